@@ -1,4 +1,18 @@
 """Adapters for accessing data sources."""
-from .filesystem_adapter import FilesystemAdapter
+from .filesystem_adapter import FilesystemAdapter, get_watcher, start_watcher, stop_watcher
+from .repo_watcher import RepositoryWatcher
+from .result_cache import ResultCache
+from .script_runner import InvalidInputError, RunnerBusyError
+from .single_flight import SingleFlight
 
-__all__ = ["FilesystemAdapter"]
+__all__ = [
+    "FilesystemAdapter",
+    "InvalidInputError",
+    "RepositoryWatcher",
+    "ResultCache",
+    "RunnerBusyError",
+    "SingleFlight",
+    "get_watcher",
+    "start_watcher",
+    "stop_watcher",
+]
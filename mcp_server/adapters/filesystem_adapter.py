@@ -1,41 +1,471 @@
 """Filesystem adapter for accessing local repository data."""
+import asyncio
+import functools
 import json
 import os
+import posixpath
 import re
-import subprocess
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from types import ModuleType
+from typing import Optional, Any, AsyncIterator, Dict, Hashable, List, Tuple
 
 from ..models import GlossaryEntry
+from .fingerprint import FingerprintCache
+from .repo_watcher import RepositoryWatcher
+from .result_cache import CACHEABLE_TOOLS, ResultCache
+from .script_runner import STREAMING_SCRIPTS, InProcessScriptRunner, InvalidInputError, SubprocessScriptRunner
+from .single_flight import SingleFlight
+from .worker_pool import get_worker_pool
+
+
+# Supported values for the script execution mode
+EXECUTION_MODES = ("inprocess", "subprocess", "pool")
+
+ALLOWED_ARG_FLAGS = ['--scope', '--ids', '--include', '--edgeTypes', '--outputFormat',
+                     '--filters', '--version', '--targets', '--ruleset', '--fixMode',
+                     '--baseRef', '--headRef', '--threshold', '--scopes',
+                     '--includeDiffSummary', '--root', '--patterns',
+                     '--query', '--start', '--target', '--depth', '--direction',
+                     '--limit', '--cursor', '--top', '--quarter', '--ref', '--date',
+                     '--focus']
+
+# Flags whose value is a JSON object; it is validated and canonicalized
+# instead of being matched against the character whitelist
+JSON_ARG_FLAGS = ('--filters',)
+
+# Flags whose value is a git revision; besides the usual characters it may
+# use revision syntax such as HEAD~1, main^ or HEAD@{1}
+REF_ARG_FLAGS = ('--ref', '--baseRef', '--headRef')
+
+# Scripts are imported once per server process and shared by all adapters
+_in_process_runner = InProcessScriptRunner()
+
+# Identical concurrent script calls are coalesced across all adapters
+default_single_flight = SingleFlight()
+
+# Results keyed on repository state are shared across all adapters
+default_result_cache = ResultCache()
+
+# Recent repository fingerprints are shared across all adapters
+default_fingerprints = FingerprintCache()
+
+# Scripts that keep the state of a watched repository in memory, with the
+# function that enables it; both take changes through apply_changes()
+LIVE_SCRIPTS = {"semantic_graph.py": "watch_worktree", "adr_index.py": "watch_records"}
+
+# Running watchers by absolute repository root
+_watchers: Dict[str, RepositoryWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def start_watcher(
+    repo_root: Optional[str] = None,
+    backend: Optional[str] = None,
+    execution_mode: Optional[str] = None,
+) -> RepositoryWatcher:
+    """Watch a repository so that adapters key its cached tools on watcher tokens.
+    
+    In the "inprocess" execution mode the scripts in LIVE_SCRIPTS also keep
+    the worktree graph and ADR index in memory, updated from the watcher's
+    change batches instead of being rebuilt.
+    
+    Args:
+        repo_root: Root directory of the repository. Defaults to current directory.
+        backend: Watcher backend, see RepositoryWatcher
+        execution_mode: Execution mode of the adapters serving the repository.
+            Defaults to MCP_SCRIPT_EXECUTION, or "inprocess".
+    
+    Returns:
+        The running watcher
+    
+    Raises:
+        OSError: If the requested backend is unavailable
+    """
+    root = os.path.abspath(repo_root or os.getcwd())
+    with _watchers_lock:
+        watcher = _watchers.get(root)
+        if watcher is not None and watcher.running:
+            return watcher
+        watcher = RepositoryWatcher(Path(root), result_cache=default_result_cache, backend=backend).start()
+        if (execution_mode or os.getenv("MCP_SCRIPT_EXECUTION", "inprocess")) == "inprocess":
+            for name, enable in LIVE_SCRIPTS.items():
+                script_path = Path(root) / "scripts" / name
+                if script_path.exists():
+                    module = _in_process_runner.load(script_path)
+                    getattr(module, enable)(root, True)
+                    watcher.subscribe(functools.partial(module.apply_changes, root))
+        _watchers[root] = watcher
+    return watcher
+
+
+def stop_watcher(repo_root: Optional[str] = None) -> None:
+    """Stop watching a repository; adapters fingerprint it on every call again.
+    
+    Args:
+        repo_root: Root directory of the repository. Defaults to current directory.
+    """
+    root = os.path.abspath(repo_root or os.getcwd())
+    with _watchers_lock:
+        watcher = _watchers.pop(root, None)
+        if watcher is None:
+            return
+        watcher.stop()
+        for name, enable in LIVE_SCRIPTS.items():
+            script_path = Path(root) / "scripts" / name
+            if script_path.exists():
+                getattr(_in_process_runner.load(script_path), enable)(root, False)
+
+
+def get_watcher(repo_root: Path) -> Optional[RepositoryWatcher]:
+    """Return the running watcher of a repository, or None."""
+    watcher = _watchers.get(os.path.abspath(repo_root))
+    return watcher if watcher is not None and watcher.running else None
 
 
 class FilesystemAdapter:
     """Adapter for reading repository files and executing scripts."""
     
-    def __init__(self, repo_root: Optional[str] = None):
+    def __init__(
+        self,
+        repo_root: Optional[str] = None,
+        execution_mode: Optional[str] = None,
+        single_flight: Optional[SingleFlight] = None,
+        result_cache: Optional[ResultCache] = None,
+        watcher: Optional[RepositoryWatcher] = None,
+        fingerprints: Optional[FingerprintCache] = None,
+    ):
         """Initialize the filesystem adapter.
         
         Args:
             repo_root: Root directory of the repository. Defaults to current directory.
+            execution_mode: How scripts are executed: "inprocess" imports supported
+                scripts into the server and calls them directly, "pool" sends them
+                to warm worker processes, "subprocess" runs every script in a fresh
+                interpreter. Defaults to the MCP_SCRIPT_EXECUTION environment
+                variable, or "inprocess".
+            single_flight: Coalescer for identical concurrent script calls.
+                Defaults to the process-wide instance.
+            result_cache: Cache for results that depend only on repository
+                state. Defaults to the process-wide instance.
+            watcher: Watcher whose tokens replace repository fingerprints.
+                Defaults to the watcher started for repo_root, if any.
+            fingerprints: Cache of recent repository fingerprints, used
+                while the repository is not watched. Defaults to the
+                process-wide instance.
         """
         self.repo_root = Path(repo_root or os.getcwd())
         self.scripts_dir = self.repo_root / "scripts"
         self.docs_dir = self.repo_root / "docs"
         self.data_dir = self.repo_root / "data"
+        
+        self.execution_mode = execution_mode or os.getenv("MCP_SCRIPT_EXECUTION", "inprocess")
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Invalid execution mode: {self.execution_mode}")
+        self.subprocess_runner = SubprocessScriptRunner()
+        self.in_process_runner = _in_process_runner
+        self.single_flight = single_flight or default_single_flight
+        self.result_cache = result_cache or default_result_cache
+        self.watcher = watcher or get_watcher(self.repo_root)
+        self.fingerprints = fingerprints or default_fingerprints
     
-    def run_script(self, script_name: str, args: List[str]) -> Dict[str, Any]:
-        """Run a Python script and return parsed JSON output.
+    def run_script(self, script_name: str, args: List[str]) -> Any:
+        """Run a repository script and return its result.
+        
+        In "inprocess" mode, scripts listed in IN_PROCESS_SCRIPTS are called
+        directly and their result object is returned as-is; in "pool" mode they
+        run on a warm worker process. Other scripts, and every script in
+        "subprocess" mode, run in a fresh interpreter and their JSON output is
+        parsed.
+        
+        Concurrent calls with the same script, sanitized arguments and
+        repository snapshot share one execution and receive the same result.
+        Results of tools in CACHEABLE_TOOLS are cached for that snapshot.
+        With ``--ref``, the snapshot is the ref's git tree: the ref is
+        resolved to the tree SHA before the call, so the result is keyed by
+        the tree and stays valid when branches move or the worktree changes.
+        While the repository is watched (see start_watcher), the worktree
+        snapshot of a cached tool is the watcher's token for that tool, and
+        resolved refs are reused until git refs change.
         
         Args:
             script_name: Name of the script file (e.g., 'semantic_graph.py')
             args: List of command-line arguments
             
         Returns:
-            Parsed JSON output from the script
+            Script result (parsed JSON output in subprocess mode)
             
         Raises:
+            InvalidInputError: If ``--ref`` does not name a git tree or the
+                script rejects its input
             RuntimeError: If script execution fails
         """
+        script_path = self._resolve_script(script_name)
+        sanitized_args, fingerprint = self._snapshot(script_path.name, self._sanitize_args(args))
+        key = self._call_key(script_path, sanitized_args, fingerprint)
+        cacheable = fingerprint is not None and script_path.name in CACHEABLE_TOOLS
+        if cacheable:
+            hit, value = self.result_cache.get(key)
+            if hit:
+                return value
+        
+        def compute():
+            result = self._execute(script_path, sanitized_args)
+            if cacheable:
+                self.result_cache.put(key, result, tool=script_path.name)
+            return result
+        
+        return self.single_flight.do(key, compute)
+    
+    def _execute(self, script_path: Path, sanitized_args: List[str]) -> Any:
+        """Dispatch a validated script call to the configured runner."""
+        if self.execution_mode == "inprocess" and self.in_process_runner.supports(script_path):
+            return self.in_process_runner.run(script_path, sanitized_args, self.repo_root)
+        if self.execution_mode == "pool":
+            pool = get_worker_pool(self.scripts_dir)
+            if pool.supports(script_path):
+                return pool.run(script_path, sanitized_args, self.repo_root)
+        return self.subprocess_runner.run(script_path, sanitized_args, self.repo_root)
+    
+    async def run_script_async(self, script_name: str, args: List[str]) -> Any:
+        """Run a repository script without blocking the event loop.
+        
+        Same validation, execution-mode, coalescing and caching rules as run_script.
+        In-process scripts run on a bounded thread pool and subprocess scripts
+        use an asyncio subprocess, so concurrent requests on one worker overlap.
+        
+        Args:
+            script_name: Name of the script file (e.g., 'semantic_graph.py')
+            args: List of command-line arguments
+            
+        Returns:
+            Script result (parsed JSON output in subprocess mode)
+            
+        Raises:
+            InvalidInputError: If ``--ref`` does not name a git tree or the
+                script rejects its input
+            RuntimeError: If script execution fails
+        """
+        script_path = self._resolve_script(script_name)
+        sanitized_args, fingerprint = await asyncio.to_thread(
+            self._snapshot, script_path.name, self._sanitize_args(args)
+        )
+        key = self._call_key(script_path, sanitized_args, fingerprint)
+        cacheable = fingerprint is not None and script_path.name in CACHEABLE_TOOLS
+        if cacheable:
+            hit, value = self.result_cache.get(key)
+            if hit:
+                return value
+        
+        async def compute():
+            result = await self._execute_async(script_path, sanitized_args)
+            if cacheable:
+                self.result_cache.put(key, result, tool=script_path.name)
+            return result
+        
+        return await self.single_flight.do_async(key, compute)
+    
+    async def stream_script_async(self, script_name: str, args: List[str]) -> AsyncIterator[Tuple[str, Any]]:
+        """Run a streaming script and yield its (kind, record) pairs as they are produced.
+        
+        Arguments are validated as for run_script and ``--ref`` is resolved
+        to its tree, but streams are neither coalesced nor cached: every
+        caller gets its own run. In "inprocess" mode the script's ``stream``
+        entry point runs on the in-process thread pool; in the other modes
+        the script runs in a subprocess that prints NDJSON, since pool
+        workers return whole results only.
+        
+        Args:
+            script_name: Name of a script in STREAMING_SCRIPTS
+            args: List of command-line arguments
+            
+        Yields:
+            (kind, record) pairs, e.g. ("diagnostic", {...}) for the validator
+            
+        Raises:
+            InvalidInputError: If ``--ref`` does not name a git tree or the
+                script rejects its input
+            RuntimeError: If the script does not stream or its execution fails
+        """
+        script_path = self._resolve_script(script_name)
+        if script_path.name not in STREAMING_SCRIPTS:
+            raise RuntimeError(f"Script does not stream: {script_name}")
+        sanitized_args = self._sanitize_args(args)
+        if '--ref' in sanitized_args:
+            # The worktree is not fingerprinted, only the ref resolved
+            sanitized_args, _fingerprint = await asyncio.to_thread(self._snapshot, script_path.name, sanitized_args)
+        if self.execution_mode == "inprocess":
+            records = self.in_process_runner.stream_async(script_path, sanitized_args, self.repo_root)
+        else:
+            records = self.subprocess_runner.stream_async(script_path, sanitized_args, self.repo_root)
+        try:
+            async for record in records:
+                yield record
+        finally:
+            await records.aclose()
+    
+    async def query_graph_async(
+        self,
+        kind: str,
+        start: List[str],
+        depth: Optional[int] = None,
+        edge_types: Optional[List[str]] = None,
+        direction: Optional[str] = None,
+        target: Optional[str] = None,
+        ref: Optional[str] = None,
+    ) -> Any:
+        """Answer a semantic graph query.
+        
+        In the in-process and pool modes the full graph of the current
+        snapshot is taken from the result cache (built once per snapshot)
+        and queried in this process through its forward and reverse
+        adjacency indexes. The subprocess mode runs the query in the script.
+        
+        Args:
+            kind: neighbors, expand, dependents or path
+            start: Ids or paths of the start nodes
+            depth: Maximum number of hops
+            edge_types: Edge types to follow
+            direction: out, in or both
+            target: Destination id or path for path queries
+            ref: Git ref whose tree is queried instead of the worktree
+        
+        Returns:
+            The result subgraph (compact graph or its parsed JSON shape)
+        
+        Raises:
+            RuntimeError: If script execution fails
+        """
+        snapshot = ["--ref", ref] if ref else []
+        if self.execution_mode != "subprocess":
+            graph = await self.run_script_async("semantic_graph.py", ["--scope", "project", *snapshot])
+            if hasattr(graph, "query"):
+                return graph.query(
+                    kind, start, depth=depth, edge_types=edge_types,
+                    direction=direction, target=target,
+                )
+        
+        args = ["--query", kind, "--start", *start, *snapshot]
+        if depth is not None:
+            args.extend(["--depth", str(depth)])
+        if edge_types:
+            args.extend(["--edgeTypes", *edge_types])
+        if direction:
+            args.extend(["--direction", direction])
+        if target:
+            args.extend(["--target", target])
+        return await self.run_script_async("semantic_graph.py", args)
+    
+    async def graph_page_async(self, args: List[str], limit: int, cursor: Optional[str] = None) -> Any:
+        """Return one page of the semantic graph selected by ``args``.
+        
+        In the in-process and pool modes the selected graph is taken from
+        the result cache, so all pages of a snapshot share one build, and
+        only the requested page is materialized. The subprocess mode pages
+        in the script.
+        
+        Args:
+            args: semantic_graph.py arguments selecting the graph
+            limit: Maximum number of nodes plus edges in the page
+            cursor: meta.nextCursor of the previous page
+        
+        Returns:
+            The page in JSON shape, with meta.nextCursor when more records follow
+        
+        Raises:
+            InvalidInputError: If the cursor is invalid, or stale because the
+                repository or the selection changed since it was issued
+            RuntimeError: If script execution fails
+        """
+        if self.execution_mode != "subprocess":
+            graph = await self.run_script_async("semantic_graph.py", args)
+            if hasattr(graph, "page"):
+                return graph.page(cursor, limit)
+        
+        page_args = [*args, "--limit", str(limit)]
+        if cursor:
+            page_args.extend(["--cursor", cursor])
+        return await self.run_script_async("semantic_graph.py", page_args)
+    
+    async def _execute_async(self, script_path: Path, sanitized_args: List[str]) -> Any:
+        """Dispatch a validated script call to the configured runner."""
+        if self.execution_mode == "inprocess" and self.in_process_runner.supports(script_path):
+            return await self.in_process_runner.run_async(script_path, sanitized_args, self.repo_root)
+        if self.execution_mode == "pool":
+            pool = get_worker_pool(self.scripts_dir)
+            if pool.supports(script_path):
+                return await pool.run_async(script_path, sanitized_args, self.repo_root)
+        return await self.subprocess_runner.run_async(script_path, sanitized_args, self.repo_root)
+    
+    def _snapshot(self, tool: str, sanitized_args: List[str]) -> Tuple[List[str], Optional[str]]:
+        """Return the arguments to execute and the fingerprint of their snapshot.
+        
+        A ``--ref`` value is replaced by the SHA of its tree, which is also
+        the fingerprint; otherwise the worktree is fingerprinted, or its
+        watcher token is used.
+        
+        Raises:
+            InvalidInputError: If ``--ref`` does not name a git tree
+        """
+        if '--ref' not in sanitized_args:
+            token = self._watch_token(tool, sanitized_args)
+            return sanitized_args, token if token is not None else self.fingerprints.get(self.repo_root)
+        i = sanitized_args.index('--ref') + 1
+        if i >= len(sanitized_args) or sanitized_args[i].startswith('--'):
+            raise InvalidInputError("--ref requires a value")
+        resolve = functools.partial(self._git_helper().resolve_tree, str(self.repo_root))
+        ref = sanitized_args[i]
+        tree = self.watcher.resolve_tree(ref, resolve) if self.watcher is not None else resolve(ref)
+        return [*sanitized_args[:i], tree, *sanitized_args[i + 1:]], f"tree:{tree}"
+    
+    def _git_helper(self) -> ModuleType:
+        """Return scripts/semantic_git.py, which resolves refs for the adapter and the scripts alike.
+        
+        Raises:
+            RuntimeError: If the scripts directory has no semantic_git.py
+        """
+        return self.in_process_runner.load_helper(self._resolve_script("semantic_git.py"))
+    
+    def _watch_token(self, tool: str, sanitized_args: List[str]) -> Optional[str]:
+        """Return the watcher token for a worktree call, or None to fingerprint.
+        
+        ADR indexes are only tracked below docs/; other roots are fingerprinted.
+        """
+        if self.watcher is None:
+            return None
+        if tool == "adr_index.py" and '--root' in sanitized_args:
+            i = sanitized_args.index('--root') + 1
+            root = posixpath.normpath(sanitized_args[i]) if i < len(sanitized_args) else ""
+            if root != "docs" and not root.startswith("docs/"):
+                return None
+        return self.watcher.token(tool)
+    
+    def _call_key(self, script_path: Path, sanitized_args: List[str], fingerprint: Optional[str]) -> Hashable:
+        """Identity of a script call for coalescing and caching.
+        
+        Arguments are normalized into (flag, values) groups sorted by flag, so
+        the same options passed in a different order share a key.
+        """
+        groups = []
+        flag, values = "", []
+        for arg in sanitized_args:
+            if arg.startswith("--"):
+                if flag or values:
+                    groups.append((flag, tuple(values)))
+                flag, values = arg, []
+            else:
+                values.append(arg)
+        if flag or values:
+            groups.append((flag, tuple(values)))
+        return (self.execution_mode, str(self.repo_root), str(script_path), tuple(sorted(groups)), fingerprint)
+    
+    def _resolve_script(self, script_name: str) -> Path:
+        """Resolve a script name inside the scripts directory.
+        
+        Raises:
+            RuntimeError: If the name is empty, escapes the scripts directory,
+                or the script does not exist
+        """
         # Validate script name to prevent path traversal using Path.resolve()
         if not script_name:
             raise RuntimeError(f"Invalid script name: {script_name}")
@@ -50,13 +480,16 @@ class FilesystemAdapter:
         
         if not script_path.exists():
             raise RuntimeError(f"Script not found: {script_path}")
+        return script_path
+    
+    def _sanitize_args(self, args: List[str]) -> List[str]:
+        """Validate script arguments against the flag and character whitelists.
         
-        # Validate and sanitize arguments
+        Raises:
+            RuntimeError: If a flag is not allowed or a value contains
+                disallowed characters
+        """
         sanitized_args = []
-        allowed_arg_prefixes = ['--scope', '--ids', '--include', '--edgeTypes', '--outputFormat', 
-                                '--filters', '--version', '--targets', '--ruleset', '--fixMode',
-                                '--baseRef', '--headRef', '--threshold', '--scopes', 
-                                '--includeDiffSummary', '--root', '--patterns']
         
         i = 0
         while i < len(args):
@@ -64,13 +497,21 @@ class FilesystemAdapter:
             
             # Check if it's a flag
             if arg.startswith('--'):
-                if arg not in allowed_arg_prefixes:
+                if arg not in ALLOWED_ARG_FLAGS:
                     raise RuntimeError(f"Invalid argument flag: {arg}")
                 sanitized_args.append(arg)
                 i += 1
                 
                 # Get the value for this flag if it exists
-                if i < len(args) and not args[i].startswith('--'):
+                if arg in JSON_ARG_FLAGS and i < len(args):
+                    sanitized_args.append(self._canonical_json(args[i]))
+                    i += 1
+                elif arg in REF_ARG_FLAGS and i < len(args) and not args[i].startswith('-'):
+                    if not re.fullmatch(r'[\w\-/.~^@{}]+', args[i]):
+                        raise RuntimeError(f"Invalid characters in argument value: {args[i]}")
+                    sanitized_args.append(args[i])
+                    i += 1
+                elif i < len(args) and not args[i].startswith('--'):
                     value = args[i]
                     # Whitelist: allow only alphanumeric, dash, underscore, dot, forward slash, and colon
                     if not re.fullmatch(r'^[\w\-/.,:]+$', value):
@@ -84,30 +525,22 @@ class FilesystemAdapter:
                     raise RuntimeError(f"Invalid characters in argument: {arg}")
                 sanitized_args.append(arg)
                 i += 1
+        return sanitized_args
+    
+    @staticmethod
+    def _canonical_json(value: str) -> str:
+        """Validate a JSON object argument and return it in canonical form.
         
+        Raises:
+            RuntimeError: If the value is not a JSON object
+        """
         try:
-            # Security note: Arguments are sanitized above through:
-            # 1. Script name validation (no path traversal)
-            # 2. Argument flag whitelist
-            # 3. Shell metacharacter filtering
-            # 4. Using list form (not shell=True) prevents shell injection
-            # CodeQL may flag this as command injection, but it's mitigated by comprehensive
-            # input validation above. All user input is sanitized before reaching subprocess.
-            result = subprocess.run(
-                ["python3", str(script_path)] + sanitized_args,
-                cwd=str(self.repo_root),
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=30
-            )
-            return json.loads(result.stdout)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Script execution failed: {e.stderr}")
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Failed to parse script output: {e}")
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("Script execution timed out")
+            parsed = json.loads(value)
+        except ValueError:
+            raise RuntimeError(f"Invalid JSON in argument value: {value}")
+        if not isinstance(parsed, dict):
+            raise RuntimeError(f"Argument value must be a JSON object: {value}")
+        return json.dumps(parsed, sort_keys=True, separators=(",", ":"))
     
     def read_glossary(self) -> List[GlossaryEntry]:
         """Parse and return glossary entries from docs/glossary.md.
@@ -182,6 +615,25 @@ class FilesystemAdapter:
         
         return entries
     
+    async def read_glossary_async(self) -> List[GlossaryEntry]:
+        """Return glossary entries, cached for the current repository snapshot.
+        
+        Returns:
+            List of GlossaryEntry objects
+        """
+        fingerprint = self.watcher.token("glossary") if self.watcher is not None else None
+        if fingerprint is None:
+            fingerprint = await asyncio.to_thread(self.fingerprints.get, self.repo_root)
+        key = ("glossary", str(self.repo_root), fingerprint)
+        if fingerprint is not None:
+            hit, value = self.result_cache.get(key)
+            if hit:
+                return value
+        entries = await asyncio.to_thread(self.read_glossary)
+        if fingerprint is not None:
+            self.result_cache.put(key, entries, tool="glossary")
+        return entries
+    
     def read_file(self, relative_path: str) -> str:
         """Read a file from the repository.
         
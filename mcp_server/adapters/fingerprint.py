@@ -0,0 +1,123 @@
+"""Cheap repository snapshot fingerprints."""
+import hashlib
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# Caches written by the scripts themselves; they never change tool results
+GENERATED_PATHS = (
+    "data/semantic-graph.json", "data/semantic-graph.snap", "data/semantic-graph-trees", "data/semantic-validation.json",
+)
+
+
+def repository_fingerprint(repo_root: Path) -> Optional[str]:
+    """Return a fingerprint of the current repository state.
+
+    The fingerprint combines the HEAD tree SHA with the worktree dirty state:
+    the porcelain status plus the size and modification time of every dirty
+    path, so repeated edits to an already-modified file still change it.
+    Caches generated by the scripts (GENERATED_PATHS) are excluded.
+
+    Args:
+        repo_root: Root directory of the repository
+
+    Returns:
+        Hex digest, or None if repo_root is not a git work tree
+    """
+    try:
+        tree = subprocess.run(
+            ["git", "rev-parse", "HEAD^{tree}"],
+            cwd=str(repo_root), capture_output=True, check=True, timeout=10,
+        ).stdout.strip()
+        status = subprocess.run(
+            # Without optional locks, git status does not rewrite the index,
+            # which would change git_stamp() and take the lock from the user
+            ["git", "--no-optional-locks", "status", "--porcelain=v1", "-z", "--untracked-files=all", "--", "."]
+            + [f":(exclude){p}" for p in GENERATED_PATHS],
+            cwd=str(repo_root), capture_output=True, check=True, timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    digest = hashlib.sha1(tree)
+    digest.update(b"\0")
+    digest.update(status)
+
+    entries = status.split(b"\0")
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if len(entry) < 4:
+            continue
+        # Renames and copies are followed by the original path
+        if entry[:1] in (b"R", b"C"):
+            i += 1
+        path = os.path.join(str(repo_root), os.fsdecode(entry[3:]))
+        try:
+            st = os.stat(path)
+            digest.update(f"{st.st_mtime_ns}:{st.st_size}".encode())
+        except OSError:
+            digest.update(b"-")
+    return digest.hexdigest()
+
+
+def git_stamp(repo_root: Path) -> Tuple[Optional[Tuple[int, int]], ...]:
+    """Return the mtime and size of git's HEAD, HEAD reflog and index files.
+
+    Commits, checkouts, resets and staging change at least one of them.
+    """
+    stamp = []
+    for name in ("HEAD", os.path.join("logs", "HEAD"), "index"):
+        try:
+            st = os.stat(os.path.join(str(repo_root), ".git", name))
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+class FingerprintCache:
+    """Reuses repository fingerprints for a short window.
+
+    repository_fingerprint() runs two git processes, and ``git status``
+    scans the whole worktree, so without a watcher every cacheable call
+    would pay for it, result-cache hits included. A fingerprint is reused
+    for ``ttl`` seconds while git_stamp() is unchanged: git operations are
+    seen at once, other worktree edits after at most ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a fingerprint is reused; 0 fingerprints on every
+                call. Defaults to MCP_FINGERPRINT_TTL, or 2.
+        """
+        self.ttl = ttl if ttl is not None else float(os.getenv("MCP_FINGERPRINT_TTL", "2"))
+        self._entries: Dict[str, Tuple[float, Tuple[Optional[Tuple[int, int]], ...], Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, repo_root: Path) -> Optional[str]:
+        """Return the fingerprint of a repository, reusing a recent one.
+
+        Returns:
+            Hex digest, or None if repo_root is not a git work tree
+        """
+        if self.ttl <= 0:
+            return repository_fingerprint(repo_root)
+        key = os.path.abspath(repo_root)
+        stamp = git_stamp(repo_root)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now and entry[1] == stamp:
+            return entry[2]
+        fingerprint = repository_fingerprint(repo_root)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, stamp, fingerprint)
+        return fingerprint
@@ -0,0 +1,152 @@
+"""Streaming serializers for semantic graph results.
+
+Script results are either the scripts' compact graph (in-process and pool
+execution) or its parsed JSON shape (subprocess execution). Both are read
+record by record, so a compact graph is never materialized as a whole and
+no response model is involved.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+
+# Node columns in export order; id is always exported
+NODE_COLUMNS = ("id", "scope", "name", "path", "owners", "contract", "meta")
+
+EDGE_COLUMNS = ("from", "to", "type", "label", "confidence")
+
+# Media types of the export formats
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "dot": "text/vnd.graphviz",
+    "graphml": "application/graphml+xml",
+    "csv": "text/csv",
+}
+
+# Number of CSV rows written per streamed chunk
+CSV_CHUNK_ROWS = 500
+
+
+def graph_records(
+    result: Any, edges_only: bool = False
+) -> Tuple[Iterator[Tuple[str, Dict[str, Any]]], Dict[str, Any]]:
+    """Return the ("node" | "edge", record) iterator and the meta of a graph result.
+
+    Nodes come before edges. With ``edges_only`` the nodes are skipped
+    without being materialized.
+    """
+    if hasattr(result, "records"):
+        return result.records(result.num_nodes if edges_only else 0), result.graph_meta
+    nodes = [] if edges_only else [("node", n) for n in result["nodes"]]
+    return iter(nodes + [("edge", e) for e in result["edges"]]), result["meta"]
+
+
+def to_ndjson(result: Any) -> Iterator[str]:
+    """Yield one JSON line per node and edge, then a line with the meta."""
+    records, meta = graph_records(result)
+    for kind, record in records:
+        yield json.dumps({kind: record}, separators=(",", ":")) + "\n"
+    yield json.dumps({"meta": meta}, separators=(",", ":")) + "\n"
+
+
+def to_dot(result: Any) -> Iterator[str]:
+    """Yield a Graphviz digraph, one statement per line."""
+    def quote(value: str) -> str:
+        return value.replace("\"", "'")
+
+    records, _meta = graph_records(result)
+    yield "digraph SemanticGraph {\n"
+    for kind, record in records:
+        if kind == "node":
+            label = record.get("name") or record["id"]
+            yield f'  "{quote(record["id"])}" [label="{quote(label)}"];\n'
+        else:
+            label = record.get("type", "rel")
+            yield f'  "{quote(record["from"])}" -> "{quote(record["to"])}" [label="{quote(label)}"];\n'
+    yield "}\n"
+
+
+def to_graphml(result: Any, columns: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """Yield a GraphML document with node attributes and edge types as data keys.
+
+    Values are written as in the CSV export.
+
+    Args:
+        result: Graph result
+        columns: Node attributes to write; all of NODE_COLUMNS if None
+    """
+    attrs = [c for c in (columns or NODE_COLUMNS) if c != "id"]
+    records, _meta = graph_records(result)
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+    for attr in attrs:
+        yield f'  <key id="{attr}" for="node" attr.name="{attr}" attr.type="string"/>\n'
+    for attr in EDGE_COLUMNS[2:]:
+        yield f'  <key id="edge_{attr}" for="edge" attr.name="{attr}" attr.type="string"/>\n'
+    yield '  <graph id="SemanticGraph" edgedefault="directed">\n'
+    for kind, record in records:
+        if kind == "node":
+            data = "".join(
+                f'<data key="{a}">{escape(_cell(record[a]))}</data>' for a in attrs if record.get(a) is not None
+            )
+            yield f'    <node id={quoteattr(record["id"])}>{data}</node>\n'
+        else:
+            data = "".join(
+                f'<data key="edge_{a}">{escape(_cell(record[a]))}</data>'
+                for a in EDGE_COLUMNS[2:] if record.get(a) is not None
+            )
+            yield f'    <edge source={quoteattr(record["from"])} target={quoteattr(record["to"])}>{data}</edge>\n'
+    yield "  </graph>\n</graphml>\n"
+
+
+def to_csv(result: Any, table: str, columns: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """Yield the node or edge table of a graph as CSV with a header row.
+
+    Lists are joined with ``;``, objects are written as JSON and missing
+    values are empty.
+
+    Args:
+        result: Graph result
+        table: "nodes" or "edges"
+        columns: Node columns to write (id is always written); all of
+            NODE_COLUMNS if None. Ignored for the edge table.
+
+    Raises:
+        ValueError: If table is not "nodes" or "edges"
+    """
+    if table == "nodes":
+        header = ["id"] + [c for c in (columns or NODE_COLUMNS) if c != "id"]
+        kind = "node"
+    elif table == "edges":
+        header = list(EDGE_COLUMNS)
+        kind = "edge"
+    else:
+        raise ValueError(f"Unknown table: {table}")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    records, _meta = graph_records(result, edges_only=kind == "edge")
+    rows = 0
+    for record_kind, record in records:
+        if record_kind != kind:
+            break
+        writer.writerow([_cell(record.get(c)) for c in header])
+        rows += 1
+        if rows % CSV_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return str(value)
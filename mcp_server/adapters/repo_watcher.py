@@ -0,0 +1,491 @@
+"""Filesystem watcher that keeps per-tool repository fingerprints current.
+
+Without a watcher every request fingerprints the repository (two git
+commands plus a stat of each dirty path), and any edit anywhere changes the
+fingerprint of every tool. A RepositoryWatcher instead receives change
+events, through inotify on Linux or by polling elsewhere, and keeps one
+generation counter per cached tool. A change moves only the generations of
+the tools whose results it can affect and drops only their cached entries;
+requests read the current generation without touching the filesystem.
+
+Listeners receive each batch of changed paths before the generations move,
+so state they keep in memory (the worktree graph, the ADR index) is current
+by the time a request can observe the new generation.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import posixpath
+import select
+import struct
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .fingerprint import GENERATED_PATHS
+from .result_cache import CACHEABLE_TOOLS, ResultCache
+
+
+logger = logging.getLogger(__name__)
+
+# Supported values for the watcher backend; "auto" prefers inotify
+WATCH_BACKENDS = ("auto", "inotify", "poll")
+
+# Directories that are never watched; nothing the tools read lives there
+IGNORED_DIRS = frozenset({
+    ".hg", ".svn", "node_modules", ".venv", "venv", "__pycache__",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+})
+
+# Git metadata that decides what refs resolve to
+GIT_REF_FILES = ("HEAD", "packed-refs", "FETCH_HEAD", "ORIG_HEAD", "MERGE_HEAD")
+
+# Quiet period that ends a batch of inotify events, in seconds
+DEBOUNCE = 0.05
+
+# Pseudo-topic for changes to git refs; it clears resolved refs only
+REFS = "refs"
+
+
+def classify(rel: str) -> Set[str]:
+    """Return the cached tools whose results a change to a path can affect.
+
+    Args:
+        rel: '/'-separated path relative to the repository root; may name a
+            file or a directory
+
+    Returns:
+        Tool names, plus REFS for git ref changes
+    """
+    if rel == ".git" or rel.startswith(".git/"):
+        name = rel[5:]
+        return {REFS} if name in GIT_REF_FILES or name.startswith("refs/") else set()
+    if any(rel == p or rel.startswith(p + "/") for p in GENERATED_PATHS):
+        return set()
+    if posixpath.dirname(rel) == "data" and posixpath.basename(rel).startswith(".") and rel.endswith(".tmp"):
+        # Temporary files of the scripts' own atomic writes
+        return set()
+    # Validation targets may be any file, and nesting depends on directories
+    tools = {"semantic_validator.py"}
+    name = posixpath.basename(rel)
+    if name.lower() == "semantic-instructions.md" or rel == ".github/copilot-instructions.md":
+        tools.add("semantic_graph.py")
+    elif name == ".gitignore":
+        tools.update({"semantic_graph.py", "adr_index.py"})
+    if rel == "docs/glossary.md":
+        tools.add("glossary")
+    elif rel.startswith("docs/") or rel == "docs":
+        tools.add("adr_index.py")
+    return tools
+
+
+def watched_dirs(root: Path, start: str = "") -> Iterator[str]:
+    """Yield the '/'-separated relative paths of the directories to watch below start.
+
+    Inside .git only the directory itself and refs/ are watched.
+    """
+    stack = [start]
+    while stack:
+        rel = stack.pop()
+        yield rel
+        if rel == ".git":
+            if (root / ".git" / "refs").is_dir():
+                stack.append(".git/refs")
+            continue
+        try:
+            with os.scandir(root / rel if rel else root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir and entry.name not in IGNORED_DIRS:
+                stack.append(f"{rel}/{entry.name}" if rel else entry.name)
+
+
+def _scan_files(root: Path, dirs: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """Return {path: (mtime_ns, size)} of the files directly in the given directories."""
+    files: Dict[str, Tuple[int, int]] = {}
+    for rel in dirs:
+        try:
+            with os.scandir(root / rel if rel else root) as it:
+                for entry in it:
+                    if rel == ".git" and entry.name not in GIT_REF_FILES:
+                        continue
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            files[f"{rel}/{entry.name}" if rel else entry.name] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files
+
+
+class _PollingBackend:
+    """Detects changes by comparing the stat of every watched file at an interval."""
+
+    name = "poll"
+
+    def __init__(self, root: Path, interval: float):
+        self.root = root
+        self.interval = interval
+        self._dirs: Set[str] = set()
+        self._files: Dict[str, Tuple[int, int]] = {}
+
+    def open(self) -> None:
+        self._dirs, self._files = self._scan()
+
+    def _scan(self) -> Tuple[Set[str], Dict[str, Tuple[int, int]]]:
+        dirs = set(watched_dirs(self.root))
+        return dirs, _scan_files(self.root, dirs)
+
+    def read(self, stop: threading.Event) -> Optional[Set[str]]:
+        """Wait one interval and return the paths that changed since the last scan."""
+        if stop.wait(self.interval):
+            return set()
+        dirs, files = self._scan()
+        changed = {rel for rel in files.keys() | self._files.keys() if files.get(rel) != self._files.get(rel)}
+        changed.update(dirs ^ self._dirs)
+        self._dirs, self._files = dirs, files
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyBackend:
+    """Receives change events from the Linux kernel for every watched directory."""
+
+    name = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    IN_ISDIR = 0x40000000
+
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: Path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = -1
+        self._paths: Dict[int, str] = {}
+        self._wds: Dict[str, int] = {}
+
+    def open(self) -> None:
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        try:
+            for rel in watched_dirs(self.root):
+                self._add_watch(rel)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, rel: str) -> None:
+        path = os.fsencode(str(self.root / rel if rel else self.root))
+        wd = self._libc.inotify_add_watch(self._fd, path, self.MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            if errno in (2, 20):
+                # ENOENT, ENOTDIR: removed or replaced before it was watched
+                return
+            # ENOSPC means the watch limit (fs.inotify.max_user_watches) is reached
+            raise OSError(errno, f"inotify_add_watch failed for {rel or '.'}")
+        old = self._paths.get(wd)
+        if old is not None and self._wds.get(old) == wd:
+            del self._wds[old]
+        self._paths[wd] = rel
+        self._wds[rel] = wd
+
+    def _forget(self, rel: str) -> None:
+        """Drop the watches of a directory moved away and of its subdirectories."""
+        prefix = rel + "/"
+        for path in [p for p in self._wds if p == rel or p.startswith(prefix)]:
+            wd = self._wds.pop(path)
+            if self._paths.get(wd) == path:
+                del self._paths[wd]
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read(self, stop: threading.Event) -> Optional[Set[str]]:
+        """Wait for events and return the changed paths once they go quiet.
+
+        Returns None when the kernel queue overflowed, or a directory was
+        moved away, whose files are not reported one by one.
+        """
+        changed: Set[str] = set()
+        lost = False
+        timeout = 0.5
+        while not stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+            if not ready:
+                if changed or lost:
+                    break
+                continue
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+            lost = self._parse(data, changed) or lost
+            timeout = DEBOUNCE
+        return None if lost else changed
+
+    def _parse(self, data: bytes, changed: Set[str]) -> bool:
+        """Add the paths of the events in data to changed; True if changes were lost."""
+        lost = False
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                lost = True
+                continue
+            if mask & self.IN_IGNORED:
+                rel = self._paths.pop(wd, None)
+                if rel is not None and self._wds.get(rel) == wd:
+                    del self._wds[rel]
+                continue
+            parent = self._paths.get(wd)
+            if parent is None or not name:
+                continue
+            rel = f"{parent}/{name}" if parent else name
+            if parent == ".git" and name not in GIT_REF_FILES and name != "refs":
+                continue
+            changed.add(rel)
+            if mask & self.IN_ISDIR:
+                if mask & self.IN_MOVED_FROM:
+                    self._forget(rel)
+                    lost = True
+                elif mask & (self.IN_CREATE | self.IN_MOVED_TO) and name not in IGNORED_DIRS:
+                    # Files created before the new watches took effect are
+                    # reported from a scan of the directory
+                    dirs = list(watched_dirs(self.root, rel))
+                    for sub in dirs:
+                        self._add_watch(sub)
+                    changed.update(dirs)
+                    changed.update(_scan_files(self.root, dirs))
+        return lost
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._paths.clear()
+        self._wds.clear()
+
+
+class RepositoryWatcher:
+    """Keeps per-tool fingerprints of one repository current from change events.
+
+    Tokens are only handed out while the watcher is running; callers fall
+    back to fingerprinting the repository otherwise. Changes become visible
+    once their batch is processed, within DEBOUNCE (inotify) or the polling
+    interval of the write.
+    """
+
+    def __init__(
+        self,
+        repo_root: Path,
+        result_cache: Optional[ResultCache] = None,
+        backend: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            repo_root: Root directory of the repository
+            result_cache: Cache whose entries of superseded generations are dropped
+            backend: "inotify", "poll" or "auto". Defaults to MCP_WATCH_BACKEND, or "auto".
+            poll_interval: Seconds between scans of the polling backend.
+                Defaults to MCP_WATCH_INTERVAL, or 2.
+        """
+        self.repo_root = Path(repo_root)
+        self.result_cache = result_cache
+        self.backend = backend or os.getenv("MCP_WATCH_BACKEND", "auto")
+        if self.backend not in WATCH_BACKENDS:
+            raise ValueError(f"Invalid watch backend: {self.backend}")
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.getenv("MCP_WATCH_INTERVAL", "2"))
+
+        self._id = uuid.uuid4().hex[:12]
+        self._generations: Dict[str, int] = {tool: 0 for tool in CACHEABLE_TOOLS}
+        self._trees: Dict[str, str] = {}
+        self._listeners: List[Callable[[Optional[List[str]]], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._impl = None
+        self._stats = {"batches": 0, "paths": 0, "overflows": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "RepositoryWatcher":
+        """Set up the watches and start the watcher thread.
+
+        Raises:
+            OSError: If the inotify backend was requested and is unavailable
+        """
+        if self.running:
+            return self
+        impl = None
+        if self.backend in ("auto", "inotify"):
+            try:
+                impl = _InotifyBackend(self.repo_root)
+                impl.open()
+            except (OSError, AttributeError) as e:
+                if self.backend == "inotify":
+                    raise OSError(f"inotify backend unavailable: {e}")
+                logger.info("inotify unavailable (%s); polling %s", e, self.repo_root)
+                impl = None
+        if impl is None:
+            impl = _PollingBackend(self.repo_root, self.poll_interval)
+            impl.open()
+        self._impl = impl
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="repository-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the watcher thread and release the watches."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._impl is not None:
+            self._impl.close()
+            self._impl = None
+
+    def subscribe(self, listener: Callable[[Optional[List[str]]], None]) -> None:
+        """Register a callable that receives every batch of changed paths.
+
+        It is called on the watcher thread before the affected tokens move,
+        with '/'-separated paths relative to the repository root, or None
+        when changes were lost and all state must be considered stale.
+        """
+        self._listeners.append(listener)
+
+    def token(self, tool: str) -> Optional[str]:
+        """Return the fingerprint of the tool's inputs, or None if not running.
+
+        Args:
+            tool: A tool in CACHEABLE_TOOLS
+        """
+        if tool not in self._generations or not self.running:
+            return None
+        with self._lock:
+            return f"watch:{self._id}:{self._generations[tool]}"
+
+    def resolve_tree(self, ref: str, resolve: Callable[[str], str]) -> str:
+        """Return the tree SHA of a ref, resolving it once until refs change.
+
+        Args:
+            ref: Git revision
+            resolve: Resolves an uncached ref; its errors propagate
+        """
+        if not self.running:
+            return resolve(ref)
+        with self._lock:
+            tree = self._trees.get(ref)
+        if tree is None:
+            tree = resolve(ref)
+            with self._lock:
+                self._trees[ref] = tree
+        return tree
+
+    def apply(self, paths: Optional[Iterable[str]]) -> Set[str]:
+        """Process a batch of changed paths.
+
+        Listeners are notified first; then the tokens of the affected tools
+        move and their cached results under the old tokens are dropped.
+
+        Args:
+            paths: '/'-separated paths relative to the repository root, or
+                None if changes were lost
+
+        Returns:
+            The affected tools, plus REFS if git refs changed
+        """
+        batch = None if paths is None else sorted(set(paths))
+        if batch is None:
+            affected = {*self._generations, REFS}
+        else:
+            affected = set()
+            for rel in batch:
+                affected |= classify(rel)
+        if not affected:
+            return affected
+
+        for listener in self._listeners:
+            try:
+                listener(batch)
+            except Exception:
+                logger.exception("Repository watcher listener failed")
+
+        with self._lock:
+            self._stats["batches"] += 1
+            if batch is None:
+                self._stats["overflows"] += 1
+            else:
+                self._stats["paths"] += len(batch)
+            if REFS in affected:
+                self._trees.clear()
+            stale = {}
+            for tool in affected & self._generations.keys():
+                stale[tool] = f"watch:{self._id}:{self._generations[tool]}"
+                self._generations[tool] += 1
+        if self.result_cache is not None:
+            for tool, token in stale.items():
+                self.result_cache.invalidate(tool, match=lambda key, token=token: key[-1] == token)
+        return affected
+
+    def stats(self) -> Dict[str, object]:
+        """Return the backend, batch counters and current generations."""
+        with self._lock:
+            return {
+                "backend": self._impl.name if self._impl is not None else None,
+                "running": self.running,
+                **self._stats,
+                "generations": dict(self._generations),
+            }
+
+    def _loop(self) -> None:
+        impl = self._impl
+        while not self._stop.is_set():
+            try:
+                changed = impl.read(self._stop)
+            except Exception:
+                logger.exception("Repository watcher failed; treating all state as stale")
+                changed = None
+                time.sleep(self.poll_interval)
+            if self._stop.is_set():
+                break
+            if changed is None or changed:
+                self.apply(changed)
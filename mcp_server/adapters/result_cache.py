@@ -0,0 +1,121 @@
+"""Bounded LRU/TTL cache for tool results keyed on repository state."""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+# Tools whose results depend only on repository state. Drift results also
+# depend on refs that can move without touching the worktree, so they are
+# never cached.
+CACHEABLE_TOOLS = frozenset({
+    "semantic_graph.py",
+    "semantic_validator.py",
+    "adr_index.py",
+    "glossary",
+})
+
+
+class ResultCache:
+    """Least-recently-used result cache with optional time-to-live.
+
+    Keys must identify the repository snapshot they were computed from, so
+    entries never need to be invalidated for correctness; explicit
+    invalidation only frees memory or forces recomputation. Cached results
+    are shared objects and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries. Defaults to MCP_CACHE_MAX_SIZE, or 100.
+            ttl: Seconds an entry stays valid; 0 disables expiry. Defaults to
+                MCP_CACHE_TTL, or 300.
+            enabled: Whether results are cached at all. Defaults to
+                MCP_CACHE_ENABLED, or true.
+        """
+        self.max_size = max_size if max_size is not None else int(os.getenv("MCP_CACHE_MAX_SIZE", "100"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("MCP_CACHE_TTL", "300"))
+        if enabled is None:
+            enabled = os.getenv("MCP_CACHE_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Look up a result.
+
+        Returns:
+            Tuple of (hit, value); value is None on a miss
+        """
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, _tool, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return True, value
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any, tool: str) -> None:
+        """Store a result, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key, including the repository fingerprint
+            value: Result to store
+            tool: Tool that produced the result, used for invalidation
+        """
+        if not self.enabled or self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._entries[key] = (value, tool, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, tool: Optional[str] = None, match: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Drop cached results.
+
+        Args:
+            tool: Only drop results of this tool; drops everything if None
+            match: Only drop entries whose key it returns True for
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [
+                k for k, (_v, t, _e) in self._entries.items()
+                if (tool is None or t == tool) and (match is None or match(k))
+            ]
+            for key in keys:
+                del self._entries[key]
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and eviction counters and the current size."""
+        with self._lock:
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "enabled": self.enabled,
+            }
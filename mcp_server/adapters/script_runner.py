@@ -0,0 +1,432 @@
+"""Execution engines used by the filesystem adapter to run repository scripts."""
+import asyncio
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+
+# Scripts that expose a ``run(argv, repo_root)`` entry point and are safe to
+# import into the server process. Anything else always runs in a subprocess.
+IN_PROCESS_SCRIPTS = frozenset({
+    "semantic_graph.py",
+    "semantic_validator.py",
+    "semantic_drift_scanner.py",
+    "adr_index.py",
+    "semantic_gravity.py",
+    "semantic_delta.py",
+})
+
+
+# Scripts that also expose a ``stream(argv, repo_root)`` entry point yielding
+# (kind, record) pairs, and print them as NDJSON with --outputFormat ndjson
+STREAMING_SCRIPTS = frozenset({
+    "semantic_validator.py",
+})
+
+# Records a streaming script may run ahead of the client; the script thread
+# waits while this many are unsent, so server memory stays bounded
+STREAM_BUFFER = 256
+
+
+def _load_cli() -> ModuleType:
+    """Import scripts/semantic_cli.py under the name the scripts import it by.
+
+    The scripts directory sits next to the server package. Sharing the
+    module means the server catches the very InvalidInputError class that
+    scripts raise in-process, and uses their exit code for rejected input.
+    """
+    module = sys.modules.get("semantic_cli")
+    if module is None:
+        path = Path(__file__).resolve().parents[2] / "scripts" / "semantic_cli.py"
+        spec = importlib.util.spec_from_file_location("semantic_cli", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["semantic_cli"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+_cli = _load_cli()
+
+# Raised by a script for input it rejects; other errors are failed runs
+InvalidInputError = _cli.InvalidInputError
+
+# Exit code of a script that rejected its input
+INVALID_INPUT_EXIT_CODE = _cli.INVALID_INPUT_EXIT_CODE
+
+
+class RunnerBusyError(RuntimeError):
+    """Raised when the in-process runner has no room for another script."""
+
+
+class SubprocessScriptRunner:
+    """Runs scripts in a fresh Python interpreter and parses their JSON stdout."""
+
+    def __init__(self, python_executable: str = "python3", timeout: float = 30):
+        """Initialize the subprocess runner.
+
+        Args:
+            python_executable: Interpreter used to launch scripts
+            timeout: Seconds to wait before the script is killed
+        """
+        self.python_executable = python_executable
+        self.timeout = timeout
+
+    def run(self, script_path: Path, args: List[str], repo_root: Path) -> Dict[str, Any]:
+        """Run a script in a subprocess.
+
+        Args:
+            script_path: Resolved path of the script to run
+            args: Sanitized command-line arguments
+            repo_root: Working directory for the script
+
+        Returns:
+            Parsed JSON output from the script
+
+        Raises:
+            InvalidInputError: If the script rejects its input
+            RuntimeError: If script execution fails
+        """
+        try:
+            # Security note: arguments are sanitized by FilesystemAdapter before
+            # they reach this point, and the list form (not shell=True) prevents
+            # shell injection.
+            result = subprocess.run(
+                [self.python_executable, str(script_path)] + args,
+                cwd=str(repo_root),
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("Script execution timed out")
+        return parse_script_output(result.returncode, result.stdout, result.stderr)
+
+    async def run_async(self, script_path: Path, args: List[str], repo_root: Path) -> Dict[str, Any]:
+        """Run a script in an asyncio subprocess without blocking the event loop.
+
+        Args:
+            script_path: Resolved path of the script to run
+            args: Sanitized command-line arguments
+            repo_root: Working directory for the script
+
+        Returns:
+            Parsed JSON output from the script
+
+        Raises:
+            InvalidInputError: If the script rejects its input
+            RuntimeError: If script execution fails
+        """
+        proc = await asyncio.create_subprocess_exec(
+            self.python_executable, str(script_path), *args,
+            cwd=str(repo_root),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise RuntimeError("Script execution timed out")
+        return parse_script_output(
+            proc.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"),
+        )
+
+    async def stream_async(self, script_path: Path, args: List[str], repo_root: Path) -> AsyncIterator[Tuple[str, Any]]:
+        """Run a streaming script with NDJSON output and yield each record as its line arrives.
+
+        The timeout applies to the wait for each line; the script is killed
+        when the caller stops early. stderr is drained concurrently, so a
+        script that writes more than a pipe buffer to it does not block.
+
+        Args:
+            script_path: Resolved path of the script to run
+            args: Sanitized command-line arguments
+            repo_root: Working directory for the script
+
+        Yields:
+            (kind, record) pairs
+
+        Raises:
+            InvalidInputError: If the script rejects its input
+            RuntimeError: If script execution fails or times out
+        """
+        proc = await asyncio.create_subprocess_exec(
+            self.python_executable, str(script_path), *args, "--outputFormat", "ndjson",
+            cwd=str(repo_root),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stderr_read = asyncio.ensure_future(proc.stderr.read())
+        kind = None
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(proc.stdout.readline(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    raise RuntimeError("Script execution timed out")
+                if not line:
+                    break
+                try:
+                    (kind, record), = json.loads(line).items()
+                except ValueError as e:
+                    raise RuntimeError(f"Failed to parse script output: {e}")
+                yield kind, record
+            stderr = await stderr_read
+            returncode = await proc.wait()
+            if returncode == INVALID_INPUT_EXIT_CODE:
+                raise InvalidInputError(invalid_input_message(stderr.decode("utf-8", errors="replace")))
+            # The validator exits with 1 when it reports errors, after its last record
+            if returncode not in (0, 1) or kind != "summary":
+                raise RuntimeError(f"Script execution failed: {stderr.decode('utf-8', errors='replace')}")
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            stderr_read.cancel()
+
+
+def parse_script_output(returncode: int, stdout: str, stderr: str) -> Dict[str, Any]:
+    """Parse the JSON document printed by a script.
+
+    A non-zero exit code is only treated as a failure when the script did not
+    produce a JSON document; the validator, for example, exits with 1 when it
+    reports errors but still prints a complete result.
+
+    Raises:
+        InvalidInputError: If the script exited with INVALID_INPUT_EXIT_CODE
+        RuntimeError: If the script failed or its output is not valid JSON
+    """
+    if returncode == INVALID_INPUT_EXIT_CODE:
+        raise InvalidInputError(invalid_input_message(stderr))
+    try:
+        return json.loads(stdout)
+    except json.JSONDecodeError as e:
+        if returncode != 0:
+            raise RuntimeError(f"Script execution failed: {stderr}")
+        raise RuntimeError(f"Failed to parse script output: {e}")
+
+
+def invalid_input_message(stderr: str) -> str:
+    """Return the message a script printed when it rejected its input."""
+    lines = stderr.strip().splitlines()
+    message = lines[-1] if lines else ""
+    return message[len("error: "):] if message.startswith("error: ") else message
+
+
+class InProcessScriptRunner:
+    """Imports whitelisted scripts once and calls their ``run`` entry point directly.
+
+    Results are returned as Python objects, skipping interpreter startup and
+    the JSON round trip through stdout.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = 30, backlog: Optional[int] = None):
+        """Initialize the in-process runner with an empty module cache.
+
+        Args:
+            max_workers: Size of the thread pool used by ``run_async``. Defaults
+                to the MCP_SCRIPT_THREADS environment variable, or 4.
+            timeout: Seconds ``run_async`` waits for a result
+            backlog: Scripts that may wait for a thread once all are busy.
+                Defaults to the MCP_SCRIPT_BACKLOG environment variable, or 16.
+        """
+        self._modules: Dict[str, ModuleType] = {}
+        self._lock = threading.Lock()
+        self.max_workers = max_workers or int(os.getenv("MCP_SCRIPT_THREADS", "4"))
+        self.timeout = timeout
+        self.backlog = backlog if backlog is not None else int(os.getenv("MCP_SCRIPT_BACKLOG", "16"))
+        # A slot is held until the script returns, not until its caller gives
+        # up, so scripts that outlive their timeout keep counting
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.backlog)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def supports(self, script_path: Path) -> bool:
+        """Return True if the script can be executed in-process."""
+        return script_path.name in IN_PROCESS_SCRIPTS
+
+    def load(self, script_path: Path) -> ModuleType:
+        """Import a script module, reusing the cached module on later calls.
+
+        The scripts directory is added to ``sys.path`` so that scripts can
+        import their shared helper modules the same way they do when run
+        from the command line.
+        """
+        key = str(script_path)
+        with self._lock:
+            module = self._modules.get(key)
+            if module is None:
+                scripts_dir = str(script_path.parent)
+                if scripts_dir not in sys.path:
+                    sys.path.append(scripts_dir)
+                spec = importlib.util.spec_from_file_location(
+                    f"_semantic_scripts.{script_path.stem}", script_path
+                )
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._modules[key] = module
+        return module
+
+    def load_helper(self, module_path: Path) -> ModuleType:
+        """Import a helper module of the scripts under its own name.
+
+        Scripts import their helpers by name, so the server gets the same
+        module object as the scripts it runs in-process, including state
+        such as the git object readers of semantic_git.py.
+        """
+        with self._lock:
+            scripts_dir = str(module_path.parent)
+            if scripts_dir not in sys.path:
+                sys.path.append(scripts_dir)
+        return importlib.import_module(module_path.stem)
+
+    def run(self, script_path: Path, args: List[str], repo_root: Path) -> Any:
+        """Run a script's ``run`` entry point in the current process.
+
+        Args:
+            script_path: Resolved path of the script to run
+            args: Sanitized command-line arguments
+            repo_root: Repository root passed to the script
+
+        Returns:
+            The object returned by the script's ``run`` function
+
+        Raises:
+            InvalidInputError: If the script rejects its input
+            RuntimeError: If script execution fails
+        """
+        module = self.load(script_path)
+        try:
+            return module.run(list(args), str(repo_root))
+        except InvalidInputError:
+            raise
+        except SystemExit as e:
+            # argparse exits on invalid arguments
+            raise RuntimeError(f"Script execution failed: invalid arguments (exit code {e.code})")
+        except Exception as e:
+            raise RuntimeError(f"Script execution failed: {e}")
+
+    async def run_async(self, script_path: Path, args: List[str], repo_root: Path) -> Any:
+        """Run a script on the bounded thread pool and await its result.
+
+        Python threads cannot be cancelled, so on timeout the caller gets an
+        error immediately while the script finishes in the background. Such
+        scripts still hold their thread; once every thread and backlog slot
+        is taken, new scripts are rejected instead of queued.
+
+        Raises:
+            InvalidInputError: If the script rejects its input
+            RunnerBusyError: If all threads and backlog slots are taken
+            RuntimeError: If script execution fails or times out
+        """
+        future = self._submit(self.run, script_path, args, repo_root)
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError("Script execution timed out")
+
+    async def stream_async(
+        self, script_path: Path, args: List[str], repo_root: Path, buffer: int = STREAM_BUFFER
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Run a script's ``stream`` entry point on the thread pool and yield its records as they are produced.
+
+        The script thread hands records to the event loop and waits while
+        ``buffer`` of them are unsent, so a slow client holds back the script
+        instead of growing a queue. The timeout applies to the wait for each
+        record. When the caller stops early, the script's generator is
+        closed at its next record.
+
+        Args:
+            script_path: Resolved path of the script to run
+            args: Sanitized command-line arguments
+            repo_root: Repository root passed to the script
+            buffer: Records the script may run ahead of the caller
+
+        Yields:
+            (kind, record) pairs
+
+        Raises:
+            InvalidInputError: If the script rejects its input
+            RunnerBusyError: If all threads and backlog slots are taken
+            RuntimeError: If script execution fails or times out
+        """
+        module = self.load(script_path)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        slots = threading.Semaphore(buffer)
+        stopped = threading.Event()
+        end = object()
+
+        def produce() -> None:
+            records = None
+            try:
+                records = module.stream(list(args), str(repo_root))
+                for record in records:
+                    slots.acquire()
+                    if stopped.is_set():
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, record)
+                outcome = None
+            except InvalidInputError as e:
+                outcome = e
+            except SystemExit as e:
+                outcome = RuntimeError(f"Script execution failed: invalid arguments (exit code {e.code})")
+            except Exception as e:
+                outcome = RuntimeError(f"Script execution failed: {e}")
+            finally:
+                if records is not None:
+                    records.close()
+            if not stopped.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, (end, outcome))
+
+        self._submit(produce)
+        try:
+            while True:
+                try:
+                    record = await asyncio.wait_for(queue.get(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    raise RuntimeError("Script execution timed out")
+                if record[0] is end:
+                    if record[1] is not None:
+                        raise record[1]
+                    return
+                slots.release()
+                yield record
+        finally:
+            stopped.set()
+            # Wake the script thread if it waits for a free slot
+            slots.release()
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """Run a function on the thread pool, holding a slot until it returns.
+
+        Raises:
+            RunnerBusyError: If all threads and backlog slots are taken
+        """
+        if not self._slots.acquire(blocking=False):
+            raise RunnerBusyError("Script execution rejected: all script threads are busy")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._slots.release())
+        return asyncio.wrap_future(future)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the thread pool on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="semantic-script"
+                )
+        return self._executor
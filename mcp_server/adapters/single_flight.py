@@ -0,0 +1,102 @@
+"""Single-flight de-duplication of identical concurrent calls."""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """An in-flight synchronous call shared by all waiters."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Shares one in-flight computation between concurrent callers with the same key.
+
+    Callers that arrive while a computation for their key is running wait
+    for it and receive the same result (or exception) instead of starting
+    their own. Results are shared objects and must not be mutated.
+    """
+
+    def __init__(self):
+        """Initialize with no in-flight calls and zeroed counters."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already in flight.
+
+        Args:
+            key: Identity of the computation
+            fn: Function computing the result
+
+        Returns:
+            The result of fn for this key
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn(), or the identical call already in flight on this event loop.
+
+        The computation runs as a separate task, so a cancelled caller does
+        not cancel it for the others.
+
+        Args:
+            key: Identity of the computation
+            fn: Coroutine function computing the result
+
+        Returns:
+            The result of fn for this key
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            self._stats["calls"] += 1
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._tasks[task_key] = task
+                self._stats["executions"] += 1
+                task.add_done_callback(lambda _t: self._forget(task_key))
+            else:
+                self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """Return call, execution and coalescing counters."""
+        with self._lock:
+            return {**self._stats, "inFlight": len(self._calls) + len(self._tasks)}
+
+    def _forget(self, task_key: Hashable) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
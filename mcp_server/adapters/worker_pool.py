@@ -0,0 +1,265 @@
+"""Pool of long-lived worker processes with the semantic scripts preloaded.
+
+Workers give the isolation of the subprocess mode without paying interpreter
+startup and imports on every request. Jobs are sent over a pipe; a worker is
+recycled after a fixed number of jobs or when its memory grows past a limit.
+"""
+import asyncio
+import atexit
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .script_runner import IN_PROCESS_SCRIPTS, InProcessScriptRunner, InvalidInputError
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+def _peak_rss_mb() -> float:
+    """Return the peak resident set size of the current process in MiB."""
+    if resource is None:
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _worker_main(conn: Connection, scripts_dir: str) -> None:
+    """Worker process entry point: preload scripts, then serve jobs until told to stop."""
+    runner = InProcessScriptRunner()
+    for name in sorted(IN_PROCESS_SCRIPTS):
+        script_path = Path(scripts_dir) / name
+        if script_path.exists():
+            runner.load(script_path)
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        script_path, args, repo_root = job
+        try:
+            result = runner.run(Path(script_path), args, Path(repo_root))
+            conn.send(("ok", result, _peak_rss_mb()))
+        except InvalidInputError as e:
+            conn.send(("invalid", str(e), _peak_rss_mb()))
+        except RuntimeError as e:
+            conn.send(("error", str(e), _peak_rss_mb()))
+
+
+@dataclass
+class _Worker:
+    """Parent-side handle of a worker process."""
+    process: multiprocessing.Process
+    conn: Connection
+    jobs: int = 0
+
+
+class ScriptWorkerPool:
+    """Dispatches script jobs to a pool of warm worker processes."""
+
+    def __init__(
+        self,
+        scripts_dir: Path,
+        size: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+        timeout: float = 30,
+    ):
+        """Initialize the worker pool. Workers are started lazily.
+
+        Args:
+            scripts_dir: Directory whose scripts are preloaded by every worker
+            size: Maximum number of workers. Defaults to MCP_POOL_SIZE, or 2.
+            max_jobs: Jobs a worker serves before it is recycled. Defaults to
+                MCP_POOL_MAX_JOBS, or 100.
+            max_rss_mb: Peak memory (MiB) above which a worker is recycled.
+                Defaults to MCP_POOL_MAX_RSS_MB, or 512.
+            timeout: Seconds to wait for a job before the worker is killed
+        """
+        self.scripts_dir = Path(scripts_dir)
+        self.size = size or int(os.getenv("MCP_POOL_SIZE", "2"))
+        self.max_jobs = max_jobs or int(os.getenv("MCP_POOL_MAX_JOBS", "100"))
+        self.max_rss_mb = max_rss_mb or float(os.getenv("MCP_POOL_MAX_RSS_MB", "512"))
+        self.timeout = timeout
+
+        # Results can be instances of classes defined by the scripts, so the
+        # parent must be able to import them when unpickling
+        scripts_path = str(self.scripts_dir.resolve())
+        if scripts_path not in sys.path:
+            sys.path.append(scripts_path)
+
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {"jobs": 0, "spawned": 0, "recycled": 0, "killed": 0}
+
+    def supports(self, script_path: Path) -> bool:
+        """Return True if the script is preloaded by the pool workers."""
+        return script_path.parent == self.scripts_dir.resolve() and script_path.name in IN_PROCESS_SCRIPTS
+
+    def run(self, script_path: Path, args: List[str], repo_root: Path) -> Any:
+        """Run a job on a pool worker and wait for the result.
+
+        Args:
+            script_path: Resolved path of the script to run
+            args: Sanitized command-line arguments
+            repo_root: Repository root passed to the script
+
+        Returns:
+            The object returned by the script's ``run`` function
+
+        Raises:
+            InvalidInputError: If the script rejects its input
+            RuntimeError: If script execution fails or times out
+        """
+        worker = self._acquire()
+        try:
+            worker.conn.send((str(script_path), list(args), str(repo_root)))
+            if not worker.conn.poll(self.timeout):
+                self._kill(worker)
+                raise RuntimeError("Script execution timed out")
+            status, payload, rss_mb = worker.conn.recv()
+        except (EOFError, OSError):
+            self._kill(worker)
+            raise RuntimeError("Script execution failed: worker process exited")
+
+        worker.jobs += 1
+        with self._lock:
+            self._stats["jobs"] += 1
+        if self._closed or worker.jobs >= self.max_jobs or rss_mb > self.max_rss_mb:
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+
+        if status == "invalid":
+            raise InvalidInputError(payload)
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    async def run_async(self, script_path: Path, args: List[str], repo_root: Path) -> Any:
+        """Run a job on a pool worker without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.run, script_path, args, repo_root)
+
+    def stats(self) -> Dict[str, int]:
+        """Return job and worker lifecycle counters."""
+        with self._lock:
+            return {**self._stats, "live": self._live, "size": self.size}
+
+    def shutdown(self) -> None:
+        """Stop all idle workers. Busy workers are stopped when they are returned."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(worker, count=False)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, starting a new one if the pool is not full."""
+        while True:
+            if self._closed:
+                raise RuntimeError("Script execution failed: worker pool is shut down")
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                spawn = self._live < self.size
+                if spawn:
+                    self._live += 1
+            if spawn:
+                try:
+                    return self._spawn()
+                except Exception:
+                    with self._lock:
+                        self._live -= 1
+                    raise
+            # Wait briefly, then re-check: a slot frees up when a worker is killed
+            try:
+                return self._idle.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+    def _spawn(self) -> _Worker:
+        """Start a worker process that preloads the scripts directory."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, str(self.scripts_dir.resolve())),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        with self._lock:
+            self._stats["spawned"] += 1
+        return _Worker(process=process, conn=parent_conn)
+
+    def _retire(self, worker: _Worker, count: bool = True) -> None:
+        """Ask a worker to exit and release its slot."""
+        try:
+            worker.conn.send(None)
+        except OSError:
+            pass
+        worker.process.join(timeout=1)
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.conn.close()
+        with self._lock:
+            self._live -= 1
+            if count:
+                self._stats["recycled"] += 1
+
+    def _kill(self, worker: _Worker) -> None:
+        """Kill a stuck or crashed worker and release its slot."""
+        worker.process.kill()
+        worker.process.join(timeout=1)
+        worker.conn.close()
+        with self._lock:
+            self._live -= 1
+            self._stats["killed"] += 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the thread pool that waits on workers for async callers."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix="semantic-pool"
+                )
+        return self._executor
+
+
+_pools: Dict[str, ScriptWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(scripts_dir: Path) -> ScriptWorkerPool:
+    """Return the process-wide worker pool for a scripts directory."""
+    key = str(Path(scripts_dir).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ScriptWorkerPool(Path(key))
+            _pools[key] = pool
+            atexit.register(pool.shutdown)
+    return pool
@@ -4,17 +4,21 @@ This server exposes semantic context, validation, drift detection, and other
 semantic intelligence as HTTP endpoints following the MCP (Model Context Protocol) patterns.
 """
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
 
+from .adapters import start_watcher, stop_watcher
 from .routes import (
     semantic_graph_router,
     validator_router,
     glossary_router,
     adr_router,
     drift_router,
+    runtime_router,
+    gravity_router,
 )
 
 # Configure logging
@@ -24,6 +28,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the repository watcher when MCP_WATCH is enabled."""
+    watching = os.getenv("MCP_WATCH", "false").lower() == "true"
+    if watching:
+        try:
+            watcher = start_watcher()
+            logger.info("Watching %s (%s)", watcher.repo_root, watcher.stats()["backend"])
+        except OSError as e:
+            watching = False
+            logger.warning(f"Repository watcher unavailable: {e}")
+    yield
+    if watching:
+        stop_watcher()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Semantic Architecture MCP Server",
@@ -35,6 +56,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS with environment-based origins
@@ -90,6 +112,8 @@ async def root():
             "drift": "/semantic/drift",
             "glossary": "/semantic/glossary",
             "adr": "/semantic/adr",
+            "gravity": "/semantic/gravity",
+            "runtime": "/semantic/runtime/stats",
         },
         "docs": "/docs",
         "status": "operational"
@@ -113,6 +137,8 @@ app.include_router(validator_router)
 app.include_router(glossary_router)
 app.include_router(adr_router)
 app.include_router(drift_router)
+app.include_router(runtime_router)
+app.include_router(gravity_router)
 
 
 if __name__ == "__main__":
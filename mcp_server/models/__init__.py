@@ -1,16 +1,23 @@
 """Data models for the MCP server."""
-from .semantic_node import SemanticNode, SemanticEdge, SemanticGraph
-from .validation_result import ValidationDiagnostic, ValidationSummary, ValidationResult
+from .semantic_node import SemanticNode, SemanticEdge, SemanticGraph, GraphFilters, GraphQuery, GraphQueryResult
+from .validation_result import ValidationDiagnostic, ValidationSummary, ValidationMeta, ValidationResult
 from .drift_report import DriftAlert, DriftSummary, DriftReport
 from .adr import ADRRecord, ADRIndex
 from .glossary import GlossaryEntry
+from .gravity import GravityScore, GravityHotspot, GravityReport
+from .graph_delta import GraphSnapshot, AttributeChange, NodeChange, NodeDelta, EdgeDelta, GraphDeltaSummary, GraphDelta
+from .runtime_stats import SingleFlightStats, CacheStats, WatcherStats, CacheInvalidation, RuntimeStats
 
 __all__ = [
     "SemanticNode",
     "SemanticEdge",
     "SemanticGraph",
+    "GraphFilters",
+    "GraphQuery",
+    "GraphQueryResult",
     "ValidationDiagnostic",
     "ValidationSummary",
+    "ValidationMeta",
     "ValidationResult",
     "DriftAlert",
     "DriftSummary",
@@ -18,4 +25,19 @@ __all__ = [
     "ADRRecord",
     "ADRIndex",
     "GlossaryEntry",
+    "GravityScore",
+    "GravityHotspot",
+    "GravityReport",
+    "GraphSnapshot",
+    "AttributeChange",
+    "NodeChange",
+    "NodeDelta",
+    "EdgeDelta",
+    "GraphDeltaSummary",
+    "GraphDelta",
+    "SingleFlightStats",
+    "CacheStats",
+    "WatcherStats",
+    "CacheInvalidation",
+    "RuntimeStats",
 ]
@@ -0,0 +1,62 @@
+"""Semantic graph delta data models."""
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+from .semantic_node import SemanticEdge, SemanticNode
+
+
+class GraphSnapshot(BaseModel):
+    """A compared snapshot: a git ref and its tree, or the working tree."""
+    ref: str
+    tree: Optional[str] = None
+
+
+class AttributeChange(BaseModel):
+    """Old and new value of one node attribute."""
+    field: str
+    before: Any = None
+    after: Any = None
+
+
+class NodeChange(BaseModel):
+    """A node present in both snapshots whose attributes changed."""
+    id: str
+    path: Optional[str] = None
+    changes: List[AttributeChange]
+
+
+class NodeDelta(BaseModel):
+    """Node changes between two snapshots."""
+    added: List[SemanticNode]
+    removed: List[SemanticNode]
+    modified: List[NodeChange]
+
+
+class EdgeDelta(BaseModel):
+    """Edge changes between two snapshots."""
+    added: List[SemanticEdge]
+    removed: List[SemanticEdge]
+
+
+class GraphDeltaSummary(BaseModel):
+    """Counts of the changes in a graph delta."""
+    filesChanged: int
+    nodesAdded: int
+    nodesRemoved: int
+    nodesModified: int
+    edgesAdded: int
+    edgesRemoved: int
+
+
+class GraphDelta(BaseModel):
+    """Semantic graph delta report (graph_delta.json)."""
+    schemaVersion: str
+    generatedBy: str
+    timestamp: str
+    date: str
+    base: GraphSnapshot
+    head: GraphSnapshot
+    nodes: NodeDelta
+    edges: EdgeDelta
+    summary: GraphDeltaSummary
+    writtenTo: Optional[str] = None
@@ -0,0 +1,39 @@
+"""Semantic Gravity data models."""
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class GravityScore(BaseModel):
+    """Gravity score and metrics of a module or cluster."""
+    id: str
+    scope: str
+    path: Optional[str] = None
+    score: float
+    fanIn: int
+    fanOut: int
+    breadth: int
+    instructionBytes: int
+    members: Optional[int] = None
+
+
+class GravityHotspot(BaseModel):
+    """A module or cluster scoring at or above the hotspot threshold."""
+    id: str
+    scope: str
+    score: float
+
+
+class GravityReport(BaseModel):
+    """Semantic Gravity report (graph_health.json)."""
+    schemaVersion: str
+    generatedBy: str
+    timestamp: str
+    quarter: str
+    engine: str
+    weights: Dict[str, float]
+    threshold: float
+    totals: Dict[str, int]
+    modules: List[GravityScore]
+    clusters: List[GravityScore]
+    hotspots: List[GravityHotspot]
+    writtenTo: Optional[str] = None
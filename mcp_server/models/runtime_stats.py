@@ -0,0 +1,46 @@
+"""Runtime statistics data models."""
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class SingleFlightStats(BaseModel):
+    """Counters for coalesced script invocations."""
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+    inFlight: int = 0
+
+
+class CacheStats(BaseModel):
+    """Counters for the repository-fingerprinted result cache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+    maxSize: int = 0
+    enabled: bool = True
+
+
+class WatcherStats(BaseModel):
+    """State and counters of the repository watcher."""
+    backend: Optional[str] = None
+    running: bool = False
+    batches: int = 0
+    paths: int = 0
+    overflows: int = 0
+    generations: Dict[str, int] = Field(default_factory=dict)
+
+
+class CacheInvalidation(BaseModel):
+    """Result of an explicit cache invalidation."""
+    tool: Optional[str] = None
+    invalidated: int
+
+
+class RuntimeStats(BaseModel):
+    """Runtime statistics of the adapter layer."""
+    singleFlight: SingleFlightStats = Field(default_factory=SingleFlightStats)
+    cache: CacheStats = Field(default_factory=CacheStats)
+    watcher: Optional[WatcherStats] = None
@@ -1,5 +1,5 @@
 """Semantic graph data models."""
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -31,12 +31,31 @@ class SemanticEdge(BaseModel):
     confidence: Optional[float] = Field(default=None, ge=0.0, le=1.0)
 
 
+class GraphFilters(BaseModel):
+    """Node filters for the semantic graph; every given predicate must match.
+    
+    ``scope``, ``owner`` and ``pathPrefix`` take one value or a list of
+    alternatives. ``meta`` maps meta keys to a value that must equal the
+    node's meta value, or be contained in it when that is a list; null
+    requires the key to be absent.
+    """
+    model_config = ConfigDict(extra="forbid")
+    
+    scope: Optional[Union[str, List[str]]] = None
+    owner: Optional[Union[str, List[str]]] = None
+    pathPrefix: Optional[Union[str, List[str]]] = None
+    meta: Optional[Dict[str, Any]] = None
+
+
 class GraphMeta(BaseModel):
     """Metadata for the semantic graph."""
     generatedAt: Optional[str] = None
     toolVersion: Optional[str] = None
     projectVersion: Optional[str] = None
     filtersApplied: Optional[Dict[str, Any]] = None
+    nextCursor: Optional[str] = None
+    tree: Optional[str] = None
+    focus: Optional[Dict[str, Any]] = None
 
 
 class SemanticGraph(BaseModel):
@@ -44,3 +63,24 @@ class SemanticGraph(BaseModel):
     nodes: List[SemanticNode]
     edges: List[SemanticEdge]
     meta: GraphMeta
+
+
+class GraphQuery(BaseModel):
+    """Parameters of a graph query, as applied."""
+    kind: str
+    start: List[str]
+    depth: Optional[int] = None
+    direction: str
+    edgeTypes: Optional[List[str]] = None
+    target: Optional[str] = None
+
+
+class GraphQueryResult(BaseModel):
+    """Result subgraph of a neighbourhood, impact or path query."""
+    query: GraphQuery
+    nodes: List[SemanticNode]
+    edges: List[SemanticEdge]
+    distances: Dict[str, int] = Field(default_factory=dict)
+    path: Optional[List[str]] = None
+    unresolved: List[str] = Field(default_factory=list)
+    meta: GraphMeta
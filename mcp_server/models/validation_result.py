@@ -1,5 +1,5 @@
 """Validation result data models."""
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -46,6 +46,10 @@ class ValidationMeta(BaseModel):
     generatedAt: str
     toolVersion: str
     schemaVersion: str = "1"
+    tree: Optional[str] = None
+    filesChecked: Optional[int] = None
+    filesSkipped: Optional[int] = None
+    focus: Optional[Dict[str, Any]] = None
 
 
 class ValidationResult(BaseModel):
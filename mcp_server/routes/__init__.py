@@ -4,6 +4,8 @@ from .validator import router as validator_router
 from .glossary import router as glossary_router
 from .adr import router as adr_router
 from .drift import router as drift_router
+from .runtime import router as runtime_router
+from .gravity import router as gravity_router
 
 __all__ = [
     "semantic_graph_router",
@@ -11,4 +13,6 @@ __all__ = [
     "glossary_router",
     "adr_router",
     "drift_router",
+    "runtime_router",
+    "gravity_router",
 ]
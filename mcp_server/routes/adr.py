@@ -4,7 +4,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 
 from ..models import ADRIndex
-from ..adapters import FilesystemAdapter
+from ..adapters import FilesystemAdapter, RunnerBusyError
 
 
 router = APIRouter(prefix="/semantic/adr", tags=["semantic"])
@@ -43,8 +43,10 @@ async def get_adr_index(
         if patterns:
             args.extend(["--patterns"] + patterns.split(","))
         
-        result = adapter.run_script("adr_index.py", args)
+        result = await adapter.run_script_async("adr_index.py", args)
         return ADRIndex(**result)
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -69,7 +71,9 @@ async def query_adr_index(
         if params.patterns:
             args.extend(["--patterns"] + params.patterns)
         
-        result = adapter.run_script("adr_index.py", args)
+        result = await adapter.run_script_async("adr_index.py", args)
         return ADRIndex(**result)
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -4,7 +4,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 
 from ..models import DriftReport
-from ..adapters import FilesystemAdapter
+from ..adapters import FilesystemAdapter, RunnerBusyError
 
 
 router = APIRouter(prefix="/semantic/drift", tags=["semantic"])
@@ -58,8 +58,10 @@ async def detect_drift(
         if includeDiffSummary:
             args.append("--includeDiffSummary")
         
-        result = adapter.run_script("semantic_drift_scanner.py", args)
+        result = await adapter.run_script_async("semantic_drift_scanner.py", args)
         return DriftReport(**result)
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -90,7 +92,9 @@ async def detect_drift_post(
         if request.includeDiffSummary:
             args.append("--includeDiffSummary")
         
-        result = adapter.run_script("semantic_drift_scanner.py", args)
+        result = await adapter.run_script_async("semantic_drift_scanner.py", args)
         return DriftReport(**result)
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -31,9 +31,9 @@ async def get_glossary(
         List of glossary entries
     """
     try:
-        entries = adapter.read_glossary()
+        entries = await adapter.read_glossary_async()
         
-        # Apply filters
+        # Apply filters (cached entries are shared, so build new lists)
         if category:
             entries = [e for e in entries if e.category and category.lower() in e.category.lower()]
         
@@ -64,7 +64,7 @@ async def get_glossary_term(
         Glossary entry
     """
     try:
-        entries = adapter.read_glossary()
+        entries = await adapter.read_glossary_async()
         
         # Find exact or case-insensitive match
         for entry in entries:
@@ -0,0 +1,48 @@
+"""Semantic Gravity API routes."""
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+
+from ..models import GravityReport
+from ..adapters import FilesystemAdapter, RunnerBusyError
+
+
+router = APIRouter(prefix="/semantic/gravity", tags=["semantic"])
+
+
+def get_adapter():
+    """Dependency to get filesystem adapter."""
+    return FilesystemAdapter()
+
+
+@router.get("", response_model=GravityReport, response_model_exclude_none=True)
+async def get_gravity(
+    scope: Literal["module", "cluster", "all"] = "all",
+    top: Optional[int] = Query(default=None, ge=1),
+    threshold: Optional[float] = Query(default=None, ge=0, le=100),
+    adapter: FilesystemAdapter = Depends(get_adapter)
+):
+    """Get Semantic Gravity scores for modules and clusters.
+    
+    Args:
+        scope: Scores to return (module, cluster or all)
+        top: Only return the N highest scores per scope
+        threshold: Hotspot score threshold (0-100)
+        adapter: Filesystem adapter dependency
+        
+    Returns:
+        GravityReport response
+    """
+    try:
+        args = ["--scope", scope]
+        
+        if top is not None:
+            args.extend(["--top", str(top)])
+        if threshold is not None:
+            args.extend(["--threshold", str(threshold)])
+        
+        result = await adapter.run_script_async("semantic_gravity.py", args)
+        return GravityReport(**result)
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,48 @@
+"""Runtime statistics API routes."""
+from typing import Optional
+from fastapi import APIRouter, Depends
+
+from ..models import RuntimeStats, CacheInvalidation
+from ..adapters import FilesystemAdapter
+
+
+router = APIRouter(prefix="/semantic/runtime", tags=["runtime"])
+
+
+def get_adapter():
+    """Dependency to get filesystem adapter."""
+    return FilesystemAdapter()
+
+
+@router.get("/stats", response_model=RuntimeStats)
+async def get_runtime_stats(adapter: FilesystemAdapter = Depends(get_adapter)):
+    """Get adapter-layer runtime counters.
+    
+    Args:
+        adapter: Filesystem adapter dependency
+        
+    Returns:
+        RuntimeStats response
+    """
+    return RuntimeStats(
+        singleFlight=adapter.single_flight.stats(),
+        cache=adapter.result_cache.stats(),
+        watcher=adapter.watcher.stats() if adapter.watcher is not None else None,
+    )
+
+
+@router.delete("/cache", response_model=CacheInvalidation)
+async def invalidate_cache(
+    tool: Optional[str] = None,
+    adapter: FilesystemAdapter = Depends(get_adapter)
+):
+    """Drop cached results.
+    
+    Args:
+        tool: Only drop results of this tool (e.g. semantic_graph.py, glossary)
+        adapter: Filesystem adapter dependency
+        
+    Returns:
+        CacheInvalidation response
+    """
+    return CacheInvalidation(tool=tool, invalidated=adapter.result_cache.invalidate(tool))
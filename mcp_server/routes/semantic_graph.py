@@ -1,10 +1,12 @@
 """Semantic graph API routes."""
-from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from typing import Any, Dict, Literal, Optional, List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
-from ..models import SemanticGraph
-from ..adapters import FilesystemAdapter
+from ..models import SemanticGraph, GraphFilters, GraphQueryResult, GraphDelta
+from ..adapters import FilesystemAdapter, InvalidInputError, RunnerBusyError
+from ..adapters.graph_export import MEDIA_TYPES, NODE_COLUMNS, to_csv, to_dot, to_graphml, to_ndjson
 
 
 router = APIRouter(prefix="/semantic/graph", tags=["semantic"])
@@ -16,7 +18,106 @@ class GraphQueryParams(BaseModel):
     ids: Optional[List[str]] = None
     include: Optional[List[str]] = None
     edgeTypes: Optional[List[str]] = None
-    outputFormat: Optional[str] = "json"
+    filters: Optional[GraphFilters] = None
+    outputFormat: Optional[Literal["json", "dot", "ndjson"]] = "json"
+    limit: Optional[int] = Field(default=None, ge=1)
+    cursor: Optional[str] = None
+    ref: Optional[str] = None
+    focus: Optional[str] = None
+
+
+def graph_payload(result: Any) -> Dict[str, Any]:
+    """Convert a script result to the JSON graph shape.
+    
+    In-process and pool execution return the scripts' compact graph
+    object, which is only materialized here; subprocess execution
+    already returns the JSON shape.
+    """
+    return result.to_dict() if hasattr(result, "to_dict") else result
+
+
+def parse_filters(filters: Optional[str]) -> Optional[GraphFilters]:
+    """Parse the JSON ``filters`` query parameter.
+    
+    Raises:
+        HTTPException: 400 if the filters are not a valid GraphFilters object
+    """
+    if not filters:
+        return None
+    try:
+        return GraphFilters.model_validate_json(filters)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filters: {e}")
+
+
+def graph_args(
+    scope: Optional[str],
+    ids: Optional[List[str]],
+    include: Optional[List[str]],
+    edge_types: Optional[List[str]],
+    filters: Optional[GraphFilters],
+    ref: Optional[str] = None,
+    focus: Optional[str] = None,
+) -> List[str]:
+    """Build the semantic_graph.py arguments that select the snapshot, nodes, edges and fields."""
+    args = ["--scope", scope or "project"]
+    
+    if ref:
+        args.extend(["--ref", ref])
+    if focus:
+        args.extend(["--focus", focus])
+    
+    if ids:
+        args.extend(["--ids"] + ids)
+    if include:
+        args.extend(["--include"] + include)
+    if edge_types:
+        args.extend(["--edgeTypes"] + edge_types)
+    if filters:
+        args.extend(["--filters", filters.model_dump_json(exclude_none=True)])
+    return args
+
+
+def split(value: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated query parameter."""
+    return value.split(",") if value else None
+
+
+async def graph_response(
+    adapter: FilesystemAdapter,
+    args: List[str],
+    output_format: Optional[str],
+    limit: Optional[int],
+    cursor: Optional[str],
+):
+    """Run semantic_graph.py and shape the result as JSON, NDJSON, DOT or a page.
+    
+    The script always returns the graph itself; the output format is
+    applied here, so all formats share one cached result.
+    
+    Raises:
+        HTTPException: 400 for an invalid cursor or input the script
+            rejects (an unknown focus or node field), 503 if all script
+            threads are busy, 500 if the script fails
+    """
+    if cursor and limit is None:
+        raise HTTPException(status_code=400, detail="cursor requires limit")
+    try:
+        if limit is not None:
+            result = await adapter.graph_page_async(args, limit, cursor)
+        else:
+            result = await adapter.run_script_async("semantic_graph.py", args)
+        if output_format == "ndjson":
+            return StreamingResponse(to_ndjson(result), media_type=MEDIA_TYPES["ndjson"])
+        if output_format == "dot":
+            return StreamingResponse(to_dot(result), media_type=MEDIA_TYPES["dot"])
+        return SemanticGraph(**graph_payload(result))
+    except InvalidInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 def get_adapter():
@@ -24,13 +125,18 @@ def get_adapter():
     return FilesystemAdapter()
 
 
-@router.get("", response_model=SemanticGraph)
+@router.get("", response_model=SemanticGraph, response_model_exclude_unset=True)
 async def get_semantic_graph(
     scope: str = "project",
     ids: Optional[str] = None,
     include: Optional[str] = None,
     edgeTypes: Optional[str] = None,
-    outputFormat: str = "json",
+    filters: Optional[str] = None,
+    outputFormat: Literal["json", "dot", "ndjson"] = "json",
+    limit: Optional[int] = Query(default=None, ge=1),
+    cursor: Optional[str] = None,
+    ref: Optional[str] = None,
+    focus: Optional[str] = None,
     adapter: FilesystemAdapter = Depends(get_adapter)
 ):
     """Get the semantic graph for the project.
@@ -38,31 +144,30 @@ async def get_semantic_graph(
     Args:
         scope: Scope of the graph (project, cluster, module)
         ids: Comma-separated list of node IDs to include
-        include: Comma-separated list of fields to include
+        include: Comma-separated list of node fields to return (id and
+            scope are always returned)
         edgeTypes: Comma-separated list of edge types to include
-        outputFormat: Output format (json or dot)
+        filters: JSON object with node filters (see GraphFilters)
+        outputFormat: Output format (json, dot or ndjson); ndjson streams
+            one node or edge per line followed by the meta
+        limit: Page size in nodes plus edges; the response meta carries
+            nextCursor while more records follow
+        cursor: nextCursor of the previous page
+        ref: Git ref (commit, tag or branch) whose tree is read instead of
+            the working tree; the response meta carries the tree SHA
+        focus: Id or path of a module or cluster; only its subtree and
+            direct neighbours are built, and scope (cluster or module)
+            is the expected scope of the focus
         adapter: Filesystem adapter dependency
         
     Returns:
-        SemanticGraph response
+        SemanticGraph response, or a streaming NDJSON response
     """
-    try:
-        args = ["--scope", scope, "--outputFormat", outputFormat]
-        
-        if ids:
-            args.extend(["--ids"] + ids.split(","))
-        if include:
-            args.extend(["--include"] + include.split(","))
-        if edgeTypes:
-            args.extend(["--edgeTypes"] + edgeTypes.split(","))
-        
-        result = adapter.run_script("semantic_graph.py", args)
-        return SemanticGraph(**result)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    args = graph_args(scope, split(ids), split(include), split(edgeTypes), parse_filters(filters), ref, focus)
+    return await graph_response(adapter, args, outputFormat, limit, cursor)
 
 
-@router.post("", response_model=SemanticGraph)
+@router.post("", response_model=SemanticGraph, response_model_exclude_unset=True)
 async def query_semantic_graph(
     params: GraphQueryParams,
     adapter: FilesystemAdapter = Depends(get_adapter)
@@ -76,17 +181,167 @@ async def query_semantic_graph(
     Returns:
         SemanticGraph response
     """
+    args = graph_args(params.scope, params.ids, params.include, params.edgeTypes, params.filters, params.ref, params.focus)
+    return await graph_response(adapter, args, params.outputFormat, params.limit, params.cursor)
+
+
+@router.get("/export")
+async def export_semantic_graph(
+    format: Literal["dot", "graphml", "csv", "ndjson"],
+    table: Literal["nodes", "edges"] = "nodes",
+    scope: str = "project",
+    ids: Optional[str] = None,
+    include: Optional[str] = None,
+    edgeTypes: Optional[str] = None,
+    filters: Optional[str] = None,
+    ref: Optional[str] = None,
+    focus: Optional[str] = None,
+    adapter: FilesystemAdapter = Depends(get_adapter)
+):
+    """Stream the semantic graph as a file for offline tools.
+    
+    The export is written straight from the graph held by the adapter,
+    record by record, without building the JSON response.
+    
+    Args:
+        format: dot, graphml, csv (one table per request) or ndjson
+        table: Table to export in the csv format (nodes or edges)
+        scope: Scope of the graph (project, cluster, module)
+        ids: Comma-separated list of node IDs to include
+        include: Comma-separated list of node columns to export (id is
+            always exported)
+        edgeTypes: Comma-separated list of edge types to include
+        filters: JSON object with node filters (see GraphFilters)
+        ref: Git ref whose tree is exported instead of the working tree
+        focus: Id or path of a module or cluster whose subtree is exported
+        adapter: Filesystem adapter dependency
+        
+    Returns:
+        Streaming response with a Content-Disposition attachment
+    """
+    columns = [c for c in NODE_COLUMNS if c in ("id", "scope", *include.split(","))] if include else None
+    args = graph_args(scope, split(ids), split(include), split(edgeTypes), parse_filters(filters), ref, focus)
+    try:
+        result = await adapter.run_script_async("semantic_graph.py", args)
+    except InvalidInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if format == "csv":
+        body = to_csv(result, table, columns)
+        filename = f"semantic-graph-{table}.csv"
+    elif format == "graphml":
+        body = to_graphml(result, columns)
+        filename = "semantic-graph.graphml"
+    elif format == "dot":
+        body = to_dot(result)
+        filename = "semantic-graph.dot"
+    else:
+        body = to_ndjson(result)
+        filename = "semantic-graph.ndjson"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/query", response_model=GraphQueryResult)
+async def get_graph_query(
+    kind: Literal["neighbors", "expand", "dependents", "path"],
+    ids: str,
+    depth: Optional[int] = Query(default=None, ge=0),
+    edgeTypes: Optional[str] = None,
+    direction: Optional[Literal["out", "in", "both"]] = None,
+    target: Optional[str] = None,
+    ref: Optional[str] = None,
+    adapter: FilesystemAdapter = Depends(get_adapter)
+):
+    """Query the neighbourhood of nodes for impact assessment.
+    
+    Args:
+        kind: neighbors (one hop), expand (k hops), dependents (transitive
+            reverse depends-on) or path (shortest path from the first id to target)
+        ids: Comma-separated ids or paths of the start nodes
+        depth: Maximum number of hops
+        edgeTypes: Comma-separated list of edge types to follow
+        direction: Follow edges out, in or both ways
+        target: Destination id or path for path queries
+        ref: Git ref whose tree is queried instead of the working tree
+        adapter: Filesystem adapter dependency
+        
+    Returns:
+        GraphQueryResult response
+    """
+    if kind == "path" and not target:
+        raise HTTPException(status_code=400, detail="target is required for path queries")
+    start = [i for i in ids.split(",") if i]
     try:
-        args = ["--scope", params.scope, "--outputFormat", params.outputFormat]
+        result = await adapter.query_graph_async(
+            kind,
+            start,
+            depth=depth,
+            edge_types=edgeTypes.split(",") if edgeTypes else None,
+            direction=direction,
+            target=target,
+            ref=ref,
+        )
+        payload = graph_payload(result)
+    except InvalidInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    meta = payload["meta"]
+    unresolved = meta.get("unresolved", [])
+    if unresolved and (set(start) <= set(unresolved) or target in unresolved):
+        raise HTTPException(status_code=404, detail=f"Unknown node(s): {', '.join(unresolved)}")
+    return GraphQueryResult(
+        query=meta["query"],
+        nodes=payload["nodes"],
+        edges=payload["edges"],
+        distances=meta.get("distances", {}),
+        path=meta.get("path"),
+        unresolved=unresolved,
+        meta={k: v for k, v in meta.items() if k not in ("query", "distances", "path", "unresolved")},
+    )
+
+
+@router.get("/delta", response_model=GraphDelta, response_model_exclude_none=True)
+async def get_graph_delta(
+    baseRef: str = "origin/main",
+    headRef: str = "HEAD",
+    adapter: FilesystemAdapter = Depends(get_adapter)
+):
+    """Get the semantic graph changes between two snapshots.
+    
+    Only the semantic files that differ between the snapshots are read,
+    so the cost follows the size of the change.
+    
+    Args:
+        baseRef: Base git reference
+        headRef: Head git reference, or WORKTREE for the working tree
+        adapter: Filesystem adapter dependency
         
-        if params.ids:
-            args.extend(["--ids"] + params.ids)
-        if params.include:
-            args.extend(["--include"] + params.include)
-        if params.edgeTypes:
-            args.extend(["--edgeTypes"] + params.edgeTypes)
+    Returns:
+        GraphDelta response (the graph_delta.json report)
         
-        result = adapter.run_script("semantic_graph.py", args)
-        return SemanticGraph(**result)
+    Raises:
+        HTTPException: 400 for an unknown ref
+    """
+    try:
+        result = await adapter.run_script_async(
+            "semantic_delta.py", ["--baseRef", baseRef, "--headRef", headRef]
+        )
+        return GraphDelta(**result)
+    except InvalidInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,14 +1,29 @@
 """Semantic validator API routes."""
-from typing import Optional, List
+import json
+from typing import Any, AsyncIterator, Literal, Optional, List, Tuple
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from ..models import ValidationResult
-from ..adapters import FilesystemAdapter
+from ..models import ValidationDiagnostic, ValidationMeta, ValidationResult, ValidationSummary
+from ..adapters import FilesystemAdapter, InvalidInputError, RunnerBusyError
 
 
 router = APIRouter(prefix="/semantic/validate", tags=["semantic"])
 
+# Media types of the streaming formats
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+# Models the streamed records are validated against, by record kind
+STREAM_MODELS = {
+    "diagnostic": ValidationDiagnostic,
+    "meta": ValidationMeta,
+    "summary": ValidationSummary,
+}
+
 
 class ValidateRequest(BaseModel):
     """Request body for validation."""
@@ -16,6 +31,13 @@ class ValidateRequest(BaseModel):
     scope: Optional[str] = None
     ruleset: str = "default"
     fixMode: str = "suggest"
+    ref: Optional[str] = None
+    focus: Optional[str] = None
+
+
+class ValidateStreamRequest(ValidateRequest):
+    """Request body for streaming validation."""
+    format: Literal["ndjson", "sse"] = "ndjson"
 
 
 def get_adapter():
@@ -23,12 +45,85 @@ def get_adapter():
     return FilesystemAdapter()
 
 
+def validate_args(
+    targets: Optional[List[str]],
+    scope: Optional[str],
+    ruleset: str,
+    fix_mode: str,
+    ref: Optional[str] = None,
+    focus: Optional[str] = None,
+) -> List[str]:
+    """Build the semantic_validator.py arguments of a validation request."""
+    args = ["--ruleset", ruleset, "--fixMode", fix_mode]
+    
+    if targets:
+        args.extend(["--targets"] + targets)
+    if scope:
+        args.extend(["--scope", scope])
+    if ref:
+        args.extend(["--ref", ref])
+    if focus:
+        args.extend(["--focus", focus])
+    return args
+
+
+def encode_record(kind: str, record: Any, format: str) -> str:
+    """Encode one streamed record as an NDJSON line or a Server-Sent Event."""
+    if kind in STREAM_MODELS:
+        record = STREAM_MODELS[kind].model_validate(record).model_dump(exclude_unset=True)
+    data = json.dumps(record if format == "sse" else {kind: record}, separators=(",", ":"))
+    if format == "sse":
+        return f"event: {kind}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def stream_response(adapter: FilesystemAdapter, args: List[str], format: str) -> StreamingResponse:
+    """Stream the validator's records as they are produced.
+    
+    Each diagnostic is sent as soon as the validator reports it, followed by
+    the meta and, last, the summary. The first record is awaited before the
+    response starts, so errors that stop the run early still get an error
+    status; an error later in the run ends the stream with an error record.
+    
+    Raises:
+        HTTPException: 400 for an invalid ref or input the script rejects,
+            503 if all script threads are busy, 500 if the script fails
+            before its first record
+    """
+    records: AsyncIterator[Tuple[str, Any]] = adapter.stream_script_async("semantic_validator.py", args)
+    try:
+        first = await records.__anext__()
+    except InvalidInputError as e:
+        await records.aclose()
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunnerBusyError as e:
+        await records.aclose()
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        await records.aclose()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def body() -> AsyncIterator[str]:
+        try:
+            yield encode_record(*first, format)
+            async for kind, record in records:
+                yield encode_record(kind, record, format)
+        except Exception as e:
+            yield encode_record("error", str(e), format)
+        finally:
+            await records.aclose()
+    
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[format])
+
+
 @router.get("", response_model=ValidationResult)
 async def validate_semantic(
     targets: Optional[str] = None,
     scope: Optional[str] = None,
     ruleset: str = "default",
     fixMode: str = "suggest",
+    ref: Optional[str] = None,
+    focus: Optional[str] = None,
     adapter: FilesystemAdapter = Depends(get_adapter)
 ):
     """Validate semantic files and contracts.
@@ -38,21 +133,25 @@ async def validate_semantic(
         scope: Scope of validation (project, cluster, module)
         ruleset: Validation ruleset (default, strict, ci)
         fixMode: Fix mode (none, suggest)
+        ref: Git ref (commit, tag or branch) to validate instead of the
+            working tree
+        focus: Id or path of a module or cluster; only its subtree and
+            direct neighbours are validated, instead of targets
         adapter: Filesystem adapter dependency
-        
+    
     Returns:
         ValidationResult response
     """
     try:
-        args = ["--ruleset", ruleset, "--fixMode", fixMode, "--outputFormat", "json"]
+        args = validate_args(targets.split(",") if targets else None, scope, ruleset, fixMode, ref, focus)
+        args.extend(["--outputFormat", "json"])
         
-        if targets:
-            args.extend(["--targets"] + targets.split(","))
-        if scope:
-            args.extend(["--scope", scope])
-        
-        result = adapter.run_script("semantic_validator.py", args)
+        result = await adapter.run_script_async("semantic_validator.py", args)
         return ValidationResult(**result)
+    except InvalidInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -67,23 +166,73 @@ async def validate_semantic_post(
     Args:
         request: Validation request parameters
         adapter: Filesystem adapter dependency
-        
+    
     Returns:
         ValidationResult response
     """
     try:
-        args = [
-            "--ruleset", request.ruleset,
-            "--fixMode", request.fixMode,
-            "--outputFormat", "json"
-        ]
+        args = validate_args(
+            request.targets, request.scope, request.ruleset, request.fixMode, request.ref, request.focus
+        )
+        args.extend(["--outputFormat", "json"])
         
-        if request.targets:
-            args.extend(["--targets"] + request.targets)
-        if request.scope:
-            args.extend(["--scope", request.scope])
-        
-        result = adapter.run_script("semantic_validator.py", args)
+        result = await adapter.run_script_async("semantic_validator.py", args)
         return ValidationResult(**result)
+    except InvalidInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stream")
+async def stream_validation(
+    targets: Optional[str] = None,
+    scope: Optional[str] = None,
+    ruleset: str = "default",
+    fixMode: str = "suggest",
+    ref: Optional[str] = None,
+    focus: Optional[str] = None,
+    format: Literal["ndjson", "sse"] = "ndjson",
+    adapter: FilesystemAdapter = Depends(get_adapter)
+):
+    """Validate semantic files, streaming each diagnostic as it is produced.
+    
+    Args:
+        targets: Comma-separated list of targets to validate
+        scope: Scope of validation (project, cluster, module)
+        ruleset: Validation ruleset (default, strict, ci)
+        fixMode: Fix mode (none, suggest)
+        ref: Git ref to validate instead of the working tree
+        focus: Id or path of a module or cluster to validate instead of targets
+        format: ndjson (one {"diagnostic": ...} line per record, then
+            {"meta": ...} and {"summary": ...}) or sse (diagnostic, meta and
+            summary events)
+        adapter: Filesystem adapter dependency
+    
+    Returns:
+        Streaming NDJSON or Server-Sent Events response
+    """
+    args = validate_args(targets.split(",") if targets else None, scope, ruleset, fixMode, ref, focus)
+    return await stream_response(adapter, args, format)
+
+
+@router.post("/stream")
+async def stream_validation_post(
+    request: ValidateStreamRequest,
+    adapter: FilesystemAdapter = Depends(get_adapter)
+):
+    """Validate semantic files with POST request, streaming each diagnostic.
+    
+    Args:
+        request: Validation request parameters and stream format
+        adapter: Filesystem adapter dependency
+    
+    Returns:
+        Streaming NDJSON or Server-Sent Events response
+    """
+    args = validate_args(
+        request.targets, request.scope, request.ruleset, request.fixMode, request.ref, request.focus
+    )
+    return await stream_response(adapter, args, request.format)
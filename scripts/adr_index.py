@@ -2,48 +2,141 @@
 import argparse
 import json
 import os
+import posixpath
+import sys
+import threading
 from datetime import datetime
-from glob import glob
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
 
+from semantic_cli import cli_main
+from semantic_walk import glob_to_regex, walk
 
-def parse_args():
+
+def parse_args(argv: List[str] | None = None):
     p = argparse.ArgumentParser(description="Index ADR/decision records")
     p.add_argument("--root", default="docs")
     p.add_argument("--patterns", nargs="*", default=["**/adr-*.md", "**/ADR-*.md", "**/decisions/*.md"])
-    return p.parse_args()
-
-
-def index_records(root: str, patterns: List[str]) -> List[Dict[str, Any]]:
-    recs: List[Dict[str, Any]] = []
-    for pat in patterns:
-        for path in glob(os.path.join(root, pat), recursive=True):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    first = f.readline().strip()
-                title = os.path.basename(path)
-                if first.startswith("# "):
-                    title = first.lstrip("# ").strip()
-                recs.append({
-                    "id": os.path.splitext(os.path.basename(path))[0],
-                    "title": title,
-                    "path": path.replace("\\", "/"),
-                })
-            except Exception:
-                recs.append({"id": os.path.basename(path), "title": os.path.basename(path), "path": path.replace("\\", "/")})
-    return sorted(recs, key=lambda r: r["path"])
+    return p.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
-    records = index_records(args.root, args.patterns)
-    out = {
+def read_record(path: str, repo_root: str = ".") -> Dict[str, Any]:
+    """Return the index record of one ADR file; its title is the first heading."""
+    try:
+        with open(os.path.join(repo_root, path), "r", encoding="utf-8") as f:
+            first = f.readline().strip()
+        title = os.path.basename(path)
+        if first.startswith("# "):
+            title = first.lstrip("# ").strip()
+        return {
+            "id": os.path.splitext(os.path.basename(path))[0],
+            "title": title,
+            "path": path.replace("\\", "/"),
+        }
+    except Exception:
+        return {"id": os.path.basename(path), "title": os.path.basename(path), "path": path.replace("\\", "/")}
+
+
+def index_records(root: str, patterns: List[str], repo_root: str = ".") -> List[Dict[str, Any]]:
+    matches = walk(os.path.join(repo_root, root), patterns)
+    paths = sorted({os.path.join(root, rel) for found in matches.values() for rel in found})
+    return sorted((read_record(path, repo_root) for path in paths), key=lambda r: r["path"])
+
+
+# Indexes kept in memory for repositories watched through watch_records(),
+# keyed by repository root, then by (root, patterns)
+_live_indexes: Dict[str, Dict[Tuple[str, Tuple[str, ...]], Dict[str, Dict[str, Any]]]] = {}
+_live_lock = threading.Lock()
+
+
+def watch_records(repo_root: str, enabled: bool = True) -> None:
+    """Start or stop serving the ADR indexes of repo_root from memory.
+
+    While enabled, the caller must report every change under repo_root
+    through apply_changes().
+    """
+    key = os.path.abspath(repo_root)
+    with _live_lock:
+        if enabled:
+            _live_indexes.setdefault(key, {})
+        else:
+            _live_indexes.pop(key, None)
+
+
+def apply_changes(repo_root: str, paths: Iterable[str] | None) -> None:
+    """Update the in-memory indexes of a watched repository.
+
+    Changed and deleted records are applied directly. A new matching file
+    may be subject to ignore rules, so it drops the index, which is rebuilt
+    on the next run; so does a changed .gitignore or an unknown change (None).
+
+    Args:
+        repo_root: Repository root passed to watch_records()
+        paths: '/'-separated paths relative to repo_root that changed
+    """
+    key = os.path.abspath(repo_root)
+    with _live_lock:
+        indexes = _live_indexes.get(key)
+        if not indexes:
+            return
+        if paths is None:
+            indexes.clear()
+            return
+        paths = list(paths)
+        for index_key in list(indexes):
+            root, patterns = index_key
+            base = os.path.normpath(root).replace(os.sep, "/").strip("/")
+            prefix = "" if base == "." else base + "/"
+            matchers = [glob_to_regex(p) for p in patterns]
+            records = indexes[index_key]
+            for rel in paths:
+                if not rel.startswith(prefix):
+                    continue
+                path = os.path.join(key, rel)
+                if os.path.basename(rel) == ".gitignore":
+                    del indexes[index_key]
+                    break
+                if rel in records:
+                    if os.path.isfile(path):
+                        records[rel] = read_record(os.path.join(root, rel[len(prefix):]), key)
+                    else:
+                        del records[rel]
+                elif os.path.isfile(path) and any(m.match(rel[len(prefix):]) for m in matchers):
+                    del indexes[index_key]
+                    break
+
+
+def live_records(root: str, patterns: List[str], repo_root: str) -> List[Dict[str, Any]]:
+    """Return the index of a watched repository from memory, building it on first use.
+
+    Unwatched repositories are indexed from the filesystem.
+    """
+    key = os.path.abspath(repo_root)
+    with _live_lock:
+        indexes = _live_indexes.get(key)
+        if indexes is None:
+            return index_records(root, patterns, repo_root)
+        index_key = (root, tuple(patterns))
+        records = indexes.get(index_key)
+        if records is None:
+            records = indexes[index_key] = {
+                posixpath.normpath(r["path"]): r for r in index_records(root, patterns, key)
+            }
+        return [records[path] for path in sorted(records)]
+
+
+def run(argv: List[str], repo_root: str) -> Dict[str, Any]:
+    args = parse_args(argv)
+    records = live_records(args.root, args.patterns, repo_root)
+    return {
         "records": records,
         "meta": {"generatedAt": datetime.utcnow().isoformat() + "Z", "count": len(records)}
     }
-    print(json.dumps(out, indent=2))
+
+
+def main() -> int:
+    print(json.dumps(run(sys.argv[1:], os.getcwd()), indent=2))
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(cli_main(main))
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Command-line entry point and input errors shared by the semantic scripts.
+
+A script's ``run`` raises InvalidInputError when it rejects its input (an
+unknown focus, node field, ref or cursor, for example). From the command line
+that error is reported on stderr with its own exit code, so callers that run
+the script in a subprocess can tell a rejected request from a failed run.
+Any other exception, ValueError included, is a failed run. The server loads
+this module too, so both sides share the exit code and the error class.
+"""
+import sys
+from typing import Callable
+
+# Exit code of a script that rejected its input; argparse already uses 2
+INVALID_INPUT_EXIT_CODE = 3
+
+
+class InvalidInputError(ValueError):
+    """Raised on purpose for arguments, refs or focus values a script rejects."""
+
+
+def cli_main(main: Callable[[], int]) -> int:
+    """Run a script's main function and return its exit code.
+
+    Returns:
+        The exit code of main, or INVALID_INPUT_EXIT_CODE with the
+        message on stderr if main raised InvalidInputError
+    """
+    try:
+        return main()
+    except InvalidInputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return INVALID_INPUT_EXIT_CODE
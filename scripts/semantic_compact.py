@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+"""Compact, array-backed representation of the semantic graph.
+
+Node ids are interned to integers in insertion order. Per-node attributes
+live in columns: scope, name and path as indexes into a shared string table,
+owners as tuples of string indexes, and contract/meta as per-node objects.
+Edges are stored per edge type in CSR form, i.e. an ``offsets`` array of
+length ``num_nodes + 1`` and a ``targets`` array, so the successors of node
+``i`` are ``targets[offsets[i]:offsets[i + 1]]``. A reverse index in the same
+form is built alongside, so queries can walk edges in either direction.
+
+The JSON shape used by the API and the CLI is produced by ``to_dict()`` and
+should only be built at the response boundary.
+
+A graph opened from a binary snapshot (see semantic_snapshot.py) has the same
+interface, with its columns and CSR arrays backed by a read-only memory map.
+"""
+import base64
+import bisect
+import copy
+import hashlib
+import json
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from semantic_cli import InvalidInputError
+
+# Marks a missing string attribute in a string-index column
+NONE = 0xFFFFFFFF
+
+# Node fields that can be projected; id and scope are always returned
+NODE_FIELDS = ("scope", "name", "path", "owners", "contract", "meta")
+
+FILTER_KEYS = ("scope", "owner", "pathPrefix", "meta")
+
+QUERY_KINDS = ("neighbors", "expand", "dependents", "path")
+DIRECTIONS = ("out", "in", "both")
+
+# Version tag of the pagination cursor format
+CURSOR_VERSION = "c2"
+
+
+def encode_cursor(position: int, digest: str) -> str:
+    """Return the opaque cursor for a position in the node-then-edge order of a graph.
+
+    Args:
+        position: Index of the next record
+        digest: CompactGraph.digest() of the graph being paged
+    """
+    raw = f"{CURSOR_VERSION}:{position}:{digest}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, digest: str) -> int:
+    """Return the position encoded in a cursor issued for a graph with the given digest.
+
+    Raises:
+        InvalidInputError: If the cursor was not produced by encode_cursor,
+            or was issued for another graph (the repository or the
+            selection changed since the previous page)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        version, position, issued = raw.split(":", 2)
+    except (ValueError, UnicodeDecodeError):
+        version = None
+    if version != CURSOR_VERSION or not position.isdigit():
+        raise InvalidInputError(f"Invalid cursor: {cursor}")
+    if issued != digest:
+        raise InvalidInputError("Stale cursor: the graph changed since the previous page; start again without a cursor")
+    return int(position)
+
+
+class _Interner:
+    """Assigns dense integer ids to strings."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        i = self.index.get(value)
+        if i is None:
+            i = len(self.values)
+            self.values.append(value)
+            self.index[value] = i
+        return i
+
+
+def _csr(num_nodes: int, pairs: List[Tuple[int, int]]) -> Tuple[array, array]:
+    """Build CSR arrays from (source, target) pairs, keeping insertion order per source."""
+    offsets = array("I", [0]) * (num_nodes + 1)
+    for src, _dst in pairs:
+        offsets[src + 1] += 1
+    for i in range(num_nodes):
+        offsets[i + 1] += offsets[i]
+    targets = array("I", [0]) * len(pairs)
+    fill = array("I", offsets[:-1])
+    for src, dst in pairs:
+        targets[fill[src]] = dst
+        fill[src] += 1
+    return offsets, targets
+
+
+def _reverse(num_nodes: int, offsets: array, targets: array) -> Tuple[array, array]:
+    """Build the CSR arrays of the transposed edges."""
+    pairs = [(targets[k], src) for src in range(num_nodes) for k in range(offsets[src], offsets[src + 1])]
+    return _csr(num_nodes, pairs)
+
+
+def _alternatives(value: Any) -> List[str]:
+    values = value if isinstance(value, list) else [value]
+    if not all(isinstance(v, str) for v in values):
+        raise InvalidInputError("Filter values must be strings or lists of strings")
+    return values
+
+
+def _meta_matches(meta: Dict[str, Any], predicates: Dict[str, Any]) -> bool:
+    for key, expected in predicates.items():
+        if expected is None:
+            if key in meta:
+                return False
+            continue
+        actual = meta.get(key)
+        if actual != expected and not (isinstance(actual, list) and expected in actual):
+            return False
+    return True
+
+
+class CompactGraph:
+    """Immutable semantic graph with interned ids and CSR adjacency per edge type.
+
+    The integer columns and CSR arrays may be arrays or memoryviews of
+    unsigned ints; the string tables and object columns may be any sequence.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        strings: List[str],
+        scope: array,
+        name: array,
+        path: array,
+        owners: List[Tuple[int, ...]],
+        contract: List[Any],
+        meta: List[Optional[Dict[str, Any]]],
+        adjacency: Dict[str, Tuple[array, array]],
+        edge_attrs: Dict[Tuple[str, int, int], Dict[str, Any]],
+        graph_meta: Dict[str, Any],
+        reverse: Optional[Dict[str, Tuple[array, array]]] = None,
+        index: Optional[Any] = None,
+    ):
+        self.ids = ids
+        self.strings = strings
+        self.scope = scope
+        self.name = name
+        self.path = path
+        self.owners = owners
+        self.contract = contract
+        self.meta = meta
+        self.adjacency = adjacency
+        self.edge_attrs = edge_attrs
+        self.graph_meta = graph_meta
+        if reverse is None:
+            reverse = {t: _reverse(len(ids), offsets, targets) for t, (offsets, targets) in adjacency.items()}
+        self.reverse = reverse
+        # Any mapping-like object with get(id); built on first lookup if None
+        self._index = index
+        self._alias_index: Optional[Dict[str, int]] = None
+        self._scope_index: Optional[Dict[str, List[int]]] = None
+        self._owner_index: Optional[Dict[str, List[int]]] = None
+        self._sorted_paths: Optional[Tuple[List[str], List[int]]] = None
+        self._digest: Optional[str] = None
+        self.fields: Tuple[str, ...] = NODE_FIELDS
+
+    @classmethod
+    def from_dict(cls, graph: Dict[str, Any]) -> "CompactGraph":
+        """Build a compact graph from the JSON shape (``nodes``, ``edges``, ``meta``).
+
+        Edges whose endpoints are not nodes of the graph are dropped.
+        """
+        strings = _Interner()
+        ids: List[str] = []
+        index: Dict[str, int] = {}
+        scope, name, path = array("I"), array("I"), array("I")
+        owners: List[Tuple[int, ...]] = []
+        contract: List[Any] = []
+        meta: List[Optional[Dict[str, Any]]] = []
+        for node in graph.get("nodes", []):
+            node_id = node["id"]
+            if node_id in index:
+                continue
+            index[node_id] = len(ids)
+            ids.append(node_id)
+            scope.append(strings.add(node.get("scope")))
+            name.append(strings.add(node.get("name")))
+            path.append(strings.add(node.get("path")))
+            owners.append(tuple(strings.add(o) for o in node.get("owners") or []))
+            contract.append(node.get("contract"))
+            meta.append(node.get("meta"))
+
+        pairs: Dict[str, List[Tuple[int, int]]] = {}
+        edge_attrs: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+        for edge in graph.get("edges", []):
+            src, dst = index.get(edge.get("from")), index.get(edge.get("to"))
+            if src is None or dst is None:
+                continue
+            edge_type = edge.get("type", "rel")
+            pairs.setdefault(edge_type, []).append((src, dst))
+            extra = {k: v for k, v in edge.items() if k not in ("from", "to", "type")}
+            if extra:
+                edge_attrs[(edge_type, src, dst)] = extra
+
+        adjacency = {t: _csr(len(ids), p) for t, p in pairs.items()}
+        return cls(
+            ids, strings.values, scope, name, path, owners, contract, meta,
+            adjacency, edge_attrs, dict(graph.get("meta", {})),
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle memoryview-backed columns as arrays and sequences as lists."""
+        state = dict(self.__dict__)
+
+        def concrete(column: Any) -> Any:
+            return array("I", column) if isinstance(column, memoryview) else column
+
+        for key in ("scope", "name", "path"):
+            state[key] = concrete(state[key])
+        for key in ("adjacency", "reverse"):
+            state[key] = {t: (concrete(o), concrete(v)) for t, (o, v) in state[key].items()}
+        for key in ("ids", "strings", "owners", "contract", "meta"):
+            if not isinstance(state[key], list):
+                state[key] = list(state[key])
+        if not isinstance(state["_index"], (dict, type(None))):
+            state["_index"] = None
+        return state
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.ids)
+
+    @property
+    def num_edges(self) -> int:
+        return sum(len(targets) for _offsets, targets in self.adjacency.values())
+
+    @property
+    def edge_types(self) -> List[str]:
+        return list(self.adjacency)
+
+    def node_index(self, key: str) -> Optional[int]:
+        """Return the index of a node given its id, its path or its front-matter id."""
+        if self._index is None:
+            self._index = {node_id: i for i, node_id in enumerate(self.ids)}
+        i = self._index.get(key)
+        if i is not None:
+            return i
+        if self._alias_index is None:
+            aliases: Dict[str, int] = {}
+            for j, p in enumerate(self.path):
+                if p != NONE:
+                    aliases.setdefault(self.strings[p], j)
+            for j, meta in enumerate(self.meta):
+                semantic_id = (meta or {}).get("semanticId")
+                if semantic_id:
+                    aliases.setdefault(semantic_id, j)
+            self._alias_index = aliases
+        return self._alias_index.get(key)
+
+    def _string(self, i: int) -> Optional[str]:
+        return None if i == NONE else self.strings[i]
+
+    def node(self, i: int) -> Dict[str, Any]:
+        """Materialize the JSON shape of one node."""
+        fields = self.fields
+        out: Dict[str, Any] = {"id": self.ids[i], "scope": self._string(self.scope[i])}
+        if "name" in fields:
+            out["name"] = self._string(self.name[i])
+        if "path" in fields:
+            out["path"] = self._string(self.path[i])
+        if "owners" in fields:
+            out["owners"] = [self.strings[o] for o in self.owners[i]]
+        if "contract" in fields:
+            out["contract"] = self.contract[i]
+        if "meta" in fields and self.meta[i] is not None:
+            out["meta"] = self.meta[i]
+        return out
+
+    def successors(self, i: int, edge_type: str) -> array:
+        """Return the targets of edges of one type leaving node i."""
+        offsets, targets = self.adjacency[edge_type]
+        return targets[offsets[i]:offsets[i + 1]]
+
+    def predecessors(self, i: int, edge_type: str) -> array:
+        """Return the sources of edges of one type entering node i."""
+        offsets, sources = self.reverse[edge_type]
+        return sources[offsets[i]:offsets[i + 1]]
+
+    def _adjacent(self, i: int, edge_types: List[str], direction: str) -> Iterator[int]:
+        for edge_type in edge_types:
+            if edge_type not in self.adjacency:
+                continue
+            if direction in ("out", "both"):
+                yield from self.successors(i, edge_type)
+            if direction in ("in", "both"):
+                yield from self.predecessors(i, edge_type)
+
+    def expand(
+        self,
+        starts: Iterable[int],
+        depth: Optional[int],
+        edge_types: Optional[List[str]] = None,
+        direction: str = "both",
+    ) -> Dict[int, int]:
+        """Breadth-first expansion from the start nodes.
+
+        Args:
+            starts: Node indexes to start from
+            depth: Maximum number of hops; None for no limit
+            edge_types: Edge types to follow; all types if None
+            direction: Follow edges "out", "in" or "both" ways
+
+        Returns:
+            Hop distance of every reached node, keyed by node index
+        """
+        types = list(self.adjacency) if edge_types is None else edge_types
+        distances = {i: 0 for i in starts}
+        frontier = deque(distances)
+        while frontier:
+            i = frontier.popleft()
+            hops = distances[i]
+            if depth is not None and hops >= depth:
+                continue
+            for j in self._adjacent(i, types, direction):
+                if j not in distances:
+                    distances[j] = hops + 1
+                    frontier.append(j)
+        return distances
+
+    def shortest_path(
+        self,
+        src: int,
+        dst: int,
+        edge_types: Optional[List[str]] = None,
+        direction: str = "both",
+    ) -> Optional[List[int]]:
+        """Return the node indexes of a shortest path from src to dst, or None."""
+        types = list(self.adjacency) if edge_types is None else edge_types
+        parents = {src: src}
+        frontier = deque([src])
+        while frontier and dst not in parents:
+            i = frontier.popleft()
+            for j in self._adjacent(i, types, direction):
+                if j not in parents:
+                    parents[j] = i
+                    frontier.append(j)
+        if dst not in parents:
+            return None
+        path = [dst]
+        while path[-1] != src:
+            path.append(parents[path[-1]])
+        return path[::-1]
+
+    def query(
+        self,
+        kind: str,
+        start: List[str],
+        depth: Optional[int] = None,
+        edge_types: Optional[List[str]] = None,
+        direction: Optional[str] = None,
+        target: Optional[str] = None,
+    ) -> "CompactGraph":
+        """Answer a neighbourhood, expansion, impact or path query.
+
+        ``neighbors`` is a one-hop expansion, ``expand`` a k-hop expansion
+        (``depth`` defaults to 1), ``dependents`` follows ``depends-on`` edges
+        backwards without a depth limit, and ``path`` finds a shortest path
+        from the first start node to ``target``.
+
+        Args:
+            kind: One of QUERY_KINDS
+            start: Ids or paths of the start nodes
+            depth: Maximum number of hops
+            edge_types: Edge types to follow; defaults to all types, or to
+                ``depends-on`` for ``dependents``
+            direction: "out", "in" or "both"; defaults to "in" for
+                ``dependents`` and "both" otherwise
+            target: Id or path of the destination for ``path``
+
+        Returns:
+            The subgraph of the result nodes, restricted to the followed edge
+            types. Its meta carries the query, hop distances, the path and
+            any start or target keys that matched no node.
+
+        Raises:
+            InvalidInputError: If kind or direction is unknown
+        """
+        if kind not in QUERY_KINDS:
+            raise InvalidInputError(f"Unknown query kind: {kind}")
+        if kind == "dependents":
+            edge_types = edge_types or ["depends-on"]
+            direction = direction or "in"
+        direction = direction or "both"
+        if direction not in DIRECTIONS:
+            raise InvalidInputError(f"Unknown direction: {direction}")
+        if kind == "neighbors":
+            depth = 1
+        elif kind == "expand" and depth is None:
+            depth = 1
+
+        unresolved = [k for k in start if self.node_index(k) is None]
+        starts = [self.node_index(k) for k in start if self.node_index(k) is not None]
+        path: Optional[List[int]] = None
+        if kind == "path":
+            dst = self.node_index(target) if target else None
+            if target and dst is None:
+                unresolved.append(target)
+            if starts and dst is not None:
+                path = self.shortest_path(starts[0], dst, edge_types, direction)
+            keep = path or []
+            distances = {i: hops for hops, i in enumerate(keep)}
+        else:
+            distances = self.expand(starts, depth, edge_types, direction)
+            keep = list(distances)
+
+        result = self.subgraph(keep, edge_types)
+        result.graph_meta["query"] = {
+            "kind": kind,
+            "start": list(start),
+            "depth": depth,
+            "direction": direction,
+            "edgeTypes": edge_types,
+            "target": target,
+        }
+        result.graph_meta["distances"] = {self.ids[i]: hops for i, hops in distances.items()}
+        result.graph_meta["path"] = [self.ids[i] for i in path] if path is not None else None
+        result.graph_meta["unresolved"] = unresolved
+        return result
+
+    def edges(self) -> Iterator[Tuple[int, int, str]]:
+        """Iterate over (source, target, type), grouped by type then source."""
+        for edge_type, (offsets, targets) in self.adjacency.items():
+            for src in range(len(self.ids)):
+                for k in range(offsets[src], offsets[src + 1]):
+                    yield src, targets[k], edge_type
+
+    def records(self, start: int = 0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over ("node", node) and then ("edge", edge) in JSON shape.
+
+        Nodes come first in index order, followed by the edges in the order
+        of edges(). Only the records from position ``start`` on are
+        materialized; earlier edges are skipped through the CSR offsets.
+        """
+        for i in range(start, len(self.ids)):
+            yield "node", self.node(i)
+        skip = max(start - len(self.ids), 0)
+        for edge_type, (offsets, targets) in self.adjacency.items():
+            count = len(targets)
+            if skip >= count:
+                skip -= count
+                continue
+            src = bisect.bisect_right(offsets, skip) - 1
+            for k in range(skip, count):
+                while offsets[src + 1] <= k:
+                    src += 1
+                yield "edge", self.edge(src, targets[k], edge_type)
+            skip = 0
+
+    def page(self, cursor: Optional[str], limit: int) -> Dict[str, Any]:
+        """Materialize at most ``limit`` records starting at a cursor.
+
+        Records are taken from records(), so a page may hold nodes, edges or
+        both. ``meta.nextCursor`` is set when more records follow.
+
+        Args:
+            cursor: Cursor from a previous page's meta.nextCursor; None
+                for the first page
+            limit: Maximum number of nodes plus edges in the page
+
+        Raises:
+            InvalidInputError: If the cursor is invalid or stale (see
+                decode_cursor), or limit is not positive
+        """
+        if limit < 1:
+            raise InvalidInputError("limit must be a positive integer")
+        start = decode_cursor(cursor, self.digest()) if cursor else 0
+        out: Dict[str, Any] = {"nodes": [], "edges": [], "meta": dict(self.graph_meta)}
+        for kind, record in self.records(start):
+            if len(out["nodes"]) + len(out["edges"]) == limit:
+                out["meta"]["nextCursor"] = encode_cursor(start + limit, self.digest())
+                break
+            out["nodes" if kind == "node" else "edges"].append(record)
+        return out
+
+    def digest(self) -> str:
+        """Return a digest of the records this graph yields, in records() order.
+
+        Cursors carry the digest of the graph they were issued for, so a
+        cursor is only accepted while the repository snapshot and the
+        selection (ids, filters, edge types, fields) still yield the same
+        records. The graph meta is not part of it. Computed once per graph.
+        """
+        if self._digest is None:
+            digest = hashlib.sha1()
+            for kind, record in self.records():
+                digest.update(json.dumps([kind, record], sort_keys=True, separators=(",", ":")).encode("utf-8"))
+                digest.update(b"\n")
+            self._digest = digest.hexdigest()[:20]
+        return self._digest
+
+    def edge(self, src: int, dst: int, edge_type: str) -> Dict[str, Any]:
+        """Materialize the JSON shape of one edge."""
+        out: Dict[str, Any] = {"from": self.ids[src], "to": self.ids[dst], "type": edge_type}
+        extra = self.edge_attrs.get((edge_type, src, dst))
+        if extra:
+            out.update(extra)
+        return out
+
+    def subgraph(self, keep: Iterable[int], edge_types: Optional[List[str]] = None) -> "CompactGraph":
+        """Return the graph induced by the given node indexes, in index order.
+
+        Args:
+            keep: Node indexes to keep
+            edge_types: Edge types to keep; all types if None
+        """
+        selected = sorted(set(keep))
+        remap = {old: new for new, old in enumerate(selected)}
+        adjacency: Dict[str, Tuple[array, array]] = {}
+        edge_attrs: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+        for edge_type in self.adjacency:
+            if edge_types is not None and edge_type not in edge_types:
+                continue
+            pairs = []
+            for old in selected:
+                for dst in self.successors(old, edge_type):
+                    new_dst = remap.get(dst)
+                    if new_dst is None:
+                        continue
+                    pairs.append((remap[old], new_dst))
+                    extra = self.edge_attrs.get((edge_type, old, dst))
+                    if extra:
+                        edge_attrs[(edge_type, remap[old], new_dst)] = extra
+            if pairs:
+                adjacency[edge_type] = _csr(len(selected), pairs)
+        result = CompactGraph(
+            [self.ids[i] for i in selected],
+            self.strings,
+            array("I", (self.scope[i] for i in selected)),
+            array("I", (self.name[i] for i in selected)),
+            array("I", (self.path[i] for i in selected)),
+            [self.owners[i] for i in selected],
+            [self.contract[i] for i in selected],
+            [self.meta[i] for i in selected],
+            adjacency, edge_attrs, dict(self.graph_meta),
+        )
+        result.fields = self.fields
+        return result
+
+    def project(self, include: Iterable[str]) -> "CompactGraph":
+        """Return a view of the graph whose nodes only carry the given fields.
+
+        Raises:
+            InvalidInputError: If a field is not one of NODE_FIELDS
+        """
+        include = list(include)
+        unknown = [f for f in include if f not in NODE_FIELDS and f != "id"]
+        if unknown:
+            raise InvalidInputError(f"Unknown node field(s): {', '.join(unknown)}")
+        view = copy.copy(self)
+        view.fields = tuple(f for f in NODE_FIELDS if f in include)
+        view._digest = None
+        view.graph_meta = dict(self.graph_meta)
+        return view
+
+    def match(self, filters: Dict[str, Any]) -> List[int]:
+        """Return the indexes of nodes matching every predicate of a filter object.
+
+        Supported predicates, each taking one value or a list of alternatives:
+        ``scope``, ``owner`` (any owner matches) and ``pathPrefix``; ``meta``
+        maps meta keys to values that must equal the meta value or be
+        contained in it when it is a list (null matches a missing key).
+        Scope, owner and path predicates are answered from indexes; meta
+        predicates are checked on the remaining candidates only.
+
+        Raises:
+            InvalidInputError: If the filter object has unknown keys or bad values
+        """
+        if not isinstance(filters, dict):
+            raise InvalidInputError("Filters must be a JSON object")
+        unknown = [k for k in filters if k not in FILTER_KEYS]
+        if unknown:
+            raise InvalidInputError(f"Unknown filter(s): {', '.join(unknown)}")
+
+        candidates: Optional[set] = None
+
+        def narrow(found: Iterable[int]) -> None:
+            nonlocal candidates
+            found = set(found)
+            candidates = found if candidates is None else candidates & found
+
+        if "scope" in filters:
+            if self._scope_index is None:
+                self._scope_index = self._column_index(self.scope)
+            narrow(i for v in _alternatives(filters["scope"]) for i in self._scope_index.get(v, []))
+        if "owner" in filters:
+            if self._owner_index is None:
+                index: Dict[str, List[int]] = {}
+                for i, owners in enumerate(self.owners):
+                    for o in owners:
+                        index.setdefault(self.strings[o], []).append(i)
+                self._owner_index = index
+            narrow(i for v in _alternatives(filters["owner"]) for i in self._owner_index.get(v, []))
+        if "pathPrefix" in filters:
+            if self._sorted_paths is None:
+                pairs = sorted((self.strings[p], i) for i, p in enumerate(self.path) if p != NONE)
+                self._sorted_paths = ([p for p, _i in pairs], [i for _p, i in pairs])
+            paths, order = self._sorted_paths
+            found: List[int] = []
+            for prefix in _alternatives(filters["pathPrefix"]):
+                lo = bisect.bisect_left(paths, prefix)
+                hi = lo
+                while hi < len(paths) and paths[hi].startswith(prefix):
+                    hi += 1
+                found.extend(order[lo:hi])
+            narrow(found)
+
+        keep = sorted(candidates) if candidates is not None else list(range(len(self.ids)))
+        meta_filters = filters.get("meta")
+        if meta_filters is not None:
+            if not isinstance(meta_filters, dict):
+                raise InvalidInputError("The meta filter must be a JSON object")
+            keep = [i for i in keep if _meta_matches(self.meta[i] or {}, meta_filters)]
+        return keep
+
+    def _column_index(self, column: array) -> Dict[str, List[int]]:
+        index: Dict[str, List[int]] = {}
+        for i, v in enumerate(column):
+            if v != NONE:
+                index.setdefault(self.strings[v], []).append(i)
+        return index
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the JSON/``SemanticGraph`` shape."""
+        return {
+            "nodes": [self.node(i) for i in range(len(self.ids))],
+            "edges": [self.edge(src, dst, t) for src, dst, t in self.edges()],
+            "meta": dict(self.graph_meta),
+        }
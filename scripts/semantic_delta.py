@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Semantic graph delta between two snapshots.
+
+A snapshot is the git tree of a ref, or the working tree (WORKTREE). The
+delta lists added and removed nodes, attribute changes of modified nodes
+and added and removed edges, in the graph_delta.json format of
+data/semantic-reports.
+
+The work follows the size of the change. Between two refs, ``git
+diff-tree`` names the semantic-instructions.md files that differ, and only
+those blobs are read; the head graph is derived from the base graph (see
+semantic_graph.tree_files). Edges are compared only for the nodes whose
+edges can have changed:
+
+- the changed nodes themselves,
+- nodes below an added or removed node, whose container may have changed,
+- nodes with a dependency entry naming a changed node.
+
+Every edge is owned by one node, its ``contains`` target or its
+``depends-on`` source, so comparing the owned edges of these nodes finds
+every edge change.
+"""
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from semantic_cli import InvalidInputError, cli_main
+from semantic_git import diff_tree, resolve_tree
+from semantic_graph import (
+    dependency_edges, edge_index, is_instructions_file, node_refs, parent_edge, scan_graph, scan_tree,
+)
+
+TOOL_VERSION = "0.1.0"
+SCHEMA_VERSION = "1.0"
+
+# --headRef value that selects the working tree
+WORKTREE = "WORKTREE"
+
+REPORT_DIR = os.path.join("data", "semantic-reports")
+REPORT_FILE = "graph_delta.json"
+
+# Snapshot indexes kept in memory, keyed by tree SHA
+INDEX_CACHE_SIZE = 8
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Compute the semantic graph delta between two snapshots")
+    p.add_argument("--baseRef", default="origin/main")
+    p.add_argument("--headRef", default="HEAD", help=f"Git ref, or {WORKTREE} for the working tree")
+    p.add_argument("--date", default=None, help="Report date (YYYY-MM-DD); today by default")
+    p.add_argument("--write", action="store_true", help=f"Write {REPORT_DIR}/<date>/{REPORT_FILE}")
+    p.add_argument("--noCache", action="store_true", help="Ignore and do not update the graph caches")
+    return p.parse_args(argv)
+
+
+class SnapshotIndex:
+    """Lookups over one graph snapshot for computing owned edges."""
+
+    def __init__(self, graph: Dict[str, Any], files: Dict[str, Dict[str, Any]]):
+        nodes = graph["nodes"]
+        self.project = nodes[0]
+        self.by_path, self.refs = edge_index(nodes)
+        self.nodes = {n["id"]: n for n in nodes}
+        self.files = files
+        self.paths = sorted(self.by_path)
+        # Dependency entry -> ids of the nodes that list it
+        self.dependents: Dict[str, List[str]] = {}
+        for n in nodes[1:]:
+            for dep in (n.get("meta") or {}).get("dependencies", []):
+                self.dependents.setdefault(dep, []).append(n["id"])
+
+    def node_at(self, rel: str) -> Dict[str, Any] | None:
+        entry = self.files.get(rel)
+        return entry["node"] if entry else None
+
+    def below(self, path: str) -> Iterable[str]:
+        """Ids of the nodes in subdirectories of path."""
+        prefix = path + "/"
+        i = bisect.bisect_left(self.paths, prefix)
+        while i < len(self.paths) and self.paths[i].startswith(prefix):
+            yield self.by_path[self.paths[i]]
+            i += 1
+
+    def owned_edges(self, node_id: str) -> Set[Tuple[str, str, str]]:
+        """The node's incoming contains edge and outgoing depends-on edges."""
+        node = self.nodes.get(node_id)
+        if node is None or node is self.project:
+            return set()
+        edges = [parent_edge(node, self.project["id"], self.by_path), *dependency_edges(node, self.refs)]
+        return {(e["from"], e["to"], e["type"]) for e in edges}
+
+
+_indexes: "OrderedDict[Tuple[str, str], SnapshotIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def snapshot_index(repo_root: str, tree: str | None, graph: Dict[str, Any], files: Dict[str, Dict[str, Any]]) -> SnapshotIndex:
+    """Return the index of a snapshot; indexes of trees are reused."""
+    if tree is None:
+        return SnapshotIndex(graph, files)
+    key = (repo_root, tree)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None and index.files is files:
+            _indexes.move_to_end(key)
+            return index
+    index = SnapshotIndex(graph, files)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def attribute_changes(before: Dict[str, Any], after: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return {field, before, after} per changed attribute.
+
+    Object attributes (contract, meta) are compared per key, as
+    ``contract.invariants`` or ``meta.dependencies``.
+    """
+    changes = []
+    for key in sorted(set(before) | set(after)):
+        if key == "id":
+            continue
+        old, new = before.get(key), after.get(key)
+        if old == new:
+            continue
+        if isinstance(old, dict) or isinstance(new, dict):
+            old, new = old if isinstance(old, dict) else {}, new if isinstance(new, dict) else {}
+            for sub in sorted(set(old) | set(new)):
+                if old.get(sub) != new.get(sub):
+                    changes.append({"field": f"{key}.{sub}", "before": old.get(sub), "after": new.get(sub)})
+        else:
+            changes.append({"field": key, "before": old, "after": new})
+    return changes
+
+
+def graph_delta(base: SnapshotIndex, head: SnapshotIndex, changed: Iterable[str]) -> Dict[str, Any]:
+    """Compare two snapshots given the semantic files that differ between them.
+
+    Args:
+        base: Index of the base snapshot
+        head: Index of the head snapshot
+        changed: Paths of semantic-instructions.md files that were added,
+            removed or modified
+
+    Returns:
+        Dict with ``nodes`` (added, removed, modified) and ``edges``
+        (added, removed)
+    """
+    added: List[Dict[str, Any]] = []
+    removed: List[Dict[str, Any]] = []
+    modified: List[Dict[str, Any]] = []
+    affected: Set[str] = set()
+    moved_paths: List[str] = []
+    names: Set[str] = set()
+
+    pairs = [(base.project, head.project)]
+    pairs.extend((base.node_at(rel), head.node_at(rel)) for rel in sorted(set(changed)))
+    for old, new in pairs:
+        if old is not None and new is not None and old["id"] == new["id"]:
+            changes = attribute_changes(old, new)
+            if changes:
+                modified.append({"id": new["id"], "path": new["path"], "changes": changes})
+        else:
+            if old is not None:
+                removed.append(old)
+            if new is not None:
+                added.append(new)
+            moved_paths.append((old or new)["path"])
+        for node in (old, new):
+            if node is not None and node is not base.project and node is not head.project:
+                affected.add(node["id"])
+                names.update(node_refs(node))
+
+    for path in moved_paths:
+        affected.update(base.below(path))
+        affected.update(head.below(path))
+    for name in names:
+        affected.update(base.dependents.get(name, ()))
+        affected.update(head.dependents.get(name, ()))
+
+    edges_added: Set[Tuple[str, str, str]] = set()
+    edges_removed: Set[Tuple[str, str, str]] = set()
+    for node_id in affected:
+        old_edges, new_edges = base.owned_edges(node_id), head.owned_edges(node_id)
+        edges_added |= new_edges - old_edges
+        edges_removed |= old_edges - new_edges
+
+    def edge_list(edges: Set[Tuple[str, str, str]]) -> List[Dict[str, str]]:
+        return [{"from": f, "to": t, "type": k} for f, t, k in sorted(edges)]
+
+    return {
+        "nodes": {
+            "added": sorted(added, key=lambda n: n["id"]),
+            "removed": sorted(removed, key=lambda n: n["id"]),
+            "modified": sorted(modified, key=lambda m: m["id"]),
+        },
+        "edges": {"added": edge_list(edges_added), "removed": edge_list(edges_removed)},
+    }
+
+
+def changed_files(base: SnapshotIndex, head: SnapshotIndex) -> List[str]:
+    """Semantic files whose nodes differ; used when a snapshot is not a tree."""
+    return [
+        rel for rel in set(base.files) | set(head.files)
+        if base.node_at(rel) != head.node_at(rel)
+    ]
+
+
+def write_report(repo_root: str, report: Dict[str, Any]) -> str:
+    """Atomically write the report to the report folder of its date.
+
+    Returns:
+        Path of the written file relative to the repository root
+    """
+    rel = os.path.join(REPORT_DIR, report["date"], REPORT_FILE)
+    path = os.path.join(repo_root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".graph_delta.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return rel.replace(os.sep, "/")
+
+
+def run(argv: List[str], repo_root: str) -> Dict[str, Any]:
+    args = parse_args(argv)
+    now = datetime.utcnow()
+    date = args.date or now.strftime("%Y-%m-%d")
+    if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", date):
+        raise InvalidInputError(f"Invalid date: {date}")
+    use_cache = not args.noCache
+
+    base_tree = resolve_tree(repo_root, args.baseRef)
+    base_graph, base_files = scan_graph(repo_root, use_cache, ref=base_tree)
+    base = snapshot_index(repo_root, base_tree if use_cache else None, base_graph, base_files)
+
+    if args.headRef == WORKTREE:
+        head_tree = None
+        head_graph, head_files = scan_graph(repo_root, use_cache)
+        head = SnapshotIndex(head_graph, head_files)
+        changed = changed_files(base, head)
+    else:
+        head_tree = resolve_tree(repo_root, args.headRef)
+        head_graph, head_files = scan_tree(repo_root, head_tree, use_cache, base=base_tree)
+        head = snapshot_index(repo_root, head_tree if use_cache else None, head_graph, head_files)
+        changed = [rel for _status, rel, _old, _new in diff_tree(repo_root, base_tree, head_tree) if is_instructions_file(rel)]
+
+    delta = graph_delta(base, head, changed)
+    report = {
+        "schemaVersion": SCHEMA_VERSION,
+        "generatedBy": f"semantic_delta@{TOOL_VERSION}",
+        "timestamp": now.isoformat() + "Z",
+        "date": date,
+        "base": {"ref": args.baseRef, "tree": base_tree},
+        "head": {"ref": args.headRef, "tree": head_tree},
+        **delta,
+        "summary": {
+            "filesChanged": len(set(changed)),
+            "nodesAdded": len(delta["nodes"]["added"]),
+            "nodesRemoved": len(delta["nodes"]["removed"]),
+            "nodesModified": len(delta["nodes"]["modified"]),
+            "edgesAdded": len(delta["edges"]["added"]),
+            "edgesRemoved": len(delta["edges"]["removed"]),
+        },
+    }
+    if args.write:
+        report["writtenTo"] = write_report(repo_root, report)
+    return report
+
+
+def main() -> int:
+    print(json.dumps(run(sys.argv[1:], os.getcwd()), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli_main(main))
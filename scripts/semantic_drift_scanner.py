@@ -7,21 +7,25 @@ import sys
 from datetime import datetime
 from typing import Any, Dict, List
 
+from semantic_cli import cli_main
+from semantic_walk import is_excluded
 
-def parse_args():
+
+def parse_args(argv: List[str] | None = None):
     p = argparse.ArgumentParser(description="Detect semantic drift across git refs")
     p.add_argument("--baseRef", default="origin/main")
     p.add_argument("--headRef", default="HEAD")
     p.add_argument("--scopes", nargs="*", default=None)
     p.add_argument("--includeDiffSummary", action="store_true", default=True)
     p.add_argument("--threshold", choices=["all", "error", "warning"], default="all")
-    return p.parse_args()
+    return p.parse_args(argv)
 
 
-def git_diff_names(base: str, head: str) -> List[str]:
+def git_diff_names(base: str, head: str, repo_root: str = ".") -> List[str]:
     try:
-        out = subprocess.check_output(["git", "diff", "--name-only", base, head], stderr=subprocess.STDOUT, text=True)
-        return [line.strip() for line in out.splitlines() if line.strip()]
+        out = subprocess.check_output(["git", "diff", "--name-only", base, head], cwd=repo_root, stderr=subprocess.STDOUT, text=True)
+        names = [line.strip() for line in out.splitlines() if line.strip()]
+        return [n for n in names if not is_excluded(n)]
     except Exception:
         return []
 
@@ -57,16 +61,16 @@ def classify_drift(files: List[str]) -> List[Dict[str, Any]]:
     return drifts
 
 
-def main() -> int:
-    args = parse_args()
-    changed = git_diff_names(args.baseRef, args.headRef)
+def run(argv: List[str], repo_root: str) -> Dict[str, Any]:
+    args = parse_args(argv)
+    changed = git_diff_names(args.baseRef, args.headRef, repo_root)
     drifts = classify_drift(changed)
 
     summary = {"count": len(drifts), "byType": {}, "bySeverity": {}}
     for d in drifts:
         summary["byType"][d["type"]] = summary["byType"].get(d["type"], 0) + 1
 
-    out = {
+    return {
         "drifts": drifts,
         "summary": summary,
         "diffSummary": "\n".join(changed) if args.includeDiffSummary else "",
@@ -77,9 +81,12 @@ def main() -> int:
             "headRef": args.headRef,
         },
     }
-    print(json.dumps(out, indent=2))
+
+
+def main() -> int:
+    print(json.dumps(run(sys.argv[1:], os.getcwd()), indent=2))
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(cli_main(main))
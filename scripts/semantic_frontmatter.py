@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""Bounded front-matter reader and parser for semantic-instructions.md files.
+
+Only the bytes up to the closing ``---`` delimiter are read, never more than
+MAX_FRONT_MATTER_BYTES. The block is parsed with a small YAML subset parser
+(block mappings and sequences, flow ``[...]``/``{...}`` collections, quoted
+and plain scalars, ``|``/``>`` block scalars, comments) into a FrontMatter
+record whose typed properties follow .schemas/semantic-instructions.schema.json.
+Records are cached by the SHA-256 of the front-matter bytes, so a file is
+parsed once however many tools read it.
+"""
+import copy
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+DELIMITER = "---"
+
+# Front matter larger than this is reported as unterminated
+MAX_FRONT_MATTER_BYTES = 64 * 1024
+
+# Parsed records kept in memory, keyed by front-matter digest
+RECORD_CACHE_SIZE = 1024
+
+SCOPES = ("project", "cluster", "module")
+
+
+class FrontMatterError(ValueError):
+    """Raised for front matter outside the supported YAML subset."""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(message)
+        self.line = line
+
+
+@dataclass(frozen=True)
+class FrontMatter:
+    """Parsed front matter of one file.
+
+    ``data`` is the raw mapping and must not be mutated; the typed
+    properties return copies.
+    """
+    present: bool
+    closed: bool = False
+    data: Dict[str, Any] = field(default_factory=dict)
+    key_lines: Dict[str, int] = field(default_factory=dict)
+    end_line: int = 1
+    digest: str = ""
+    error: Optional[str] = None
+    error_line: Optional[int] = None
+
+    @property
+    def valid(self) -> bool:
+        """True if the block is present, terminated and parsed."""
+        return self.present and self.closed and self.error is None
+
+    @property
+    def scope(self) -> Optional[str]:
+        value = self.data.get("scope")
+        return value if value in SCOPES else None
+
+    @property
+    def id(self) -> Optional[str]:
+        return _text(self.data.get("id"))
+
+    @property
+    def name(self) -> Optional[str]:
+        return _text(self.data.get("name"))
+
+    @property
+    def owners(self) -> List[str]:
+        return _strings(self.data.get("owners"))
+
+    @property
+    def reviewers(self) -> List[str]:
+        return _strings(self.data.get("reviewers"))
+
+    @property
+    def dependencies(self) -> List[str]:
+        """Other semantic units this one depends on, by id or path."""
+        return _strings(self.data.get("dependencies"))
+
+    @property
+    def contract(self) -> Dict[str, Any]:
+        """Contract with ``invariants`` and ``validation.tests`` always present.
+
+        A top-level ``validation`` block, as used by the documented template,
+        is folded into the contract.
+        """
+        raw = self.data.get("contract")
+        contract = copy.deepcopy(raw) if isinstance(raw, dict) else {}
+        validation = contract.get("validation")
+        if not isinstance(validation, dict):
+            top = self.data.get("validation")
+            validation = copy.deepcopy(top) if isinstance(top, dict) else {}
+        validation["tests"] = _strings(validation.get("tests"))
+        contract["invariants"] = _strings(contract.get("invariants"))
+        contract["validation"] = validation
+        return contract
+
+    @property
+    def change_policy(self) -> Dict[str, Any]:
+        raw = self.data.get("change_policy")
+        return copy.deepcopy(raw) if isinstance(raw, dict) else {}
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        raw = self.data.get("meta")
+        return copy.deepcopy(raw) if isinstance(raw, dict) else {}
+
+    def line(self, key: str) -> int:
+        """Return the 1-based line of a (dotted) key, or of the opening delimiter."""
+        return self.key_lines.get(key, 1)
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, bool) or value is None or isinstance(value, (dict, list)):
+        return None
+    text = str(value)
+    return text or None
+
+
+def _strings(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(v) for v in value if v is not None and not isinstance(v, (dict, list))]
+
+
+def read_front_matter(path: str, limit: int = MAX_FRONT_MATTER_BYTES) -> bytes:
+    """Read a file up to and including its closing front-matter delimiter.
+
+    Args:
+        path: File to read
+        limit: Maximum number of bytes read
+
+    Returns:
+        The opening line only if the file has no front matter, otherwise the
+        front-matter block including both delimiters (truncated at limit)
+    """
+    with open(path, "rb") as f:
+        first = f.readline(limit)
+        if _strip_bom(first).rstrip(b"\r\n") != DELIMITER.encode():
+            return first
+        chunks = [first]
+        total = len(first)
+        while total < limit:
+            line = f.readline(limit - total)
+            if not line:
+                break
+            chunks.append(line)
+            total += len(line)
+            if line.rstrip(b"\r\n") == DELIMITER.encode():
+                break
+        return b"".join(chunks)
+
+
+def _strip_bom(data: bytes) -> bytes:
+    return data[3:] if data.startswith(b"\xef\xbb\xbf") else data
+
+
+_records: "OrderedDict[str, FrontMatter]" = OrderedDict()
+_records_lock = threading.Lock()
+
+
+def parse_bytes(data: bytes) -> FrontMatter:
+    """Parse the front matter at the start of data, reusing cached records.
+
+    Args:
+        data: File content, or the prefix returned by read_front_matter
+
+    Returns:
+        The parsed record; parse problems are reported in ``error``
+    """
+    block = _block(data)
+    digest = hashlib.sha256(block).hexdigest()
+    with _records_lock:
+        record = _records.get(digest)
+        if record is not None:
+            _records.move_to_end(digest)
+            return record
+    record = _parse_block(block, digest)
+    with _records_lock:
+        _records[digest] = record
+        while len(_records) > RECORD_CACHE_SIZE:
+            _records.popitem(last=False)
+    return record
+
+
+def load_front_matter(path: str) -> FrontMatter:
+    """Read and parse the front matter of a file."""
+    return parse_bytes(read_front_matter(path))
+
+
+def _block(data: bytes) -> bytes:
+    """Cut data down to the bytes the front matter depends on."""
+    lines = data.splitlines(keepends=True)
+    if not lines or _strip_bom(lines[0]).rstrip(b"\r\n") != DELIMITER.encode():
+        return lines[0] if lines else b""
+    for i in range(1, len(lines)):
+        if lines[i].rstrip(b"\r\n") == DELIMITER.encode():
+            return b"".join(lines[:i + 1])
+    return b"".join(lines)
+
+
+def _parse_block(block: bytes, digest: str) -> FrontMatter:
+    lines = _strip_bom(block).decode("utf-8", errors="replace").splitlines()
+    if not lines or lines[0].rstrip() != DELIMITER:
+        return FrontMatter(present=False, digest=digest)
+    try:
+        end = next(i for i in range(1, len(lines)) if lines[i].rstrip() == DELIMITER)
+    except StopIteration:
+        return FrontMatter(
+            present=True, end_line=len(lines), digest=digest,
+            error=f"Unterminated front matter: no closing '{DELIMITER}' within {MAX_FRONT_MATTER_BYTES} bytes",
+            error_line=1,
+        )
+    parser = _Parser(lines[1:end], first_line=2)
+    try:
+        data = parser.parse()
+    except FrontMatterError as e:
+        return FrontMatter(
+            present=True, closed=True, end_line=end + 1, digest=digest,
+            error=str(e), error_line=e.line,
+        )
+    return FrontMatter(
+        present=True, closed=True, data=data, key_lines=parser.key_lines,
+        end_line=end + 1, digest=digest,
+    )
+
+
+class _Line(NamedTuple):
+    number: int
+    indent: int
+    text: str
+
+
+_KEY_RE = re.compile(r"""^(?P<key>"[^"]*"|'[^']*'|[^\s#'"\[\]{},:-][^:#]*?|-[^\s:#][^:#]*?)\s*:(?:\s+(?P<rest>.*))?$""")
+_INT_RE = re.compile(r"^[-+]?\d+$")
+_FLOAT_RE = re.compile(r"^[-+]?(\d+\.\d*|\.\d+)([eE][-+]?\d+)?$")
+
+
+def _strip_comment(text: str) -> str:
+    """Remove a trailing ``# comment`` that is outside quotes."""
+    quote = None
+    for i, c in enumerate(text):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "\"'" and (i == 0 or text[i - 1] in " \t[{,:"):
+            quote = c
+        elif c == "#" and (i == 0 or text[i - 1] in " \t"):
+            return text[:i].rstrip()
+    return text.rstrip()
+
+
+def _scalar(text: str, line: int) -> Any:
+    text = text.strip()
+    if not text:
+        return None
+    if text[0] == '"':
+        try:
+            return json.loads(text)
+        except ValueError:
+            raise FrontMatterError("Invalid double-quoted string", line)
+    if text[0] == "'":
+        if len(text) < 2 or text[-1] != "'":
+            raise FrontMatterError("Invalid single-quoted string", line)
+        return text[1:-1].replace("''", "'")
+    lowered = text.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if lowered in ("null", "~"):
+        return None
+    if _INT_RE.match(text):
+        return int(text)
+    if _FLOAT_RE.match(text):
+        return float(text)
+    return text
+
+
+def _balanced(text: str) -> bool:
+    depth, quote = 0, None
+    for c in text:
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c in "[{":
+            depth += 1
+        elif c in "]}":
+            depth -= 1
+    return depth <= 0
+
+
+def _flow(text: str, line: int) -> Any:
+    """Parse a flow collection such as ``["a", b]`` or ``{k: v}``."""
+    value, i = _flow_value(text, 0, ",]}", line)
+    while i < len(text) and text[i] in " \t":
+        i += 1
+    if i != len(text):
+        raise FrontMatterError(f"Unexpected '{text[i]}' in flow collection", line)
+    return value
+
+
+def _flow_value(s: str, i: int, stops: str, line: int) -> Tuple[Any, int]:
+    while i < len(s) and s[i] in " \t":
+        i += 1
+    if i >= len(s):
+        return None, i
+    c = s[i]
+    if c in "[{":
+        close = "]" if c == "[" else "}"
+        is_map = c == "{"
+        items: List[Any] = []
+        mapping: Dict[str, Any] = {}
+        i += 1
+        while True:
+            while i < len(s) and s[i] in " \t":
+                i += 1
+            if i >= len(s):
+                raise FrontMatterError(f"Unclosed '{c}' in flow collection", line)
+            if s[i] == close:
+                return (mapping if is_map else items), i + 1
+            if is_map:
+                key, i = _flow_value(s, i, ":", line)
+                if i >= len(s) or s[i] != ":":
+                    raise FrontMatterError("Expected ':' in flow mapping", line)
+                value, i = _flow_value(s, i + 1, ",}", line)
+                mapping[str(key)] = value
+            else:
+                value, i = _flow_value(s, i, ",]", line)
+                items.append(value)
+            while i < len(s) and s[i] in " \t":
+                i += 1
+            if i < len(s) and s[i] == ",":
+                i += 1
+            elif i >= len(s) or s[i] != close:
+                raise FrontMatterError(f"Expected ',' or '{close}' in flow collection", line)
+    if c in "\"'":
+        j = i + 1
+        while j < len(s):
+            if s[j] == "\\" and c == '"':
+                j += 2
+                continue
+            if s[j] == c:
+                if c == "'" and j + 1 < len(s) and s[j + 1] == "'":
+                    j += 2
+                    continue
+                break
+            j += 1
+        if j >= len(s):
+            raise FrontMatterError("Unterminated string in flow collection", line)
+        return _scalar(s[i:j + 1], line), j + 1
+    j = i
+    while j < len(s) and s[j] not in stops:
+        j += 1
+    return _scalar(s[i:j], line), j
+
+
+class _Parser:
+    """Indentation-driven parser for the supported YAML subset."""
+
+    def __init__(self, raw_lines: List[str], first_line: int):
+        self.raw = raw_lines
+        self.lines = [
+            _Line(first_line + k, len(raw) - len(raw.lstrip(" ")), raw.strip())
+            for k, raw in enumerate(raw_lines)
+        ]
+        self.pos = 0
+        self.key_lines: Dict[str, int] = {}
+
+    def parse(self) -> Dict[str, Any]:
+        self._skip()
+        if self.pos >= len(self.lines):
+            return {}
+        for raw, line in zip(self.raw, self.lines):
+            if line.text and raw[line.indent] == "\t":
+                raise FrontMatterError("Tabs are not allowed for indentation", line.number)
+        value = self._mapping(self.lines[self.pos].indent, "")
+        self._skip()
+        if self.pos < len(self.lines):
+            raise FrontMatterError("Unexpected content", self.lines[self.pos].number)
+        return value
+
+    def _skip(self) -> None:
+        while self.pos < len(self.lines) and (
+            not self.lines[self.pos].text or self.lines[self.pos].text.startswith("#")
+        ):
+            self.pos += 1
+
+    def _peek(self) -> Optional[_Line]:
+        self._skip()
+        return self.lines[self.pos] if self.pos < len(self.lines) else None
+
+    @staticmethod
+    def _is_item(line: _Line) -> bool:
+        return line.text == "-" or line.text.startswith("- ")
+
+    def _mapping(self, indent: int, path: str) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        while True:
+            line = self._peek()
+            if line is None or line.indent < indent or self._is_item(line):
+                return result
+            if line.indent > indent:
+                raise FrontMatterError("Unexpected indentation", line.number)
+            m = _KEY_RE.match(line.text)
+            if not m:
+                raise FrontMatterError("Expected 'key: value'", line.number)
+            key = m.group("key")
+            if key[0] in "\"'":
+                key = key[1:-1]
+            full = f"{path}.{key}" if path else key
+            self.key_lines[full] = line.number
+            self.pos += 1
+            result[key] = self._value(m.group("rest") or "", indent, full, line, in_mapping=True)
+
+    def _sequence(self, indent: int, path: str) -> List[Any]:
+        items: List[Any] = []
+        while True:
+            line = self._peek()
+            if line is None or line.indent < indent:
+                return items
+            if line.indent > indent:
+                raise FrontMatterError("Unexpected indentation", line.number)
+            if not self._is_item(line):
+                return items
+            item = line.text[1:].lstrip()
+            item_path = f"{path}[{len(items)}]"
+            if item and _KEY_RE.match(item) and item[0] not in "[{":
+                # "- key: value" starts a mapping indented at the key
+                offset = indent + len(line.text) - len(item)
+                self.lines[self.pos] = _Line(line.number, offset, item)
+                items.append(self._mapping(offset, item_path))
+            else:
+                self.pos += 1
+                items.append(self._value(item, indent, item_path, line, in_mapping=False))
+
+    def _value(self, rest: str, indent: int, path: str, line: _Line, in_mapping: bool) -> Any:
+        text = _strip_comment(rest)
+        if not text:
+            nxt = self._peek()
+            if nxt is None:
+                return None
+            if nxt.indent > indent:
+                if self._is_item(nxt):
+                    return self._sequence(nxt.indent, path)
+                return self._mapping(nxt.indent, path)
+            if in_mapping and nxt.indent == indent and self._is_item(nxt):
+                return self._sequence(indent, path)
+            return None
+        if text[0] in "|>":
+            return self._block_scalar(text, indent, line)
+        if text[0] in "[{":
+            while not _balanced(text) and self.pos < len(self.lines):
+                text += " " + _strip_comment(self.lines[self.pos].text)
+                self.pos += 1
+            return _flow(text, line.number)
+        return _scalar(text, line.number)
+
+    def _block_scalar(self, header: str, indent: int, line: _Line) -> str:
+        if not re.match(r"^[|>][-+]?$", header):
+            raise FrontMatterError("Unsupported block scalar header", line.number)
+        body: List[str] = []
+        block_indent = None
+        while self.pos < len(self.lines):
+            raw = self.raw[self.pos]
+            current = self.lines[self.pos]
+            if current.text and current.indent <= indent:
+                break
+            if current.text and block_indent is None:
+                block_indent = current.indent
+            body.append(raw[block_indent:] if block_indent is not None else "")
+            self.pos += 1
+        while body and not body[-1]:
+            body.pop()
+        if header[0] == "|":
+            text = "\n".join(body)
+        else:
+            text = " ".join(part for part in body if part) if body else ""
+        if header.endswith("-"):
+            return text
+        return text + "\n" if text else text
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Read files of any git tree straight from the object store.
+
+Objects are read through one persistent ``git cat-file --batch`` process per
+repository, so reading a blob is a pipe round trip rather than a process
+start. Tree listings are cached by tree SHA; trees are immutable, so cached
+listings never go stale.
+"""
+import atexit
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from semantic_cli import InvalidInputError
+
+# Number of tree listings kept in memory
+TREE_CACHE_SIZE = 16
+
+_SHA_RE = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+
+class GitObjectReader:
+    """Reads git objects through a persistent ``git cat-file --batch`` process.
+
+    The process is started lazily and restarted if it exits. Calls are
+    serialized, so one reader can be shared by threads.
+    """
+
+    def __init__(self, repo_root: str):
+        self.repo_root = repo_root
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def read(self, name: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return (sha, type, content) of an object, or None if it does not exist.
+
+        Args:
+            name: Object name understood by git, e.g. a SHA, ``<tree>:<path>``
+                or ``<ref>^{tree}``
+
+        Raises:
+            ValueError: If the name contains a line break
+            RuntimeError: If git cannot be started or exits unexpectedly
+        """
+        if "\n" in name or "\r" in name:
+            raise ValueError(f"Invalid object name: {name!r}")
+        with self._lock:
+            proc = self._process()
+            try:
+                proc.stdin.write(name.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                header = proc.stdout.readline()
+            except OSError as e:
+                self._stop()
+                raise RuntimeError(f"git cat-file failed: {e}")
+            if not header:
+                self._stop()
+                raise RuntimeError("git cat-file exited unexpectedly")
+            parts = header.decode("utf-8", errors="replace").split()
+            if len(parts) != 3 or not parts[2].isdigit():
+                # "<name> missing" or "<name> ambiguous"; the name may
+                # contain spaces, so only "<sha> <type> <size>" is a hit
+                return None
+            sha, kind, size = parts
+            content = proc.stdout.read(int(size))
+            proc.stdout.read(1)
+            return sha, kind, content
+
+    def close(self) -> None:
+        """Stop the git process; a later read starts a new one."""
+        with self._lock:
+            self._stop()
+
+    def _process(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            try:
+                self._proc = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=self.repo_root, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError as e:
+                raise RuntimeError(f"Cannot start git: {e}")
+        return self._proc
+
+    def _stop(self) -> None:
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except (OSError, subprocess.SubprocessError):
+                self._proc.kill()
+            self._proc = None
+
+
+_readers: Dict[str, GitObjectReader] = {}
+_trees: "OrderedDict[Tuple[str, str], Dict[str, Tuple[str, int]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def object_reader(repo_root: str) -> GitObjectReader:
+    """Return the shared reader of a repository."""
+    with _lock:
+        reader = _readers.get(repo_root)
+        if reader is None:
+            reader = _readers[repo_root] = GitObjectReader(repo_root)
+        return reader
+
+
+@atexit.register
+def _close_readers() -> None:
+    for reader in list(_readers.values()):
+        reader.close()
+
+
+def resolve_tree(repo_root: str, ref: str) -> str:
+    """Return the SHA of the tree a ref (commit, tag, branch or tree) points to.
+
+    Raises:
+        InvalidInputError: If the ref is malformed or does not name a tree
+    """
+    if not ref or ref.startswith("-") or any(c.isspace() for c in ref):
+        raise InvalidInputError(f"Invalid git ref: {ref}")
+    found = object_reader(repo_root).read(f"{ref}^{{tree}}")
+    if found is None or found[1] != "tree":
+        raise InvalidInputError(f"Unknown git ref: {ref}")
+    return found[0]
+
+
+def list_tree(repo_root: str, tree: str) -> Dict[str, Tuple[str, int]]:
+    """Return {path: (blob sha, size)} for every file of a tree, recursively.
+
+    Raises:
+        ValueError: If tree is not a full object SHA
+        RuntimeError: If git ls-tree fails
+    """
+    if not _SHA_RE.match(tree):
+        raise ValueError(f"Not a tree SHA: {tree}")
+    key = (repo_root, tree)
+    with _lock:
+        entries = _trees.get(key)
+        if entries is not None:
+            _trees.move_to_end(key)
+            return entries
+
+    proc = subprocess.run(
+        ["git", "ls-tree", "-r", "-z", "-l", "--full-tree", tree],
+        cwd=repo_root, capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"git ls-tree failed: {proc.stderr.decode('utf-8', errors='replace').strip()}")
+    entries = {}
+    for record in proc.stdout.split(b"\0"):
+        if not record:
+            continue
+        info, path = record.split(b"\t", 1)
+        _mode, kind, sha, size = info.split()
+        if kind == b"blob":
+            entries[path.decode("utf-8", errors="surrogateescape")] = (sha.decode(), int(size))
+
+    with _lock:
+        _trees[key] = entries
+        while len(_trees) > TREE_CACHE_SIZE:
+            _trees.popitem(last=False)
+    return entries
+
+
+def read_blob(repo_root: str, name: str) -> Optional[bytes]:
+    """Return the content of a blob (SHA or ``<tree>:<path>``), or None if missing."""
+    found = object_reader(repo_root).read(name)
+    if found is None or found[1] != "blob":
+        return None
+    return found[2]
+
+
+def diff_tree(repo_root: str, base: str, head: str) -> List[Tuple[str, str, Optional[str], Optional[str]]]:
+    """Return the files that differ between two trees.
+
+    git compares the trees recursively and skips subtrees whose SHAs are
+    equal, so the cost follows the size of the change, not of the trees.
+
+    Returns:
+        (status, path, base blob, head blob) per file; status is A, D or M
+        and the blob is None on the side where the file does not exist
+
+    Raises:
+        ValueError: If base or head is not a full object SHA
+        RuntimeError: If git diff-tree fails
+    """
+    for tree in (base, head):
+        if not _SHA_RE.match(tree):
+            raise ValueError(f"Not a tree SHA: {tree}")
+    proc = subprocess.run(
+        ["git", "diff-tree", "-r", "-z", "--no-renames", base, head],
+        cwd=repo_root, capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"git diff-tree failed: {proc.stderr.decode('utf-8', errors='replace').strip()}")
+    changes = []
+    # Raw format: ":<mode> <mode> <sha> <sha> <status>\0<path>\0" per file
+    fields = proc.stdout.split(b"\0")
+    for info, path in zip(fields[0::2], fields[1::2]):
+        if not info.startswith(b":"):
+            continue
+        _old_mode, _new_mode, old_sha, new_sha, status = info[1:].decode().split()
+        changes.append((
+            status[0],
+            path.decode("utf-8", errors="surrogateescape"),
+            None if set(old_sha) == {"0"} else old_sha,
+            None if set(new_sha) == {"0"} else new_sha,
+        ))
+    return changes
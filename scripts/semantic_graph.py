@@ -1,66 +1,249 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import json
 import os
+import posixpath
 import re
 import sys
+import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
+from semantic_cli import InvalidInputError, cli_main
+from semantic_compact import DIRECTIONS, QUERY_KINDS, CompactGraph
+from semantic_frontmatter import FrontMatter, parse_bytes, read_front_matter
+from semantic_snapshot import open_snapshot, write_snapshot
+from semantic_git import diff_tree, list_tree, read_blob, resolve_tree
+from semantic_walk import is_excluded, walk, walk_subtree
 
-def parse_args() -> argparse.Namespace:
+TOOL_VERSION = "0.3.0"
+
+# Persistent graph cache: the last graph plus per-file stat and content hashes
+GRAPH_CACHE_FILE = os.path.join("data", "semantic-graph.json")
+
+# Graphs of git trees, one file per tree SHA; trees never change, so entries
+# are valid for as long as the tool version matches
+TREE_CACHE_DIR = os.path.join("data", "semantic-graph-trees")
+TREE_MEMORY_CACHE_SIZE = 8
+
+# Binary snapshot of the working-tree graph; tree graphs are snapshotted to
+# TREE_CACHE_DIR/<tree>.snap
+SNAPSHOT_FILE = os.path.join("data", "semantic-graph.snap")
+
+GOVERNANCE_FILE = ".github/copilot-instructions.md"
+INSTRUCTIONS_FILE = "semantic-instructions.md"
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Emit semantic graph from repository")
     p.add_argument("--scope", choices=["project", "cluster", "module"], default="project")
     p.add_argument("--ids", nargs="*", default=None)
     p.add_argument("--include", nargs="*", default=None)
     p.add_argument("--edgeTypes", nargs="*", default=None)
-    p.add_argument("--outputFormat", choices=["json", "dot"], default="json")
+    p.add_argument("--outputFormat", choices=["json", "dot", "ndjson"], default="json")
     p.add_argument("--filters", default=None, help="JSON object with filters")
     p.add_argument("--version", default="0.1")
-    return p.parse_args()
+    p.add_argument("--noCache", action="store_true", help="Ignore and do not update the graph cache")
+    p.add_argument("--query", choices=list(QUERY_KINDS), default=None, help="Answer a graph query instead of returning the graph")
+    p.add_argument("--start", nargs="*", default=[], help="Ids or paths of the query start nodes")
+    p.add_argument("--target", default=None, help="Destination id or path for --query path")
+    p.add_argument("--depth", type=int, default=None, help="Maximum number of hops")
+    p.add_argument("--direction", choices=list(DIRECTIONS), default=None)
+    p.add_argument("--limit", type=int, default=None, help="Page size in nodes plus edges")
+    p.add_argument("--cursor", default=None, help="meta.nextCursor of the previous page")
+    p.add_argument("--ref", default=None, help="Build the graph of a git ref instead of the working tree")
+    p.add_argument("--focus", default=None, help="Id or path of a module or cluster; build only its subtree and direct neighbours")
+    return p.parse_args(argv)
+
+
+def project_owners(txt: str) -> List[str]:
+    # Read YAML front matter owners: ["@handle"]
+    fm = None
+    if txt.startswith("---"):
+        parts = txt.split("---", 2)
+        if len(parts) >= 3:
+            fm = parts[1]
+    if fm:
+        m = re.search(r"owners:\s*\[(.*?)\]", fm)
+        if m:
+            raw = m.group(1)
+            return [s.strip().strip('"\'') for s in raw.split(";") for s in s.split(",") if s.strip()]
+    return []
 
 
 def read_project_owners(repo_root: str) -> List[str]:
-    owners: List[str] = []
-    governance = os.path.join(repo_root, ".github", "copilot-instructions.md")
+    governance = os.path.join(repo_root, GOVERNANCE_FILE)
     if os.path.isfile(governance):
         try:
             with open(governance, "r", encoding="utf-8") as f:
-                txt = f.read()
-            # Read YAML front matter owners: ["@handle"]
-            fm = None
-            if txt.startswith("---"):
-                parts = txt.split("---", 2)
-                if len(parts) >= 3:
-                    fm = parts[1]
-            if fm:
-                m = re.search(r"owners:\s*\[(.*?)\]", fm)
-                if m:
-                    raw = m.group(1)
-                    owners = [s.strip().strip('"\'') for s in raw.split(";") for s in s.split(",") if s.strip()]
+                return project_owners(f.read())
         except Exception:
             pass
-    return owners
+    return []
 
 
 def find_semantic_instruction_files(repo_root: str) -> List[str]:
-    matches: List[str] = []
-    for root, _dirs, files in os.walk(repo_root):
-        for fn in files:
-            if fn.lower() == "semantic-instructions.md":
-                matches.append(os.path.join(root, fn))
-    return matches
+    pattern = "**/semantic-instructions.md"
+    found = walk(repo_root, [pattern], ignore_case=True)[pattern]
+    return [os.path.join(repo_root, rel) for rel in found]
 
 
-def build_graph(repo_root: str, scope: str, ids: List[str] | None) -> Dict[str, Any]:
-    nodes: List[Dict[str, Any]] = []
-    edges: List[Dict[str, Any]] = []
+def load_graph_cache(repo_root: str) -> Tuple[Dict[str, Any] | None, Dict[str, Dict[str, Any]]]:
+    """Return the cached project node and per-file entries keyed by relative path.
 
-    owners = read_project_owners(repo_root)
-    project_id = os.path.basename(repo_root.rstrip(os.sep)) or "project"
+    Returns (None, {}) when the cache is missing, unreadable or was written
+    by a different tool version.
+    """
+    try:
+        with open(os.path.join(repo_root, GRAPH_CACHE_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    if not isinstance(data, dict) or data.get("meta", {}).get("toolVersion") != TOOL_VERSION:
+        return None, {}
+    nodes = {n.get("id"): n for n in data.get("nodes", [])}
+    project = next((n for n in data.get("nodes", []) if n.get("scope") == "project"), None)
+    files: Dict[str, Dict[str, Any]] = {}
+    for rel, entry in data.get("files", {}).items():
+        node = nodes.get(entry.get("nodeId"))
+        if node is not None:
+            files[rel] = {**entry, "node": node}
+    return project, files
 
-    # Always include a project node as root
-    nodes.append({
+
+def save_graph_cache(repo_root: str, graph: Dict[str, Any], files: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically write the graph and file table to the cache file.
+
+    Nothing is written when the data directory does not exist or is not writable.
+    """
+    path = os.path.join(repo_root, GRAPH_CACHE_FILE)
+    cache_dir = os.path.dirname(path)
+    if not os.path.isdir(cache_dir):
+        return
+    out = {
+        "nodes": graph["nodes"],
+        "edges": graph["edges"],
+        "meta": {**graph["meta"], "note": "Generated by scripts/semantic_graph.py; safe to delete"},
+        "files": {
+            rel: {"mtimeNs": e["mtimeNs"], "size": e["size"], "sha256": e["sha256"], "nodeId": e["node"]["id"]}
+            for rel, e in files.items()
+        },
+    }
+    try:
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".semantic-graph.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(out, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def module_node(rel: str, record: FrontMatter) -> Dict[str, Any]:
+    module_id = rel.rsplit("/", 1)[0]
+    scope = record.scope or "module"
+    node: Dict[str, Any] = {
+        "id": f"{scope}:{module_id}",
+        "scope": scope,
+        "name": record.name or os.path.basename(module_id),
+        "path": module_id,
+        "owners": record.owners,
+        "contract": record.contract,
+    }
+    meta = {
+        k: v for k, v in (
+            ("semanticId", record.id),
+            ("reviewers", record.reviewers),
+            ("dependencies", record.dependencies),
+            ("changePolicy", record.change_policy),
+        ) if v
+    }
+    if meta:
+        node["meta"] = meta
+    return node
+
+
+def module_entry(path: str, rel: str, cached: Dict[str, Any] | None) -> Tuple[Dict[str, Any], bool]:
+    """Return the file entry for a semantic-instructions.md and whether it changed.
+
+    Files whose size and mtime match the cache are not opened; otherwise
+    only the front matter is read, and it is not re-parsed if its hash
+    matches the cache.
+    """
+    st = os.stat(path)
+    if cached and cached.get("mtimeNs") == st.st_mtime_ns and cached.get("size") == st.st_size:
+        return cached, False
+    content = read_front_matter(path)
+    digest = hashlib.sha256(content).hexdigest()
+    if cached and cached.get("sha256") == digest:
+        return {**cached, "mtimeNs": st.st_mtime_ns, "size": st.st_size}, True
+    node = module_node(rel, parse_bytes(content))
+    return {"mtimeNs": st.st_mtime_ns, "size": st.st_size, "sha256": digest, "node": node}, True
+
+
+def node_refs(node: Dict[str, Any]) -> List[str]:
+    """Return the names a dependency entry may use for a node, by priority."""
+    semantic_id = (node.get("meta") or {}).get("semanticId")
+    return [key for key in (semantic_id, node["path"], node["id"]) if key]
+
+
+def edge_index(nodes: List[Dict[str, Any]]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return the node ids by path and by dependency name.
+
+    A name used by several nodes refers to the first of them.
+    """
+    by_path = {n["path"]: n["id"] for n in nodes[1:]}
+    refs: Dict[str, str] = {}
+    for n in nodes[1:]:
+        for key in node_refs(n):
+            refs.setdefault(key, n["id"])
+    return by_path, refs
+
+
+def parent_edge(node: Dict[str, Any], project: str, by_path: Dict[str, str]) -> Dict[str, Any]:
+    """Return the contains edge from the node at the nearest ancestor directory."""
+    parent = project
+    path = posixpath.dirname(node["path"])
+    while path:
+        if path in by_path:
+            parent = by_path[path]
+            break
+        path = posixpath.dirname(path)
+    return {"from": parent, "to": node["id"], "type": "contains"}
+
+
+def dependency_edges(node: Dict[str, Any], refs: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Return the depends-on edges of the node's resolved dependencies."""
+    edges = []
+    for dep in (node.get("meta") or {}).get("dependencies", []):
+        target = refs.get(dep)
+        if target and target != node["id"]:
+            edges.append({"from": node["id"], "to": target, "type": "depends-on"})
+    return edges
+
+
+def graph_edges(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Derive containment and dependency edges from the node list.
+
+    Each node is contained by the node at its nearest ancestor directory, or
+    by the project node (nodes[0]). Entries of a node's ``dependencies``
+    front matter may name another node by graph id, path or front-matter id;
+    unresolved entries are skipped.
+    """
+    project = nodes[0]["id"]
+    by_path, refs = edge_index(nodes)
+    edges = [parent_edge(n, project, by_path) for n in nodes[1:]]
+    for n in nodes[1:]:
+        edges.extend(dependency_edges(n, refs))
+    return edges
+
+
+def project_node(repo_root: str, owners: List[str]) -> Dict[str, Any]:
+    project_id = os.path.basename(repo_root.rstrip(os.sep)) or "project"
+    return {
         "id": f"project:{project_id}",
         "scope": "project",
         "name": project_id,
@@ -68,39 +251,590 @@ def build_graph(repo_root: str, scope: str, ids: List[str] | None) -> Dict[str,
         "owners": owners,
         "contract": {"invariants": [], "validation": {"tests": []}},
         "meta": {"detected": True}
-    })
+    }
 
-    # Discover modules by presence of semantic-instructions.md
+
+def scan_graph(
+    repo_root: str, use_cache: bool = True, ref: str | None = None
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Discover the full graph and its per-file entries keyed by relative path.
+
+    Modules are discovered by the presence of semantic-instructions.md;
+    only files that changed since the cached run are read again. Each file
+    entry carries the file's size and content hash and its node. With a
+    ref, the graph of that git tree is returned instead (see scan_tree).
+    """
+    if ref is not None:
+        return scan_tree(repo_root, ref, use_cache)
+
+    nodes: List[Dict[str, Any]] = []
+    edges: List[Dict[str, Any]] = []
+
+    # Always include a project node as root
+    nodes.append(project_node(repo_root, read_project_owners(repo_root)))
+
+    cached_project, cached = load_graph_cache(repo_root) if use_cache else (None, {})
+    files: Dict[str, Dict[str, Any]] = {}
+    dirty = cached_project != nodes[0]
     for path in find_semantic_instruction_files(repo_root):
-        rel = os.path.relpath(path, repo_root)
-        module_id = rel.replace(os.sep, "/").rsplit("/", 1)[0]
-        node = {
-            "id": f"module:{module_id}",
-            "scope": "module",
-            "name": os.path.basename(module_id),
-            "path": module_id,
-            "owners": [],
-            "contract": {"invariants": [], "validation": {"tests": []}},
-        }
+        rel = os.path.relpath(path, repo_root).replace(os.sep, "/")
+        entry, changed = module_entry(path, rel, cached.get(rel))
+        files[rel] = entry
+        dirty = dirty or changed
+        node = entry["node"]
         nodes.append(node)
-        edges.append({"from": f"project:{project_id}", "to": node["id"], "type": "contains"})
-
-    # Scope filtering
-    if ids:
-        idset = set(ids)
-        nodes = [n for n in nodes if n.get("id") in idset or n.get("path") in idset]
-        # Keep edges only if both ends remain
-        keep = {n["id"] for n in nodes}
-        edges = [e for e in edges if e.get("from") in keep and e.get("to") in keep]
+    dirty = dirty or files.keys() != cached.keys()
+    edges.extend(graph_edges(nodes))
 
-    return {
+    graph = {
         "nodes": nodes,
         "edges": edges,
         "meta": {
             "generatedAt": datetime.utcnow().isoformat() + "Z",
-            "toolVersion": "0.1.0",
+            "toolVersion": TOOL_VERSION,
+        }
+    }
+    if use_cache and dirty:
+        save_graph_cache(repo_root, graph, files)
+    return graph, files
+
+
+_tree_graphs: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]]" = OrderedDict()
+_tree_graphs_lock = threading.Lock()
+
+
+def is_instructions_file(rel: str) -> bool:
+    """True for a semantic-instructions.md path that is not excluded from scans."""
+    return posixpath.basename(rel).lower() == INSTRUCTIONS_FILE and not is_excluded(rel)
+
+
+def cached_tree(repo_root: str, tree: str) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]] | None:
+    """Return the graph and file table of a tree from memory or disk, or None."""
+    key = (repo_root, tree)
+    with _tree_graphs_lock:
+        hit = _tree_graphs.get(key)
+        if hit is not None:
+            _tree_graphs.move_to_end(key)
+            return hit
+    hit = load_tree_cache(repo_root, tree)
+    return remember_tree(key, hit) if hit is not None else None
+
+
+def scan_tree(
+    repo_root: str, ref: str, use_cache: bool = True, base: str | None = None
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Discover the graph of the git tree a ref points to, without a checkout.
+
+    semantic-instructions.md blobs are read from the object store. The
+    result depends only on the tree, so it is kept in memory and in
+    TREE_CACHE_DIR under the tree SHA and computed once per tree.
+
+    When the graph of a base tree is cached, only the files that differ
+    between the trees are read (see tree_files).
+
+    Raises:
+        InvalidInputError: If the ref or base does not name a tree
+    """
+    tree = resolve_tree(repo_root, ref)
+    if use_cache:
+        hit = cached_tree(repo_root, tree)
+        if hit is not None:
+            return hit
+
+    files = tree_files(repo_root, tree, base if use_cache else None)
+    governance = read_blob(repo_root, f"{tree}:{GOVERNANCE_FILE}")
+    nodes = [project_node(repo_root, project_owners(governance.decode("utf-8", errors="replace")) if governance else [])]
+    nodes.extend(files[rel]["node"] for rel in sorted(files))
+    graph = {
+        "nodes": nodes,
+        "edges": graph_edges(nodes),
+        "meta": {
+            "generatedAt": datetime.utcnow().isoformat() + "Z",
+            "toolVersion": TOOL_VERSION,
+            "tree": tree,
         }
     }
+    if use_cache:
+        save_tree_cache(repo_root, tree, graph, files)
+        remember_tree((repo_root, tree), (graph, files))
+    return graph, files
+
+
+def tree_files(repo_root: str, tree: str, base: str | None = None) -> Dict[str, Dict[str, Any]]:
+    """Return the file table of a tree: {path: {blob, size, node}}.
+
+    With a base ref whose graph is cached, the base file table is patched
+    with the semantic files ``git diff-tree`` reports as changed; otherwise
+    every semantic-instructions.md blob of the tree is parsed.
+    """
+    cached = None
+    if base is not None:
+        base_tree = resolve_tree(repo_root, base)
+        cached = cached_tree(repo_root, base_tree)
+    if cached is None:
+        files: Dict[str, Dict[str, Any]] = {}
+        for rel, (blob, size) in list_tree(repo_root, tree).items():
+            if is_instructions_file(rel):
+                node = module_node(rel, parse_bytes(read_blob(repo_root, blob) or b""))
+                files[rel] = {"blob": blob, "size": size, "node": node}
+        return files
+
+    files = dict(cached[1])
+    for _status, rel, _old, blob in diff_tree(repo_root, base_tree, tree):
+        if not is_instructions_file(rel):
+            continue
+        if blob is None:
+            files.pop(rel, None)
+            continue
+        content = read_blob(repo_root, blob) or b""
+        files[rel] = {"blob": blob, "size": len(content), "node": module_node(rel, parse_bytes(content))}
+    return files
+
+
+def remember_tree(key: Tuple[str, str], value: Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]):
+    with _tree_graphs_lock:
+        _tree_graphs[key] = value
+        while len(_tree_graphs) > TREE_MEMORY_CACHE_SIZE:
+            _tree_graphs.popitem(last=False)
+    return value
+
+
+def load_tree_cache(repo_root: str, tree: str) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]] | None:
+    """Return the cached graph and file table of a tree, or None."""
+    try:
+        with open(os.path.join(repo_root, TREE_CACHE_DIR, f"{tree}.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("meta", {}).get("toolVersion") != TOOL_VERSION:
+        return None
+    nodes = {n.get("id"): n for n in data.get("nodes", [])}
+    files = {
+        rel: {"blob": entry.get("blob"), "size": entry.get("size"), "node": nodes.get(entry.get("nodeId"))}
+        for rel, entry in data.get("files", {}).items()
+    }
+    graph = {"nodes": data.get("nodes", []), "edges": data.get("edges", []), "meta": data["meta"]}
+    return graph, files
+
+
+def save_tree_cache(repo_root: str, tree: str, graph: Dict[str, Any], files: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically write the graph of a tree to TREE_CACHE_DIR.
+
+    Nothing is written when the data directory does not exist or is not writable.
+    """
+    if not os.path.isdir(os.path.join(repo_root, "data")):
+        return
+    cache_dir = os.path.join(repo_root, TREE_CACHE_DIR)
+    out = {
+        **graph,
+        "files": {rel: {"blob": e["blob"], "size": e["size"], "nodeId": e["node"]["id"]} for rel, e in files.items()},
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".tree.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(out, f, separators=(",", ":"))
+        os.replace(tmp, os.path.join(cache_dir, f"{tree}.json"))
+    except OSError:
+        pass
+
+
+def worktree_stamp(repo_root: str) -> str:
+    """Return a digest of the path, size and mtime of every file the worktree graph is read from."""
+    project = os.path.basename(repo_root.rstrip(os.sep))
+    digest = hashlib.sha1(f"{TOOL_VERSION}\0{project}".encode("utf-8"))
+    paths = [os.path.join(repo_root, GOVERNANCE_FILE), *sorted(find_semantic_instruction_files(repo_root))]
+    for path in paths:
+        digest.update(b"\0" + os.path.relpath(path, repo_root).encode("utf-8", errors="surrogateescape"))
+        try:
+            st = os.stat(path)
+            digest.update(f"\0{st.st_mtime_ns}:{st.st_size}".encode())
+        except OSError:
+            digest.update(b"\0-")
+    return digest.hexdigest()
+
+
+class WorktreeGraph:
+    """Working-tree graph kept in memory and updated file by file."""
+
+    def __init__(self, repo_root: str):
+        self.repo_root = repo_root
+        self.rescan()
+
+    def rescan(self) -> None:
+        self.graph, self.files = scan_graph(self.repo_root)
+        self.compact = CompactGraph.from_dict(self.graph)
+
+    def apply(self, paths: Iterable[str]) -> None:
+        """Re-read the semantic files among the changed paths.
+
+        Modified and deleted files are applied directly. A new semantic
+        file or a changed .gitignore may be subject to ignore rules, so it
+        triggers a rescan, which still only parses files that changed.
+        """
+        files = dict(self.files)
+        project = self.graph["nodes"][0]
+        changed = False
+        for rel in paths:
+            path = os.path.join(self.repo_root, rel)
+            if rel == GOVERNANCE_FILE:
+                project = project_node(self.repo_root, read_project_owners(self.repo_root))
+                changed = True
+            elif rel in files:
+                if os.path.isfile(path):
+                    files[rel] = module_entry(path, rel, files[rel])[0]
+                else:
+                    del files[rel]
+                changed = True
+            elif posixpath.basename(rel) == ".gitignore" or (is_instructions_file(rel) and os.path.isfile(path)):
+                self.rescan()
+                return
+        if not changed:
+            return
+        nodes = [project, *(files[rel]["node"] for rel in sorted(files))]
+        graph = {
+            "nodes": nodes,
+            "edges": graph_edges(nodes),
+            "meta": {"generatedAt": datetime.utcnow().isoformat() + "Z", "toolVersion": TOOL_VERSION},
+        }
+        self.compact = CompactGraph.from_dict(graph)
+        self.graph, self.files = graph, files
+
+
+# Working trees whose graph is kept in memory by watch_worktree(); the value
+# is None until the graph is first loaded
+_live_worktrees: Dict[str, WorktreeGraph | None] = {}
+_live_lock = threading.Lock()
+
+
+def watch_worktree(repo_root: str, enabled: bool = True) -> None:
+    """Start or stop serving the working-tree graph of repo_root from memory.
+
+    While enabled, load_graph() returns the in-memory graph without looking
+    at the filesystem, so the caller must report every change under
+    repo_root through apply_changes().
+    """
+    key = os.path.abspath(repo_root)
+    with _live_lock:
+        if enabled:
+            _live_worktrees.setdefault(key, None)
+        else:
+            _live_worktrees.pop(key, None)
+
+
+def apply_changes(repo_root: str, paths: Iterable[str] | None) -> None:
+    """Update the in-memory graph of a watched working tree.
+
+    Args:
+        repo_root: Repository root passed to watch_worktree()
+        paths: '/'-separated paths relative to repo_root that changed, or
+            None if the changes are unknown; the graph is then rebuilt on
+            the next load
+    """
+    key = os.path.abspath(repo_root)
+    with _live_lock:
+        if key not in _live_worktrees:
+            return
+        live = _live_worktrees[key]
+        if live is None:
+            return
+        if paths is None:
+            _live_worktrees[key] = None
+            return
+        try:
+            live.apply(paths)
+        except Exception:
+            _live_worktrees[key] = None
+
+
+def live_graph(repo_root: str) -> CompactGraph | None:
+    """Return the in-memory graph of a watched working tree, or None if not watched."""
+    key = os.path.abspath(repo_root)
+    with _live_lock:
+        if key not in _live_worktrees:
+            return None
+        live = _live_worktrees[key]
+        if live is None:
+            live = _live_worktrees[key] = WorktreeGraph(key)
+        return live.compact
+
+
+def load_graph(repo_root: str, use_cache: bool = True, ref: str | None = None) -> CompactGraph:
+    """Return the full compact graph of the working tree or of a git ref.
+
+    With the cache enabled, the graph is mapped from a binary snapshot when
+    one was written for the same state: the tree SHA for a ref, or
+    worktree_stamp() for the working tree. Otherwise it is built and the
+    snapshot is written, so every process serving the repository maps one
+    shared copy instead of building its own. A working tree watched through
+    watch_worktree() is served from memory.
+    """
+    if use_cache and ref is None:
+        live = live_graph(repo_root)
+        if live is not None:
+            return live
+    if not use_cache:
+        return CompactGraph.from_dict(scan_graph(repo_root, False, ref)[0])
+    if ref is not None:
+        tree = resolve_tree(repo_root, ref)
+        path = os.path.join(repo_root, TREE_CACHE_DIR, f"{tree}.snap")
+        stamp = f"{TOOL_VERSION}:{os.path.basename(repo_root.rstrip(os.sep))}:{tree}"
+    else:
+        tree = None
+        path = os.path.join(repo_root, SNAPSHOT_FILE)
+        stamp = worktree_stamp(repo_root)
+
+    graph = open_snapshot(path, stamp)
+    if graph is not None:
+        return graph
+    data, _files = scan_graph(repo_root, True, tree)
+    graph = CompactGraph.from_dict(data)
+    if os.path.isdir(os.path.join(repo_root, "data")):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_snapshot(graph, path, stamp)
+        except OSError:
+            pass
+    return graph
+
+
+def focus_index(
+    repo_root: str, use_cache: bool = True, ref: str | None = None
+) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+    """Return the file table used to locate a focus, and whether it is current.
+
+    A git tree's table and the in-memory table of a watched working tree
+    are current. Otherwise the table of the graph cache is used as an index
+    of the last scan; only without a cache is the working tree scanned.
+    """
+    if ref is not None:
+        return scan_tree(repo_root, ref, use_cache)[1], True
+    if use_cache:
+        key = os.path.abspath(repo_root)
+        with _live_lock:
+            live = _live_worktrees.get(key)
+        if live is not None:
+            return live.files, True
+        _project, cached = load_graph_cache(repo_root)
+        if cached:
+            return cached, False
+    return scan_graph(repo_root, use_cache)[1], True
+
+
+def resolve_focus(repo_root: str, index: Dict[str, Dict[str, Any]], focus: str) -> Dict[str, Any] | None:
+    """Return the indexed node a focus names by front-matter id, path or graph id.
+
+    A path to a module missing from the index (a new module) yields a bare
+    node with only its path. None is returned for the project.
+    """
+    path = posixpath.normpath(focus.replace("\\", "/")).strip("/")
+    if posixpath.basename(path).lower() == INSTRUCTIONS_FILE:
+        path = posixpath.dirname(path) or "."
+    if path == "." or focus.startswith("project:"):
+        return None
+    nodes = [index[rel]["node"] for rel in sorted(index)]
+    for n in nodes:
+        if focus in node_refs(n) or n["path"] == path:
+            return n
+    if os.path.isfile(os.path.join(repo_root, path, INSTRUCTIONS_FILE)):
+        return {"path": path}
+    raise InvalidInputError(f"Unknown focus: {focus}")
+
+
+def focus_files(
+    repo_root: str, focus: str, use_cache: bool = True, ref: str | None = None
+) -> Tuple[str, List[str], List[str], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]] | None:
+    """Locate the subtree of a module or cluster and its direct neighbours.
+
+    The focus is looked up in focus_index(). Only the focus directory is
+    walked, and only the files found there and the neighbours' files are
+    read, so a module costs a few files instead of a repository scan.
+    Neighbours are the nearest containing module, the dependencies of the
+    subtree's nodes and, per the index, the nodes depending on them. When
+    a stale index does not know the focus, the working tree is scanned
+    once to refresh it.
+
+    Args:
+        repo_root: Repository root
+        focus: Front-matter id, path or graph id of a module or cluster
+        use_cache: Use the graph cache as the index
+        ref: Git ref whose tree is searched instead of the working tree
+
+    Returns:
+        (focus directory, subtree files, neighbour files, file entries by
+        path, entries of all units by path), or None when the focus is the
+        project. The last table is the index with the subtree and
+        neighbour entries read again; it names every unit a dependency may
+        refer to.
+
+    Raises:
+        InvalidInputError: If no module or cluster matches the focus
+    """
+    index, current = focus_index(repo_root, use_cache, ref)
+    if not current:
+        try:
+            located = locate_focus(repo_root, index, False, focus)
+        except InvalidInputError:
+            located = None
+        else:
+            if located is None or located[1]:
+                return located
+        index, current = scan_graph(repo_root, use_cache)[1], True
+    return locate_focus(repo_root, index, current, focus)
+
+
+def locate_focus(
+    repo_root: str, index: Dict[str, Dict[str, Any]], current: bool, focus: str
+) -> Tuple[str, List[str], List[str], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]] | None:
+    """Return what focus_files() returns, using one index.
+
+    Entries of a current index are used as they are; otherwise the focus
+    directory is walked and files are read again where they changed.
+    """
+    node = resolve_focus(repo_root, index, focus)
+    if node is None:
+        return None
+    module_dir = node["path"]
+
+    def entry(rel: str) -> Dict[str, Any] | None:
+        if current:
+            return index.get(rel)
+        path = os.path.join(repo_root, rel)
+        return module_entry(path, rel, index.get(rel))[0] if os.path.isfile(path) else None
+
+    if current:
+        subtree = sorted(rel for rel in index if rel.startswith(f"{module_dir}/"))
+    else:
+        pattern = "**/semantic-instructions.md"
+        subtree = walk_subtree(repo_root, module_dir, [pattern], ignore_case=True)[pattern]
+    entries = {rel: e for rel, e in ((rel, entry(rel)) for rel in subtree) if e is not None}
+    subtree = [rel for rel in subtree if rel in entries]
+
+    neighbours = set()
+    parent = posixpath.dirname(module_dir)
+    while parent:
+        rel = f"{parent}/{INSTRUCTIONS_FILE}"
+        if rel in index or (not current and os.path.isfile(os.path.join(repo_root, rel)) and not is_excluded(rel)):
+            neighbours.add(rel)
+            break
+        parent = posixpath.dirname(parent)
+    # Dependency names resolve as in graph_edges: the first node by path wins
+    refs: Dict[str, str] = {}
+    for rel in sorted({*index, *entries}):
+        for key in node_refs((entries.get(rel) or index[rel])["node"]):
+            refs.setdefault(key, rel)
+    for rel in subtree:
+        for dep in (entries[rel]["node"].get("meta") or {}).get("dependencies", []):
+            if dep in refs:
+                neighbours.add(refs[dep])
+    inside = set(subtree)
+    for rel, e in index.items():
+        if any(refs.get(dep) in inside for dep in (e["node"].get("meta") or {}).get("dependencies", [])):
+            neighbours.add(rel)
+    gone = set()
+    for rel in sorted(neighbours - inside):
+        e = entry(rel)
+        if e is not None:
+            entries[rel] = e
+        else:
+            gone.add(rel)
+    # Indexed units below the focus directory that were not found again, or
+    # neighbours that no longer exist, are gone
+    units = {rel: e for rel, e in index.items() if rel not in gone and not rel.startswith(f"{module_dir}/")}
+    units.update(entries)
+    return module_dir, subtree, sorted(set(entries) - inside), entries, {rel: units[rel] for rel in sorted(units)}
+
+
+def check_focus_scope(
+    focus: str, scope: str | None, module_dir: str, entries: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any] | None:
+    """Return the node of the focus directory, checking it against a cluster or module scope.
+
+    Raises:
+        InvalidInputError: If scope is cluster or module and the focus is of another scope
+    """
+    entry = entries.get(f"{module_dir}/{INSTRUCTIONS_FILE}")
+    node = entry["node"] if entry else None
+    if scope in ("cluster", "module") and (node is None or node["scope"] != scope):
+        raise InvalidInputError(f"Focus {focus} is not a {scope}")
+    return node
+
+
+def focus_graph(
+    repo_root: str, focus: str, scope: str = "project", use_cache: bool = True, ref: str | None = None
+) -> CompactGraph:
+    """Build the graph of a module or cluster subtree and its direct neighbours.
+
+    Edges are kept when one end lies in the subtree; neighbours' other
+    edges are not evaluated. The project node is always included. meta.focus
+    describes the selection.
+
+    Raises:
+        InvalidInputError: If no module or cluster matches the focus, or a cluster
+            or module scope is given and the focus is of another scope
+    """
+    located = focus_files(repo_root, focus, use_cache, ref)
+    if located is None:
+        return load_graph(repo_root, use_cache, ref)
+    module_dir, subtree, neighbours, entries, _units = located
+    focus_node = check_focus_scope(focus, scope, module_dir, entries)
+
+    if ref is not None:
+        project = scan_tree(repo_root, ref, use_cache)[0]["nodes"][0]
+    else:
+        project = project_node(repo_root, read_project_owners(repo_root))
+    nodes = [project, *(entries[rel]["node"] for rel in sorted(entries))]
+    inside = {entries[rel]["node"]["id"] for rel in subtree}
+    edges = [e for e in graph_edges(nodes) if e["from"] in inside or e["to"] in inside]
+    meta: Dict[str, Any] = {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "toolVersion": TOOL_VERSION,
+        "focus": {
+            "id": focus_node["id"] if focus_node else None,
+            "path": module_dir,
+            "nodes": len(subtree),
+            "neighbors": len(neighbours),
+        },
+    }
+    if ref is not None:
+        meta["tree"] = resolve_tree(repo_root, ref)
+    return CompactGraph.from_dict({"nodes": nodes, "edges": edges, "meta": meta})
+
+
+def build_graph(
+    repo_root: str,
+    scope: str,
+    ids: List[str] | None,
+    use_cache: bool = True,
+    filters: Dict[str, Any] | None = None,
+    edge_types: List[str] | None = None,
+    include: List[str] | None = None,
+    ref: str | None = None,
+    focus: str | None = None,
+) -> CompactGraph:
+    if focus:
+        compact = focus_graph(repo_root, focus, scope, use_cache, ref)
+    else:
+        compact = load_graph(repo_root, use_cache, ref)
+    # Node selection and edge-type filtering; edges are kept only if both
+    # ends remain
+    keep = None
+    if ids:
+        keep = {i for i in (compact.node_index(k) for k in ids) if i is not None}
+    if filters:
+        matched = set(compact.match(filters))
+        keep = matched if keep is None else keep & matched
+    if keep is not None or edge_types:
+        compact = compact.subgraph(range(compact.num_nodes) if keep is None else keep, edge_types)
+    if include:
+        compact = compact.project(include)
+
+    applied = {
+        k: v for k, v in (("filters", filters), ("edgeTypes", edge_types), ("include", include)) if v
+    }
+    if applied:
+        compact.graph_meta["filtersApplied"] = applied
+    return compact
 
 
 def to_dot(graph: Dict[str, Any]) -> str:
@@ -118,18 +852,59 @@ def to_dot(graph: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def main() -> int:
-    args = parse_args()
-    repo_root = os.getcwd()
+def to_ndjson(graph: CompactGraph | Dict[str, Any]) -> Iterator[str]:
+    """Yield one JSON line per node and edge, then a line with the graph meta.
+
+    Accepts a compact graph, whose records are materialized one at a time,
+    or the JSON shape of a page.
+    """
+    if isinstance(graph, CompactGraph):
+        records: Iterable[Tuple[str, Dict[str, Any]]] = graph.records()
+        meta = graph.graph_meta
+    else:
+        records = chain((("node", n) for n in graph["nodes"]), (("edge", e) for e in graph["edges"]))
+        meta = graph["meta"]
+    for kind, record in records:
+        yield json.dumps({kind: record}, separators=(",", ":"))
+    yield json.dumps({"meta": meta}, separators=(",", ":"))
+
+
+def run(argv: List[str], repo_root: str) -> CompactGraph | Dict[str, Any]:
+    args = parse_args(argv)
+    if args.limit is None and args.cursor:
+        raise InvalidInputError("--cursor requires --limit")
 
-    # Parse filters if provided (but not applied in stub)
     try:
-        _filters = json.loads(args.filters) if args.filters else None
-    except json.JSONDecodeError:
-        _filters = None
+        filters = json.loads(args.filters) if args.filters else None
+    except json.JSONDecodeError as e:
+        raise InvalidInputError(f"Invalid --filters JSON: {e}")
 
-    graph = build_graph(repo_root, args.scope, args.ids)
+    if args.query:
+        # --edgeTypes selects the edges a query follows
+        graph = build_graph(repo_root, args.scope, None, use_cache=not args.noCache, ref=args.ref, focus=args.focus)
+        graph = graph.query(
+            args.query, args.start, depth=args.depth, edge_types=args.edgeTypes,
+            direction=args.direction, target=args.target,
+        )
+        return graph.project(args.include) if args.include else graph
+
+    graph = build_graph(
+        repo_root, args.scope, args.ids, use_cache=not args.noCache,
+        filters=filters, edge_types=args.edgeTypes, include=args.include, ref=args.ref, focus=args.focus,
+    )
+    # A page is a bounded slice of the graph, so it is materialized here
+    return graph.page(args.cursor, args.limit) if args.limit is not None else graph
+
+
+def main() -> int:
+    args = parse_args()
+    result = run(sys.argv[1:], os.getcwd())
 
+    if args.outputFormat == "ndjson":
+        for line in to_ndjson(result):
+            print(line)
+        return 0
+    graph = result.to_dict() if isinstance(result, CompactGraph) else result
     if args.outputFormat == "dot":
         print(to_dot(graph))
     else:
@@ -138,4 +913,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(cli_main(main))
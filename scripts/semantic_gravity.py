@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Semantic Gravity scores for modules and clusters.
+
+Gravity combines, per node, its fan-in and fan-out over ``depends-on``
+edges, the length of its semantic-instructions.md in bytes and the breadth
+of its dependencies (the number of distinct containers its direct
+dependencies live in). Each metric is normalized by its maximum over the
+scored nodes and the weighted sum is scaled to 0..100.
+
+Clusters are scored the same way from aggregates over their members (the
+nodes whose nearest cluster ancestor is the cluster): only dependencies
+that cross the cluster boundary count towards fan-in, fan-out and breadth,
+and instruction bytes are summed.
+
+All metrics are computed in one pass over the CSR edge arrays of the
+compact graph. NumPy is used when it is installed; the pure-Python engine
+gives identical results.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+from semantic_cli import InvalidInputError, cli_main
+from semantic_compact import NONE, CompactGraph
+from semantic_graph import scan_graph
+
+try:
+    import numpy as np
+except ImportError:  # optional accelerator
+    np = None
+
+TOOL_VERSION = "0.1.0"
+SCHEMA_VERSION = "1.0"
+
+# Metric weights; they sum to 1 so scores range from 0 to 100
+WEIGHTS = {"fanIn": 0.3, "fanOut": 0.2, "breadth": 0.3, "instructionBytes": 0.2}
+
+# Scores at or above the threshold are reported as hotspots
+HOTSPOT_THRESHOLD = 60.0
+
+AUDIT_DIR = os.path.join("data", "semantic-audits")
+REPORT_FILE = "graph_health.json"
+
+ENGINES = ("auto", "numpy", "python")
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Compute Semantic Gravity for modules and clusters")
+    p.add_argument("--scope", choices=["module", "cluster", "all"], default="all")
+    p.add_argument("--top", type=int, default=None, help="Only return the N highest scores per scope")
+    p.add_argument("--threshold", type=float, default=HOTSPOT_THRESHOLD, help="Hotspot score threshold")
+    p.add_argument("--quarter", default=None, help="Audit quarter (YYYY-QN); the current quarter by default")
+    p.add_argument("--write", action="store_true", help=f"Write {AUDIT_DIR}/<quarter>/{REPORT_FILE}")
+    p.add_argument("--engine", choices=list(ENGINES), default="auto")
+    p.add_argument("--noCache", action="store_true", help="Ignore and do not update the graph cache")
+    return p.parse_args(argv)
+
+
+def current_quarter(now: datetime) -> str:
+    return f"{now.year}-Q{(now.month - 1) // 3 + 1}"
+
+
+def graph_inputs(graph: CompactGraph) -> Tuple[array, array, array, array, int, int]:
+    """Return the arrays the engines work on.
+
+    Returns:
+        depends-on offsets and targets, contains offsets and targets, and
+        the string indexes of the cluster and module scopes
+    """
+    n = graph.num_nodes
+    empty = (array("I", [0] * (n + 1)), array("I"))
+    dep_offsets, dep_targets = graph.adjacency.get("depends-on", empty)
+    con_offsets, con_targets = graph.adjacency.get("contains", empty)
+    strings = {s: i for i, s in enumerate(graph.strings)}
+    return (
+        dep_offsets, dep_targets, con_offsets, con_targets,
+        strings.get("cluster", NONE), strings.get("module", NONE),
+    )
+
+
+def python_metrics(graph: CompactGraph, sizes: Sequence[int]) -> Dict[str, List[int]]:
+    """Compute node and cluster metrics with plain Python loops."""
+    n = graph.num_nodes
+    dep_offsets, dep_targets, con_offsets, con_targets, cluster_scope, module_scope = graph_inputs(graph)
+    is_cluster = [s == cluster_scope for s in graph.scope]
+    is_module = [s == module_scope for s in graph.scope]
+    parent = [-1] * n
+    for src in range(n):
+        for k in range(con_offsets[src], con_offsets[src + 1]):
+            parent[con_targets[k]] = src
+
+    # Nearest cluster ancestor-or-self of every node
+    cluster = [-2] * n
+    for i in range(n):
+        chain = []
+        j = i
+        while j >= 0 and cluster[j] == -2:
+            if is_cluster[j]:
+                cluster[j] = j
+                break
+            chain.append(j)
+            j = parent[j]
+        found = cluster[j] if j >= 0 else -1
+        for k in chain:
+            cluster[k] = found
+
+    fan_in = [0] * n
+    fan_out = [dep_offsets[i + 1] - dep_offsets[i] for i in range(n)]
+    breadth = [0] * n
+    c_fan_in = [0] * n
+    c_fan_out = [0] * n
+    c_reach: Dict[int, set] = {}
+    for src in range(n):
+        containers = set()
+        cs = cluster[src]
+        for k in range(dep_offsets[src], dep_offsets[src + 1]):
+            dst = dep_targets[k]
+            fan_in[dst] += 1
+            containers.add(parent[dst])
+            cd = cluster[dst]
+            if cs != cd:
+                if cs >= 0:
+                    c_fan_out[cs] += 1
+                    c_reach.setdefault(cs, set()).add(cd)
+                if cd >= 0:
+                    c_fan_in[cd] += 1
+        breadth[src] = len(containers)
+
+    c_breadth = [0] * n
+    for c, reach in c_reach.items():
+        c_breadth[c] = len(reach)
+    c_size = [0] * n
+    c_members = [0] * n
+    for i in range(n):
+        c = cluster[i]
+        if c >= 0:
+            c_size[c] += sizes[i]
+            if is_module[i]:
+                c_members[c] += 1
+
+    return {
+        "fanIn": fan_in, "fanOut": fan_out, "breadth": breadth, "instructionBytes": list(sizes),
+        "clusterFanIn": c_fan_in, "clusterFanOut": c_fan_out, "clusterBreadth": c_breadth,
+        "clusterInstructionBytes": c_size, "members": c_members,
+    }
+
+
+def numpy_metrics(graph: CompactGraph, sizes: Sequence[int]) -> Dict[str, Any]:
+    """Compute node and cluster metrics with vectorized NumPy operations."""
+    n = graph.num_nodes
+    dep_offsets, dep_targets, con_offsets, con_targets, cluster_scope, module_scope = graph_inputs(graph)
+    idx = np.arange(n, dtype=np.int64)
+    off = np.asarray(dep_offsets, dtype=np.int64)
+    tgt = np.asarray(dep_targets, dtype=np.int64)
+    scope = np.asarray(graph.scope, dtype=np.int64)
+    is_cluster = scope == cluster_scope
+    is_module = scope == module_scope
+    sizes = np.asarray(sizes, dtype=np.int64)
+
+    parent = np.full(n, -1, dtype=np.int64)
+    parent[np.asarray(con_targets, dtype=np.int64)] = np.repeat(idx, np.diff(np.asarray(con_offsets, dtype=np.int64)))
+
+    # Nearest cluster ancestor-or-self, one hop per iteration for all nodes
+    cluster = np.where(is_cluster, idx, parent)
+    while True:
+        pending = np.zeros(n, dtype=bool)
+        valid = cluster >= 0
+        pending[valid] = ~is_cluster[cluster[valid]]
+        if not pending.any():
+            break
+        cluster[pending] = parent[cluster[pending]]
+
+    fan_out = np.diff(off)
+    src = np.repeat(idx, fan_out)
+    fan_in = np.bincount(tgt, minlength=n)
+    breadth = _distinct_per_group(src, parent[tgt], n)
+
+    cs = cluster[src]
+    cd = cluster[tgt]
+    external = cs != cd
+    out_edges = external & (cs >= 0)
+    c_fan_out = np.bincount(cs[out_edges], minlength=n)
+    c_fan_in = np.bincount(cd[external & (cd >= 0)], minlength=n)
+    c_breadth = _distinct_per_group(cs[out_edges], cd[out_edges], n)
+    in_cluster = cluster >= 0
+    c_size = np.bincount(cluster[in_cluster], weights=sizes[in_cluster], minlength=n).astype(np.int64)
+    c_members = np.bincount(cluster[in_cluster & is_module], minlength=n)
+
+    return {
+        "fanIn": fan_in, "fanOut": fan_out, "breadth": breadth, "instructionBytes": sizes,
+        "clusterFanIn": c_fan_in, "clusterFanOut": c_fan_out, "clusterBreadth": c_breadth,
+        "clusterInstructionBytes": c_size, "members": c_members,
+    }
+
+
+def _distinct_per_group(groups: Any, values: Any, n: int) -> Any:
+    """Count the distinct values per group index with one sort."""
+    order = np.lexsort((values, groups))
+    groups = groups[order]
+    values = values[order]
+    first = np.ones(len(groups), dtype=bool)
+    first[1:] = (groups[1:] != groups[:-1]) | (values[1:] != values[:-1])
+    return np.bincount(groups[first], minlength=n)
+
+
+def weighted_scores(columns: Dict[str, Any], rows: List[int], use_numpy: bool) -> List[float]:
+    """Return 100 * sum(weight * value / max) for the given rows.
+
+    Both engines perform the same floating-point operations in the same
+    order, so their scores are identical.
+    """
+    if use_numpy:
+        selected = np.asarray(rows, dtype=np.int64)
+        total = np.zeros(len(rows))
+        for metric, weight in WEIGHTS.items():
+            values = np.asarray(columns[metric], dtype=np.float64)[selected]
+            top = values.max() if len(rows) else 0.0
+            if top > 0:
+                total = total + weight * (values / top)
+        return (total * 100.0).tolist()
+
+    total = [0.0] * len(rows)
+    for metric, weight in WEIGHTS.items():
+        values = [float(columns[metric][i]) for i in rows]
+        top = max(values, default=0.0)
+        if top > 0:
+            total = [t + weight * (v / top) for t, v in zip(total, values)]
+    return [t * 100.0 for t in total]
+
+
+def gravity(graph: CompactGraph, sizes: Sequence[int], engine: str = "auto") -> Dict[str, Any]:
+    """Score every module and cluster of a graph.
+
+    Args:
+        graph: Full semantic graph
+        sizes: Instruction file size in bytes per node index
+        engine: numpy, python or auto (numpy when installed)
+
+    Returns:
+        Dict with the engine used and the module and cluster rows, each
+        sorted by descending score
+
+    Raises:
+        InvalidInputError: If the numpy engine is requested but NumPy is not installed
+    """
+    if engine == "numpy" and np is None:
+        raise InvalidInputError("The numpy engine requires NumPy to be installed")
+    use_numpy = engine == "numpy" or (engine == "auto" and np is not None)
+    metrics = (numpy_metrics if use_numpy else python_metrics)(graph, sizes)
+
+    scopes = [graph.strings[s] for s in graph.scope]
+    modules = [i for i, s in enumerate(scopes) if s == "module"]
+    clusters = [i for i, s in enumerate(scopes) if s == "cluster"]
+    cluster_columns = {
+        metric: metrics["cluster" + metric[0].upper() + metric[1:]] for metric in WEIGHTS
+    }
+
+    def rows(selected: List[int], columns: Dict[str, Any], extra: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        scores = weighted_scores(columns, selected, use_numpy)
+        # Plain lists; indexing NumPy arrays element by element is slow
+        values = [(key, _as_list(columns[key] if key in WEIGHTS else metrics[key])) for key in (*WEIGHTS, *extra)]
+        out = []
+        for i, score in zip(selected, scores):
+            row: Dict[str, Any] = {
+                "id": graph.ids[i],
+                "scope": scopes[i],
+                "path": graph.strings[graph.path[i]],
+                "score": round(score, 2),
+            }
+            for key, column in values:
+                row[key] = int(column[i])
+            out.append(row)
+        out.sort(key=lambda r: (-r["score"], r["id"]))
+        return out
+
+    return {
+        "engine": "numpy" if use_numpy else "python",
+        "modules": rows(modules, metrics, ()),
+        "clusters": rows(clusters, cluster_columns, ("members",)),
+    }
+
+
+def _as_list(column: Any) -> List[Any]:
+    return column.tolist() if hasattr(column, "tolist") else column
+
+
+def write_report(repo_root: str, report: Dict[str, Any]) -> str:
+    """Atomically write the report to the audit folder of its quarter.
+
+    Returns:
+        Path of the written file relative to the repository root
+    """
+    rel = os.path.join(AUDIT_DIR, report["quarter"], REPORT_FILE)
+    path = os.path.join(repo_root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".graph_health.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return rel.replace(os.sep, "/")
+
+
+def run(argv: List[str], repo_root: str) -> Dict[str, Any]:
+    args = parse_args(argv)
+    now = datetime.utcnow()
+    quarter = args.quarter or current_quarter(now)
+    if not re.fullmatch(r"\d{4}-Q[1-4]", quarter):
+        raise InvalidInputError(f"Invalid quarter: {quarter}")
+
+    data, files = scan_graph(repo_root, use_cache=not args.noCache)
+    graph = CompactGraph.from_dict(data)
+    sizes = [0] * graph.num_nodes
+    for entry in files.values():
+        i = graph.node_index(entry["node"]["id"])
+        if i is not None:
+            sizes[i] = entry["size"]
+
+    result = gravity(graph, sizes, args.engine)
+    selected = {
+        "module": result["modules"] if args.scope in ("module", "all") else [],
+        "cluster": result["clusters"] if args.scope in ("cluster", "all") else [],
+    }
+    hotspots = [
+        {"id": r["id"], "scope": r["scope"], "score": r["score"]}
+        for rows in selected.values() for r in rows if r["score"] >= args.threshold
+    ]
+    hotspots.sort(key=lambda h: (-h["score"], h["id"]))
+
+    report = {
+        "schemaVersion": SCHEMA_VERSION,
+        "generatedBy": f"semantic_gravity@{TOOL_VERSION}",
+        "timestamp": now.isoformat() + "Z",
+        "quarter": quarter,
+        "engine": result["engine"],
+        "weights": WEIGHTS,
+        "threshold": args.threshold,
+        "totals": {
+            "modules": len(result["modules"]),
+            "clusters": len(result["clusters"]),
+            "dependencies": len(graph.adjacency.get("depends-on", ((), ()))[1]),
+        },
+        "modules": selected["module"][:args.top],
+        "clusters": selected["cluster"][:args.top],
+        "hotspots": hotspots,
+    }
+    if args.write:
+        report["writtenTo"] = write_report(repo_root, report)
+    return report
+
+
+def main() -> int:
+    print(json.dumps(run(sys.argv[1:], os.getcwd()), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli_main(main))
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Rule engine of the semantic validator.
+
+A rule is a function registered with ``@rule`` that declares the inputs it
+reads. File rules read the ``front_matter`` record and the ``listing`` of
+nested directories of the file's directory; repository rules read the file
+catalog. For each file the engine gathers every input once, on first use,
+and runs all rules of the selected ruleset against it, so adding a rule adds
+no pass over the file. Rules that read the front matter are skipped when it
+cannot be read (SI000) or parsed (SI001), and a rule may be limited to
+files of some scopes. Repository rules may read the ``units`` index of all
+semantic units, which is built once per run.
+"""
+import os
+import posixpath
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
+
+from semantic_frontmatter import FrontMatter, load_front_matter, parse_bytes
+from semantic_git import read_blob
+from semantic_graph import node_refs, scan_graph
+from semantic_schema import Validator, line_of, load_validator
+
+# Files of a git tree as listed by semantic_git.list_tree: {path: (blob, size)}
+TreeFiles = Dict[str, Tuple[str, int]]
+
+# Diagnostics of one target file, and the nested module directories they
+# depend on (None when they depend on the file content only)
+FileResult = Tuple[List[Dict[str, Any]], List[str] | None]
+
+SEVERITY = ("error", "warning", "info")
+
+FILE_INPUTS = ("front_matter", "listing")
+
+REPOSITORY_INPUTS = ("units",)
+
+# Rule names by ruleset, in the order the rules run
+RULESETS: Dict[str, List[str]] = {"default": [], "strict": [], "ci": []}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A registered rule."""
+    name: str
+    check: Callable[[Any], None]
+    needs: FrozenSet[str]
+    scopes: FrozenSet[str] | None
+    repository: bool
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(
+    name: str, needs: Iterable[str] = (), scopes: Iterable[str] | None = None,
+    rulesets: Iterable[str] = ("default", "strict", "ci"), repository: bool = False
+) -> Callable[[Callable[[Any], None]], Callable[[Any], None]]:
+    """Register a rule.
+
+    A file rule is called with a FileContext whose declared inputs have been
+    gathered; a repository rule is called once per run with a
+    RepositoryContext.
+
+    Args:
+        name: Unique rule name
+        needs: Inputs the rule reads (FILE_INPUTS, or REPOSITORY_INPUTS for
+            a repository rule)
+        scopes: Front-matter scopes the rule applies to; None for all files
+        rulesets: Rulesets that run the rule
+        repository: Whether the rule checks the repository instead of each file
+
+    Raises:
+        ValueError: If the name is taken or an input or ruleset is unknown
+    """
+    needs = frozenset(needs)
+    unknown = needs - set(REPOSITORY_INPUTS if repository else FILE_INPUTS) or set(rulesets) - set(RULESETS)
+    if unknown or name in RULES:
+        raise ValueError(f"Invalid rule {name}: {', '.join(sorted(unknown)) or 'already registered'}")
+    if scopes is not None:
+        needs |= {"front_matter"}
+
+    def register(check: Callable[[Any], None]) -> Callable[[Any], None]:
+        RULES[name] = Rule(name, check, needs, frozenset(scopes) if scopes is not None else None, repository)
+        for ruleset in rulesets:
+            RULESETS[ruleset].append(name)
+        return check
+    return register
+
+
+def add_diag(diags: List[Dict[str, Any]], severity: str, code: str, message: str, file: str, start: int | None = None, end: int | None = None):
+    diags.append({
+        "severity": severity,
+        "code": code,
+        "message": message,
+        "location": {"file": file, **({"startLine": start} if start is not None else {}), **({"endLine": end} if end is not None else {})}
+    })
+
+
+def nested_directories(module_dir: str) -> List[str]:
+    """Return the subdirectories of module subdirectories, as sorted relative paths."""
+    nested: List[str] = []
+    with os.scandir(module_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                with os.scandir(entry.path) as subentries:
+                    nested.extend(f"{entry.name}/{sub.name}" for sub in subentries if sub.is_dir())
+    return sorted(nested)
+
+
+def tree_nested_directories(module_dir: str, files: TreeFiles) -> List[str]:
+    """Return the nested directories of a module, derived from the paths of a git tree."""
+    prefix = f"{module_dir}/" if module_dir else ""
+    nested = set()
+    for rel in files:
+        if rel.startswith(prefix):
+            parts = rel[len(prefix):].split("/")
+            # entry/subentry/file: subentry is a nested directory
+            if len(parts) >= 3:
+                nested.add(f"{parts[0]}/{parts[1]}")
+    return sorted(nested)
+
+
+class UnitIndex:
+    """Semantic units by every name a reference may use.
+
+    Names resolve as dependencies do in the semantic graph: by front-matter
+    id, path or graph id, and a name used by several units refers to the
+    first of them by path. Lookups are single dictionary probes.
+    """
+
+    def __init__(self, table: Dict[str, Dict[str, Any]]):
+        # Graph nodes by the relative path of their semantic-instructions.md
+        self.nodes: Dict[str, Dict[str, Any]] = {rel: table[rel]["node"] for rel in sorted(table)}
+        self.names: Dict[str, str] = {}
+        for rel, node in self.nodes.items():
+            for key in node_refs(node):
+                self.names.setdefault(key, rel)
+
+    def resolve(self, name: str) -> str | None:
+        """Return the file of the unit a name refers to, "." for the project, or None."""
+        if name == "." or name.startswith("project:"):
+            return "."
+        return self.names.get(name)
+
+
+class RepositoryContext:
+    """The files a validation run reads: the working tree, or a git tree listed by files.
+
+    targets are the files of the run; repository rules that check files
+    check only these (all files when None). unit_table is the graph's file
+    table the units index is built from; a focused run passes the table it
+    located the focus with, so that the index costs no repository scan.
+    """
+
+    def __init__(
+        self, repo_root: str = ".", files: TreeFiles | None = None, schema: Validator | None = None,
+        tree: str | None = None, targets: List[str] | None = None, use_cache: bool = True,
+        unit_table: Dict[str, Dict[str, Any]] | None = None,
+    ):
+        self.repo_root = repo_root
+        self.files = files
+        self.schema = schema if schema is not None else load_validator(repo_root, files)
+        self.tree = tree
+        self.targets = targets
+        self.use_cache = use_cache
+        self.unit_table = unit_table
+        self.units: UnitIndex | None = None
+        self.diagnostics: List[Dict[str, Any]] = []
+
+    def exists(self, rel: str) -> bool:
+        """Return whether a file exists, by path relative to the repository root."""
+        if self.files is not None:
+            return rel.replace(os.sep, "/") in self.files
+        return os.path.isfile(os.path.join(self.repo_root, rel))
+
+    def report(self, severity: str, code: str, message: str, file: str) -> None:
+        add_diag(self.diagnostics, severity, code, message, file)
+
+    def gather(self, need: str) -> None:
+        """Gather a repository input once."""
+        if need == "units" and self.units is None:
+            table = self.unit_table
+            if table is None:
+                # The graph's file table: only files changed since the cached
+                # scan are read again
+                table = scan_graph(self.repo_root, self.use_cache, self.tree)[1]
+            self.units = UnitIndex(table)
+
+
+class FileContext:
+    """One target file and the inputs gathered for it."""
+
+    def __init__(self, repository: RepositoryContext, path: str):
+        self.repository = repository
+        self.path = path
+        self.diagnostics: List[Dict[str, Any]] = []
+        self.front_matter: FrontMatter | None = None
+        self.listing: List[str] | None = None
+        self._gathered: Dict[str, bool] = {}
+
+    def report(self, severity: str, code: str, message: str, line: int | None = None) -> None:
+        add_diag(self.diagnostics, severity, code, message, self.path, line, line)
+
+    def gather(self, need: str) -> bool:
+        """Gather an input once and return whether it is available."""
+        if need not in self._gathered:
+            self._gathered[need] = getattr(self, f"_gather_{need}")()
+        return self._gathered[need]
+
+    def _gather_front_matter(self) -> bool:
+        repo = self.repository
+        try:
+            if repo.files is not None:
+                fm = parse_bytes(read_blob(repo.repo_root, repo.files[self.path][0]) or b"")
+            else:
+                fm = load_front_matter(os.path.join(repo.repo_root, self.path))
+        except Exception as e:
+            add_diag(self.diagnostics, "error", "SI000", f"Failed to read: {e}", self.path)
+            return False
+        if not fm.present:
+            self.report("error", "SI001", "Missing YAML front matter", 1)
+            return False
+        if fm.error:
+            self.report("error", "SI001", f"Invalid YAML front matter: {fm.error}", fm.error_line)
+            return False
+        self.front_matter = fm
+        return True
+
+    def _gather_listing(self) -> bool:
+        repo = self.repository
+        if repo.files is not None:
+            self.listing = tree_nested_directories(posixpath.dirname(self.path), repo.files)
+        else:
+            self.listing = nested_directories(os.path.join(repo.repo_root, os.path.dirname(self.path)))
+        return True
+
+
+def select_rules(ruleset: str) -> Tuple[List[Rule], List[Rule]]:
+    """Return the file rules and the repository rules of a ruleset."""
+    rules = [RULES[name] for name in RULESETS[ruleset]]
+    return [r for r in rules if not r.repository], [r for r in rules if r.repository]
+
+
+def check_file(repository: RepositoryContext, path: str, rules: List[Rule]) -> FileResult:
+    """Run file rules against one file, gathering each input once.
+
+    Returns:
+        The diagnostics, and the listing of a working-tree file when a rule
+        read it
+    """
+    ctx = FileContext(repository, path)
+    for r in rules:
+        if "front_matter" in r.needs and not ctx.gather("front_matter"):
+            continue
+        if r.scopes is not None and ctx.front_matter.scope not in r.scopes:
+            continue
+        for need in r.needs:
+            ctx.gather(need)
+        r.check(ctx)
+    listing = ctx.listing if repository.files is None else None
+    return ctx.diagnostics, listing
+
+
+def check_repository(repository: RepositoryContext, rules: List[Rule]) -> List[Dict[str, Any]]:
+    """Run repository rules once and return their diagnostics."""
+    for r in rules:
+        for need in r.needs:
+            repository.gather(need)
+        r.check(repository)
+    return repository.diagnostics
+
+
+REQUIRED_DOCUMENTS = (
+    os.path.join("docs", "vision.md"),
+    os.path.join("docs", "semantic-project-model.md"),
+    os.path.join("docs", "semantic-collaboration-model.md"),
+    os.path.join("docs", "glossary.md"),
+)
+
+
+@rule("front-matter-schema", needs=("front_matter",))
+def check_schema(ctx: FileContext) -> None:
+    """Check the front matter against the compiled schema (SI002, SI004-SI007)."""
+    for violation in ctx.repository.schema.validate(ctx.front_matter.data):
+        ctx.report("error", violation.code, violation.message, line_of(ctx.front_matter, violation.path))
+
+
+@rule("module-structure", needs=("listing",), scopes=("module",))
+def check_module_structure(ctx: FileContext) -> None:
+    """Check that a module has only one level of subdirectories (SI003)."""
+    if ctx.listing:
+        # Report only once per module
+        ctx.report(
+            "error",
+            "SI003",
+            f"Module directory structure exceeds one level of nesting: {ctx.listing[0]}. Modules may only contain one level of subdirectories.",
+        )
+
+
+@rule("required-documents", rulesets=("strict", "ci"), repository=True)
+def check_required_documents(repository: RepositoryContext) -> None:
+    """Check that the core documents exist (DOC001)."""
+    for f in REQUIRED_DOCUMENTS:
+        if not repository.exists(f):
+            repository.report("error", "DOC001", f"Required document missing: {f}", f)
+
+
+@rule("references", needs=("units",), repository=True)
+def check_references(repository: RepositoryContext) -> None:
+    """Check the dependencies of the target files against the unit index (SI010-SI012).
+
+    SI010 reports a reference no unit answers to, SI011 a unit referencing
+    itself, and SI012 a reference across the unit's own scope: to the
+    project, or to a unit that contains it or that it contains, which the
+    hierarchy already relates.
+    """
+    units = repository.units
+    targets = units.nodes if repository.targets is None else repository.targets
+    for rel in targets:
+        rel = rel.replace(os.sep, "/")
+        node = units.nodes.get(rel)
+        if node is None:
+            continue
+        for dep in (node.get("meta") or {}).get("dependencies", []):
+            target = units.resolve(dep)
+            if target is None:
+                repository.report("error", "SI010", f"Unresolved reference '{dep}': no module or cluster has this id or path", rel)
+            elif target == rel:
+                repository.report("warning", "SI011", f"Reference '{dep}' names the unit itself", rel)
+            else:
+                other = units.nodes.get(target, {"scope": "project"})
+                if other["scope"] == "project":
+                    relation = "the project"
+                elif node["path"].startswith(f"{other['path']}/"):
+                    relation = f"its containing {other['scope']} {other['path']}"
+                elif other["path"].startswith(f"{node['path']}/"):
+                    relation = f"its contained {other['scope']} {other['path']}"
+                else:
+                    continue
+                repository.report("warning", "SI012", f"Reference '{dep}' crosses scope: it names {relation}", rel)
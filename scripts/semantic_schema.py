@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Compiled JSON-Schema validation of front matter.
+
+compile_schema turns a schema into a tree of closures once, so validating a
+file only calls the checks the schema needs instead of interpreting the
+schema again. The draft-07 keywords used by
+.schemas/semantic-instructions.schema.json are supported: ``type``,
+``enum``, ``const``, ``required``, ``properties``, ``additionalProperties``,
+``items``, ``minItems``/``maxItems``, ``minLength``/``maxLength``,
+``pattern`` and ``minimum``/``maximum``. Other validation keywords are
+rejected when the schema is compiled rather than silently ignored.
+
+Violations carry an SI code:
+
+- SI002 required field missing
+- SI004 value has the wrong type
+- SI005 value not allowed (``enum``, ``const``, ``pattern``)
+- SI006 value out of bounds (item count, length, minimum/maximum)
+- SI007 field not allowed (``additionalProperties``)
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from semantic_frontmatter import FrontMatter
+from semantic_git import read_blob
+
+SCHEMA_FILE = ".schemas/semantic-instructions.schema.json"
+
+# Used when a repository has no schema file: the fields the validator has
+# always required
+DEFAULT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "required": ["scope", "id", "owners"],
+    "properties": {
+        "scope": {"enum": ["project", "cluster", "module"]},
+        "id": {"type": ["string", "integer", "number"], "minLength": 1},
+        "owners": {"type": "array"},
+    },
+}
+
+# Keywords that do not constrain values
+ANNOTATIONS = frozenset(("$schema", "$id", "$comment", "title", "description", "default", "examples"))
+
+TYPES: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+# Compiled validators by schema digest
+_compiled: Dict[str, "Validator"] = {}
+_compiled_lock = threading.Lock()
+
+
+class Violation(NamedTuple):
+    """A value that does not match the schema."""
+    code: str
+    path: Tuple[Any, ...]
+    message: str
+
+
+# A compiled check appends the violations of a value at a path
+Check = Callable[[Any, Tuple[Any, ...], List[Violation]], None]
+
+
+class Validator(NamedTuple):
+    """A compiled schema with the document and digest it was compiled from."""
+    digest: str
+    source: bytes
+    check: Check
+
+    def validate(self, data: Any) -> List[Violation]:
+        """Return the violations of data, in schema order."""
+        violations: List[Violation] = []
+        self.check(data, (), violations)
+        return violations
+
+
+def format_path(path: Tuple[Any, ...]) -> str:
+    """Format a value path as ``contract.invariants[0]``."""
+    out = ""
+    for part in path:
+        out += f"[{part}]" if isinstance(part, int) else (f".{part}" if out else str(part))
+    return out or "front matter"
+
+
+def line_of(fm: FrontMatter, path: Tuple[Any, ...]) -> int:
+    """Return the line of the nearest key on path that the parser recorded."""
+    keys: List[str] = []
+    for part in path:
+        if isinstance(part, int):
+            break
+        keys.append(str(part))
+    for n in range(len(keys), 0, -1):
+        line = fm.key_lines.get(".".join(keys[:n]))
+        if line is not None:
+            return line
+    return 1
+
+
+def compile_schema(schema: Any) -> Check:
+    """Compile a schema into a check function.
+
+    Raises:
+        ValueError: If the schema uses an unsupported keyword or is malformed
+    """
+    if schema is True or schema == {}:
+        return lambda value, path, out: None
+    if schema is False:
+        return lambda value, path, out: out.append(Violation("SI007", path, f"'{format_path(path)}' is not allowed"))
+    if not isinstance(schema, dict):
+        raise ValueError(f"Invalid schema: {schema!r}")
+    unsupported = set(schema) - ANNOTATIONS - _KEYWORDS.keys()
+    if unsupported:
+        raise ValueError(f"Unsupported schema keywords: {', '.join(sorted(unsupported))}")
+
+    type_check = _compile_type(schema["type"]) if "type" in schema else None
+    checks = [_KEYWORDS[k](schema[k], schema) for k in _KEYWORDS if k in schema and k != "type"]
+    checks = [c for c in checks if c is not None]
+
+    def check(value: Any, path: Tuple[Any, ...], out: List[Violation]) -> None:
+        # Further keywords are not checked against a value of the wrong type
+        if type_check is not None and not type_check(value, path, out):
+            return
+        for c in checks:
+            c(value, path, out)
+    return check
+
+
+def _compile_type(expected: Any) -> Callable[[Any, Tuple[Any, ...], List[Violation]], bool]:
+    names = [expected] if isinstance(expected, str) else list(expected)
+    unknown = [n for n in names if n not in TYPES]
+    if unknown:
+        raise ValueError(f"Unknown schema type: {unknown[0]}")
+    tests = [TYPES[n] for n in names]
+    label = " or ".join(names)
+
+    def type_check(value: Any, path: Tuple[Any, ...], out: List[Violation]) -> bool:
+        if any(t(value) for t in tests):
+            return True
+        out.append(Violation("SI004", path, f"'{format_path(path)}' must be of type {label}"))
+        return False
+    return type_check
+
+
+def _compile_enum(allowed: List[Any], _schema: Dict[str, Any]) -> Check:
+    label = ", ".join(json.dumps(a) for a in allowed)
+
+    def check(value, path, out):
+        # 1 == True in Python but not in JSON Schema
+        if not any(value == a and type(value) is type(a) for a in allowed):
+            out.append(Violation("SI005", path, f"'{format_path(path)}' must be one of: {label}"))
+    return check
+
+
+def _compile_const(expected: Any, _schema: Dict[str, Any]) -> Check:
+    def check(value, path, out):
+        if not (value == expected and type(value) is type(expected)):
+            out.append(Violation("SI005", path, f"'{format_path(path)}' must be {json.dumps(expected)}"))
+    return check
+
+
+def _compile_pattern(pattern: str, _schema: Dict[str, Any]) -> Check:
+    search = re.compile(pattern).search
+
+    def check(value, path, out):
+        if isinstance(value, str) and not search(value):
+            out.append(Violation("SI005", path, f"'{format_path(path)}' must match {pattern}"))
+    return check
+
+
+def _compile_required(names: List[str], _schema: Dict[str, Any]) -> Check:
+    def check(value, path, out):
+        if isinstance(value, dict):
+            for name in names:
+                if name not in value:
+                    out.append(Violation("SI002", path + (name,), f"Missing required field '{format_path(path + (name,))}'"))
+    return check
+
+
+def _compile_properties(properties: Dict[str, Any], _schema: Dict[str, Any]) -> Check:
+    compiled = [(name, compile_schema(sub)) for name, sub in properties.items()]
+
+    def check(value, path, out):
+        if isinstance(value, dict):
+            for name, sub in compiled:
+                if name in value:
+                    sub(value[name], path + (name,), out)
+    return check
+
+
+def _compile_additional(additional: Any, schema: Dict[str, Any]) -> Check | None:
+    if additional is True:
+        return None
+    known = frozenset(schema.get("properties", {}))
+    sub = compile_schema(additional)
+
+    def check(value, path, out):
+        if isinstance(value, dict):
+            for name, item in value.items():
+                if name not in known:
+                    sub(item, path + (name,), out)
+    return check
+
+
+def _compile_items(items: Any, _schema: Dict[str, Any]) -> Check:
+    if isinstance(items, list):
+        raise ValueError("Unsupported schema keywords: items (tuple form)")
+    sub = compile_schema(items)
+
+    def check(value, path, out):
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                sub(item, path + (i,), out)
+    return check
+
+
+def _bound(kind: Any, measure: Callable[[Any], Any], minimum: bool, what: str):
+    """Return a keyword compiler for a lower or upper bound on measure(value)."""
+    def compile_bound(limit: Any, _schema: Dict[str, Any]) -> Check:
+        def check(value, path, out):
+            if isinstance(value, kind) and not isinstance(value, bool):
+                size = measure(value)
+                if size < limit if minimum else size > limit:
+                    bound = "at least" if minimum else "at most"
+                    out.append(Violation("SI006", path, f"'{format_path(path)}' must {what.format(bound=bound, limit=limit)}"))
+        return check
+    return compile_bound
+
+
+# Keyword compilers, in the order their checks run
+_KEYWORDS: Dict[str, Callable[[Any, Dict[str, Any]], Check | None]] = {
+    "type": lambda expected, schema: None,
+    "enum": _compile_enum,
+    "const": _compile_const,
+    "pattern": _compile_pattern,
+    "minLength": _bound(str, len, True, "be {bound} {limit} characters long"),
+    "maxLength": _bound(str, len, False, "be {bound} {limit} characters long"),
+    "minimum": _bound((int, float), lambda v: v, True, "be {bound} {limit}"),
+    "maximum": _bound((int, float), lambda v: v, False, "be {bound} {limit}"),
+    "minItems": _bound(list, len, True, "have {bound} {limit} item(s)"),
+    "maxItems": _bound(list, len, False, "have {bound} {limit} item(s)"),
+    "required": _compile_required,
+    "properties": _compile_properties,
+    "additionalProperties": _compile_additional,
+    "items": _compile_items,
+}
+
+
+def compile_validator(text: bytes) -> Validator:
+    """Return the compiled validator of a schema document, compiling it once per content.
+
+    Raises:
+        ValueError: If the document is not valid JSON or not a supported schema
+    """
+    digest = hashlib.sha256(text).hexdigest()
+    with _compiled_lock:
+        validator = _compiled.get(digest)
+    if validator is None:
+        try:
+            validator = Validator(digest, text, compile_schema(json.loads(text)))
+        except re.error as e:
+            raise ValueError(f"Invalid pattern: {e}")
+        with _compiled_lock:
+            _compiled[digest] = validator
+    return validator
+
+
+def load_validator(repo_root: str = ".", files: Dict[str, Tuple[str, int]] | None = None) -> Validator:
+    """Return the compiled front-matter schema of a repository.
+
+    The schema is read from SCHEMA_FILE in the working tree, or in the git
+    tree listed by files; DEFAULT_SCHEMA is used when there is none.
+
+    Raises:
+        ValueError: If the schema file is not valid JSON or not a supported schema
+    """
+    text = None
+    if files is not None:
+        if SCHEMA_FILE in files:
+            text = read_blob(repo_root, files[SCHEMA_FILE][0])
+    else:
+        try:
+            with open(os.path.join(repo_root, SCHEMA_FILE), "rb") as f:
+                text = f.read()
+        except FileNotFoundError:
+            pass
+    if text is None:
+        text = json.dumps(DEFAULT_SCHEMA, sort_keys=True).encode()
+    try:
+        return compile_validator(text)
+    except ValueError as e:
+        raise ValueError(f"Invalid schema {SCHEMA_FILE}: {e}")
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Memory-mappable binary snapshots of the compact semantic graph.
+
+A snapshot stores a CompactGraph as flat sections that are used in place
+through a read-only memory map, so opening one costs a header parse
+whatever the graph size, and every process that maps the same file shares
+one physical copy in the page cache.
+
+Layout (native byte order, recorded in the header):
+
+    magic "SEMGRAPH" | uint32 format version | uint32 header length
+    header (JSON): stamp, node count, edge types, graph meta, edge
+        attributes and {section: [offset, count, typecode]}
+    sections, each aligned to 8 bytes:
+        strings.offsets/.data, ids.offsets/.data  interned string tables;
+            string i is data[offsets[i]:offsets[i + 1]] in UTF-8
+        ids.order                 node indexes sorted by id, for lookups
+        scope, name, path         string indexes per node
+        owners.offsets/.values    owner string indexes per node (CSR)
+        contract.offsets/.data    JSON per node, empty for None
+        meta.offsets/.data
+        adj.<type>.offsets/.targets, rev.<type>.offsets/.targets  CSR
+
+The stamp identifies the state the graph was built from; a snapshot is only
+opened when the caller's stamp matches.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from semantic_compact import CompactGraph
+
+MAGIC = b"SEMGRAPH"
+FORMAT_VERSION = 1
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 8
+
+
+class _StringTable:
+    """Sequence of strings decoded on access from an offsets/data pair."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(len(self)))
+
+
+class _Ragged:
+    """Sequence of integer tuples stored in CSR form."""
+
+    def __init__(self, offsets: memoryview, values: memoryview):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Tuple[int, ...]:
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return tuple(self.values[self.offsets[i]:self.offsets[i + 1]])
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        return (self[i] for i in range(len(self)))
+
+
+class _JsonColumn(_StringTable):
+    """Sequence of JSON values decoded on access; empty entries are None."""
+
+    def __getitem__(self, i: int) -> Any:
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return json.loads(str(self.data[start:end], "utf-8")) if end > start else None
+
+
+class _SortedIndex:
+    """Node id lookup by binary search over the ids sorted in the snapshot."""
+
+    def __init__(self, ids: _StringTable, order: memoryview):
+        self.ids = ids
+        self.order = order
+
+    def get(self, key: str) -> Optional[int]:
+        lo, hi = 0, len(self.order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ids[self.order[mid]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.order) and self.ids[self.order[lo]] == key:
+            return self.order[lo]
+        return None
+
+
+def _strings(values: List[Optional[str]]) -> Tuple[array, bytes]:
+    offsets = array("Q", [0])
+    chunks = []
+    for value in values:
+        encoded = b"" if value is None else value.encode("utf-8")
+        chunks.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+    return offsets, b"".join(chunks)
+
+
+def _json_column(values: List[Any]) -> Tuple[array, bytes]:
+    return _strings([None if v is None else json.dumps(v, separators=(",", ":")) for v in values])
+
+
+def write_snapshot(graph: CompactGraph, path: str, stamp: str) -> None:
+    """Atomically write a graph to a snapshot file.
+
+    Args:
+        graph: Graph to store; all node fields are stored whatever its projection
+        path: Destination file; its directory must exist
+        stamp: Identity of the state the graph was built from
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    n = graph.num_nodes
+    ids = list(graph.ids)
+    sections: List[Tuple[str, Any]] = []
+    for name, values in (("strings", list(graph.strings)), ("ids", ids)):
+        offsets, data = _strings(values)
+        sections += [(f"{name}.offsets", offsets), (f"{name}.data", data)]
+    sections.append(("ids.order", array("I", sorted(range(n), key=ids.__getitem__))))
+    for name in ("scope", "name", "path"):
+        sections.append((name, array("I", getattr(graph, name))))
+    owner_offsets, owner_values = array("I", [0]), array("I")
+    for owners in graph.owners:
+        owner_values.extend(owners)
+        owner_offsets.append(len(owner_values))
+    sections += [("owners.offsets", owner_offsets), ("owners.values", owner_values)]
+    for name in ("contract", "meta"):
+        offsets, data = _json_column(list(getattr(graph, name)))
+        sections += [(f"{name}.offsets", offsets), (f"{name}.data", data)]
+    for prefix, csr in (("adj", graph.adjacency), ("rev", graph.reverse)):
+        for edge_type, (offsets, targets) in csr.items():
+            sections.append((f"{prefix}.{edge_type}.offsets", array("I", offsets)))
+            sections.append((f"{prefix}.{edge_type}.targets", array("I", targets)))
+
+    table: Dict[str, List[Any]] = {}
+    position = 0
+    for name, data in sections:
+        position += -position % _ALIGN
+        typecode = data.typecode if isinstance(data, array) else "B"
+        table[name] = [position, len(data), typecode]
+        position += len(data) * (data.itemsize if isinstance(data, array) else 1)
+    header = json.dumps({
+        "stamp": stamp,
+        "byteOrder": sys.byteorder,
+        "numNodes": n,
+        "edgeTypes": list(graph.adjacency),
+        "graphMeta": graph.graph_meta,
+        "edgeAttrs": [[t, s, d, attrs] for (t, s, d), attrs in graph.edge_attrs.items()],
+        "sections": table,
+    }, separators=(",", ":")).encode("utf-8")
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".snapshot.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            start = _PREAMBLE.size + len(header)
+            f.write(b"\0" * (-start % _ALIGN))
+            written = 0
+            for name, data in sections:
+                f.write(b"\0" * (table[name][0] - written))
+                raw = data.tobytes() if isinstance(data, array) else data
+                f.write(raw)
+                written = table[name][0] + len(raw)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def open_snapshot(path: str, stamp: Optional[str] = None) -> Optional[CompactGraph]:
+    """Map a snapshot file read-only and return its graph.
+
+    Args:
+        path: Snapshot file
+        stamp: Required stamp; None accepts any
+
+    Returns:
+        The graph, or None if the file is missing, unreadable, of another
+        format version or byte order, or has a different stamp
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    graph = None
+    try:
+        graph = _map_graph(mapped, stamp)
+    except (KeyError, TypeError, ValueError, struct.error):
+        pass
+    if graph is None:
+        try:
+            mapped.close()
+        except BufferError:
+            # Views of a rejected file are still referenced; the map is
+            # released with them
+            pass
+    return graph
+
+
+def _map_graph(mapped: mmap.mmap, stamp: Optional[str]) -> Optional[CompactGraph]:
+    """Check the header of a mapped snapshot and build the graph over its sections."""
+    magic, version, header_len = _PREAMBLE.unpack_from(mapped, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    header = json.loads(mapped[_PREAMBLE.size:_PREAMBLE.size + header_len])
+    if header["byteOrder"] != sys.byteorder or (stamp is not None and header["stamp"] != stamp):
+        return None
+    start = _PREAMBLE.size + header_len
+    start += -start % _ALIGN
+    view = memoryview(mapped)
+
+    def section(name: str) -> memoryview:
+        offset, count, typecode = header["sections"][name]
+        size = count * (1 if typecode == "B" else array(typecode).itemsize)
+        if start + offset + size > len(view):
+            raise ValueError(f"Truncated snapshot section: {name}")
+        raw = view[start + offset:start + offset + size]
+        return raw if typecode == "B" else raw.cast(typecode)
+
+    ids = _StringTable(section("ids.offsets"), section("ids.data"))
+    if len(ids) != header["numNodes"]:
+        return None
+    csr = {
+        prefix: {
+            t: (section(f"{prefix}.{t}.offsets"), section(f"{prefix}.{t}.targets"))
+            for t in header["edgeTypes"]
+        }
+        for prefix in ("adj", "rev")
+    }
+    return CompactGraph(
+        ids,
+        _StringTable(section("strings.offsets"), section("strings.data")),
+        section("scope"),
+        section("name"),
+        section("path"),
+        _Ragged(section("owners.offsets"), section("owners.values")),
+        _JsonColumn(section("contract.offsets"), section("contract.data")),
+        _JsonColumn(section("meta.offsets"), section("meta.data")),
+        csr["adj"],
+        {(t, s, d): attrs for t, s, d, attrs in header["edgeAttrs"]},
+        header["graphMeta"],
+        reverse=csr["rev"],
+        index=_SortedIndex(ids, section("ids.order")),
+    )
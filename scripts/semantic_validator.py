@@ -1,137 +1,444 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
+import importlib
+import itertools
 import json
+import multiprocessing
 import os
+import posixpath
 import re
 import sys
+import tempfile
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from glob import glob
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
 
+from semantic_cli import InvalidInputError, cli_main
+from semantic_frontmatter import read_front_matter
+from semantic_git import list_tree, resolve_tree
+from semantic_graph import check_focus_scope, focus_files
+from semantic_rules import (
+    RULESETS, SEVERITY, FileResult, RepositoryContext, TreeFiles, check_file, check_repository, nested_directories, select_rules,
+)
+from semantic_schema import Validator, compile_validator, load_validator
+from semantic_walk import is_excluded, walk
 
-SEVERITY = ("error", "warning", "info")
+TOOL_VERSION = "0.3.0"
 
+# Persistent validation cache: per ruleset, the content hash, module
+# structure and diagnostics of every validated working-tree file, valid for
+# one tool version and schema
+VALIDATION_CACHE_FILE = os.path.join("data", "semantic-validation.json")
 
-def parse_args():
+# Targets are validated in chunks of this many files; with more than one
+# chunk, the chunks are spread over a worker pool
+CHUNK_SIZE = 64
+
+# Worker count used when --workers is not given; defaults to the CPU count, max 8
+WORKERS_ENV = "SEMANTIC_VALIDATE_WORKERS"
+
+# Pool type used when --pool is not given. Run from the command line, the
+# script uses processes. Loaded into a long-lived process, such as the server,
+# it uses threads: a cached process pool would otherwise stay alive in every
+# server worker for the life of that worker.
+DEFAULT_POOL = "process" if __name__ == "__main__" else "thread"
+
+
+def parse_args(argv: List[str] | None = None):
     p = argparse.ArgumentParser(description="Validate semantic files and contracts")
     p.add_argument("--targets", nargs="*", default=["."])
     p.add_argument("--scope", choices=["project", "cluster", "module"], default=None)
-    p.add_argument("--ruleset", choices=["default", "strict", "ci"], default="default")
+    p.add_argument("--ruleset", choices=list(RULESETS), default="default")
     p.add_argument("--fixMode", choices=["none", "suggest"], default="suggest")
-    p.add_argument("--outputFormat", choices=["json"], default="json")
-    return p.parse_args()
+    p.add_argument("--outputFormat", choices=["json", "ndjson"], default="json", help="ndjson prints one {kind: record} line per diagnostic as it is produced, then the meta and the summary")
+    p.add_argument("--ref", default=None, help="Validate the files of a git ref instead of the working tree")
+    p.add_argument("--focus", default=None, help="Id or path of a module or cluster; validate only its subtree and direct neighbours instead of --targets")
+    p.add_argument("--workers", type=int, default=None, help=f"Parallel workers; 1 validates sequentially (default: ${WORKERS_ENV}, or the CPU count up to 8)")
+    p.add_argument("--pool", choices=["process", "thread"], default=None, help="Worker pool type (default: process from the command line, thread when imported)")
+    p.add_argument("--noCache", action="store_true", help="Ignore and do not update the validation cache")
+    return p.parse_args(argv)
+
+
+def collect_targets(inputs: List[str], repo_root: str = ".", files: TreeFiles | None = None) -> List[str]:
+    if files is not None:
+        return collect_tree_targets(inputs, files)
+    results: List[str] = []
+    for t in inputs:
+        base = os.path.join(repo_root, t)
+        if os.path.isdir(base):
+            pattern = "**/semantic-instructions.md"
+            for rel in walk(base, [pattern], ignore_case=True)[pattern]:
+                results.append(os.path.relpath(os.path.join(base, rel), repo_root))
+        else:
+            results.extend(glob(t, root_dir=repo_root, recursive=True))
+    # de-dup
+    return sorted(set(results))
 
 
-def add_diag(diags: List[Dict[str, Any]], severity: str, code: str, message: str, file: str, start: int | None = None, end: int | None = None):
-    diags.append({
-        "severity": severity,
-        "code": code,
-        "message": message,
-        "location": {"file": file, **({"startLine": start} if start is not None else {}), **({"endLine": end} if end is not None else {})}
-    })
+def glob_regex(pattern: str) -> "re.Pattern[str]":
+    """Translate a glob pattern to a regex with glob(recursive=True) semantics.
 
+    ``*`` and ``?`` do not match ``/``; ``**`` matches any number of directories.
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
 
-def validate_semantic_instructions_md(path: str, diags: List[Dict[str, Any]]):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            txt = f.read()
-        if not txt.startswith("---"):
-            add_diag(diags, "error", "SI001", "Missing YAML front matter", path, 1, 1)
-            return
-        parts = txt.split("---", 2)
-        fm = parts[1]
-        # required: scope, id, owners
-        missing = []
-        if not re.search(r"\bscope:\s*(project|cluster|module)\b", fm):
-            missing.append("scope")
-        if not re.search(r"\bid:\s*\S+", fm):
-            missing.append("id")
-        if not re.search(r"\bowners:\s*\[.*?\]", fm, re.S):
-            missing.append("owners")
-        for m in missing:
-            add_diag(diags, "error", "SI002", f"Missing required field '{m}' in front matter", path, 1, 1)
-        
-        # Check if this is a module scope
-        scope_match = re.search(r"\bscope:\s*(project|cluster|module)\b", fm)
-        if scope_match and scope_match.group(1) == "module":
-            # Validate module directory structure (one level of subdirectories allowed)
-            validate_module_structure(path, diags)
-    except Exception as e:
-        add_diag(diags, "error", "SI000", f"Failed to read: {e}", path)
-
-
-def validate_module_structure(semantic_instructions_path: str, diags: List[Dict[str, Any]]):
-    """Validate that module directory structure adheres to one-level subdirectory rule."""
-    module_dir = os.path.dirname(semantic_instructions_path)
-    
-    # List immediate subdirectories of the module directory
-    for entry in os.listdir(module_dir):
-        entry_path = os.path.join(module_dir, entry)
-        if os.path.isdir(entry_path):
-            # Check if this subdirectory contains any subdirectories
-            for subentry in os.listdir(entry_path):
-                subentry_path = os.path.join(entry_path, subentry)
-                if os.path.isdir(subentry_path):
-                    rel_path = os.path.relpath(subentry_path, module_dir)
-                    add_diag(
-                        diags,
-                        "error",
-                        "SI003",
-                        f"Module directory structure exceeds one level of nesting: {rel_path}. Modules may only contain one level of subdirectories.",
-                        semantic_instructions_path
-                    )
-                    # Report only once per module
-                    return
-
-
-
-
-def collect_targets(inputs: List[str]) -> List[str]:
+
+def collect_tree_targets(inputs: List[str], files: TreeFiles) -> List[str]:
+    """Select target files from a git tree listing.
+
+    Directory targets select the semantic-instructions.md files below them;
+    other targets are matched as glob patterns against the tree paths.
+    """
     results: List[str] = []
     for t in inputs:
-        if os.path.isdir(t):
-            for root, _dirs, files in os.walk(t):
-                for fn in files:
-                    if fn.lower() == "semantic-instructions.md":
-                        results.append(os.path.join(root, fn))
+        target = posixpath.normpath(t.replace("\\", "/")).strip("/")
+        prefix = "" if target == "." else f"{target}/"
+        if not prefix or any(rel.startswith(prefix) for rel in files):
+            results.extend(
+                rel for rel in files
+                if rel.startswith(prefix)
+                and posixpath.basename(rel).lower() == "semantic-instructions.md"
+                and not is_excluded(rel)
+            )
         else:
-            results.extend(glob(t, recursive=True))
-    # de-dup
+            match = glob_regex(target).match
+            results.extend(rel for rel in files if match(rel))
     return sorted(set(results))
 
 
-def main() -> int:
-    args = parse_args()
-    diags: List[Dict[str, Any]] = []
+def validate_chunk(
+    paths: List[str], repo_root: str = ".", tree: str | None = None, schema: bytes | None = None,
+    ruleset: str = "default"
+) -> List[FileResult]:
+    """Run the file rules of a ruleset on target files, one after the other, and return their results in order.
+
+    schema is the schema document; it is compiled once per process and
+    content. Without it, the repository's schema is loaded.
+    """
+    return list(iter_chunk(paths, repo_root, tree, schema, ruleset))
+
+
+def iter_chunk(
+    paths: List[str], repo_root: str = ".", tree: str | None = None, schema: bytes | None = None,
+    ruleset: str = "default"
+) -> Iterator[FileResult]:
+    """Yield the results of validate_chunk one file at a time."""
+    files = list_tree(repo_root, tree) if tree else None
+    validator = compile_validator(schema) if schema is not None else load_validator(repo_root, files)
+    repository = RepositoryContext(repo_root, files, validator)
+    rules, _repository_rules = select_rules(ruleset)
+    for path in paths:
+        yield check_file(repository, path, rules)
+
+
+_executors: Dict[Tuple[str, int], Executor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(pool: str, workers: int) -> Executor:
+    """Return a worker pool that is reused by later runs in this process.
+
+    Process pools use the spawn start method, which is safe in a
+    multi-threaded server. Daemon processes, such as the server's script
+    workers, cannot have children, so they get a thread pool.
+    """
+    if pool == "process" and multiprocessing.current_process().daemon:
+        pool = "thread"
+    key = (pool, workers)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            if pool == "process":
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="semantic-validate")
+            _executors[key] = executor
+    return executor
+
+
+def validate_targets(
+    paths: List[str], repo_root: str = ".", tree: str | None = None, workers: int = 1, pool: str = "process",
+    schema: bytes | None = None, ruleset: str = "default"
+) -> List[FileResult]:
+    """Validate target files, spreading chunks of them over a worker pool.
+
+    Chunks are cut from the target list in order and their results are
+    concatenated in the same order, so the result is identical to
+    validating the files sequentially, whatever the worker count.
+
+    Args:
+        paths: Target files relative to repo_root, in output order
+        repo_root: Repository root
+        tree: Tree SHA whose files are validated instead of the working tree
+        workers: Maximum number of chunks validated at once
+        pool: "process" or "thread"
+        schema: Schema document passed to validate_chunk
+        ruleset: Ruleset whose file rules are run
+    """
+    return list(iter_targets(paths, repo_root, tree, workers, pool, schema, ruleset))
+
+
+def iter_targets(
+    paths: List[str], repo_root: str = ".", tree: str | None = None, workers: int = 1, pool: str = "process",
+    schema: bytes | None = None, ruleset: str = "default"
+) -> Iterator[FileResult]:
+    """Yield the results of validate_targets in order, each as soon as it is known.
+
+    A sequential run yields file by file; on a worker pool, the files of a
+    chunk are yielded once the chunk and the chunks before it are done.
+    """
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    if workers <= 1 or len(chunks) <= 1:
+        yield from iter_chunk(paths, repo_root, tree, schema, ruleset)
+        return
+    executor = get_executor(pool, min(workers, len(chunks)))
+    # Child processes find the function by module name; the importable module
+    # is used because the server loads this script under a private name
+    worker = importlib.import_module("semantic_validator").validate_chunk if isinstance(executor, ProcessPoolExecutor) else validate_chunk
+    done = 0
+    try:
+        n = len(chunks)
+        for chunk_results in executor.map(worker, chunks, [repo_root] * n, [tree] * n, [schema] * n, [ruleset] * n):
+            done += 1
+            yield from chunk_results
+    except BrokenExecutor:
+        # A worker died (or could not start); drop the pool and validate the
+        # remaining chunks here
+        with _executors_lock:
+            for key in [k for k, e in _executors.items() if e is executor]:
+                del _executors[key]
+        executor.shutdown(wait=False)
+        yield from iter_chunk(paths[done * CHUNK_SIZE:], repo_root, tree, schema, ruleset)
+
+
+def load_validation_cache(repo_root: str, schema: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Return the cached file entries by ruleset and relative path.
 
-    # CI/strict may enforce presence of core docs
-    if args.ruleset in ("ci", "strict"):
-        required = [
-            os.path.join("docs", "vision.md"),
-            os.path.join("docs", "semantic-project-model.md"),
-            os.path.join("docs", "semantic-collaboration-model.md"),
-            os.path.join("docs", "glossary.md"),
-        ]
-        for f in required:
-            if not os.path.isfile(f):
-                add_diag(diags, "error", "DOC001", f"Required document missing: {f}", f)
-
-    target_files = collect_targets(args.targets)
-    for path in target_files:
-        validate_semantic_instructions_md(path, diags)
-
-    summary = {
-        "errors": sum(1 for d in diags if d["severity"] == "error"),
-        "warnings": sum(1 for d in diags if d["severity"] == "warning"),
-        "infos": sum(1 for d in diags if d["severity"] == "info"),
+    Returns {} when the cache is missing, unreadable or was written by a
+    different tool version or for a different schema (by digest).
+    """
+    try:
+        with open(os.path.join(repo_root, VALIDATION_CACHE_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    meta = data.get("meta", {}) if isinstance(data, dict) else {}
+    if meta.get("toolVersion") != TOOL_VERSION or meta.get("schema") != schema:
+        return {}
+    rulesets = data.get("rulesets")
+    return rulesets if isinstance(rulesets, dict) else {}
+
+
+def save_validation_cache(repo_root: str, schema: str, rulesets: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    """Atomically write the file entries to the cache file.
+
+    Nothing is written when the data directory does not exist or is not writable.
+    """
+    path = os.path.join(repo_root, VALIDATION_CACHE_FILE)
+    cache_dir = os.path.dirname(path)
+    if not os.path.isdir(cache_dir):
+        return
+    out = {
+        "meta": {
+            "toolVersion": TOOL_VERSION,
+            "schema": schema,
+            "note": "Generated by scripts/semantic_validator.py; safe to delete",
+        },
+        "rulesets": rulesets,
+    }
+    try:
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".semantic-validation.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(out, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def file_state(repo_root: str, rel: str, cached: Dict[str, Any] | None) -> Tuple[Dict[str, Any] | None, bool]:
+    """Return the stat and content hash of a target file and whether its cached result still holds.
+
+    Files whose size and mtime match the cache are not opened; otherwise
+    the front matter, which is all the rules read, is hashed. A module's
+    result also depends on its directory structure, which is listed again.
+
+    Returns:
+        (state, unchanged); state is None when the file cannot be read
+    """
+    path = os.path.join(repo_root, rel)
+    try:
+        st = os.stat(path)
+        if cached and cached.get("mtimeNs") == st.st_mtime_ns and cached.get("size") == st.st_size:
+            digest = cached["sha256"]
+        else:
+            digest = hashlib.sha256(read_front_matter(path)).hexdigest()
+        state = {"mtimeNs": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+        unchanged = bool(cached) and cached.get("sha256") == digest
+        if unchanged and cached.get("structure") is not None:
+            unchanged = nested_directories(os.path.dirname(path)) == cached["structure"]
+    except OSError:
+        return None, False
+    return state, unchanged
+
+
+def iter_incremental(
+    paths: List[str], repo_root: str, ruleset: str, schema: Validator, workers: int = 1, pool: str = "process"
+) -> Iterator[Tuple[List[Dict[str, Any]], bool]]:
+    """Validate working-tree target files, re-running rules only where needed.
+
+    Files whose content hash and module structure match the cache entry for
+    the ruleset reuse its diagnostics; the others are validated with
+    iter_targets and their entries are updated. A changed schema
+    invalidates every entry. The cache is written once all files are done.
+
+    Yields:
+        The diagnostics of each target file, in target order, and whether
+        they were taken from the cache
+    """
+    rulesets = load_validation_cache(repo_root, schema.digest)
+    section = rulesets.get(ruleset, {})
+    states: Dict[str, Dict[str, Any] | None] = {}
+    dirty: List[str] = []
+    for rel in paths:
+        states[rel], unchanged = file_state(repo_root, rel, section.get(rel))
+        if not unchanged:
+            dirty.append(rel)
+    # Dirty files are validated in target order, so their results are
+    # consumed in step with the targets
+    fresh = iter_targets(dirty, repo_root, None, workers, pool, schema.source, ruleset)
+    dirty_set = set(dirty)
+
+    # Entries of files outside this run's targets are kept while the files exist
+    entries = {
+        rel: entry for rel, entry in section.items()
+        if rel not in states and os.path.isfile(os.path.join(repo_root, rel))
+    }
+    for rel in paths:
+        if rel in dirty_set:
+            file_diags, structure = next(fresh)
+            entry = {"structure": structure, "diagnostics": file_diags}
+        else:
+            file_diags = section[rel]["diagnostics"]
+            entry = section[rel]
+        yield file_diags, rel not in dirty_set
+        if states[rel] is not None:
+            entries[rel] = {**entry, **states[rel]}
+    if entries != section:
+        save_validation_cache(repo_root, schema.digest, {**rulesets, ruleset: entries})
+
+
+def stream(argv: List[str], repo_root: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Validate and yield each ("diagnostic", diagnostic) as it is produced.
+
+    The diagnostics of each target file come in target order, then those of
+    the repository rules, then ("meta", meta) and, last, ("summary",
+    summary). run() collects the same records.
+    """
+    args = parse_args(argv)
+    workers = args.workers if args.workers is not None else int(os.getenv(WORKERS_ENV, "0")) or min(8, os.cpu_count() or 1)
+    if workers < 1:
+        raise InvalidInputError(f"Invalid worker count: {workers}")
+    pool = args.pool or DEFAULT_POOL
+    tree = resolve_tree(repo_root, args.ref) if args.ref else None
+    files = list_tree(repo_root, tree) if tree else None
+    schema = load_validator(repo_root, files)
+
+    located = focus_files(repo_root, args.focus, not args.noCache, args.ref) if args.focus else None
+    if located is not None:
+        module_dir, subtree, neighbours, entries, unit_table = located
+        focus_node = check_focus_scope(args.focus, args.scope, module_dir, entries)
+        target_files = sorted(subtree + neighbours)
+    else:
+        target_files = collect_targets(args.targets, repo_root, files)
+        unit_table = None
+
+    if tree or args.noCache:
+        results = ((file_diags, False) for file_diags, _structure in iter_targets(
+            target_files, repo_root, tree, workers, pool, schema.source, args.ruleset
+        ))
+    else:
+        results = iter_incremental(target_files, repo_root, args.ruleset, schema, workers, pool)
+
+    def repository_results() -> Iterator[Tuple[List[Dict[str, Any]], bool]]:
+        # Repository rules, e.g. the core documents enforced by CI/strict and
+        # the references of the target files; they run after the file rules,
+        # whose diagnostics need no repository-wide index
+        _file_rules, repository_rules = select_rules(args.ruleset)
+        repository = RepositoryContext(repo_root, files, schema, tree, target_files, not args.noCache, unit_table)
+        yield check_repository(repository, repository_rules), False
+
+    counts = dict.fromkeys(SEVERITY, 0)
+    skipped = 0
+    for file_diags, cached in itertools.chain(results, repository_results()):
+        skipped += cached
+        for d in file_diags:
+            counts[d["severity"]] = counts.get(d["severity"], 0) + 1
+            yield "diagnostic", d
+
+    meta = {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "toolVersion": TOOL_VERSION,
+        "schemaVersion": "1",
+        "filesChecked": len(target_files) - skipped,
+        "filesSkipped": skipped,
+    }
+    if tree:
+        meta["tree"] = tree
+    if located is not None:
+        meta["focus"] = {"id": focus_node["id"] if focus_node else None, "path": module_dir, "nodes": len(subtree), "neighbors": len(neighbours)}
+    yield "meta", meta
+    yield "summary", {
+        "errors": counts["error"],
+        "warnings": counts["warning"],
+        "infos": counts["info"],
         "ruleset": args.ruleset,
         "scope": args.scope or "auto",
     }
-    out = {"diagnostics": diags, "summary": summary, "meta": {"generatedAt": datetime.utcnow().isoformat() + "Z", "toolVersion": "0.1.0", "schemaVersion": "1"}}
+
+
+def run(argv: List[str], repo_root: str) -> Dict[str, Any]:
+    diags: List[Dict[str, Any]] = []
+    records: Dict[str, Dict[str, Any]] = {}
+    for kind, record in stream(argv, repo_root):
+        if kind == "diagnostic":
+            diags.append(record)
+        else:
+            records[kind] = record
+    return {"diagnostics": diags, "summary": records["summary"], "meta": records["meta"]}
+
+
+def main() -> int:
+    if parse_args(sys.argv[1:]).outputFormat == "ndjson":
+        for kind, record in stream(sys.argv[1:], os.getcwd()):
+            print(json.dumps({kind: record}, separators=(",", ":")), flush=True)
+        return 1 if record["errors"] > 0 else 0
+
+    out = run(sys.argv[1:], os.getcwd())
     print(json.dumps(out, indent=2))
 
-    return 1 if summary["errors"] > 0 else 0
+    return 1 if out["summary"]["errors"] > 0 else 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(cli_main(main))
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Shared repository walker for the semantic scripts.
+
+Walks a tree once with os.scandir, prunes excluded directories (VCS metadata,
+dependency and build output, anything matched by .gitignore files or the
+configured exclude list) and matches every requested glob pattern in the
+same pass. Large top-level subtrees are scanned in parallel threads.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Pattern, Tuple
+
+
+# Always pruned, regardless of ignore files. Build output is only pruned at
+# the repository root: a module or cluster may itself be named build or dist
+DEFAULT_EXCLUDES = (
+    ".git/", ".hg/", ".svn/", "node_modules/", ".venv/", "venv/", "__pycache__/",
+    ".tox/", ".nox/", ".mypy_cache/", ".pytest_cache/", ".ruff_cache/",
+    "/build/", "/dist/", "/htmlcov/", "*.egg-info/",
+)
+
+# Ignore files honoured in every directory of the walk
+IGNORE_FILES = (".gitignore",)
+
+# Comma-separated extra exclude patterns, in .gitignore syntax
+EXCLUDE_ENV = "SEMANTIC_EXCLUDE"
+
+
+def glob_to_regex(pattern: str, ignore_case: bool = False) -> Pattern[str]:
+    """Compile a glob with ``**`` support into a regex over '/'-separated paths."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out) + r"\Z", re.IGNORECASE if ignore_case else 0)
+
+
+class IgnoreRules:
+    """Ordered .gitignore-style rules; the last matching rule wins."""
+
+    def __init__(self, rules: Tuple[Tuple[str, Pattern[str], bool, bool], ...] = ()):
+        # (base directory, regex, negated, directories only)
+        self.rules = rules
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str], base: str = "") -> "IgnoreRules":
+        return cls().extend(patterns, base)
+
+    def extend(self, lines: Iterable[str], base: str = "") -> "IgnoreRules":
+        """Return new rules with the given pattern lines appended.
+
+        Args:
+            lines: Lines in .gitignore syntax
+            base: Directory the patterns are relative to ("" for the walk root)
+        """
+        rules = list(self.rules)
+        for raw in lines:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = glob_to_regex(line if anchored else "**/" + line)
+            rules.append((base, regex, negated, dir_only))
+        return IgnoreRules(tuple(rules))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Return True if a '/'-separated path relative to the walk root is ignored."""
+        result = False
+        for base, regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                path = rel_path[len(base) + 1:]
+            else:
+                path = rel_path
+            if regex.match(path):
+                result = not negated
+        return result
+
+
+def default_rules(excludes: Iterable[str] | None = None) -> IgnoreRules:
+    """Built-in excludes plus SEMANTIC_EXCLUDE plus the given patterns."""
+    env = [p.strip() for p in os.getenv(EXCLUDE_ENV, "").split(",") if p.strip()]
+    return IgnoreRules.from_patterns([*DEFAULT_EXCLUDES, *env, *(excludes or [])])
+
+
+def is_excluded(rel_path: str, excludes: Iterable[str] | None = None) -> bool:
+    """Return True if a repository-relative file path falls under an excluded pattern.
+
+    Every parent directory is checked too, so files inside excluded
+    directories are excluded.
+    """
+    rules = default_rules(excludes)
+    parts = rel_path.replace("\\", "/").strip("/").split("/")
+    for i in range(1, len(parts)):
+        if rules.ignored("/".join(parts[:i]), True):
+            return True
+    return rules.ignored("/".join(parts), False)
+
+
+def _read_ignore_file(path: str) -> List[str]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.readlines()
+    except OSError:
+        return []
+
+
+def _scan(
+    root: str,
+    start_rel: str,
+    rules: IgnoreRules,
+    matchers: List[Tuple[int, Pattern[str]]],
+    ignore_files: Tuple[str, ...],
+) -> List[Tuple[int, str]]:
+    """Depth-first scan of one subtree; returns (pattern index, relative path) pairs."""
+    found: List[Tuple[int, str]] = []
+    stack = [(start_rel, rules)]
+    while stack:
+        dir_rel, dir_rules = stack.pop()
+        dir_abs = os.path.join(root, dir_rel) if dir_rel else root
+        try:
+            with os.scandir(dir_abs) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        names = {e.name for e in entries}
+        for ignore_file in ignore_files:
+            if ignore_file in names:
+                dir_rules = dir_rules.extend(
+                    _read_ignore_file(os.path.join(dir_abs, ignore_file)), dir_rel
+                )
+        for entry in entries:
+            rel = f"{dir_rel}/{entry.name}" if dir_rel else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if dir_rules.ignored(rel, is_dir):
+                continue
+            if is_dir:
+                stack.append((rel, dir_rules))
+                continue
+            for index, regex in matchers:
+                if regex.match(rel):
+                    found.append((index, rel))
+    return found
+
+
+def walk(
+    root: str,
+    patterns: List[str],
+    excludes: Iterable[str] | None = None,
+    ignore_files: Tuple[str, ...] = IGNORE_FILES,
+    ignore_case: bool = False,
+    max_workers: int | None = None,
+) -> Dict[str, List[str]]:
+    """Find files under root matching any of the glob patterns in a single pass.
+
+    Args:
+        root: Directory to walk
+        patterns: Globs relative to root; ``**`` matches any number of directories
+        excludes: Extra .gitignore-style exclude patterns
+        ignore_files: Per-directory ignore files to honour
+        ignore_case: Match the requested patterns case-insensitively
+        max_workers: Threads used for top-level subtrees (default: CPU count, max 8)
+
+    Returns:
+        Mapping of each pattern to the sorted '/'-separated paths, relative
+        to root, that it matched
+    """
+    matchers = [(i, glob_to_regex(p, ignore_case)) for i, p in enumerate(patterns)]
+    rules = default_rules(excludes)
+    for ignore_file in ignore_files:
+        rules = rules.extend(_read_ignore_file(os.path.join(root, ignore_file)))
+
+    found: List[Tuple[int, str]] = []
+    subtrees: List[str] = []
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        entries = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if rules.ignored(entry.name, is_dir):
+            continue
+        if is_dir:
+            subtrees.append(entry.name)
+        else:
+            found.extend((i, entry.name) for i, regex in matchers if regex.match(entry.name))
+
+    workers = max_workers or min(8, os.cpu_count() or 1)
+    if workers > 1 and len(subtrees) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(lambda d: _scan(root, d, rules, matchers, ignore_files), subtrees):
+                found.extend(part)
+    else:
+        for d in subtrees:
+            found.extend(_scan(root, d, rules, matchers, ignore_files))
+
+    results: Dict[str, List[str]] = {p: [] for p in patterns}
+    for index, rel in found:
+        results[patterns[index]].append(rel)
+    for paths in results.values():
+        paths.sort()
+    return results
+
+
+def walk_subtree(
+    root: str,
+    subdir: str,
+    patterns: List[str],
+    excludes: Iterable[str] | None = None,
+    ignore_files: Tuple[str, ...] = IGNORE_FILES,
+    ignore_case: bool = False,
+) -> Dict[str, List[str]]:
+    """Find the files walk(root, ...) would find under one subdirectory, walking only that subdirectory.
+
+    The ignore files of root and of every directory between root and subdir
+    apply as they do in a full walk, and an ignored subdir yields nothing.
+
+    Args:
+        root: Walk root that patterns and the returned paths are relative to
+        subdir: '/'-separated directory below root to walk
+        patterns: Globs relative to root; ``**`` matches any number of directories
+        excludes: Extra .gitignore-style exclude patterns
+        ignore_files: Per-directory ignore files to honour
+        ignore_case: Match the requested patterns case-insensitively
+
+    Returns:
+        Mapping of each pattern to the sorted '/'-separated paths, relative
+        to root, that it matched
+    """
+    results: Dict[str, List[str]] = {p: [] for p in patterns}
+    matchers = [(i, glob_to_regex(p, ignore_case)) for i, p in enumerate(patterns)]
+    rules = default_rules(excludes)
+    for ignore_file in ignore_files:
+        rules = rules.extend(_read_ignore_file(os.path.join(root, ignore_file)))
+    parts = subdir.replace("\\", "/").strip("/").split("/")
+    for i in range(1, len(parts) + 1):
+        rel = "/".join(parts[:i])
+        if rules.ignored(rel, True):
+            return results
+        # subdir's own ignore files are read by the scan
+        if i < len(parts):
+            for ignore_file in ignore_files:
+                rules = rules.extend(_read_ignore_file(os.path.join(root, rel, ignore_file)), rel)
+    for index, rel in _scan(root, "/".join(parts), rules, matchers, ignore_files):
+        results[patterns[index]].append(rel)
+    for paths in results.values():
+        paths.sort()
+    return results
@@ -4,6 +4,7 @@ This module provides common fixtures used across unit, integration, and semantic
 It sets up test clients, mock data, and test environment configurations.
 """
 import os
+import shutil
 import pytest
 import tempfile
 from pathlib import Path
@@ -56,6 +57,28 @@ def temp_repo_dir() -> Generator[Path, None, None]:
         yield repo_path
 
 
+@pytest.fixture
+def scripts_repo_dir(temp_repo_dir: Path) -> Path:
+    """Provide a temporary repository with the real semantic scripts and one module.
+    
+    Args:
+        temp_repo_dir: Temporary repository directory
+        
+    Returns:
+        Path: Path to the temporary repository
+    """
+    scripts_src = Path(__file__).resolve().parent.parent / "scripts"
+    for script in scripts_src.glob("*.py"):
+        shutil.copy(script, temp_repo_dir / "scripts" / script.name)
+    
+    module_dir = temp_repo_dir / "modules" / "core"
+    module_dir.mkdir(parents=True)
+    (module_dir / "semantic-instructions.md").write_text(
+        "---\nscope: module\nid: core\nname: Core\nowners: [\"@team-core\"]\n---\n\n# Core\n"
+    )
+    return temp_repo_dir
+
+
 @pytest.fixture
 def mock_glossary_file(temp_repo_dir: Path) -> Path:
     """Create a mock glossary file for testing.
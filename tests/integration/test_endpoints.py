@@ -3,6 +3,8 @@
 Tests all HTTP endpoints of the MCP server to ensure they respond correctly
 and handle various request scenarios.
 """
+import json
+
 import pytest
 
 
@@ -29,6 +31,7 @@ class TestRootEndpoints:
         assert "/semantic/validate" in endpoints["validate"]
         assert "/semantic/drift" in endpoints["drift"]
         assert "/semantic/glossary" in endpoints["glossary"]
+        assert "/semantic/gravity" in endpoints["gravity"]
         assert "/semantic/adr" in endpoints["adr"]
     
     def test_health_check_endpoint(self, test_client):
@@ -107,6 +110,133 @@ class TestSemanticGraphEndpoints:
         response = test_client.post("/semantic/graph", json=payload)
         assert response.status_code in [200, 500]
     
+    @pytest.mark.integration
+    def test_get_semantic_graph_with_filters(self, test_client):
+        """Test GET /semantic/graph with projection and filters."""
+        response = test_client.get(
+            "/semantic/graph",
+            params={"include": "name", "filters": '{"scope": "project"}'}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [n["scope"] for n in data["nodes"]] == ["project"]
+        assert set(data["nodes"][0]) == {"id", "scope", "name"}
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_unknown_include(self, test_client):
+        """Test that an unknown projection field is rejected."""
+        response = test_client.get("/semantic/graph", params={"include": "bogus"})
+        assert response.status_code == 400
+        assert "Unknown node field" in response.json()["error"]
+        response = test_client.post("/semantic/graph", json={"include": ["bogus"]})
+        assert response.status_code == 400
+        response = test_client.get("/semantic/graph/export", params={"format": "csv", "include": "bogus"})
+        assert response.status_code == 400
+    
+    @pytest.mark.integration
+    def test_busy_runner_is_service_unavailable(self, test_client, monkeypatch):
+        """Test that a saturated script runner is reported as 503."""
+        from mcp_server.adapters import FilesystemAdapter, RunnerBusyError
+        
+        async def busy(self, script_name, args):
+            raise RunnerBusyError("Script execution rejected: all script threads are busy")
+        
+        monkeypatch.setattr(FilesystemAdapter, "run_script_async", busy)
+        for path in ["/semantic/graph", "/semantic/validate", "/semantic/drift", "/semantic/gravity", "/semantic/adr"]:
+            response = test_client.get(path)
+            assert response.status_code == 503, path
+            assert "busy" in response.json()["error"]
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_focus(self, test_client):
+        """Test that a project focus builds the whole graph and an unknown focus is rejected."""
+        response = test_client.get("/semantic/graph", params={"focus": "."})
+        assert response.status_code == 200
+        assert response.json()["nodes"][0]["scope"] == "project"
+        
+        response = test_client.get("/semantic/graph", params={"focus": "module:missing"})
+        assert response.status_code == 400
+        assert "Unknown focus" in response.json()["error"]
+        response = test_client.get("/semantic/graph/export", params={"format": "csv", "focus": "module:missing"})
+        assert response.status_code == 400
+        response = test_client.post("/semantic/validate", json={"focus": "module:missing"})
+        assert response.status_code == 400
+        response = test_client.get("/semantic/validate/stream", params={"focus": "module:missing"})
+        assert response.status_code == 400
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_invalid_filters(self, test_client):
+        """Test that unknown filter keys are rejected."""
+        response = test_client.get(
+            "/semantic/graph", params={"filters": '{"colour": "red"}'}
+        )
+        assert response.status_code == 400
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_ndjson(self, test_client):
+        """Test that outputFormat=ndjson streams one record per line."""
+        import json
+        
+        response = test_client.get("/semantic/graph", params={"outputFormat": "ndjson"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0]["node"]["scope"] == "project"
+        assert list(lines[-1]) == ["meta"]
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_pages(self, test_client):
+        """Test that following nextCursor returns the whole graph."""
+        full = test_client.get("/semantic/graph").json()
+        
+        nodes, edges, cursor = [], [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = test_client.get("/semantic/graph", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            nodes += page["nodes"]
+            edges += page["edges"]
+            cursor = page["meta"].get("nextCursor")
+            if cursor is None:
+                break
+        
+        assert [n["id"] for n in nodes] == [n["id"] for n in full["nodes"]]
+        assert len(edges) == len(full["edges"])
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_invalid_cursor(self, test_client):
+        """Test that a bad cursor or a cursor without limit is rejected."""
+        response = test_client.get("/semantic/graph", params={"limit": 2, "cursor": "bogus"})
+        assert response.status_code == 400
+        response = test_client.get("/semantic/graph", params={"cursor": "bogus"})
+        assert response.status_code == 400
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_at_ref(self, test_client):
+        """Test the graph of a git ref, which carries its tree SHA."""
+        response = test_client.get("/semantic/graph", params={"ref": "HEAD"})
+        assert response.status_code == 200
+        assert len(response.json()["meta"]["tree"]) == 40
+        response = test_client.get("/semantic/graph", params={"ref": "no-such-branch"})
+        assert response.status_code == 400
+    
+    @pytest.mark.integration
+    def test_get_graph_delta(self, test_client):
+        """Test the delta of a snapshot with itself."""
+        response = test_client.get("/semantic/graph/delta", params={"baseRef": "HEAD", "headRef": "HEAD"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["base"]["tree"] == data["head"]["tree"]
+        assert data["summary"]["filesChanged"] == 0
+        assert data["nodes"] == {"added": [], "removed": [], "modified": []}
+        for params in ({"baseRef": "nope"}, {"baseRef": "HEAD", "headRef": "nope"}):
+            response = test_client.get("/semantic/graph/delta", params=params)
+            assert response.status_code == 400
+            assert response.json()["error"] == "Unknown git ref: nope"
+    
     @pytest.mark.integration
     def test_semantic_graph_invalid_format(self, test_client):
         """Test semantic graph with invalid output format."""
@@ -163,6 +293,15 @@ class TestValidationEndpoints:
         response = test_client.post("/semantic/validate", json=payload)
         assert response.status_code in [200, 500]
     
+    @pytest.mark.integration
+    def test_validate_at_ref(self, test_client):
+        """Test validation of a git ref."""
+        response = test_client.get("/semantic/validate", params={"ref": "HEAD"})
+        assert response.status_code == 200
+        assert len(response.json()["meta"]["tree"]) == 40
+        response = test_client.post("/semantic/validate", json={"ref": "no-such-branch"})
+        assert response.status_code == 400
+    
     @pytest.mark.integration
     def test_validate_with_targets(self, test_client):
         """Test validation with specific targets."""
@@ -172,6 +311,33 @@ class TestValidationEndpoints:
         )
         
         assert response.status_code in [200, 500]
+    
+    @pytest.mark.integration
+    def test_stream_validation_ndjson(self, test_client):
+        """Test GET /semantic/validate/stream as NDJSON, ending with the summary."""
+        response = test_client.get("/semantic/validate/stream", params={"ruleset": "strict"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [next(iter(line)) for line in lines[-2:]] == ["meta", "summary"]
+        assert lines[-1]["summary"]["ruleset"] == "strict"
+        diagnostics = [line["diagnostic"] for line in lines if "diagnostic" in line]
+        assert lines[-1]["summary"]["errors"] == sum(d["severity"] == "error" for d in diagnostics)
+    
+    @pytest.mark.integration
+    def test_stream_validation_sse(self, test_client):
+        """Test POST /semantic/validate/stream as Server-Sent Events."""
+        response = test_client.post("/semantic/validate/stream", json={"format": "sse", "ref": "HEAD"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [e.split("\n") for e in response.text.strip().split("\n\n")]
+        assert [e[0] for e in events[-2:]] == ["event: meta", "event: summary"]
+        assert len(json.loads(events[-2][1][len("data: "):])["tree"]) == 40
+        
+        response = test_client.post("/semantic/validate/stream", json={"ref": "no-such-branch"})
+        assert response.status_code == 400
 
 
 class TestDriftEndpoints:
@@ -326,6 +492,76 @@ class TestADREndpoints:
         assert response.status_code in [200, 500]
 
 
+class TestGraphQueryEndpoints:
+    """Test semantic graph query endpoints."""
+    
+    @pytest.mark.integration
+    def test_neighbors_of_project(self, test_client):
+        """Test GET /semantic/graph/query from the project node."""
+        response = test_client.get(
+            "/semantic/graph/query", params={"kind": "neighbors", "ids": "."}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["query"]["kind"] == "neighbors"
+        assert data["query"]["depth"] == 1
+        assert data["nodes"][0]["path"] == "."
+        assert data["distances"][data["nodes"][0]["id"]] == 0
+    
+    @pytest.mark.integration
+    def test_unknown_node(self, test_client):
+        """Test that unknown start nodes return 404."""
+        response = test_client.get(
+            "/semantic/graph/query", params={"kind": "expand", "ids": "module:missing"}
+        )
+        assert response.status_code == 404
+    
+    @pytest.mark.integration
+    def test_path_requires_target(self, test_client):
+        """Test that path queries without a target are rejected."""
+        response = test_client.get(
+            "/semantic/graph/query", params={"kind": "path", "ids": "."}
+        )
+        assert response.status_code == 400
+    
+    @pytest.mark.integration
+    def test_invalid_kind(self, test_client):
+        """Test that unknown query kinds fail validation."""
+        response = test_client.get(
+            "/semantic/graph/query", params={"kind": "everything", "ids": "."}
+        )
+        assert response.status_code == 422
+
+
+class TestRuntimeEndpoints:
+    """Test runtime statistics endpoints."""
+    
+    @pytest.mark.integration
+    def test_get_runtime_stats(self, test_client):
+        """Test GET /semantic/runtime/stats returns coalescing counters."""
+        response = test_client.get("/semantic/runtime/stats")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert "singleFlight" in data
+        for counter in ("calls", "executions", "coalesced", "inFlight"):
+            assert counter in data["singleFlight"]
+        for counter in ("hits", "misses", "evictions", "size"):
+            assert counter in data["cache"]
+        assert data["watcher"] is None
+    
+    @pytest.mark.integration
+    def test_invalidate_cache(self, test_client):
+        """Test DELETE /semantic/runtime/cache."""
+        response = test_client.delete("/semantic/runtime/cache", params={"tool": "glossary"})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["tool"] == "glossary"
+        assert data["invalidated"] >= 0
+
+
 class TestErrorHandling:
     """Test error handling across endpoints."""
     
@@ -367,3 +603,89 @@ class TestCORSHeaders:
         assert response.status_code == 200
         # In test environment, CORS headers may or may not be present
         # depending on test client configuration
+
+
+class TestGravityEndpoints:
+    """Test Semantic Gravity endpoints."""
+    
+    @pytest.mark.integration
+    def test_get_gravity(self, test_client):
+        """Test GET /semantic/gravity."""
+        response = test_client.get("/semantic/gravity", params={"top": 5})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["schemaVersion"] == "1.0"
+        assert len(data["modules"]) <= 5
+        assert "writtenTo" not in data
+    
+    @pytest.mark.integration
+    def test_get_gravity_invalid_threshold(self, test_client):
+        """Test that thresholds outside 0-100 are rejected."""
+        response = test_client.get("/semantic/gravity", params={"threshold": 150})
+        assert response.status_code == 422
+
+
+class TestGraphExportEndpoints:
+    """Test graph export endpoints."""
+    
+    @pytest.mark.integration
+    def test_export_dot(self, test_client):
+        """Test exporting the graph as Graphviz DOT."""
+        response = test_client.get("/semantic/graph/export", params={"format": "dot"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/vnd.graphviz")
+        assert "semantic-graph.dot" in response.headers["content-disposition"]
+        assert response.text.startswith("digraph SemanticGraph {")
+        assert response.text.rstrip().endswith("}")
+    
+    @pytest.mark.integration
+    def test_export_graphml(self, test_client):
+        """Test exporting the graph as well-formed GraphML."""
+        import xml.etree.ElementTree as ET
+        
+        graph = test_client.get("/semantic/graph").json()
+        response = test_client.get("/semantic/graph/export", params={"format": "graphml"})
+        
+        assert response.status_code == 200
+        ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+        root = ET.fromstring(response.content)
+        assert len(root.findall(".//g:node", ns)) == len(graph["nodes"])
+        assert len(root.findall(".//g:edge", ns)) == len(graph["edges"])
+    
+    @pytest.mark.integration
+    def test_export_csv_tables(self, test_client):
+        """Test exporting the node and edge tables as CSV."""
+        import csv
+        import io
+        
+        graph = test_client.get("/semantic/graph").json()
+        
+        nodes = test_client.get(
+            "/semantic/graph/export", params={"format": "csv", "include": "name,path"}
+        )
+        assert nodes.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(nodes.text)))
+        assert list(rows[0]) == ["id", "scope", "name", "path"]
+        assert [r["id"] for r in rows] == [n["id"] for n in graph["nodes"]]
+        
+        edges = test_client.get("/semantic/graph/export", params={"format": "csv", "table": "edges"})
+        rows = list(csv.DictReader(io.StringIO(edges.text)))
+        assert [(r["from"], r["to"], r["type"]) for r in rows] == [
+            (e["from"], e["to"], e["type"]) for e in graph["edges"]
+        ]
+    
+    @pytest.mark.integration
+    def test_export_unknown_format(self, test_client):
+        """Test that unknown export formats are rejected."""
+        response = test_client.get("/semantic/graph/export", params={"format": "xlsx"})
+        assert response.status_code == 422
+    
+    @pytest.mark.integration
+    def test_get_semantic_graph_dot(self, test_client):
+        """Test that outputFormat=dot returns DOT instead of failing validation."""
+        response = test_client.get("/semantic/graph", params={"outputFormat": "dot"})
+        
+        assert response.status_code == 200
+        assert response.text.startswith("digraph SemanticGraph {")
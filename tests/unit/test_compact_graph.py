@@ -0,0 +1,37 @@
+"""Unit tests for the compact semantic graph.
+
+Tests the array-backed graph of scripts/semantic_compact.py.
+"""
+from mcp_server.adapters import FilesystemAdapter
+
+
+class TestCompactGraph:
+    """Tests for the array-backed graph returned by semantic_graph.py."""
+    
+    def test_in_process_result_is_compact(self, scripts_repo_dir):
+        """Test that in-process runs return the compact graph, not dicts."""
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        graph = adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        
+        assert graph.num_nodes == 2
+        assert graph.edge_types == ["contains"]
+        core = graph.node_index("module:modules/core")
+        project = graph.node_index(graph.ids[0])
+        assert list(graph.successors(project, "contains")) == [core]
+    
+    def test_ids_select_by_id_or_path(self, scripts_repo_dir):
+        """Test that --ids keeps matching nodes and the edges between them."""
+        api_dir = scripts_repo_dir / "modules" / "api"
+        api_dir.mkdir()
+        (api_dir / "semantic-instructions.md").write_text("---\nscope: module\n---\n")
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        project_id = f"project:{scripts_repo_dir.name}"
+        
+        result = adapter.run_script(
+            "semantic_graph.py", ["--ids", project_id, "modules/api"]
+        ).to_dict()
+        
+        assert [n["id"] for n in result["nodes"]] == [project_id, "module:modules/api"]
+        assert result["edges"] == [
+            {"from": project_id, "to": "module:modules/api", "type": "contains"}
+        ]
@@ -2,9 +2,13 @@
 
 Tests the filesystem adapter that reads repository data and executes scripts.
 """
+import shutil
+import sys
+from pathlib import Path
+
 import pytest
 
-from mcp_server.adapters import FilesystemAdapter
+from mcp_server.adapters import FilesystemAdapter, InvalidInputError
 
 
 class TestFilesystemAdapter:
@@ -246,3 +250,276 @@ class TestFilesystemAdapterSecurity:
         for attempt in traversal_attempts:
             with pytest.raises(RuntimeError):
                 adapter.run_script(attempt, [])
+
+
+class TestInProcessExecution:
+    """Tests for the in-process script execution mode."""
+    
+    def test_invalid_execution_mode(self, temp_repo_dir):
+        """Test that an unknown execution mode is rejected."""
+        with pytest.raises(ValueError, match="Invalid execution mode"):
+            FilesystemAdapter(repo_root=str(temp_repo_dir), execution_mode="threads")
+    
+    def test_execution_mode_from_environment(self, temp_repo_dir, monkeypatch):
+        """Test that the execution mode defaults to the environment setting."""
+        monkeypatch.setenv("MCP_SCRIPT_EXECUTION", "subprocess")
+        adapter = FilesystemAdapter(repo_root=str(temp_repo_dir))
+        assert adapter.execution_mode == "subprocess"
+    
+    def test_graph_runs_in_process(self, scripts_repo_dir):
+        """Test that a supported script is called without a subprocess."""
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        result = adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()
+        
+        ids = [n["id"] for n in result["nodes"]]
+        assert "module:modules/core" in ids
+    
+    def test_in_process_matches_subprocess(self, scripts_repo_dir):
+        """Test that both execution modes produce the same result."""
+        in_process = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        isolated = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="subprocess")
+        
+        for script, args in [
+            ("semantic_graph.py", ["--scope", "project"]),
+            ("semantic_validator.py", ["--ruleset", "strict"]),
+            ("adr_index.py", ["--root", "docs"]),
+        ]:
+            a = in_process.run_script(script, args)
+            b = isolated.run_script(script, args)
+            if hasattr(a, "to_dict"):
+                a = a.to_dict()
+            a.pop("meta")
+            b.pop("meta")
+            assert a == b
+    
+    def test_in_process_invalid_arguments(self, scripts_repo_dir):
+        """Test that argument errors raised by argparse become RuntimeError."""
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        
+        with pytest.raises(RuntimeError, match="Script execution failed"):
+            adapter.run_script("semantic_graph.py", ["--scope", "galaxy"])
+    
+    @pytest.mark.parametrize("mode", ["inprocess", "pool", "subprocess"])
+    async def test_rejected_input_is_value_error(self, scripts_repo_dir, mode):
+        """Test that an InvalidInputError raised by a script reaches the caller unchanged in every mode."""
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode=mode)
+        
+        with pytest.raises(InvalidInputError, match="Unknown focus: missing"):
+            await adapter.run_script_async("semantic_graph.py", ["--focus", "missing"])
+        with pytest.raises(InvalidInputError, match="Unknown focus: missing"):
+            async for _record in adapter.stream_script_async("semantic_validator.py", ["--focus", "missing"]):
+                pass
+    
+    @pytest.mark.parametrize("mode", ["inprocess", "pool", "subprocess"])
+    async def test_internal_value_error_is_failure(self, temp_repo_dir, mode):
+        """Test that a ValueError a script did not raise on purpose is a failed run in every mode."""
+        scripts_dir = temp_repo_dir / "scripts"
+        shutil.copy(Path(__file__).parents[2] / "scripts" / "semantic_cli.py", scripts_dir)
+        (scripts_dir / "semantic_gravity.py").write_text(FAULTY_SCRIPT)
+        adapter = FilesystemAdapter(repo_root=str(temp_repo_dir), execution_mode=mode)
+        
+        with pytest.raises(RuntimeError, match="Script execution failed") as excinfo:
+            await adapter.run_script_async("semantic_gravity.py", [])
+        assert not isinstance(excinfo.value, ValueError)
+
+
+class TestAsyncExecution:
+    """Tests for the non-blocking run_script_async API."""
+    
+    async def test_run_script_async_subprocess(self, temp_repo_dir):
+        """Test running an isolated script through an asyncio subprocess."""
+        script_path = temp_repo_dir / "scripts" / "echo.py"
+        script_path.write_text('import json, sys; print(json.dumps({"args": sys.argv[1:]}))')
+        
+        adapter = FilesystemAdapter(repo_root=str(temp_repo_dir))
+        result = await adapter.run_script_async("echo.py", ["--scope", "module"])
+        assert result["args"] == ["--scope", "module"]
+    
+    async def test_run_script_async_in_process(self, scripts_repo_dir):
+        """Test running a supported script on the thread pool."""
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        result = await adapter.run_script_async("semantic_graph.py", ["--scope", "project"])
+        result = result.to_dict()
+        assert any(n["id"] == "module:modules/core" for n in result["nodes"])
+    
+    async def test_concurrent_calls_overlap(self, temp_repo_dir):
+        """Test that concurrent calls do not serialize on the event loop."""
+        import asyncio
+        import time
+        
+        script_path = temp_repo_dir / "scripts" / "sleepy.py"
+        script_path.write_text('import json, time; time.sleep(1); print(json.dumps({"ok": True}))')
+        
+        adapter = FilesystemAdapter(repo_root=str(temp_repo_dir))
+        start = time.monotonic()
+        results = await asyncio.gather(*[
+            adapter.run_script_async("sleepy.py", ["--scope", f"s{i}"]) for i in range(3)
+        ])
+        elapsed = time.monotonic() - start
+        
+        assert all(r["ok"] for r in results)
+        assert elapsed < 2.5
+    
+    async def test_run_script_async_timeout(self, temp_repo_dir):
+        """Test that a slow subprocess is killed on timeout."""
+        script_path = temp_repo_dir / "scripts" / "slow_script.py"
+        script_path.write_text('import time; time.sleep(60)')
+        
+        adapter = FilesystemAdapter(repo_root=str(temp_repo_dir))
+        adapter.subprocess_runner.timeout = 0.5
+        
+        with pytest.raises(RuntimeError, match="timed out"):
+            await adapter.run_script_async("slow_script.py", [])
+    
+    async def test_saturated_runner_rejects(self, temp_repo_dir):
+        """Test that scripts outliving their timeout hold their thread and new work is rejected once the backlog is full."""
+        import asyncio
+        from mcp_server.adapters import RunnerBusyError
+        from mcp_server.adapters.script_runner import InProcessScriptRunner
+        
+        script_path = temp_repo_dir / "scripts" / "semantic_graph.py"
+        script_path.write_text(BLOCKING_SCRIPT)
+        runner = InProcessScriptRunner(max_workers=1, timeout=0.2, backlog=1)
+        module = runner.load(script_path)
+        
+        try:
+            # The first script times out but keeps the only thread
+            with pytest.raises(RuntimeError, match="timed out"):
+                await runner.run_async(script_path, ["first"], temp_repo_dir)
+            queued = asyncio.ensure_future(runner.run_async(script_path, ["queued"], temp_repo_dir))
+            await asyncio.sleep(0)
+            with pytest.raises(RunnerBusyError):
+                await runner.run_async(script_path, ["rejected"], temp_repo_dir)
+            # A script that times out before it starts gives back its slot
+            with pytest.raises(RuntimeError, match="timed out"):
+                await queued
+        finally:
+            module.release.set()
+        
+        for _ in range(100):
+            try:
+                result = await runner.run_async(script_path, ["after"], temp_repo_dir)
+                break
+            except RunnerBusyError:
+                await asyncio.sleep(0.01)
+        assert result == {"argv": ["after"]}
+        assert module.started == ["first", "after"]
+
+
+FAULTY_SCRIPT = """
+import json
+import sys
+
+from semantic_cli import cli_main
+
+
+def run(argv, repo_root):
+    return {"count": int("missing")}
+
+
+def main():
+    print(json.dumps(run(sys.argv[1:], ".")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli_main(main))
+"""
+
+BLOCKING_SCRIPT = """
+import threading
+
+release = threading.Event()
+started = []
+
+
+def run(argv, repo_root):
+    started.extend(argv)
+    release.wait(10)
+    return {"argv": argv}
+"""
+
+STREAMING_SCRIPT = """
+produced = []
+closed = []
+
+
+def stream(argv, repo_root):
+    try:
+        for i in range(1000):
+            produced.append(i)
+            yield "diagnostic", {"n": i}
+        yield "summary", {"errors": 0}
+    finally:
+        closed.append(True)
+"""
+
+NOISY_STREAMING_SCRIPT = """
+import json
+import sys
+
+sys.stderr.write("warning\\n" * 200000)
+print(json.dumps({"diagnostic": {"n": 0}}), flush=True)
+print(json.dumps({"summary": {"errors": 0}}), flush=True)
+"""
+
+
+class TestStreamingExecution:
+    """Tests for streaming script execution."""
+    
+    @pytest.mark.parametrize("mode", ["inprocess", "subprocess"])
+    async def test_stream_matches_run(self, scripts_repo_dir, mode):
+        """Test that every execution mode streams the records of a validation run."""
+        (scripts_repo_dir / "modules" / "api").mkdir()
+        (scripts_repo_dir / "modules" / "api" / "semantic-instructions.md").write_text("---\nscope: module\n---\n")
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode=mode)
+        
+        records = [r async for r in adapter.stream_script_async("semantic_validator.py", ["--ruleset", "strict"])]
+        result = await adapter.run_script_async("semantic_validator.py", ["--ruleset", "strict"])
+        assert [record for kind, record in records if kind == "diagnostic"] == result["diagnostics"]
+        assert records[-1] == ("summary", result["summary"])
+    
+    async def test_bounded_buffer_and_early_close(self, temp_repo_dir):
+        """Test that the script waits for a slow reader and is stopped when the reader leaves."""
+        import asyncio
+        from mcp_server.adapters.script_runner import InProcessScriptRunner
+        
+        script_path = temp_repo_dir / "scripts" / "semantic_validator.py"
+        script_path.write_text(STREAMING_SCRIPT)
+        runner = InProcessScriptRunner()
+        module = runner.load(script_path)
+        
+        records = runner.stream_async(script_path, [], temp_repo_dir, buffer=2)
+        assert await records.__anext__() == ("diagnostic", {"n": 0})
+        await asyncio.sleep(0.2)
+        # Two buffered records and one waiting for a slot
+        assert len(module.produced) == 4
+        
+        await records.aclose()
+        for _ in range(50):
+            if module.closed:
+                break
+            await asyncio.sleep(0.01)
+        assert module.closed == [True]
+        assert len(module.produced) == 4
+    
+    # A script blocked on a full stderr pipe cannot even be reaped, so a
+    # regression would hang rather than fail
+    @pytest.mark.timeout(60)
+    async def test_subprocess_stream_drains_stderr(self, temp_repo_dir):
+        """Test that a streaming script writing more than a pipe buffer to stderr does not block."""
+        from mcp_server.adapters.script_runner import SubprocessScriptRunner
+        
+        script_path = temp_repo_dir / "scripts" / "semantic_validator.py"
+        script_path.write_text(NOISY_STREAMING_SCRIPT)
+        runner = SubprocessScriptRunner(python_executable=sys.executable, timeout=5)
+        
+        records = [r async for r in runner.stream_async(script_path, [], temp_repo_dir)]
+        assert records == [("diagnostic", {"n": 0}), ("summary", {"errors": 0})]
+    
+    async def test_only_streaming_scripts(self, scripts_repo_dir):
+        """Test that scripts without a stream entry point are rejected."""
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir))
+        with pytest.raises(RuntimeError, match="does not stream"):
+            async for _record in adapter.stream_script_async("semantic_graph.py", []):
+                pass
@@ -0,0 +1,179 @@
+"""Unit tests for focused evaluation.
+
+Tests that --focus locates a module or cluster subtree through the graph
+index, and that the graph and the validator evaluate only that subtree and
+its direct neighbours.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
+
+import semantic_graph  # noqa: E402
+import semantic_validator  # noqa: E402
+from semantic_walk import walk_subtree  # noqa: E402
+
+
+def write_module(root: Path, path: str, scope: str, name: str, dependencies=()) -> Path:
+    deps = f"dependencies: [{', '.join(dependencies)}]\n" if dependencies else ""
+    target = root / path / "semantic-instructions.md"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(f"---\nscope: {scope}\nid: {name}\nname: {name}\nowners: [\"@a\"]\n{deps}---\n")
+    return target
+
+
+@pytest.fixture
+def focus_repo_dir(temp_repo_dir: Path) -> Path:
+    """A repository with a cluster of two modules and three other modules."""
+    write_module(temp_repo_dir, "clusters/app", "cluster", "app")
+    write_module(temp_repo_dir, "clusters/app/api", "module", "api", ["core"])
+    write_module(temp_repo_dir, "clusters/app/web", "module", "web", ["api"])
+    write_module(temp_repo_dir, "modules/core", "module", "core")
+    write_module(temp_repo_dir, "modules/util", "module", "util")
+    write_module(temp_repo_dir, "modules/cli", "module", "cli", ["web"])
+    return temp_repo_dir
+
+
+def focus(root: Path, *argv: str):
+    graph = semantic_graph.run(["--focus", *argv], str(root)).to_dict()
+    edges = [(e["from"], e["to"], e["type"]) for e in graph["edges"]]
+    return [n["id"] for n in graph["nodes"]], edges, graph["meta"]["focus"]
+
+
+class TestFocusGraph:
+    """Test the graph of a focused subtree."""
+    
+    def test_module_with_neighbours(self, focus_repo_dir):
+        """Test that a module brings its container, dependencies and dependents only."""
+        nodes, edges, meta = focus(focus_repo_dir, "api")
+        
+        assert nodes == [
+            "project:" + focus_repo_dir.name,
+            "module:clusters/app/api",
+            "cluster:clusters/app",
+            "module:clusters/app/web",
+            "module:modules/core",
+        ]
+        assert edges == [
+            ("cluster:clusters/app", "module:clusters/app/api", "contains"),
+            ("module:clusters/app/api", "module:modules/core", "depends-on"),
+            ("module:clusters/app/web", "module:clusters/app/api", "depends-on"),
+        ]
+        assert meta == {"id": "module:clusters/app/api", "path": "clusters/app/api", "nodes": 1, "neighbors": 3}
+    
+    def test_focus_names(self, focus_repo_dir):
+        """Test that an id, a graph id, a directory and a file path name the same focus."""
+        expected = focus(focus_repo_dir, "clusters/app")
+        assert expected[2]["nodes"] == 3
+        for name in ("app", "cluster:clusters/app", "clusters/app/semantic-instructions.md", "./clusters/app/"):
+            assert focus(focus_repo_dir, name) == expected
+    
+    def test_project_focus_builds_full_graph(self, focus_repo_dir):
+        """Test that focusing the project builds the whole graph."""
+        graph = semantic_graph.run(["--focus", "."], str(focus_repo_dir)).to_dict()
+        assert len(graph["nodes"]) == 7
+        assert "focus" not in graph["meta"]
+    
+    def test_scope_mismatch_and_unknown_focus(self, focus_repo_dir):
+        """Test that a focus of another scope and an unknown focus are rejected."""
+        with pytest.raises(ValueError, match="not a cluster"):
+            semantic_graph.run(["--focus", "api", "--scope", "cluster"], str(focus_repo_dir))
+        assert focus(focus_repo_dir, "app", "--scope", "cluster")[2]["id"] == "cluster:clusters/app"
+        with pytest.raises(ValueError, match="Unknown focus"):
+            semantic_graph.run(["--focus", "missing"], str(focus_repo_dir))
+    
+    def test_stale_index_refreshed(self, focus_repo_dir):
+        """Test that a module added since the cached scan is found by its id."""
+        semantic_graph.run([], str(focus_repo_dir))
+        write_module(focus_repo_dir, "modules/fresh", "module", "fresh", ["util"])
+        
+        nodes, _edges, meta = focus(focus_repo_dir, "fresh")
+        assert nodes[1:] == ["module:modules/fresh", "module:modules/util"]
+        assert meta["neighbors"] == 1
+    
+    def test_changed_subtree_read_again(self, focus_repo_dir):
+        """Test that files of the focus that changed since the cached scan are read again."""
+        semantic_graph.run([], str(focus_repo_dir))
+        write_module(focus_repo_dir, "clusters/app/api", "module", "api", ["util"])
+        
+        nodes, _edges, _meta = focus(focus_repo_dir, "api")
+        assert "module:modules/util" in nodes
+        assert "module:modules/core" not in nodes
+    
+    def test_focus_at_ref(self, focus_repo_dir):
+        """Test that a focus is located in the tree of a git ref."""
+        git = ["git", "-c", "user.name=t", "-c", "user.email=t@t", "-C", str(focus_repo_dir)]
+        subprocess.run([*git, "init", "-q"], check=True)
+        subprocess.run([*git, "add", "clusters", "modules"], check=True)
+        subprocess.run([*git, "commit", "-qm", "init"], check=True)
+        write_module(focus_repo_dir, "modules/fresh", "module", "fresh")
+        
+        graph = semantic_graph.run(["--focus", "web", "--ref", "HEAD"], str(focus_repo_dir)).to_dict()
+        assert graph["meta"]["tree"]
+        assert graph["meta"]["focus"]["neighbors"] == 3
+        with pytest.raises(ValueError, match="Unknown focus"):
+            semantic_graph.run(["--focus", "fresh", "--ref", "HEAD"], str(focus_repo_dir))
+
+
+class TestFocusValidation:
+    """Test validation of a focused subtree."""
+    
+    def test_validates_subtree_and_neighbours(self, focus_repo_dir):
+        """Test that only the focus and its neighbours are checked."""
+        (focus_repo_dir / "modules" / "util" / "semantic-instructions.md").write_text("# broken\n")
+        (focus_repo_dir / "clusters" / "app" / "api" / "a" / "b").mkdir(parents=True)
+        
+        result = semantic_validator.run(["--focus", "api", "--noCache"], str(focus_repo_dir))
+        assert [(d["code"], d["location"]["file"]) for d in result["diagnostics"]] == [
+            ("SI003", "clusters/app/api/semantic-instructions.md"),
+        ]
+        assert result["meta"]["filesChecked"] == 4
+        assert result["meta"]["focus"] == {
+            "id": "module:clusters/app/api", "path": "clusters/app/api", "nodes": 1, "neighbors": 3,
+        }
+    
+    def test_focus_keeps_other_cache_entries(self, focus_repo_dir):
+        """Test that a focused run leaves the cached results of other files in place."""
+        root = str(focus_repo_dir)
+        semantic_validator.run([], root)
+        semantic_validator.run(["--focus", "util"], root)
+        assert semantic_validator.run([], root)["meta"]["filesSkipped"] == 6
+    
+    def test_references_checked_without_repository_walk(self, focus_repo_dir, monkeypatch):
+        """Test that the references of a focus are resolved against the index, not a new scan."""
+        root = str(focus_repo_dir)
+        semantic_validator.run([], root)
+        write_module(focus_repo_dir, "clusters/app/api", "module", "api", ["core", "missing", "app"])
+        walks = []
+        full_walk = semantic_graph.walk
+        monkeypatch.setattr(semantic_graph, "walk", lambda *args, **kwargs: walks.append(args[0]) or full_walk(*args, **kwargs))
+        
+        result = semantic_validator.run(["--focus", "api"], root)
+        assert [(d["code"], d["location"]["file"]) for d in result["diagnostics"]] == [
+            ("SI010", "clusters/app/api/semantic-instructions.md"),
+            ("SI012", "clusters/app/api/semantic-instructions.md"),
+        ]
+        assert walks == []
+
+
+class TestWalkSubtree:
+    """Test walking one subdirectory as part of a full walk."""
+    
+    def test_matches_full_walk(self, focus_repo_dir):
+        """Test that the subtree walk finds what the full walk finds below the directory."""
+        (focus_repo_dir / ".gitignore").write_text("clusters/app/web/\n")
+        (focus_repo_dir / "clusters" / ".gitignore").write_text("api/\n")
+        pattern = "**/semantic-instructions.md"
+        
+        assert walk_subtree(str(focus_repo_dir), "clusters/app", [pattern]) == {
+            pattern: ["clusters/app/semantic-instructions.md"],
+        }
+        assert walk_subtree(str(focus_repo_dir), "clusters/app/api", [pattern]) == {pattern: []}
+        assert walk_subtree(str(focus_repo_dir), "modules", [pattern])[pattern] == [
+            "modules/cli/semantic-instructions.md",
+            "modules/core/semantic-instructions.md",
+            "modules/util/semantic-instructions.md",
+        ]
@@ -0,0 +1,304 @@
+"""Unit tests for graphs, validation and graph deltas at git refs.
+
+Tests scripts/semantic_git.py, the --ref option of the semantic scripts
+and FilesystemAdapter, which read git trees without a checkout, and
+scripts/semantic_delta.py.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+from mcp_server.adapters.result_cache import ResultCache
+from mcp_server.adapters.single_flight import SingleFlight
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
+
+import semantic_delta  # noqa: E402
+import semantic_git  # noqa: E402
+import semantic_graph  # noqa: E402
+import semantic_validator  # noqa: E402
+
+
+def git(repo_dir, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo_dir, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def history_repo_dir(scripts_repo_dir):
+    """Repository with two commits and uncommitted changes.
+
+    HEAD~1  modules/core
+    HEAD    modules/core, modules/api (missing owners)
+    worktree  adds modules/web, fixes api's owners
+    """
+    git(scripts_repo_dir, "init", "-q")
+    git(scripts_repo_dir, "add", "-A")
+    git(scripts_repo_dir, "commit", "-q", "-m", "core")
+    api = scripts_repo_dir / "modules" / "api"
+    api.mkdir()
+    (api / "semantic-instructions.md").write_text("---\nscope: module\nid: api\ndependencies: [core]\n---\n")
+    git(scripts_repo_dir, "add", "-A")
+    git(scripts_repo_dir, "commit", "-q", "-m", "api")
+
+    (api / "semantic-instructions.md").write_text(
+        "---\nscope: module\nid: api\nowners: [\"@api\"]\ndependencies: [core]\n---\n"
+    )
+    web = scripts_repo_dir / "modules" / "web"
+    web.mkdir()
+    (web / "semantic-instructions.md").write_text("---\nscope: module\nid: web\n---\n")
+    return scripts_repo_dir
+
+
+def node_ids(graph):
+    return sorted(n["id"] for n in graph["nodes"])
+
+
+class TestGitObjects:
+    """Test reading trees and blobs from the object store."""
+    
+    def test_resolve_and_list_tree(self, history_repo_dir):
+        """Test that refs resolve to trees whose files can be read."""
+        root = str(history_repo_dir)
+        tree = semantic_git.resolve_tree(root, "HEAD")
+        
+        assert tree == git(history_repo_dir, "rev-parse", "HEAD^{tree}")
+        files = semantic_git.list_tree(root, tree)
+        blob, size = files["modules/api/semantic-instructions.md"]
+        content = semantic_git.read_blob(root, blob)
+        assert len(content) == size
+        assert b"owners" not in content
+        assert "modules/web/semantic-instructions.md" not in files
+    
+    def test_missing_paths_with_spaces(self, history_repo_dir):
+        """Test that a missing path with spaces is reported missing, not misread as an object."""
+        root = str(history_repo_dir)
+        tree = semantic_git.resolve_tree(root, "HEAD")
+        
+        for path in ("x y", "a b c", "x missing"):
+            assert semantic_git.read_blob(root, f"{tree}:{path}") is None
+        assert semantic_git.read_blob(root, f"{tree}:modules/api/semantic-instructions.md")
+    
+    def test_invalid_refs(self, history_repo_dir):
+        """Test that malformed and unknown refs are rejected."""
+        root = str(history_repo_dir)
+        for ref in ("", "--all", "HEAD main"):
+            with pytest.raises(ValueError, match="Invalid git ref"):
+                semantic_git.resolve_tree(root, ref)
+        with pytest.raises(ValueError, match="Unknown git ref"):
+            semantic_git.resolve_tree(root, "no-such-branch")
+        with pytest.raises(ValueError, match="Not a tree SHA"):
+            semantic_git.list_tree(root, "HEAD")
+
+
+class TestGraphAtRef:
+    """Test the semantic graph of git refs."""
+    
+    def test_graph_at_refs(self, history_repo_dir):
+        """Test that each ref sees its own tree, not the worktree."""
+        adapter = FilesystemAdapter(repo_root=str(history_repo_dir), execution_mode="inprocess")
+        
+        head = adapter.run_script("semantic_graph.py", ["--ref", "HEAD"]).to_dict()
+        previous = adapter.run_script("semantic_graph.py", ["--ref", "HEAD~1"]).to_dict()
+        worktree = adapter.run_script("semantic_graph.py", []).to_dict()
+        
+        assert node_ids(previous) == ["module:modules/core", f"project:{history_repo_dir.name}"]
+        assert "module:modules/api" in node_ids(head)
+        assert "module:modules/web" not in node_ids(head)
+        assert "module:modules/web" in node_ids(worktree)
+        assert {"from": "module:modules/api", "to": "module:modules/core", "type": "depends-on"} in head["edges"]
+        assert head["meta"]["tree"] == git(history_repo_dir, "rev-parse", "HEAD^{tree}")
+        assert "tree" not in worktree["meta"]
+    
+    def test_subprocess_matches_in_process(self, history_repo_dir):
+        """Test that the script reads refs identically in a subprocess."""
+        graphs = {}
+        for mode in ("inprocess", "subprocess"):
+            adapter = FilesystemAdapter(repo_root=str(history_repo_dir), execution_mode=mode)
+            result = adapter.run_script("semantic_graph.py", ["--ref", "HEAD"])
+            graphs[mode] = result.to_dict() if hasattr(result, "to_dict") else result
+        
+        assert graphs["subprocess"]["nodes"] == graphs["inprocess"]["nodes"]
+        assert graphs["subprocess"]["edges"] == graphs["inprocess"]["edges"]
+    
+    def test_tree_cache_on_disk(self, history_repo_dir, monkeypatch):
+        """Test that tree graphs are stored under the tree SHA and reused."""
+        root = str(history_repo_dir)
+        tree = git(history_repo_dir, "rev-parse", "HEAD^{tree}")
+        graph, files = semantic_graph.scan_graph(root, ref="HEAD")
+        
+        assert (history_repo_dir / "data" / "semantic-graph-trees" / f"{tree}.json").is_file()
+        assert files["modules/api/semantic-instructions.md"]["node"]["id"] == "module:modules/api"
+        
+        # A fresh process reads the file instead of the blobs
+        monkeypatch.setattr(semantic_graph, "_tree_graphs", type(semantic_graph._tree_graphs)())
+        monkeypatch.setattr(semantic_graph, "parse_bytes", None)
+        cached, cached_files = semantic_graph.scan_graph(root, ref="HEAD")
+        assert cached["nodes"] == graph["nodes"]
+        assert cached["edges"] == graph["edges"]
+        assert cached_files == files
+    
+    def test_cache_keyed_by_tree(self, history_repo_dir):
+        """Test that refs naming one tree share a result the worktree cannot invalidate."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        adapter = FilesystemAdapter(
+            repo_root=str(history_repo_dir), execution_mode="inprocess",
+            result_cache=cache, single_flight=SingleFlight(),
+        )
+        
+        first = adapter.run_script("semantic_graph.py", ["--ref", "HEAD"])
+        branch = git(history_repo_dir, "rev-parse", "--abbrev-ref", "HEAD")
+        assert adapter.run_script("semantic_graph.py", ["--ref", branch]) is first
+        (history_repo_dir / "modules" / "web" / "semantic-instructions.md").write_text("---\nscope: module\n---\n")
+        assert adapter.run_script("semantic_graph.py", ["--ref", "HEAD"]) is first
+        assert cache.stats()["hits"] == 2
+    
+    def test_adapter_rejects_bad_refs(self, history_repo_dir):
+        """Test that unknown refs and unsafe values never reach git or the script."""
+        adapter = FilesystemAdapter(repo_root=str(history_repo_dir), execution_mode="inprocess")
+        # Refs are resolved by the same module the scripts use
+        assert adapter._git_helper() is semantic_git
+        
+        with pytest.raises(ValueError, match="Unknown git ref"):
+            adapter.run_script("semantic_graph.py", ["--ref", "no-such-branch"])
+        with pytest.raises(ValueError, match="Invalid git ref"):
+            adapter.run_script("semantic_graph.py", ["--ref", "-x"])
+        with pytest.raises(RuntimeError, match="Invalid characters"):
+            adapter.run_script("semantic_graph.py", ["--ref", "HEAD;ls"])
+    
+    async def test_query_at_ref(self, history_repo_dir):
+        """Test that graph queries run against the tree of a ref."""
+        adapter = FilesystemAdapter(repo_root=str(history_repo_dir), execution_mode="inprocess")
+        
+        result = await adapter.query_graph_async("dependents", ["module:modules/core"], ref="HEAD~1")
+        assert result.to_dict()["meta"]["unresolved"] == []
+        assert "module:modules/api" not in node_ids(result.to_dict())
+        result = await adapter.query_graph_async("dependents", ["module:modules/core"], ref="HEAD")
+        assert "module:modules/api" in node_ids(result.to_dict())
+
+
+class TestValidatorAtRef:
+    """Test validation of git refs."""
+    
+    def test_validate_ref(self, history_repo_dir):
+        """Test that a ref is validated as committed, not as in the worktree."""
+        adapter = FilesystemAdapter(repo_root=str(history_repo_dir), execution_mode="inprocess")
+        
+        at_head = adapter.run_script("semantic_validator.py", ["--ref", "HEAD"])
+        worktree = adapter.run_script("semantic_validator.py", [])
+        
+        head_files = {d["location"]["file"] for d in at_head["diagnostics"] if d["code"] == "SI002"}
+        assert head_files == {"modules/api/semantic-instructions.md"}
+        assert at_head["meta"]["tree"] == git(history_repo_dir, "rev-parse", "HEAD^{tree}")
+        worktree_files = {d["location"]["file"] for d in worktree["diagnostics"] if d["code"] == "SI002"}
+        assert "modules/api/semantic-instructions.md" not in {f.replace("\\", "/") for f in worktree_files}
+    
+    def test_targets_and_nesting_in_tree(self, history_repo_dir):
+        """Test target globs and the module nesting rule against tree paths."""
+        nested = history_repo_dir / "modules" / "core" / "lib" / "deep"
+        nested.mkdir(parents=True)
+        (nested / "x.py").write_text("")
+        git(history_repo_dir, "add", "modules/core")
+        git(history_repo_dir, "commit", "-q", "-m", "nest")
+        # Glob targets are a CLI feature; the adapter's whitelist has no "*"
+        result = semantic_validator.run(
+            ["--ref", "HEAD", "--targets", "modules/*/semantic-instructions.md"], str(history_repo_dir)
+        )
+        codes = {(d["code"], d["location"]["file"]) for d in result["diagnostics"]}
+        assert ("SI003", "modules/core/semantic-instructions.md") in codes
+        assert ("SI002", "modules/api/semantic-instructions.md") in codes
+        
+        adapter = FilesystemAdapter(repo_root=str(history_repo_dir), execution_mode="inprocess")
+        only_core = adapter.run_script("semantic_validator.py", ["--ref", "HEAD", "--targets", "modules/core"])
+        assert {d["location"]["file"] for d in only_core["diagnostics"]} == {"modules/core/semantic-instructions.md"}
+
+
+class TestGraphDelta:
+    """Test the graph delta between snapshots."""
+    
+    def edges(self, edges):
+        return {(e["from"], e["to"], e["type"]) for e in edges}
+    
+    def test_delta_between_commits(self, history_repo_dir):
+        """Test nodes and incident edges added by a commit."""
+        adapter = FilesystemAdapter(repo_root=str(history_repo_dir), execution_mode="inprocess")
+        delta = adapter.run_script("semantic_delta.py", ["--baseRef", "HEAD~1", "--headRef", "HEAD"])
+        project = f"project:{history_repo_dir.name}"
+        
+        assert [n["id"] for n in delta["nodes"]["added"]] == ["module:modules/api"]
+        assert delta["nodes"]["removed"] == delta["nodes"]["modified"] == []
+        assert self.edges(delta["edges"]["added"]) == {
+            (project, "module:modules/api", "contains"),
+            ("module:modules/api", "module:modules/core", "depends-on"),
+        }
+        assert delta["edges"]["removed"] == []
+        assert delta["summary"]["filesChanged"] == 1
+        assert delta["head"]["tree"] == git(history_repo_dir, "rev-parse", "HEAD^{tree}")
+    
+    def test_delta_to_worktree(self, history_repo_dir):
+        """Test attribute changes against the working tree."""
+        delta = semantic_delta.run(["--baseRef", "HEAD", "--headRef", "WORKTREE"], str(history_repo_dir))
+        
+        assert [n["id"] for n in delta["nodes"]["added"]] == ["module:modules/web"]
+        assert delta["nodes"]["modified"] == [{
+            "id": "module:modules/api",
+            "path": "modules/api",
+            "changes": [{"field": "owners", "before": [], "after": ["@api"]}],
+        }]
+        assert delta["head"] == {"ref": "WORKTREE", "tree": None}
+    
+    def test_delta_matches_full_diff(self, history_repo_dir):
+        """Test that a new container re-parents the nodes below it and scope changes replace nodes."""
+        (history_repo_dir / "modules" / "semantic-instructions.md").write_text("---\nscope: cluster\nid: core\n---\n")
+        (history_repo_dir / "modules" / "api" / "semantic-instructions.md").write_text(
+            "---\nscope: cluster\nid: api\ndependencies: [core]\n---\n"
+        )
+        git(history_repo_dir, "add", "-A")
+        git(history_repo_dir, "commit", "-q", "-m", "cluster")
+        root = str(history_repo_dir)
+        
+        delta = semantic_delta.run(["--baseRef", "HEAD~1", "--headRef", "HEAD"], root)
+        base, _ = semantic_graph.scan_graph(root, False, ref="HEAD~1")
+        head, _ = semantic_graph.scan_graph(root, False, ref="HEAD")
+        base_ids, head_ids = {n["id"] for n in base["nodes"]}, {n["id"] for n in head["nodes"]}
+        
+        assert {n["id"] for n in delta["nodes"]["added"]} == head_ids - base_ids
+        assert {n["id"] for n in delta["nodes"]["removed"]} == base_ids - head_ids
+        assert self.edges(delta["edges"]["added"]) == self.edges(head["edges"]) - self.edges(base["edges"])
+        assert self.edges(delta["edges"]["removed"]) == self.edges(base["edges"]) - self.edges(head["edges"])
+        assert ("cluster:modules", "module:modules/web", "contains") in self.edges(delta["edges"]["added"])
+    
+    def test_head_derived_from_base(self, history_repo_dir, monkeypatch):
+        """Test that only changed blobs are parsed once the base graph is cached."""
+        root = str(history_repo_dir)
+        semantic_graph.scan_graph(root, ref="HEAD~1")
+        parsed = []
+        parse_bytes = semantic_graph.parse_bytes
+        monkeypatch.setattr(semantic_graph, "parse_bytes", lambda data: parsed.append(data) or parse_bytes(data))
+        
+        derived, _ = semantic_graph.scan_tree(root, "HEAD", base="HEAD~1")
+        
+        assert len(parsed) == 1
+        full, _ = semantic_graph.scan_graph(root, False, ref="HEAD")
+        assert derived["nodes"] == full["nodes"]
+        assert derived["edges"] == full["edges"]
+    
+    def test_write_report(self, history_repo_dir):
+        """Test that --write stores graph_delta.json under the date."""
+        delta = semantic_delta.run(
+            ["--baseRef", "HEAD~1", "--write", "--date", "2025-07-01"], str(history_repo_dir)
+        )
+        
+        path = history_repo_dir / "data" / "semantic-reports" / "2025-07-01" / "graph_delta.json"
+        assert delta["writtenTo"] == "data/semantic-reports/2025-07-01/graph_delta.json"
+        written = json.loads(path.read_text())
+        assert written["generatedBy"].startswith("semantic_delta@")
+        assert written["nodes"] == delta["nodes"]
+        with pytest.raises(ValueError, match="Invalid date"):
+            semantic_delta.run(["--baseRef", "HEAD~1", "--date", "July"], str(history_repo_dir))
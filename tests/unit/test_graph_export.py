@@ -0,0 +1,97 @@
+"""Unit tests for the graph export serializers.
+
+Tests DOT, GraphML, CSV and NDJSON output for both script result shapes.
+"""
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+from mcp_server.adapters import graph_export
+from mcp_server.adapters.graph_export import to_csv, to_dot, to_graphml, to_ndjson
+
+
+GRAPH = {
+    "nodes": [
+        {"id": "project:demo", "scope": "project", "name": "demo", "path": ".", "owners": ["@a", "@b"]},
+        {"id": "module:api", "scope": "module", "name": 'say "hi" & <go>', "path": "api",
+         "meta": {"semanticId": "api"}},
+    ],
+    "edges": [
+        {"from": "project:demo", "to": "module:api", "type": "contains"},
+    ],
+    "meta": {"toolVersion": "0.3.0"},
+}
+
+
+@pytest.fixture(params=["dict", "compact"])
+def graph_result(request, scripts_repo_dir):
+    """The same graph as parsed JSON (subprocess) and as a compact graph."""
+    if request.param == "dict":
+        return GRAPH
+    adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+    return adapter.run_script("semantic_graph.py", ["--scope", "project"])
+
+
+def payload(result):
+    return result.to_dict() if hasattr(result, "to_dict") else result
+
+
+class TestGraphExport:
+    """Test the streaming export formats."""
+    
+    def test_ndjson(self, graph_result):
+        """Test one line per record with the meta last."""
+        graph = payload(graph_result)
+        lines = [json.loads(line) for line in "".join(to_ndjson(graph_result)).splitlines()]
+        
+        assert [line["node"] for line in lines[:len(graph["nodes"])]] == graph["nodes"]
+        assert [line["edge"] for line in lines[len(graph["nodes"]):-1]] == graph["edges"]
+        assert lines[-1] == {"meta": graph["meta"]}
+    
+    def test_dot(self, graph_result):
+        """Test that every node and edge becomes a statement."""
+        graph = payload(graph_result)
+        text = "".join(to_dot(graph_result))
+        
+        assert text.startswith("digraph SemanticGraph {\n")
+        assert text.count(" -> ") == len(graph["edges"])
+        assert text.count("[label=") == len(graph["nodes"]) + len(graph["edges"])
+    
+    def test_graphml_escapes(self):
+        """Test that GraphML output is well formed for markup in values."""
+        root = ET.fromstring("".join(to_graphml(GRAPH)))
+        ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+        
+        names = [d.text for d in root.findall(".//g:node/g:data[@key='name']", ns)]
+        assert names == ["demo", 'say "hi" & <go>']
+        owners = root.find(".//g:node[@id='project:demo']/g:data[@key='owners']", ns)
+        assert owners.text == "@a;@b"
+    
+    def test_csv_nodes_and_edges(self, graph_result):
+        """Test the node and edge tables."""
+        graph = payload(graph_result)
+        
+        nodes = list(csv.DictReader(io.StringIO("".join(to_csv(graph_result, "nodes", ["id", "path"])))))
+        assert nodes == [{"id": n["id"], "path": n["path"]} for n in graph["nodes"]]
+        
+        edges = list(csv.DictReader(io.StringIO("".join(to_csv(graph_result, "edges")))))
+        assert [(e["from"], e["to"], e["type"], e["label"]) for e in edges] == [
+            (e["from"], e["to"], e["type"], "") for e in graph["edges"]
+        ]
+    
+    def test_csv_is_chunked(self, monkeypatch):
+        """Test that large tables are streamed in chunks of rows."""
+        monkeypatch.setattr(graph_export, "CSV_CHUNK_ROWS", 1)
+        chunks = list(to_csv(GRAPH, "nodes", ["id"]))
+        
+        assert chunks[0] == "id\nproject:demo\n"
+        assert "".join(chunks) == "id\nproject:demo\nmodule:api\n"
+    
+    def test_csv_unknown_table(self):
+        """Test that only the nodes and edges tables exist."""
+        with pytest.raises(ValueError, match="Unknown table"):
+            list(to_csv(GRAPH, "owners"))
@@ -0,0 +1,119 @@
+"""Unit tests for semantic graph pagination.
+
+Tests cursor pagination and the NDJSON output of the semantic graph.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+
+
+class TestGraphPagination:
+    """Tests for cursor pagination and NDJSON output of the semantic graph."""
+    
+    @pytest.fixture
+    def paged_repo_dir(self, scripts_repo_dir):
+        """Repository with five more modules, two of which depend on core."""
+        for n in range(5):
+            module_dir = scripts_repo_dir / "modules" / f"m{n}"
+            module_dir.mkdir(parents=True)
+            deps = "dependencies: [core]\n" if n % 2 else ""
+            (module_dir / "semantic-instructions.md").write_text(
+                f"---\nscope: module\nid: m{n}\n{deps}---\n"
+            )
+        return scripts_repo_dir
+    
+    def _pages(self, run_page, limit):
+        pages, cursor = [], None
+        while True:
+            page = run_page(cursor, limit)
+            pages.append(page)
+            cursor = page["meta"].get("nextCursor")
+            if cursor is None:
+                return pages
+    
+    @pytest.mark.parametrize("limit", [1, 3, 7, 100])
+    def test_pages_cover_graph_once(self, paged_repo_dir, limit):
+        """Test that following nextCursor yields every node and edge exactly once."""
+        adapter = FilesystemAdapter(repo_root=str(paged_repo_dir), execution_mode="inprocess")
+        graph = adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        full = graph.to_dict()
+        
+        pages = self._pages(graph.page, limit)
+        
+        assert [n for p in pages for n in p["nodes"]] == full["nodes"]
+        assert [e for p in pages for e in p["edges"]] == full["edges"]
+        assert all(len(p["nodes"]) + len(p["edges"]) <= limit for p in pages)
+        assert len(pages) == -(-(len(full["nodes"]) + len(full["edges"])) // limit)
+    
+    def test_invalid_cursor_rejected(self, paged_repo_dir):
+        """Test that cursors not issued by the graph are rejected."""
+        adapter = FilesystemAdapter(repo_root=str(paged_repo_dir), execution_mode="inprocess")
+        graph = adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            graph.page("not-a-cursor", 5)
+        with pytest.raises(ValueError, match="positive"):
+            graph.page(None, 0)
+    
+    @pytest.mark.parametrize("mode", ["inprocess", "subprocess"])
+    async def test_cursor_rejected_after_edit(self, paged_repo_dir, mode):
+        """Test that a cursor is rejected once a file changed between pages."""
+        adapter = FilesystemAdapter(repo_root=str(paged_repo_dir), execution_mode=mode)
+        args = ["--scope", "project"]
+        cursor = (await adapter.graph_page_async(args, 3))["meta"]["nextCursor"]
+        
+        assert (await adapter.graph_page_async(args, 3, cursor))["nodes"]
+        (paged_repo_dir / "modules" / "m0" / "semantic-instructions.md").write_text(
+            "---\nscope: module\nid: m0\ndependencies: [m1]\n---\n"
+        )
+        with pytest.raises(ValueError, match="Stale cursor"):
+            await adapter.graph_page_async(args, 3, cursor)
+    
+    def test_cursor_bound_to_selection(self, paged_repo_dir):
+        """Test that a cursor is only accepted by a graph with the same selection."""
+        adapter = FilesystemAdapter(repo_root=str(paged_repo_dir), execution_mode="inprocess")
+        graph = adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        cursor = graph.page(None, 3)["meta"]["nextCursor"]
+        
+        for args in (["--edgeTypes", "depends-on"], ["--include", "name"], ["--filters", '{"scope": "module"}']):
+            other = adapter.run_script("semantic_graph.py", ["--scope", "project", *args])
+            with pytest.raises(ValueError, match="Stale cursor"):
+                other.page(cursor, 3)
+        # An unchanged repository rebuilds the same records, so the cursor stays valid
+        rebuilt = adapter.run_script("semantic_graph.py", ["--scope", "project", "--ids"] + graph.ids)
+        assert rebuilt.page(cursor, 3) == graph.page(cursor, 3)
+    
+    async def test_subprocess_pages_match_in_process(self, paged_repo_dir):
+        """Test that the script pages identically when run in a subprocess."""
+        args = ["--scope", "project", "--edgeTypes", "depends-on"]
+        pages = {}
+        for mode in ("inprocess", "subprocess"):
+            adapter = FilesystemAdapter(repo_root=str(paged_repo_dir), execution_mode=mode)
+            pages[mode], cursor = [], None
+            while True:
+                page = await adapter.graph_page_async(args, 4, cursor)
+                pages[mode].append((page["nodes"], page["edges"]))
+                cursor = page["meta"].get("nextCursor")
+                if cursor is None:
+                    break
+        
+        assert pages["subprocess"] == pages["inprocess"]
+        assert len(pages["inprocess"]) == 3
+    
+    def test_ndjson_output(self, paged_repo_dir):
+        """Test the CLI NDJSON format: one record per line, meta last."""
+        script = Path(__file__).parents[2] / "scripts" / "semantic_graph.py"
+        out = subprocess.run(
+            [sys.executable, str(script), "--outputFormat", "ndjson", "--noCache"],
+            cwd=paged_repo_dir, capture_output=True, text=True, check=True,
+        ).stdout
+        
+        lines = [json.loads(line) for line in out.splitlines()]
+        assert [list(line) for line in lines[:7]] == [["node"]] * 7
+        assert sum("edge" in line for line in lines) == 6 + 2
+        assert list(lines[-1]) == ["meta"]
@@ -0,0 +1,97 @@
+"""Unit tests for semantic graph projection and filters.
+
+Tests node field projection, edge-type selection and node filters.
+"""
+import json
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+
+
+class TestGraphProjection:
+    """Tests for --include, --edgeTypes and --filters in semantic_graph.py."""
+    
+    @pytest.fixture
+    def projection_repo_dir(self, scripts_repo_dir):
+        """Repository with modules owned by different teams."""
+        for name, owner, extra in [
+            ("api", "@team-api", "dependencies: [core]\n"),
+            ("web", "@team-web", "dependencies: [api]\n"),
+        ]:
+            module_dir = scripts_repo_dir / "modules" / name
+            module_dir.mkdir(parents=True)
+            (module_dir / "semantic-instructions.md").write_text(
+                f"---\nscope: module\nid: {name}\nowners: [\"{owner}\"]\n{extra}---\n"
+            )
+        return scripts_repo_dir
+    
+    def _graph(self, repo_dir, args):
+        adapter = FilesystemAdapter(repo_root=str(repo_dir), execution_mode="inprocess")
+        return adapter.run_script("semantic_graph.py", args).to_dict()
+    
+    def test_include_projects_fields(self, projection_repo_dir):
+        """Test that only the requested node fields are returned."""
+        result = self._graph(projection_repo_dir, ["--include", "owners"])
+        
+        for node in result["nodes"]:
+            assert set(node) == {"id", "scope", "owners"}
+        assert result["meta"]["filtersApplied"] == {"include": ["owners"]}
+    
+    def test_unknown_include_field_rejected(self, projection_repo_dir):
+        """Test that unknown projection fields fail."""
+        with pytest.raises(ValueError, match="Unknown node field"):
+            self._graph(projection_repo_dir, ["--include", "secrets"])
+    
+    def test_edge_types_filter_edges(self, projection_repo_dir):
+        """Test that only edges of the requested types are returned."""
+        result = self._graph(projection_repo_dir, ["--edgeTypes", "depends-on"])
+        
+        assert len(result["nodes"]) == 4
+        assert {e["type"] for e in result["edges"]} == {"depends-on"}
+    
+    @pytest.mark.parametrize("filters,expected", [
+        ({"scope": "project"}, None),
+        ({"owner": "@team-api"}, {"module:modules/api"}),
+        ({"owner": ["@team-api", "@team-web"]}, {"module:modules/api", "module:modules/web"}),
+        ({"pathPrefix": "modules/", "owner": "@team-web"}, {"module:modules/web"}),
+        ({"meta": {"semanticId": "web"}}, {"module:modules/web"}),
+        ({"meta": {"dependencies": "core"}}, {"module:modules/api"}),
+    ])
+    def test_filters(self, projection_repo_dir, filters, expected):
+        """Test the filter predicates, alone and combined."""
+        result = self._graph(projection_repo_dir, ["--filters", json.dumps(filters)])
+        
+        ids = {n["id"] for n in result["nodes"]}
+        if expected is None:
+            expected = {f"project:{projection_repo_dir.name}"}
+        assert ids == expected
+        assert result["meta"]["filtersApplied"]["filters"] == filters
+    
+    def test_filters_keep_edges_between_matches(self, projection_repo_dir):
+        """Test that edges survive only when both ends match."""
+        result = self._graph(projection_repo_dir, ["--filters", '{"pathPrefix": "modules/"}'])
+        
+        assert {(e["from"], e["to"], e["type"]) for e in result["edges"]} == {
+            ("module:modules/api", "module:modules/core", "depends-on"),
+            ("module:modules/web", "module:modules/api", "depends-on"),
+        }
+    
+    def test_invalid_filters_rejected(self, projection_repo_dir):
+        """Test that malformed or unknown filters are rejected."""
+        adapter = FilesystemAdapter(repo_root=str(projection_repo_dir), execution_mode="inprocess")
+        
+        with pytest.raises(RuntimeError, match="Invalid JSON"):
+            adapter.run_script("semantic_graph.py", ["--filters", "{scope"])
+        with pytest.raises(RuntimeError, match="JSON object"):
+            adapter.run_script("semantic_graph.py", ["--filters", "[1]"])
+        with pytest.raises(ValueError, match="Unknown filter"):
+            adapter.run_script("semantic_graph.py", ["--filters", '{"colour": "red"}'])
+    
+    def test_filters_canonicalized_for_coalescing(self, temp_repo_dir):
+        """Test that equivalent filter objects produce the same arguments."""
+        adapter = FilesystemAdapter(repo_root=str(temp_repo_dir))
+        
+        a = adapter._sanitize_args(["--filters", '{"scope": "module", "owner": "@a"}'])
+        b = adapter._sanitize_args(["--filters", '{"owner":"@a","scope":"module"}'])
+        assert a == b
@@ -0,0 +1,74 @@
+"""Unit tests for semantic graph queries.
+
+Tests the neighbourhood, impact and path queries of scripts/semantic_compact.py.
+"""
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+
+
+class TestGraphQueries:
+    """Tests for containment, dependency edges and graph queries."""
+    
+    @pytest.fixture
+    def query_repo_dir(self, scripts_repo_dir):
+        """Repository with a cluster, two nested modules and dependencies."""
+        def write(rel, front_matter):
+            path = scripts_repo_dir / rel
+            path.mkdir(parents=True, exist_ok=True)
+            (path / "semantic-instructions.md").write_text(f"---\n{front_matter}---\n")
+        
+        write("modules", "scope: cluster\nid: modules\n")
+        write("modules/api", "scope: module\nid: api\ndependencies: [core]\n")
+        write("modules/web", "scope: module\nid: web\ndependencies: [\"modules/api\"]\n")
+        return scripts_repo_dir
+    
+    def test_containment_follows_directories(self, query_repo_dir):
+        """Test that nodes are contained by their nearest ancestor node."""
+        adapter = FilesystemAdapter(repo_root=str(query_repo_dir), execution_mode="inprocess")
+        edges = adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()["edges"]
+        
+        contains = {(e["from"], e["to"]) for e in edges if e["type"] == "contains"}
+        assert ("cluster:modules", "module:modules/core") in contains
+        assert ("cluster:modules", "module:modules/api") in contains
+        depends = {(e["from"], e["to"]) for e in edges if e["type"] == "depends-on"}
+        assert depends == {
+            ("module:modules/api", "module:modules/core"),
+            ("module:modules/web", "module:modules/api"),
+        }
+    
+    @pytest.mark.parametrize("mode", ["inprocess", "subprocess"])
+    async def test_transitive_dependents(self, query_repo_dir, mode):
+        """Test that dependents follow depends-on edges backwards transitively."""
+        adapter = FilesystemAdapter(repo_root=str(query_repo_dir), execution_mode=mode)
+        result = await adapter.query_graph_async("dependents", ["core"])
+        if hasattr(result, "to_dict"):
+            result = result.to_dict()
+        
+        assert result["meta"]["distances"] == {
+            "module:modules/core": 0,
+            "module:modules/api": 1,
+            "module:modules/web": 2,
+        }
+        assert all(e["type"] == "depends-on" for e in result["edges"])
+    
+    async def test_k_hop_expansion(self, query_repo_dir):
+        """Test that expansion stops at the requested depth."""
+        adapter = FilesystemAdapter(repo_root=str(query_repo_dir), execution_mode="inprocess")
+        result = await adapter.query_graph_async(
+            "expand", ["module:modules/web"], depth=1, edge_types=["depends-on"], direction="out"
+        )
+        
+        assert set(result.graph_meta["distances"]) == {"module:modules/web", "module:modules/api"}
+    
+    async def test_shortest_path(self, query_repo_dir):
+        """Test that path queries return the hops in order."""
+        adapter = FilesystemAdapter(repo_root=str(query_repo_dir), execution_mode="inprocess")
+        result = await adapter.query_graph_async(
+            "path", ["modules/web"], edge_types=["depends-on"], direction="out", target="modules/core"
+        )
+        
+        assert result.graph_meta["path"] == [
+            "module:modules/web", "module:modules/api", "module:modules/core"
+        ]
+        assert result.graph_meta["unresolved"] == []
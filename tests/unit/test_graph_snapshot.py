@@ -0,0 +1,129 @@
+"""Unit tests for binary graph snapshots.
+
+Tests the snapshot format of scripts/semantic_snapshot.py and how
+semantic_graph.py writes and maps snapshots.
+"""
+import os
+import pickle
+import subprocess
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
+
+import semantic_graph  # noqa: E402
+from semantic_compact import CompactGraph  # noqa: E402
+from semantic_snapshot import open_snapshot, write_snapshot  # noqa: E402
+
+
+GRAPH = {
+    "nodes": [
+        {"id": "project:demo", "scope": "project", "name": "demo", "path": ".", "owners": [],
+         "contract": {"invariants": []}, "meta": {"detected": True}},
+        {"id": "module:api", "scope": "module", "name": "Ápi", "path": "api", "owners": ["@a", "@b"],
+         "contract": {"invariants": ["stable"]}, "meta": {"semanticId": "api", "dependencies": ["core"]}},
+        {"id": "module:core", "scope": "module", "name": "core", "path": "core", "owners": ["@a"],
+         "contract": {"invariants": []}},
+    ],
+    "edges": [
+        {"from": "project:demo", "to": "module:api", "type": "contains"},
+        {"from": "project:demo", "to": "module:core", "type": "contains"},
+        {"from": "module:api", "to": "module:core", "type": "depends-on", "label": "uses", "confidence": 0.5},
+    ],
+    "meta": {"toolVersion": "0.3.0"},
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """A snapshot of GRAPH with the stamp "s1"."""
+    path = tmp_path / "graph.snap"
+    write_snapshot(CompactGraph.from_dict(GRAPH), str(path), "s1")
+    return path
+
+
+class TestSnapshotFormat:
+    """Test writing and mapping snapshots."""
+    
+    def test_round_trip(self, snapshot_path):
+        """Test that a mapped graph answers like the graph it was written from."""
+        graph = CompactGraph.from_dict(GRAPH)
+        mapped = open_snapshot(str(snapshot_path), "s1")
+        
+        assert isinstance(mapped.scope, memoryview)
+        assert mapped.to_dict() == graph.to_dict() == {**GRAPH, "nodes": mapped.to_dict()["nodes"]}
+        assert mapped.node_index("module:core") == 2
+        assert mapped.node_index("api") == 1
+        assert mapped.node_index("module:none") is None
+        assert mapped.query("dependents", ["core"]).to_dict() == graph.query("dependents", ["core"]).to_dict()
+        assert mapped.match({"owner": "@b"}) == [1]
+        assert mapped.page(None, 2) == graph.page(None, 2)
+    
+    def test_rejected_snapshots(self, snapshot_path, tmp_path):
+        """Test that other stamps, missing and corrupt files are not opened."""
+        assert open_snapshot(str(snapshot_path), "s2") is None
+        assert open_snapshot(str(tmp_path / "missing.snap")) is None
+        
+        corrupt = tmp_path / "corrupt.snap"
+        corrupt.write_bytes(snapshot_path.read_bytes()[:200])
+        assert open_snapshot(str(corrupt)) is None
+        (tmp_path / "empty.snap").write_bytes(b"")
+        assert open_snapshot(str(tmp_path / "empty.snap")) is None
+    
+    def test_pickled_as_arrays(self, snapshot_path):
+        """Test that mapped graphs cross process boundaries as plain columns."""
+        restored = pickle.loads(pickle.dumps(open_snapshot(str(snapshot_path))))
+        
+        assert isinstance(restored.scope, array)
+        assert isinstance(restored.ids, list)
+        assert restored.to_dict() == CompactGraph.from_dict(GRAPH).to_dict()
+
+
+class TestGraphSnapshots:
+    """Test the snapshots written by semantic_graph.py."""
+    
+    def test_worktree_snapshot(self, scripts_repo_dir):
+        """Test that the working-tree graph is mapped until a semantic file changes."""
+        root = str(scripts_repo_dir)
+        built = semantic_graph.load_graph(root)
+        
+        assert (scripts_repo_dir / "data" / "semantic-graph.snap").is_file()
+        mapped = semantic_graph.load_graph(root)
+        assert isinstance(mapped.scope, memoryview)
+        assert mapped.to_dict() == built.to_dict()
+        
+        instructions = scripts_repo_dir / "modules" / "core" / "semantic-instructions.md"
+        instructions.write_text("---\nscope: module\nid: core\nname: Renamed\n---\n")
+        os.utime(instructions, ns=(1, 1))
+        rebuilt = semantic_graph.load_graph(root)
+        assert not isinstance(rebuilt.scope, memoryview)
+        assert rebuilt.node(rebuilt.node_index("core"))["name"] == "Renamed"
+    
+    def test_tree_snapshot(self, scripts_repo_dir):
+        """Test that graphs of git refs are snapshotted under their tree SHA."""
+        def git(*args):
+            return subprocess.run(
+                ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                cwd=scripts_repo_dir, check=True, capture_output=True, text=True,
+            ).stdout.strip()
+        git("init", "-q")
+        git("add", "-A")
+        git("commit", "-q", "-m", "init")
+        tree = git("rev-parse", "HEAD^{tree}")
+        
+        first = semantic_graph.run(["--ref", "HEAD", "--noCache"], str(scripts_repo_dir)).to_dict()
+        semantic_graph.load_graph(str(scripts_repo_dir), ref="HEAD")
+        
+        assert (scripts_repo_dir / "data" / "semantic-graph-trees" / f"{tree}.snap").is_file()
+        mapped = semantic_graph.load_graph(str(scripts_repo_dir), ref="HEAD")
+        assert isinstance(mapped.scope, memoryview)
+        assert mapped.to_dict()["nodes"] == first["nodes"]
+    
+    def test_no_cache_skips_snapshot(self, scripts_repo_dir):
+        """Test that --noCache neither reads nor writes snapshots."""
+        semantic_graph.run(["--noCache"], str(scripts_repo_dir))
+        
+        assert not (scripts_repo_dir / "data" / "semantic-graph.snap").exists()
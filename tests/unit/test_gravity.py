@@ -0,0 +1,133 @@
+"""Unit tests for the Semantic Gravity engine.
+
+Tests the metrics, scores and audit report of scripts/semantic_gravity.py.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+
+
+SCRIPT = Path(__file__).parents[2] / "scripts" / "semantic_gravity.py"
+
+
+@pytest.fixture
+def gravity_repo_dir(scripts_repo_dir):
+    """Repository with two clusters and dependencies within and across them.
+
+    modules/        cluster, contains core (from scripts_repo_dir), api
+    apps/           cluster, contains web, cli
+    tools/          module outside any cluster
+    """
+    def write(rel, front_matter, body=""):
+        path = scripts_repo_dir / rel
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "semantic-instructions.md").write_text(f"---\n{front_matter}---\n{body}")
+
+    write("modules", "scope: cluster\nid: modules\n")
+    write("modules/api", "scope: module\nid: api\ndependencies: [core]\n")
+    write("apps", "scope: cluster\nid: apps\n")
+    write("apps/web", "scope: module\nid: web\ndependencies: [api, core, cli]\n", "x" * 2000)
+    write("apps/cli", "scope: module\nid: cli\ndependencies: [core]\n")
+    write("tools", "scope: module\nid: tools\ndependencies: [web]\n")
+    return scripts_repo_dir
+
+
+def scores(report, scope):
+    return {row["id"]: row for row in report[scope]}
+
+
+class TestGravity:
+    """Test gravity metrics and scores."""
+    
+    def test_module_metrics(self, gravity_repo_dir):
+        """Test fan-in, fan-out, breadth and instruction size per module."""
+        adapter = FilesystemAdapter(repo_root=str(gravity_repo_dir), execution_mode="inprocess")
+        report = adapter.run_script("semantic_gravity.py", [])
+        modules = scores(report, "modules")
+        
+        core = modules["module:modules/core"]
+        assert (core["fanIn"], core["fanOut"], core["breadth"]) == (3, 0, 0)
+        web = modules["module:apps/web"]
+        # api and core live in the modules cluster, cli in apps
+        assert (web["fanIn"], web["fanOut"], web["breadth"]) == (1, 3, 2)
+        assert web["instructionBytes"] == (gravity_repo_dir / "apps/web/semantic-instructions.md").stat().st_size
+        # web has the highest fan-out, breadth and size, so it ranks first
+        assert report["modules"][0]["id"] == "module:apps/web"
+        assert all(0 <= row["score"] <= 100 for row in report["modules"])
+        assert report["totals"] == {"modules": 5, "clusters": 2, "dependencies": 6}
+    
+    def test_cluster_metrics(self, gravity_repo_dir):
+        """Test that clusters count only dependencies crossing their boundary."""
+        adapter = FilesystemAdapter(repo_root=str(gravity_repo_dir), execution_mode="inprocess")
+        clusters = scores(adapter.run_script("semantic_gravity.py", ["--scope", "cluster"]), "clusters")
+        
+        modules = clusters["cluster:modules"]
+        # web -> api, web -> core, cli -> core; api -> core stays inside
+        assert (modules["fanIn"], modules["fanOut"], modules["breadth"], modules["members"]) == (3, 0, 0, 2)
+        apps = clusters["cluster:apps"]
+        # tools -> web comes from outside any cluster
+        assert (apps["fanIn"], apps["fanOut"], apps["breadth"], apps["members"]) == (1, 3, 1, 2)
+        sizes = sum(
+            (gravity_repo_dir / rel / "semantic-instructions.md").stat().st_size
+            for rel in ("apps", "apps/web", "apps/cli")
+        )
+        assert apps["instructionBytes"] == sizes
+    
+    def test_scope_top_and_hotspots(self, gravity_repo_dir):
+        """Test selection of scores and the hotspot threshold."""
+        adapter = FilesystemAdapter(repo_root=str(gravity_repo_dir), execution_mode="inprocess")
+        report = adapter.run_script("semantic_gravity.py", ["--scope", "module", "--top", "2", "--threshold", "50"])
+        
+        assert len(report["modules"]) == 2
+        assert report["clusters"] == []
+        assert report["hotspots"]
+        assert all(h["scope"] == "module" and h["score"] >= 50 for h in report["hotspots"])
+    
+    def test_numpy_engine_matches_python(self, gravity_repo_dir):
+        """Test that the vectorized engine gives identical results."""
+        pytest.importorskip("numpy")
+        
+        results = {}
+        for engine in ("python", "numpy"):
+            out = subprocess.run(
+                [sys.executable, str(SCRIPT), "--engine", engine],
+                cwd=gravity_repo_dir, capture_output=True, text=True, check=True,
+            ).stdout
+            results[engine] = json.loads(out)
+        
+        assert results["numpy"]["engine"] == "numpy"
+        for scope in ("modules", "clusters", "hotspots"):
+            assert results["numpy"][scope] == results["python"][scope]
+    
+    def test_write_report(self, gravity_repo_dir):
+        """Test that --write stores graph_health.json under the quarter."""
+        out = subprocess.run(
+            [sys.executable, str(SCRIPT), "--write", "--quarter", "2025-Q3"],
+            cwd=gravity_repo_dir, capture_output=True, text=True, check=True,
+        ).stdout
+        report = json.loads(out)
+        
+        path = gravity_repo_dir / "data" / "semantic-audits" / "2025-Q3" / "graph_health.json"
+        assert report["writtenTo"] == "data/semantic-audits/2025-Q3/graph_health.json"
+        written = json.loads(path.read_text())
+        assert written["schemaVersion"] == "1.0"
+        assert written["generatedBy"].startswith("semantic_gravity@")
+        assert written["modules"] == report["modules"]
+        assert "writtenTo" not in written
+    
+    def test_invalid_quarter(self, gravity_repo_dir):
+        """Test that malformed quarters are rejected."""
+        adapter = FilesystemAdapter(repo_root=str(gravity_repo_dir), execution_mode="inprocess")
+        with pytest.raises(ValueError, match="Invalid quarter"):
+            adapter.run_script("semantic_gravity.py", ["--quarter", "2025-Q5"])
+    
+    def test_server_cannot_write(self, gravity_repo_dir):
+        """Test that the adapter does not pass --write to the script."""
+        adapter = FilesystemAdapter(repo_root=str(gravity_repo_dir), execution_mode="inprocess")
+        with pytest.raises(RuntimeError, match="Invalid argument flag"):
+            adapter.run_script("semantic_gravity.py", ["--write"])
@@ -0,0 +1,59 @@
+"""Unit tests for the incremental semantic graph.
+
+Tests the persistent graph cache that semantic_graph.py reads and writes.
+"""
+import json
+
+from mcp_server.adapters import FilesystemAdapter
+
+
+class TestIncrementalGraph:
+    """Tests for the persistent graph cache written by semantic_graph.py."""
+    
+    def _graph(self, repo_dir):
+        adapter = FilesystemAdapter(repo_root=str(repo_dir), execution_mode="inprocess")
+        return adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()
+    
+    def test_cache_file_written(self, scripts_repo_dir):
+        """Test that the graph and file table are persisted."""
+        self._graph(scripts_repo_dir)
+        cache = json.loads((scripts_repo_dir / "data" / "semantic-graph.json").read_text())
+        
+        entry = cache["files"]["modules/core/semantic-instructions.md"]
+        assert entry["nodeId"] == "module:modules/core"
+        assert len(entry["sha256"]) == 64
+        assert any(n["id"] == "module:modules/core" for n in cache["nodes"])
+    
+    def test_unchanged_files_reused_from_cache(self, scripts_repo_dir):
+        """Test that files with matching stat data are not parsed again."""
+        self._graph(scripts_repo_dir)
+        cache_path = scripts_repo_dir / "data" / "semantic-graph.json"
+        cache = json.loads(cache_path.read_text())
+        for node in cache["nodes"]:
+            if node["id"] == "module:modules/core":
+                node["name"] = "from-cache"
+        cache_path.write_text(json.dumps(cache))
+        # The binary snapshot would answer first; rebuild from the file cache
+        (scripts_repo_dir / "data" / "semantic-graph.snap").unlink()
+        
+        nodes = {n["id"]: n for n in self._graph(scripts_repo_dir)["nodes"]}
+        assert nodes["module:modules/core"]["name"] == "from-cache"
+    
+    def test_added_and_removed_files(self, scripts_repo_dir):
+        """Test that added and removed modules are reflected on the next run."""
+        self._graph(scripts_repo_dir)
+        
+        api_dir = scripts_repo_dir / "modules" / "api"
+        api_dir.mkdir()
+        (api_dir / "semantic-instructions.md").write_text("---\nscope: module\n---\n")
+        (scripts_repo_dir / "modules" / "core" / "semantic-instructions.md").unlink()
+        
+        ids = {n["id"] for n in self._graph(scripts_repo_dir)["nodes"]}
+        assert "module:modules/api" in ids
+        assert "module:modules/core" not in ids
+    
+    def test_corrupt_cache_ignored(self, scripts_repo_dir):
+        """Test that an unreadable cache falls back to a full build."""
+        (scripts_repo_dir / "data" / "semantic-graph.json").write_text("{not json")
+        ids = {n["id"] for n in self._graph(scripts_repo_dir)["nodes"]}
+        assert "module:modules/core" in ids
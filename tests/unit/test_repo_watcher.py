@@ -0,0 +1,264 @@
+"""Unit tests for RepositoryWatcher.
+
+Tests change classification, per-tool tokens, both watcher backends and the
+in-memory graph and ADR index kept current from change batches.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter, RepositoryWatcher, ResultCache, start_watcher, stop_watcher
+from mcp_server.adapters import fingerprint
+from mcp_server.adapters.repo_watcher import REFS, classify
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
+
+import adr_index  # noqa: E402
+import semantic_graph  # noqa: E402
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    """Poll predicate until it is true or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@pytest.fixture
+def idle_watcher(tmp_path):
+    """A running watcher whose backend never reports changes on its own."""
+    cache = ResultCache(max_size=10, ttl=0, enabled=True)
+    watcher = RepositoryWatcher(tmp_path, result_cache=cache, backend="poll", poll_interval=3600).start()
+    yield watcher
+    watcher.stop()
+
+
+class TestClassify:
+    """Test which tools a changed path affects."""
+    
+    def test_semantic_files(self):
+        """Test that semantic files affect the graph and the validator."""
+        assert classify("modules/core/semantic-instructions.md") == {"semantic_graph.py", "semantic_validator.py"}
+        assert classify(".github/copilot-instructions.md") == {"semantic_graph.py", "semantic_validator.py"}
+    
+    def test_docs(self):
+        """Test that docs affect the ADR index, and the glossary file the glossary."""
+        assert classify("docs/glossary.md") == {"glossary", "semantic_validator.py"}
+        assert classify("docs/adr/adr-001.md") == {"adr_index.py", "semantic_validator.py"}
+    
+    def test_other_paths(self):
+        """Test that other files only affect validation, and generated files nothing."""
+        assert classify("src/app.py") == {"semantic_validator.py"}
+        assert classify("data/semantic-graph.snap") == set()
+        assert classify("data/semantic-graph-trees/abc.json") == set()
+        assert classify("data/.snapshot.x1.tmp") == set()
+    
+    def test_git_metadata(self):
+        """Test that ref changes are told apart from other git metadata."""
+        assert classify(".git/refs/heads/main") == {REFS}
+        assert classify(".git/HEAD") == {REFS}
+        assert classify(".git/index") == set()
+
+
+class TestRepositoryWatcher:
+    """Test tokens, invalidation and listeners."""
+    
+    def test_tokens_need_a_running_watcher(self, tmp_path):
+        """Test that a stopped watcher hands out no tokens."""
+        watcher = RepositoryWatcher(tmp_path, backend="poll", poll_interval=3600)
+        assert watcher.token("semantic_graph.py") is None
+        
+        watcher.start()
+        assert watcher.token("semantic_graph.py") is not None
+        assert watcher.token("semantic_drift_scanner.py") is None
+        watcher.stop()
+        assert watcher.token("semantic_graph.py") is None
+    
+    def test_only_affected_tokens_move(self, idle_watcher):
+        """Test that a change moves and invalidates only the tools it affects."""
+        cache = idle_watcher.result_cache
+        graph_token = idle_watcher.token("semantic_graph.py")
+        glossary_token = idle_watcher.token("glossary")
+        cache.put(("graph", graph_token), 1, tool="semantic_graph.py")
+        cache.put(("graph", "tree:abc"), 2, tool="semantic_graph.py")
+        cache.put(("glossary", glossary_token), 3, tool="glossary")
+        
+        affected = idle_watcher.apply(["modules/core/semantic-instructions.md"])
+        
+        assert affected == {"semantic_graph.py", "semantic_validator.py"}
+        assert idle_watcher.token("semantic_graph.py") != graph_token
+        assert idle_watcher.token("glossary") == glossary_token
+        assert cache.get(("graph", graph_token)) == (False, None)
+        assert cache.get(("graph", "tree:abc")) == (True, 2)
+        assert cache.get(("glossary", glossary_token)) == (True, 3)
+    
+    def test_lost_changes_move_every_token(self, idle_watcher):
+        """Test that unknown changes invalidate everything."""
+        before = {tool: idle_watcher.token(tool) for tool in ("semantic_graph.py", "glossary", "adr_index.py")}
+        idle_watcher.apply(None)
+        
+        assert all(idle_watcher.token(tool) != token for tool, token in before.items())
+        assert idle_watcher.stats()["overflows"] == 1
+    
+    def test_listeners_run_before_tokens_move(self, idle_watcher):
+        """Test that listeners see the batch while the old tokens are still current."""
+        seen = []
+        idle_watcher.subscribe(lambda paths: seen.append((paths, idle_watcher.token("semantic_graph.py"))))
+        token = idle_watcher.token("semantic_graph.py")
+        idle_watcher.apply(["b/semantic-instructions.md", "a/semantic-instructions.md"])
+        
+        assert seen == [(["a/semantic-instructions.md", "b/semantic-instructions.md"], token)]
+        
+        idle_watcher.apply([".git/index"])
+        assert len(seen) == 1
+    
+    def test_resolved_refs_reused_until_refs_change(self, idle_watcher):
+        """Test that refs are resolved once until git refs change."""
+        calls = []
+        
+        def resolve(ref):
+            calls.append(ref)
+            return f"tree-{len(calls)}"
+        
+        assert idle_watcher.resolve_tree("HEAD", resolve) == "tree-1"
+        assert idle_watcher.resolve_tree("HEAD", resolve) == "tree-1"
+        idle_watcher.apply(["src/app.py"])
+        assert idle_watcher.resolve_tree("HEAD", resolve) == "tree-1"
+        idle_watcher.apply([".git/refs/heads/main"])
+        assert idle_watcher.resolve_tree("HEAD", resolve) == "tree-2"
+
+
+class TestBackends:
+    """Test that the backends report changes."""
+    
+    @pytest.mark.parametrize("backend", ["poll", "inotify"])
+    def test_changes_reported(self, tmp_path, backend):
+        """Test modified files, and files in new directories, for each backend."""
+        if backend == "inotify" and not sys.platform.startswith("linux"):
+            pytest.skip("inotify is only available on Linux")
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "docs" / "glossary.md").write_text("# Glossary\n")
+        batches = []
+        watcher = RepositoryWatcher(tmp_path, backend=backend, poll_interval=0.05)
+        watcher.subscribe(batches.append)
+        watcher.start()
+        try:
+            assert watcher.stats()["backend"] == backend
+            token = watcher.token("glossary")
+            (tmp_path / "docs" / "glossary.md").write_text("# Glossary\n\n## Terms\n")
+            assert wait_for(lambda: watcher.token("glossary") != token)
+            
+            module = tmp_path / "modules" / "core"
+            module.mkdir(parents=True)
+            (module / "semantic-instructions.md").write_text("---\nscope: module\n---\n")
+            assert wait_for(lambda: any("modules/core/semantic-instructions.md" in (b or []) for b in batches))
+        finally:
+            watcher.stop()
+
+
+class TestLiveState:
+    """Test the in-memory graph and ADR index updated from change batches."""
+    
+    def test_live_graph_applies_changes(self, scripts_repo_dir, monkeypatch):
+        """Test that modified and deleted semantic files are applied without a rescan."""
+        root = str(scripts_repo_dir)
+        other = scripts_repo_dir / "modules" / "api" / "semantic-instructions.md"
+        other.parent.mkdir()
+        other.write_text("---\nscope: module\nid: api\ndependencies: [core]\n---\n")
+        semantic_graph.watch_worktree(root)
+        try:
+            graph = semantic_graph.load_graph(root)
+            assert graph.num_nodes == 3
+            
+            def no_rescan(_repo_root):
+                raise AssertionError("rescanned")
+            monkeypatch.setattr(semantic_graph, "find_semantic_instruction_files", no_rescan)
+            core = scripts_repo_dir / "modules" / "core" / "semantic-instructions.md"
+            core.write_text("---\nscope: module\nid: core\nname: Renamed\n---\n")
+            os.utime(core, ns=(1, 1))
+            semantic_graph.apply_changes(root, ["modules/core/semantic-instructions.md", "src/app.py"])
+            graph = semantic_graph.load_graph(root)
+            assert graph.node(graph.node_index("core"))["name"] == "Renamed"
+            assert graph.to_dict()["edges"][-1] == {"from": "module:modules/api", "to": "module:modules/core", "type": "depends-on"}
+            
+            core.unlink()
+            semantic_graph.apply_changes(root, ["modules/core/semantic-instructions.md"])
+            graph = semantic_graph.load_graph(root)
+            assert graph.num_nodes == 2
+            assert graph.node_index("core") is None
+        finally:
+            semantic_graph.watch_worktree(root, False)
+    
+    def test_live_graph_rescans_new_files(self, scripts_repo_dir):
+        """Test that a new semantic file is picked up by a rescan."""
+        root = str(scripts_repo_dir)
+        semantic_graph.watch_worktree(root)
+        try:
+            assert semantic_graph.load_graph(root).num_nodes == 2
+            added = scripts_repo_dir / "modules" / "api" / "semantic-instructions.md"
+            added.parent.mkdir()
+            added.write_text("---\nscope: module\nid: api\n---\n")
+            assert semantic_graph.load_graph(root).num_nodes == 2
+            
+            semantic_graph.apply_changes(root, ["modules/api", "modules/api/semantic-instructions.md"])
+            assert semantic_graph.load_graph(root).node_index("api") is not None
+        finally:
+            semantic_graph.watch_worktree(root, False)
+    
+    def test_live_adr_index(self, temp_repo_dir):
+        """Test that ADR titles are updated in place and new ADRs rebuild the index."""
+        root = str(temp_repo_dir)
+        adr_dir = temp_repo_dir / "docs" / "adr"
+        adr_dir.mkdir()
+        (adr_dir / "adr-001.md").write_text("# First\n")
+        adr_index.watch_records(root)
+        try:
+            assert [r["title"] for r in adr_index.run([], root)["records"]] == ["First"]
+            
+            (adr_dir / "adr-001.md").write_text("# Renamed\n")
+            assert [r["title"] for r in adr_index.run([], root)["records"]] == ["First"]
+            adr_index.apply_changes(root, ["docs/adr/adr-001.md"])
+            assert [r["title"] for r in adr_index.run([], root)["records"]] == ["Renamed"]
+            
+            (adr_dir / "adr-002.md").write_text("# Second\n")
+            adr_index.apply_changes(root, ["docs/adr/adr-002.md"])
+            assert [r["title"] for r in adr_index.run([], root)["records"]] == ["Renamed", "Second"]
+            
+            (adr_dir / "adr-001.md").unlink()
+            adr_index.apply_changes(root, ["docs/adr/adr-001.md"])
+            assert [r["path"] for r in adr_index.run([], root)["records"]] == ["docs/adr/adr-002.md"]
+        finally:
+            adr_index.watch_records(root, False)
+    
+    def test_watched_adapter_skips_fingerprints(self, scripts_repo_dir, mock_glossary_file, monkeypatch):
+        """Test that a watched repository is served without fingerprinting it."""
+        def no_fingerprint(_repo_root):
+            raise AssertionError("fingerprinted")
+        
+        monkeypatch.setenv("MCP_WATCH_INTERVAL", "0.05")
+        watcher = start_watcher(str(scripts_repo_dir), backend="poll", execution_mode="inprocess")
+        try:
+            monkeypatch.setattr(fingerprint, "repository_fingerprint", no_fingerprint)
+            adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+            assert adapter.watcher is watcher
+            
+            graph = adapter.run_script("semantic_graph.py", [])
+            assert adapter.run_script("semantic_graph.py", []) is graph
+            glossary_token = watcher.token("glossary")
+            
+            core = scripts_repo_dir / "modules" / "core" / "semantic-instructions.md"
+            core.write_text("---\nscope: module\nid: core\nname: Renamed\n---\n")
+            os.utime(core, ns=(1, 1))
+            assert wait_for(lambda: adapter.run_script("semantic_graph.py", []) is not graph)
+            graph = adapter.run_script("semantic_graph.py", [])
+            assert graph.node(graph.node_index("core"))["name"] == "Renamed"
+            assert watcher.token("glossary") == glossary_token
+        finally:
+            stop_watcher(str(scripts_repo_dir))
+        assert FilesystemAdapter(repo_root=str(scripts_repo_dir)).watcher is None
@@ -0,0 +1,174 @@
+"""Unit tests for ResultCache.
+
+Tests the repository-fingerprinted result cache used by the adapter layer.
+"""
+import subprocess
+import time
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter, ResultCache, SingleFlight
+from mcp_server.adapters import fingerprint
+from mcp_server.adapters.fingerprint import FingerprintCache
+
+
+class TestResultCache:
+    """Test ResultCache class."""
+    
+    def test_hit_and_miss(self):
+        """Test basic lookups and counters."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        assert cache.get("a") == (False, None)
+        
+        cache.put("a", {"v": 1}, tool="adr_index.py")
+        assert cache.get("a") == (True, {"v": 1})
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResultCache(max_size=2, ttl=0, enabled=True)
+        cache.put("a", 1, tool="t")
+        cache.put("b", 2, tool="t")
+        cache.get("a")
+        cache.put("c", 3, tool="t")
+        
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.get("c") == (True, 3)
+        assert cache.stats()["evictions"] == 1
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        cache = ResultCache(max_size=10, ttl=0.05, enabled=True)
+        cache.put("a", 1, tool="t")
+        time.sleep(0.1)
+        
+        assert cache.get("a") == (False, None)
+        assert cache.stats()["expirations"] == 1
+    
+    def test_invalidate_by_tool(self):
+        """Test explicit invalidation of one tool's entries."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        cache.put("g1", 1, tool="semantic_graph.py")
+        cache.put("g2", 2, tool="semantic_graph.py")
+        cache.put("gl", 3, tool="glossary")
+        
+        assert cache.invalidate("semantic_graph.py") == 2
+        assert cache.get("gl") == (True, 3)
+        assert cache.invalidate() == 1
+        assert cache.stats()["size"] == 0
+    
+    def test_disabled_cache(self):
+        """Test that a disabled cache never stores results."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=False)
+        cache.put("a", 1, tool="t")
+        assert cache.get("a") == (False, None)
+
+
+class TestAdapterCaching:
+    """Test result caching through FilesystemAdapter."""
+    
+    @pytest.fixture
+    def git_repo_dir(self, scripts_repo_dir):
+        """Turn the scripts repository into a git work tree with one commit."""
+        def git(*args):
+            subprocess.run(
+                ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                cwd=scripts_repo_dir, check=True, capture_output=True,
+            )
+        git("init", "-q")
+        git("add", "-A")
+        git("commit", "-q", "-m", "init")
+        return scripts_repo_dir
+    
+    def test_repeated_calls_hit_cache(self, git_repo_dir):
+        """Test that an unchanged repository serves results from the cache."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        adapter = FilesystemAdapter(
+            repo_root=str(git_repo_dir), result_cache=cache, single_flight=SingleFlight()
+        )
+        
+        first = adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        second = adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        assert second is first
+        assert cache.stats()["hits"] == 1
+    
+    def test_worktree_change_misses_cache(self, git_repo_dir):
+        """Test that editing the worktree changes the cache key."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        adapter = FilesystemAdapter(
+            repo_root=str(git_repo_dir), result_cache=cache, single_flight=SingleFlight(),
+            fingerprints=FingerprintCache(ttl=0),
+        )
+        
+        adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        new_module = git_repo_dir / "modules" / "api"
+        new_module.mkdir()
+        (new_module / "semantic-instructions.md").write_text("---\nscope: module\n---\n")
+        result = adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()
+        
+        assert any(n["id"] == "module:modules/api" for n in result["nodes"])
+        assert cache.stats()["hits"] == 0
+    
+    def test_cache_hit_runs_no_git(self, git_repo_dir, monkeypatch):
+        """Test that a cache hit within the fingerprint window starts no git process."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        adapter = FilesystemAdapter(
+            repo_root=str(git_repo_dir), result_cache=cache, single_flight=SingleFlight(),
+            fingerprints=FingerprintCache(ttl=60),
+        )
+        first = adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        
+        def no_git(*args, **kwargs):
+            raise AssertionError("git was run")
+        
+        monkeypatch.setattr(fingerprint.subprocess, "run", no_git)
+        assert adapter.run_script("semantic_graph.py", ["--scope", "project"]) is first
+        assert cache.stats()["hits"] == 1
+    
+    def test_fingerprint_window(self, git_repo_dir, monkeypatch):
+        """Test that a fingerprint is reused until its window ends or git state changes."""
+        calls = []
+        
+        def counting(repo_root):
+            calls.append(repo_root)
+            return f"fp-{len(calls)}"
+        
+        monkeypatch.setattr(fingerprint, "repository_fingerprint", counting)
+        now = [100.0]
+        monkeypatch.setattr(fingerprint.time, "monotonic", lambda: now[0])
+        fingerprints = FingerprintCache(ttl=2)
+        
+        assert fingerprints.get(git_repo_dir) == "fp-1"
+        (git_repo_dir / "new.txt").write_text("edit")
+        now[0] += 1
+        assert fingerprints.get(git_repo_dir) == "fp-1"
+        now[0] += 1
+        assert fingerprints.get(git_repo_dir) == "fp-2"
+        
+        # Staging changes the index, which ends the window at once
+        subprocess.run(["git", "add", "new.txt"], cwd=git_repo_dir, check=True)
+        assert fingerprints.get(git_repo_dir) == "fp-3"
+        assert FingerprintCache(ttl=0).get(git_repo_dir) == "fp-4"
+    
+    async def test_glossary_cached(self, git_repo_dir, mock_glossary_file):
+        """Test that glossary entries are cached per snapshot."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        adapter = FilesystemAdapter(repo_root=str(git_repo_dir), result_cache=cache)
+        
+        first = await adapter.read_glossary_async()
+        second = await adapter.read_glossary_async()
+        assert len(first) == 3
+        assert second is first
+    
+    def test_untracked_directory_not_cached(self, scripts_repo_dir):
+        """Test that results are not cached outside a git work tree."""
+        cache = ResultCache(max_size=10, ttl=0, enabled=True)
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), result_cache=cache)
+        
+        adapter.run_script("semantic_graph.py", ["--scope", "project"])
+        assert cache.stats()["size"] == 0
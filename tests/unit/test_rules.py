@@ -0,0 +1,172 @@
+"""Unit tests for the validator rule engine.
+
+Tests rule registration, ruleset selection and that each input is gathered
+once per file however many rules read it.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
+
+import semantic_rules  # noqa: E402
+import semantic_validator  # noqa: E402
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Rule registry that is restored after the test."""
+    monkeypatch.setattr(semantic_rules, "RULES", dict(semantic_rules.RULES))
+    monkeypatch.setattr(semantic_rules, "RULESETS", {k: list(v) for k, v in semantic_rules.RULESETS.items()})
+    return semantic_rules
+
+
+class TestRulesets:
+    """Test which rules each ruleset runs."""
+    
+    def test_builtin_rulesets(self):
+        """Test that strict and ci add the required documents to the default rules."""
+        file_rules, repository_rules = semantic_rules.select_rules("default")
+        assert [r.name for r in file_rules] == ["front-matter-schema", "module-structure"]
+        assert [r.name for r in repository_rules] == ["references"]
+        for ruleset in ("strict", "ci"):
+            file_rules, repository_rules = semantic_rules.select_rules(ruleset)
+            assert [r.name for r in repository_rules] == ["required-documents", "references"]
+    
+    def test_ruleset_selects_repository_rules(self, scripts_repo_dir):
+        """Test that only strict and ci report missing core documents."""
+        root = str(scripts_repo_dir)
+        assert semantic_validator.run(["--noCache"], root)["diagnostics"] == []
+        strict = semantic_validator.run(["--ruleset", "strict", "--noCache"], root)
+        assert [d["code"] for d in strict["diagnostics"]] == ["DOC001"] * 4
+    
+    def test_invalid_registration(self, registry):
+        """Test that unknown inputs, unknown rulesets and duplicate names are rejected."""
+        with pytest.raises(ValueError, match="file_text"):
+            registry.rule("text", needs=("file_text",))
+        with pytest.raises(ValueError, match="nightly"):
+            registry.rule("nightly", rulesets=("nightly",))
+        with pytest.raises(ValueError, match="units"):
+            registry.rule("unit-names", needs=("units",))
+        with pytest.raises(ValueError, match="already registered"):
+            registry.rule("module-structure")
+
+
+class TestEngine:
+    """Test how the engine gathers inputs and runs rules."""
+    
+    def test_inputs_gathered_once(self, registry, scripts_repo_dir, monkeypatch):
+        """Test that added rules read the inputs already gathered instead of another pass."""
+        seen = []
+        
+        @registry.rule("module-name", needs=("front_matter", "listing"), scopes=("module",), rulesets=("strict",))
+        def module_name(ctx):
+            seen.append((ctx.front_matter.name, ctx.listing))
+            if ctx.front_matter.name != ctx.front_matter.id:
+                ctx.report("warning", "SI900", "Module name differs from id", ctx.front_matter.line("name"))
+        
+        calls = {"front_matter": 0, "listing": 0}
+        load_front_matter, nested_directories = registry.load_front_matter, registry.nested_directories
+        
+        def counted(name, func):
+            def wrapper(*args):
+                calls[name] += 1
+                return func(*args)
+            return wrapper
+        monkeypatch.setattr(registry, "load_front_matter", counted("front_matter", load_front_matter))
+        monkeypatch.setattr(registry, "nested_directories", counted("listing", nested_directories))
+        
+        (scripts_repo_dir / "modules" / "core" / "sub" / "deep").mkdir(parents=True)
+        result = semantic_validator.run(["--ruleset", "strict", "--noCache"], str(scripts_repo_dir))
+        
+        assert calls == {"front_matter": 1, "listing": 1}
+        assert seen == [("Core", ["sub/deep"])]
+        codes = [(d["code"], d["location"].get("startLine")) for d in result["diagnostics"] if d["code"] != "DOC001"]
+        assert codes == [("SI003", None), ("SI900", 4)]
+    
+    def test_scoped_rules_skip_other_files(self, scripts_repo_dir):
+        """Test that module rules skip other scopes and front-matter rules skip unreadable files."""
+        project = scripts_repo_dir / "semantic-instructions.md"
+        project.write_text("---\nscope: project\nid: p\nowners: [\"@a\"]\n---\n")
+        broken = scripts_repo_dir / "modules" / "broken" / "semantic-instructions.md"
+        broken.parent.mkdir()
+        broken.write_text("# no front matter\n")
+        (scripts_repo_dir / "docs" / "nested").mkdir()
+        
+        results = semantic_validator.validate_chunk(
+            ["semantic-instructions.md", "modules/broken/semantic-instructions.md"], str(scripts_repo_dir)
+        )
+        # The project's subdirectories are never listed
+        assert results[0] == ([], None)
+        assert [d["code"] for d in results[1][0]] == ["SI001"]
+
+
+def write_unit(root, path, scope, name, dependencies=()):
+    target = root / path / "semantic-instructions.md"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(
+        f"---\nscope: {scope}\nid: {name}\nname: {name}\nowners: [\"@a\"]\n"
+        f"dependencies: [{', '.join(dependencies)}]\n---\n"
+    )
+
+
+class TestReferences:
+    """Test cross-reference validation against the unit index."""
+    
+    def test_reference_diagnostics(self, temp_repo_dir):
+        """Test dangling references, self-references and references across scope."""
+        write_unit(temp_repo_dir, "clusters/app", "cluster", "app", ["api"])
+        write_unit(temp_repo_dir, "clusters/app/api", "module", "api", ["core", "modules/core", "module:modules/core"])
+        write_unit(temp_repo_dir, "clusters/app/web", "module", "web", ["web", "app", "ghost", "project:demo", "api"])
+        write_unit(temp_repo_dir, "modules/core", "module", "core")
+        result = semantic_validator.run(["--noCache"], str(temp_repo_dir))
+        
+        found = [(d["code"], d["severity"], d["location"]["file"]) for d in result["diagnostics"]]
+        assert found == [
+            ("SI012", "warning", "clusters/app/semantic-instructions.md"),
+            ("SI011", "warning", "clusters/app/web/semantic-instructions.md"),
+            ("SI012", "warning", "clusters/app/web/semantic-instructions.md"),
+            ("SI010", "error", "clusters/app/web/semantic-instructions.md"),
+            ("SI012", "warning", "clusters/app/web/semantic-instructions.md"),
+        ]
+        assert "'ghost'" in result["diagnostics"][3]["message"]
+        assert "containing cluster clusters/app" in result["diagnostics"][2]["message"]
+    
+    def test_only_target_references_checked(self, temp_repo_dir):
+        """Test that references are checked for the run's targets against every unit."""
+        write_unit(temp_repo_dir, "a", "module", "a", ["b"])
+        write_unit(temp_repo_dir, "b", "module", "b", ["ghost"])
+        root = str(temp_repo_dir)
+        
+        assert semantic_validator.run(["--targets", "a", "--noCache"], root)["diagnostics"] == []
+        result = semantic_validator.run(["--targets", "b", "--noCache"], root)
+        assert [d["code"] for d in result["diagnostics"]] == ["SI010"]
+    
+    def test_index_follows_changes(self, temp_repo_dir):
+        """Test that the index is rebuilt from changed files while the validation cache is used."""
+        write_unit(temp_repo_dir, "a", "module", "a", ["b"])
+        root = str(temp_repo_dir)
+        assert [d["code"] for d in semantic_validator.run([], root)["diagnostics"]] == ["SI010"]
+        
+        write_unit(temp_repo_dir, "b", "module", "b")
+        result = semantic_validator.run([], root)
+        assert result["diagnostics"] == []
+        assert result["meta"]["filesSkipped"] == 1
+    
+    def test_index_built_once(self, temp_repo_dir, monkeypatch):
+        """Test that the unit index is built once per run and names resolve by dictionary lookup."""
+        write_unit(temp_repo_dir, "a", "module", "a", ["b"])
+        write_unit(temp_repo_dir, "b", "module", "b", ["a"])
+        builds = []
+        unit_index = semantic_rules.UnitIndex
+        
+        def counted(table):
+            builds.append(len(table))
+            return unit_index(table)
+        monkeypatch.setattr(semantic_rules, "UnitIndex", counted)
+        
+        assert semantic_validator.run(["--noCache"], str(temp_repo_dir))["diagnostics"] == []
+        assert builds == [2]
+        index = unit_index({})
+        assert index.resolve(".") == "." and index.resolve("a") is None
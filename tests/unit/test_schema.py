@@ -0,0 +1,132 @@
+"""Unit tests for compiled front-matter schema validation.
+
+Tests the compiled keywords, SI codes and line numbers, and that the
+validator applies the repository's schema.
+"""
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
+
+import semantic_schema  # noqa: E402
+import semantic_validator  # noqa: E402
+from semantic_frontmatter import parse_bytes  # noqa: E402
+
+SCHEMA_PATH = Path(__file__).parents[2] / semantic_schema.SCHEMA_FILE
+
+
+def violations(schema, data):
+    validator = semantic_schema.compile_validator(json.dumps(schema).encode())
+    return [(v.code, semantic_schema.format_path(v.path)) for v in validator.validate(data)]
+
+
+@pytest.fixture
+def schema_repo_dir(scripts_repo_dir: Path) -> Path:
+    """A repository with the project's front-matter schema."""
+    (scripts_repo_dir / ".schemas").mkdir()
+    shutil.copy(SCHEMA_PATH, scripts_repo_dir / semantic_schema.SCHEMA_FILE)
+    return scripts_repo_dir
+
+
+class TestCompiledSchema:
+    """Test the compiled schema keywords."""
+    
+    def test_project_schema(self):
+        """Test the project schema's required fields, owners and typed objects."""
+        schema = json.loads(SCHEMA_PATH.read_text())
+        valid = {"scope": "module", "id": "core", "name": "Core", "owners": ["@a"], "contract": {"invariants": ["x"]}}
+        assert violations(schema, valid) == []
+        
+        data = {
+            "scope": "galaxy", "id": "core", "owners": [],
+            "contract": {"invariants": ["x", 3], "validation": []}, "change_policy": "none",
+        }
+        assert violations(schema, data) == [
+            ("SI002", "name"),
+            ("SI005", "scope"),
+            ("SI006", "owners"),
+            ("SI004", "contract.invariants[1]"),
+            ("SI004", "contract.validation"),
+            ("SI004", "change_policy"),
+        ]
+    
+    def test_keywords(self):
+        """Test bounds, patterns, const and additionalProperties."""
+        schema = {
+            "type": "object",
+            "properties": {
+                "n": {"type": "integer", "minimum": 1, "maximum": 3},
+                "tag": {"type": "string", "pattern": "^v[0-9]+$", "maxLength": 3},
+                "kind": {"const": "module"},
+            },
+            "additionalProperties": False,
+        }
+        assert violations(schema, {"n": 2, "tag": "v1", "kind": "module"}) == []
+        assert violations(schema, {"n": True, "tag": "x1234", "kind": "cluster", "extra": 1}) == [
+            ("SI004", "n"),
+            ("SI005", "tag"),
+            ("SI006", "tag"),
+            ("SI005", "kind"),
+            ("SI007", "extra"),
+        ]
+        assert violations(schema, [1]) == [("SI004", "front matter")]
+    
+    def test_unsupported_keywords_rejected(self):
+        """Test that a schema with keywords the compiler does not know is rejected."""
+        with pytest.raises(ValueError, match="oneOf"):
+            semantic_schema.compile_schema({"oneOf": [{"type": "string"}]})
+        with pytest.raises(ValueError, match="Unknown schema type"):
+            semantic_schema.compile_schema({"type": "date"})
+    
+    def test_compiled_once(self):
+        """Test that a schema document is compiled once per content."""
+        text = SCHEMA_PATH.read_bytes()
+        assert semantic_schema.compile_validator(text) is semantic_schema.compile_validator(bytes(text))
+    
+    def test_line_numbers(self):
+        """Test that violations are placed on the nearest recorded key."""
+        fm = parse_bytes(b"---\nscope: module\ncontract:\n  invariants:\n    - 1\n---\n")
+        assert semantic_schema.line_of(fm, ("contract", "invariants", 0)) == 4
+        assert semantic_schema.line_of(fm, ("contract", "validation")) == 3
+        assert semantic_schema.line_of(fm, ("owners",)) == 1
+
+
+class TestSchemaValidation:
+    """Test the validator against the repository's schema."""
+    
+    def test_schema_diagnostics(self, schema_repo_dir):
+        """Test SI codes and lines reported for a file that violates the schema."""
+        core = schema_repo_dir / "modules" / "core" / "semantic-instructions.md"
+        core.write_text("---\nscope: module\nid: core\nowners: []\nchange_policy:\n  escalation: 3\n---\n")
+        result = semantic_validator.run(["--noCache"], str(schema_repo_dir))
+        
+        found = [(d["code"], d["location"]["startLine"]) for d in result["diagnostics"]]
+        assert found == [("SI002", 1), ("SI006", 4), ("SI004", 6)]
+    
+    def test_default_schema_without_file(self, scripts_repo_dir):
+        """Test that a repository without a schema file gets the previously required fields."""
+        core = scripts_repo_dir / "modules" / "core" / "semantic-instructions.md"
+        core.write_text("---\nscope: module\nname: Core\n---\n")
+        result = semantic_validator.run(["--noCache"], str(scripts_repo_dir))
+        
+        assert [(d["code"], d["message"]) for d in result["diagnostics"]] == [
+            ("SI002", "Missing required field 'id'"),
+            ("SI002", "Missing required field 'owners'"),
+        ]
+    
+    def test_schema_change_invalidates_cache(self, schema_repo_dir):
+        """Test that editing the schema re-validates every file."""
+        root = str(schema_repo_dir)
+        assert semantic_validator.run([], root)["diagnostics"] == []
+        assert semantic_validator.run([], root)["meta"]["filesSkipped"] == 1
+        
+        schema = json.loads(SCHEMA_PATH.read_text())
+        schema["required"].append("reviewers")
+        (schema_repo_dir / semantic_schema.SCHEMA_FILE).write_text(json.dumps(schema))
+        result = semantic_validator.run([], root)
+        assert result["meta"]["filesSkipped"] == 0
+        assert [d["code"] for d in result["diagnostics"]] == ["SI002"]
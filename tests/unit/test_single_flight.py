@@ -0,0 +1,92 @@
+"""Unit tests for SingleFlight.
+
+Tests coalescing of identical concurrent calls in the adapter layer.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter, SingleFlight
+
+
+class TestSingleFlight:
+    """Test SingleFlight class."""
+    
+    def test_concurrent_threads_share_one_execution(self):
+        """Test that threads calling with the same key share one result."""
+        flight = SingleFlight()
+        executions = []
+        
+        def compute():
+            executions.append(1)
+            time.sleep(0.2)
+            return {"value": 42}
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("graph", compute)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert len(executions) == 1
+        assert all(r is results[0] for r in results)
+        stats = flight.stats()
+        assert stats["calls"] == 4
+        assert stats["coalesced"] == 3
+        assert stats["inFlight"] == 0
+    
+    def test_errors_are_shared(self):
+        """Test that every waiter receives the leader's exception."""
+        flight = SingleFlight()
+        
+        def fail():
+            raise RuntimeError("boom")
+        
+        with pytest.raises(RuntimeError, match="boom"):
+            flight.do("key", fail)
+        # The failed call is not remembered
+        assert flight.do("key", lambda: "ok") == "ok"
+    
+    async def test_async_calls_coalesce(self):
+        """Test that coroutines with the same key share one execution."""
+        flight = SingleFlight()
+        executions = []
+        
+        async def compute():
+            executions.append(1)
+            await asyncio.sleep(0.1)
+            return "result"
+        
+        results = await asyncio.gather(*[flight.do_async("k", compute) for _ in range(5)])
+        other = await flight.do_async("other", compute)
+        
+        assert results == ["result"] * 5
+        assert other == "result"
+        assert len(executions) == 2
+        assert flight.stats()["coalesced"] == 4
+    
+    async def test_adapter_coalesces_identical_calls(self, temp_repo_dir):
+        """Test that the adapter shares one subprocess between identical calls."""
+        script_path = temp_repo_dir / "scripts" / "counter.py"
+        script_path.write_text(
+            "import json, time\n"
+            "with open('runs.txt', 'a') as f: f.write('x')\n"
+            "time.sleep(0.5)\n"
+            "print(json.dumps({'ok': True}))\n"
+        )
+        
+        flight = SingleFlight()
+        adapter = FilesystemAdapter(repo_root=str(temp_repo_dir), single_flight=flight)
+        results = await asyncio.gather(*[
+            adapter.run_script_async("counter.py", ["--scope", "module"]) for _ in range(3)
+        ])
+        
+        assert all(r["ok"] for r in results)
+        assert (temp_repo_dir / "runs.txt").read_text() == "x"
+        assert flight.stats()["coalesced"] == 2
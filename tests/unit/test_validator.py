@@ -0,0 +1,171 @@
+"""Unit tests for the semantic validator.
+
+Tests that parallel validation returns exactly what sequential validation
+returns, that the validation cache re-runs rules only where needed, and
+that streamed records arrive as they are produced.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "scripts"))
+
+import semantic_validator  # noqa: E402
+
+
+@pytest.fixture
+def many_modules_repo(scripts_repo_dir: Path) -> Path:
+    """A repository with enough modules for several validation chunks."""
+    for i in range(2 * semantic_validator.CHUNK_SIZE + 5):
+        module = scripts_repo_dir / "modules" / f"m{i:03d}"
+        (module / "sub").mkdir(parents=True)
+        if i % 7 == 0:
+            (module / "sub" / "nested").mkdir()
+        front_matter = f"scope: module\nid: m{i}\nowners: [\"@t\"]" if i % 5 else f"scope: module\nname: m{i}"
+        (module / "semantic-instructions.md").write_text(f"---\n{front_matter}\n---\n")
+    return scripts_repo_dir
+
+
+def without_timestamp(result):
+    for key in ("generatedAt", "filesChecked", "filesSkipped"):
+        result["meta"].pop(key)
+    return result
+
+
+def codes(result):
+    return [(d["code"], d["location"]["file"]) for d in result["diagnostics"]]
+
+
+class TestParallelValidation:
+    """Test validation spread over worker pools."""
+    
+    @pytest.mark.parametrize("pool", ["thread", "process"])
+    def test_identical_to_sequential(self, many_modules_repo, pool):
+        """Test that every worker count yields the same diagnostics in the same order."""
+        root = str(many_modules_repo)
+        sequential = without_timestamp(semantic_validator.run(["--workers", "1", "--noCache"], root))
+        assert {"SI002", "SI003"} <= {code for code, _path in codes(sequential)}
+        
+        for workers in ("2", "8"):
+            parallel = semantic_validator.run(["--workers", workers, "--pool", pool, "--noCache"], root)
+            assert without_timestamp(parallel) == sequential
+    
+    def test_process_pool_in_server(self, many_modules_repo):
+        """Test process workers when the server has loaded the script under a private name."""
+        adapter = FilesystemAdapter(repo_root=str(many_modules_repo), execution_mode="inprocess")
+        module = adapter.in_process_runner.load(many_modules_repo / "scripts" / "semantic_validator.py")
+        result = module.run(["--workers", "2", "--pool", "process", "--ruleset", "strict", "--noCache"], str(many_modules_repo))
+        
+        expected = semantic_validator.run(["--workers", "1", "--ruleset", "strict", "--noCache"], str(many_modules_repo))
+        assert without_timestamp(result) == without_timestamp(expected)
+    
+    def test_thread_pool_in_server(self, many_modules_repo, monkeypatch):
+        """Test that the server's in-process runs validate on threads and start no process pool."""
+        monkeypatch.setenv(semantic_validator.WORKERS_ENV, "2")
+        adapter = FilesystemAdapter(repo_root=str(many_modules_repo), execution_mode="inprocess")
+        result = adapter.run_script("semantic_validator.py", ["--ruleset", "strict"])
+        
+        expected = semantic_validator.run(["--workers", "1", "--ruleset", "strict", "--noCache"], str(many_modules_repo))
+        assert without_timestamp(result) == without_timestamp(expected)
+        module = adapter.in_process_runner.load(many_modules_repo / "scripts" / "semantic_validator.py")
+        assert module._executors and all(pool == "thread" for pool, _workers in module._executors)
+    
+    def test_invalid_worker_count(self, scripts_repo_dir):
+        """Test that a worker count below one is rejected."""
+        with pytest.raises(ValueError):
+            semantic_validator.run(["--workers", "0"], str(scripts_repo_dir))
+
+
+class TestIncrementalValidation:
+    """Test the persistent validation cache."""
+    
+    def test_unchanged_files_skipped(self, many_modules_repo):
+        """Test that a second run reuses every result and reports the same diagnostics."""
+        root = str(many_modules_repo)
+        first = semantic_validator.run(["--workers", "1"], root)
+        total = 2 * semantic_validator.CHUNK_SIZE + 6
+        assert (first["meta"]["filesChecked"], first["meta"]["filesSkipped"]) == (total, 0)
+        assert (many_modules_repo / semantic_validator.VALIDATION_CACHE_FILE).is_file()
+        
+        second = semantic_validator.run(["--workers", "2", "--pool", "thread"], root)
+        assert (second["meta"]["filesChecked"], second["meta"]["filesSkipped"]) == (0, total)
+        assert second["diagnostics"] == first["diagnostics"]
+    
+    def test_changed_content_and_structure_rechecked(self, many_modules_repo):
+        """Test that edited files and modules with new nested directories are validated again."""
+        root = str(many_modules_repo)
+        semantic_validator.run(["--workers", "1"], root)
+        
+        edited = many_modules_repo / "modules" / "m001" / "semantic-instructions.md"
+        edited.write_text("---\nscope: module\nid: m1\n---\n")
+        (many_modules_repo / "modules" / "m002" / "sub" / "nested").mkdir()
+        result = semantic_validator.run(["--workers", "1"], root)
+        
+        assert result["meta"]["filesChecked"] == 2
+        assert result["diagnostics"] == semantic_validator.run(["--noCache"], root)["diagnostics"]
+        assert ("SI002", "modules/m001/semantic-instructions.md") in codes(result)
+        assert ("SI003", "modules/m002/semantic-instructions.md") in codes(result)
+    
+    def test_rulesets_cached_separately(self, many_modules_repo):
+        """Test that each ruleset has its own entries and deleted files are dropped."""
+        root = str(many_modules_repo)
+        semantic_validator.run(["--workers", "1"], root)
+        assert semantic_validator.run(["--ruleset", "ci", "--workers", "1"], root)["meta"]["filesSkipped"] == 0
+        assert semantic_validator.run(["--workers", "1"], root)["meta"]["filesChecked"] == 0
+        
+        os.remove(many_modules_repo / "modules" / "m003" / "semantic-instructions.md")
+        semantic_validator.run(["--workers", "1"], root)
+        cache = json.loads((many_modules_repo / semantic_validator.VALIDATION_CACHE_FILE).read_text())
+        assert set(cache["rulesets"]) == {"default", "ci"}
+        assert "modules/m003/semantic-instructions.md" not in cache["rulesets"]["default"]
+    
+    def test_no_cache(self, scripts_repo_dir):
+        """Test that --noCache neither reads nor writes the cache."""
+        result = semantic_validator.run(["--noCache"], str(scripts_repo_dir))
+        assert result["meta"]["filesChecked"] == 1
+        assert not (scripts_repo_dir / semantic_validator.VALIDATION_CACHE_FILE).exists()
+
+
+class TestStreamingValidation:
+    """Test the stream entry point."""
+    
+    @pytest.mark.parametrize("workers", ["1", "3"])
+    def test_stream_matches_run(self, many_modules_repo, workers):
+        """Test that the streamed records are the diagnostics, meta and summary of run()."""
+        argv = ["--noCache", "--workers", workers, "--pool", "thread"]
+        records = list(semantic_validator.stream(argv, str(many_modules_repo)))
+        result = semantic_validator.run(argv, str(many_modules_repo))
+        
+        assert [kind for kind, _record in records[-2:]] == ["meta", "summary"]
+        assert [record for kind, record in records if kind == "diagnostic"] == result["diagnostics"]
+        assert records[-1][1] == result["summary"]
+        assert {**records[-2][1], "generatedAt": None} == {**result["meta"], "generatedAt": None}
+    
+    def test_first_diagnostic_before_other_files(self, many_modules_repo, monkeypatch):
+        """Test that a diagnostic is yielded before the remaining files are checked."""
+        checked = []
+        check_file = semantic_validator.check_file
+        
+        def counted(repository, path, rules):
+            checked.append(path)
+            return check_file(repository, path, rules)
+        monkeypatch.setattr(semantic_validator, "check_file", counted)
+        
+        records = semantic_validator.stream(["--noCache", "--workers", "1"], str(many_modules_repo))
+        kind, record = next(records)
+        assert (kind, record["code"]) == ("diagnostic", "SI002")
+        assert checked == ["modules/core/semantic-instructions.md", "modules/m000/semantic-instructions.md"]
+        records.close()
+    
+    def test_cache_written_after_stream(self, many_modules_repo):
+        """Test that a streamed run updates the validation cache like run()."""
+        root = str(many_modules_repo)
+        records = list(semantic_validator.stream(["--workers", "1"], root))
+        assert records[-2][1]["filesSkipped"] == 0
+        assert semantic_validator.run(["--workers", "1"], root)["meta"]["filesChecked"] == 0
+
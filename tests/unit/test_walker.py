@@ -0,0 +1,78 @@
+"""Unit tests for the shared repository walker.
+
+Tests how scripts/semantic_walk.py prunes and matches files for the scripts.
+"""
+from mcp_server.adapters import FilesystemAdapter
+
+
+class TestRepositoryWalker:
+    """Tests for the shared ignore-aware walker used by the scripts."""
+    
+    def _add_module(self, repo_dir, rel):
+        module_dir = repo_dir / rel
+        module_dir.mkdir(parents=True)
+        (module_dir / "semantic-instructions.md").write_text("---\nscope: module\n---\n")
+    
+    def test_graph_skips_excluded_directories(self, scripts_repo_dir):
+        """Test that dependency, VCS and gitignored directories are not scanned."""
+        self._add_module(scripts_repo_dir, "node_modules/pkg")
+        self._add_module(scripts_repo_dir, ".venv/lib")
+        self._add_module(scripts_repo_dir, "generated/mod")
+        (scripts_repo_dir / ".gitignore").write_text("generated/\n")
+        
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        result = adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()
+        
+        ids = {n["id"] for n in result["nodes"] if n["scope"] == "module"}
+        assert ids == {"module:modules/core"}
+    
+    def test_build_output_pruned_at_root_only(self, scripts_repo_dir):
+        """Test that build and dist are pruned at the root but modules of those names are kept."""
+        self._add_module(scripts_repo_dir, "build/lib")
+        self._add_module(scripts_repo_dir, "dist/pkg")
+        self._add_module(scripts_repo_dir, "services/build")
+        self._add_module(scripts_repo_dir, "modules/dist")
+        
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        result = adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()
+        
+        ids = {n["id"] for n in result["nodes"] if n["scope"] == "module"}
+        assert ids == {"module:modules/core", "module:services/build", "module:modules/dist"}
+    
+    def test_nested_gitignore_and_negation(self, scripts_repo_dir):
+        """Test that nested ignore files apply to their subtree and '!' re-includes."""
+        self._add_module(scripts_repo_dir, "modules/tmp-a")
+        self._add_module(scripts_repo_dir, "modules/tmp-keep")
+        (scripts_repo_dir / "modules" / ".gitignore").write_text("tmp-*\n!tmp-keep\n")
+        
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        result = adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()
+        
+        ids = {n["id"] for n in result["nodes"]}
+        assert "module:modules/tmp-keep" in ids
+        assert "module:modules/tmp-a" not in ids
+    
+    def test_environment_excludes(self, scripts_repo_dir, monkeypatch):
+        """Test that SEMANTIC_EXCLUDE adds exclude patterns."""
+        monkeypatch.setenv("SEMANTIC_EXCLUDE", "modules/core")
+        
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        result = adapter.run_script("semantic_graph.py", ["--scope", "project"]).to_dict()
+        
+        assert [n for n in result["nodes"] if n["scope"] == "module"] == []
+    
+    def test_adr_patterns_single_pass(self, scripts_repo_dir):
+        """Test that a file matched by several patterns is indexed once."""
+        decisions = scripts_repo_dir / "docs" / "decisions"
+        decisions.mkdir(parents=True)
+        (decisions / "adr-0001.md").write_text("# Use records\n")
+        (scripts_repo_dir / "docs" / "adr-0002.md").write_text("# Second\n")
+        
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="inprocess")
+        result = adapter.run_script("adr_index.py", [])
+        
+        assert [r["path"] for r in result["records"]] == [
+            "docs/adr-0002.md",
+            "docs/decisions/adr-0001.md",
+        ]
+        assert result["records"][1]["title"] == "Use records"
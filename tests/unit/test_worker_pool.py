@@ -0,0 +1,74 @@
+"""Unit tests for ScriptWorkerPool.
+
+Tests the warm worker processes used by the "pool" execution mode.
+"""
+import pytest
+
+from mcp_server.adapters import FilesystemAdapter
+from mcp_server.adapters.worker_pool import ScriptWorkerPool
+
+
+class TestScriptWorkerPool:
+    """Test ScriptWorkerPool class."""
+    
+    def test_pool_runs_script(self, scripts_repo_dir):
+        """Test that a job runs on a worker and returns the script result."""
+        pool = ScriptWorkerPool(scripts_repo_dir / "scripts", size=1)
+        try:
+            script = (scripts_repo_dir / "scripts" / "semantic_graph.py").resolve()
+            result = pool.run(script, ["--scope", "project"], scripts_repo_dir).to_dict()
+            assert any(n["id"] == "module:modules/core" for n in result["nodes"])
+            
+            # The warm worker is reused for the next job
+            pool.run(script, ["--scope", "project"], scripts_repo_dir)
+            assert pool.stats()["spawned"] == 1
+            assert pool.stats()["jobs"] == 2
+        finally:
+            pool.shutdown()
+    
+    def test_worker_recycled_after_max_jobs(self, scripts_repo_dir):
+        """Test that workers are replaced after serving max_jobs jobs."""
+        pool = ScriptWorkerPool(scripts_repo_dir / "scripts", size=1, max_jobs=2)
+        try:
+            script = (scripts_repo_dir / "scripts" / "adr_index.py").resolve()
+            for _ in range(3):
+                pool.run(script, ["--root", "docs"], scripts_repo_dir)
+            
+            stats = pool.stats()
+            assert stats["recycled"] == 1
+            assert stats["spawned"] == 2
+        finally:
+            pool.shutdown()
+    
+    def test_worker_killed_on_timeout(self, scripts_repo_dir):
+        """Test that a worker exceeding the timeout is killed."""
+        pool = ScriptWorkerPool(scripts_repo_dir / "scripts", size=1, timeout=0.001)
+        try:
+            script = (scripts_repo_dir / "scripts" / "semantic_graph.py").resolve()
+            with pytest.raises(RuntimeError, match="timed out"):
+                pool.run(script, ["--scope", "project"], scripts_repo_dir)
+            assert pool.stats()["killed"] == 1
+            assert pool.stats()["live"] == 0
+        finally:
+            pool.shutdown()
+    
+    def test_script_errors_are_reported(self, scripts_repo_dir):
+        """Test that script failures in a worker surface as RuntimeError."""
+        pool = ScriptWorkerPool(scripts_repo_dir / "scripts", size=1)
+        try:
+            script = (scripts_repo_dir / "scripts" / "semantic_graph.py").resolve()
+            with pytest.raises(RuntimeError, match="Script execution failed"):
+                pool.run(script, ["--scope", "galaxy"], scripts_repo_dir)
+            assert pool.stats()["live"] == 1
+        finally:
+            pool.shutdown()
+    
+    async def test_adapter_pool_mode(self, scripts_repo_dir):
+        """Test that the adapter dispatches supported scripts to the pool."""
+        adapter = FilesystemAdapter(repo_root=str(scripts_repo_dir), execution_mode="pool")
+        result = await adapter.run_script_async("semantic_graph.py", ["--scope", "project"])
+        result = result.to_dict()
+        assert any(n["id"] == "module:modules/core" for n in result["nodes"])
+        
+        with pytest.raises(RuntimeError, match="Invalid argument flag"):
+            await adapter.run_script_async("semantic_graph.py", ["--evil"])